@@ -22,10 +22,15 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
 from config import Settings
-from shared.browser_automation import GoLoginManager, BrowserProfileManager
+from database import DatabaseManager
+from shared.browser_automation import GoLoginManager, BrowserProfileManager, get_session_pool
+from shared.browser_automation.screenshots import get_screenshot_service
+from shared.browser_automation.element_snapshot import snapshot_elements
+from shared.write_behind import utc_timestamp
+from comment_snapshot import SCROLL_COMMENTS_JS, take_comment_snapshot, count_comments, like_targets
 
 logger = logging.getLogger(__name__)
 
@@ -70,11 +75,15 @@ class InstagramWorker:
         
         # GoLogin / Selenium
         self.gologin_manager = GoLoginManager()
+        self.session_pool = get_session_pool()  # Warm browsers reused across runs
         self.gologin_session = None
         self.driver = None
+        self.browser_reusable = True
         
         # Database
         self.db_path = settings.get_database_path()
+        self.db = DatabaseManager(self.db_path)  # Pooled WAL connections + processed-post index
+        self.log_writer = self.db.writer  # Batched engagement_log writes
         
         # Session tracking
         self.session_id = None
@@ -89,6 +98,7 @@ class InstagramWorker:
         project_root = Path(__file__).parent.parent.parent.resolve()
         self.logs_dir = project_root / 'services' / 'ig-engagement-service' / 'logs'
         self.logs_dir.mkdir(exist_ok=True)
+        self.screenshots = get_screenshot_service(self.logs_dir / 'screenshots')
         
         logger.info(f"Worker initialized for profile: {profile_name} ({profile_id[:8]}...)")
     
@@ -146,6 +156,9 @@ class InstagramWorker:
             # Step 2: Create session in database
             self._create_session_record()
             
+            # Load processed post history once for in-memory dedup
+            self.db.processed_index.load()
+            
             # Step 3: Launch GoLogin
             logger.info("\n[1/5] Launching GoLogin profile...")
             print("[1/5] Launching browser...")
@@ -194,12 +207,14 @@ class InstagramWorker:
             logger.error(f"SESSION FAILED: {str(e)}", exc_info=True)
             print(f"[ERROR] Session failed: {e}")
             
+            # Don't hand a possibly broken browser to the next run
+            if isinstance(e, WebDriverException):
+                self.browser_reusable = False
+            
             # Save error screenshot
             try:
                 if self.driver:
-                    timestamp = datetime.now().strftime('%H%M%S')
-                    screenshot_path = self.logs_dir / f"error_session_{timestamp}.png"
-                    self.driver.save_screenshot(str(screenshot_path))
+                    screenshot_path = self.screenshots.capture(self.driver, self.profile_id, 'error_session', force=True)
                     logger.error(f"Error screenshot saved: {screenshot_path}")
             except:
                 pass
@@ -226,17 +241,12 @@ class InstagramWorker:
             True if limit reached (>= 30), False otherwise
         """
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            today = date.today()
-            cursor.execute("""
-                SELECT like_count, limit_reached FROM daily_likes 
-                WHERE profile_id = ? AND date = ?
-            """, (self.profile_id, today))
-            
-            result = cursor.fetchone()
-            conn.close()
+            with self.db._get_connection() as conn:
+                today = date.today()
+                result = conn.execute("""
+                    SELECT like_count, limit_reached FROM daily_likes 
+                    WHERE profile_id = ? AND date = ?
+                """, (self.profile_id, today.isoformat())).fetchone()
             
             if result:
                 current_count, limit_reached = result
@@ -258,16 +268,12 @@ class InstagramWorker:
     def _create_session_record(self):
         """Create session record in database"""
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO sessions (id, profile_id, started_at, status)
-                VALUES (?, ?, ?, 'running')
-            """, (self.session_id, self.profile_id, datetime.now()))
-            
-            conn.commit()
-            conn.close()
+            with self.db._get_connection() as conn:
+                conn.execute("""
+                    INSERT INTO sessions (id, profile_id, started_at, status)
+                    VALUES (?, ?, ?, 'running')
+                """, (self.session_id, self.profile_id, datetime.now().isoformat(' ')))
+                conn.commit()
             logger.info(f"Session record created in database")
         
         except Exception as e:
@@ -283,53 +289,49 @@ class InstagramWorker:
             error_message: Error message if failed
         """
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE sessions 
-                SET ended_at = ?, status = ?, 
-                    likes_performed = ?, posts_processed = ?, errors_count = ?
-                WHERE id = ?
-            """, (
-                datetime.now(),
-                status,
-                self.likes_performed,
-                self.posts_processed,
-                self.errors_count,
-                self.session_id
-            ))
-            
-            # Update daily_likes if any likes were performed
-            if self.likes_performed > 0:
-                today = date.today()
-                
-                # Check if we've reached limit
-                cursor.execute("""
-                    SELECT like_count FROM daily_likes
-                    WHERE profile_id = ? AND date = ?
-                """, (self.profile_id, today))
-                
-                result = cursor.fetchone()
-                new_count = (result[0] if result else 0) + self.likes_performed
+            with self.db._get_connection() as conn:
+                conn.execute("""
+                    UPDATE sessions 
+                    SET ended_at = ?, status = ?, 
+                        likes_performed = ?, posts_processed = ?, errors_count = ?
+                    WHERE id = ?
+                """, (
+                    datetime.now().isoformat(' '),
+                    status,
+                    self.likes_performed,
+                    self.posts_processed,
+                    self.errors_count,
+                    self.session_id
+                ))
                 
-                limit_reached = 1 if new_count >= 30 else 0
-                
-                cursor.execute("""
-                    INSERT INTO daily_likes (profile_id, date, like_count, limit_reached)
-                    VALUES (?, ?, ?, ?)
-                    ON CONFLICT(profile_id, date) 
-                    DO UPDATE SET 
-                        like_count = like_count + ?,
-                        limit_reached = ?,
-                        last_updated = CURRENT_TIMESTAMP
-                """, (self.profile_id, today, self.likes_performed, limit_reached,
-                      self.likes_performed, limit_reached))
+                # Update daily_likes if any likes were performed
+                if self.likes_performed > 0:
+                    today = date.today().isoformat()
+                    
+                    # Check if we've reached limit
+                    result = conn.execute("""
+                        SELECT like_count FROM daily_likes
+                        WHERE profile_id = ? AND date = ?
+                    """, (self.profile_id, today)).fetchone()
+                    
+                    new_count = (result[0] if result else 0) + self.likes_performed
+                    
+                    limit_reached = 1 if new_count >= 30 else 0
+                    
+                    conn.execute("""
+                        INSERT INTO daily_likes (profile_id, date, like_count, limit_reached)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT(profile_id, date) 
+                        DO UPDATE SET 
+                            like_count = like_count + ?,
+                            limit_reached = ?,
+                            last_updated = CURRENT_TIMESTAMP
+                    """, (self.profile_id, today, self.likes_performed, limit_reached,
+                          self.likes_performed, limit_reached))
+                    
+                    logger.info(f"Daily likes updated: {new_count}/30 (limit_reached={limit_reached})")
                 
-                logger.info(f"Daily likes updated: {new_count}/30 (limit_reached={limit_reached})")
-            
-            conn.commit()
-            conn.close()
+                conn.commit()
             logger.info(f"Session record updated: status={status}")
         
         except Exception as e:
@@ -338,8 +340,8 @@ class InstagramWorker:
     def _start_gologin(self):
         """Launch GoLogin profile and connect Selenium"""
         try:
-            # Start GoLogin session
-            self.gologin_session = self.gologin_manager.start_session(self.profile_id)
+            # Lease a GoLogin session (warm if this profile ran recently)
+            self.gologin_session = self.session_pool.acquire(self.gologin_manager, self.profile_id)
             
             if not self.gologin_session or 'driver' not in self.gologin_session:
                 raise Exception("GoLogin session failed to start")
@@ -347,7 +349,8 @@ class InstagramWorker:
             self.driver = self.gologin_session['driver']
             
             debugger_address = self.gologin_session.get('debugger_address', 'unknown')
-            logger.info(f"GoLogin started successfully: {debugger_address}")
+            warm = " (warm)" if self.gologin_session.get('reused') else ""
+            logger.info(f"GoLogin started successfully{warm}: {debugger_address}")
             print(f"[OK] Browser ready: {debugger_address}")
             
             # Verify Instagram login
@@ -419,11 +422,10 @@ class InstagramWorker:
             
             # Alternative: find any button with cookie-related text
             try:
-                buttons = self.driver.find_elements(By.CSS_SELECTOR, "button")
-                for button in buttons:
+                for button in snapshot_elements(self.driver, "button", fields=('text',)):
                     button_text = button.text.lower()
                     if any(word in button_text for word in ['allow', 'accept', 'zezwól', 'cookie']):
-                        button.click()
+                        button.element.click()
                         logger.info(f"Dismissed cookie popup (found: '{button.text}')")
                         time.sleep(2)
                         return
@@ -518,13 +520,13 @@ class InstagramWorker:
             wait = WebDriverWait(self.driver, 10)
             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='/p/']")))
             
-            # Find all post links
-            post_elements = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='/p/']")
+            # Find all post links (first 20) with their URLs in one script call
+            post_links = snapshot_elements(self.driver, "a[href*='/p/']", fields=('href',), limit=20)
             
             # Extract URLs
             post_urls = []
-            for elem in post_elements[:20]:  # Get first 20 posts
-                href = elem.get_attribute('href')
+            for link in post_links:
+                href = link.href
                 if href and '/p/' in href:
                     post_urls.append(href)
             
@@ -545,6 +547,9 @@ class InstagramWorker:
         """
         Check if post has already been processed
         
+        Uses the in-memory dedup index; SQLite is only queried when the
+        Bloom filter reports a possible hit.
+        
         Args:
             post_url: Full Instagram post URL
             
@@ -552,17 +557,7 @@ class InstagramWorker:
             True if already processed
         """
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT 1 FROM processed_posts WHERE post_url = ?
-            """, (post_url,))
-            
-            result = cursor.fetchone()
-            conn.close()
-            
-            return result is not None
+            return self.db.is_post_processed(post_url)
         
         except Exception as e:
             logger.error(f"Error checking if post processed: {e}")
@@ -656,23 +651,9 @@ class InstagramWorker:
                     comment_author = target.get('author', 'unknown')
                     
                     # Log button position for verification
-                    try:
-                        y_pos = button.location['y']
-                        logger.info(f"    [TARGET {i+1}/3] Button at Y={y_pos} (visual position)")
-                    except:
-                        pass
+                    logger.info(f"    [TARGET {i+1}/3] Button at Y={target.get('y')} (visual position)")
                     logger.info(f"    [COMMENT] Author: {comment_author or 'unknown'} | Text: {comment_text[:120]}")
                     
-                    # Check if already liked
-                    try:
-                        svg = target.get('svg') or button.find_element(By.CSS_SELECTOR, "svg")
-                        svg_aria = svg.get_attribute('aria-label') or ''
-                        if 'unlike' in svg_aria.lower() or 'nie lubi' in svg_aria.lower():
-                            logger.info(f"    Comment {i+1} already liked, skipping")
-                            continue
-                    except:
-                        pass
-                    
                     # Click like button
                     try:
                         # Scroll into view
@@ -708,13 +689,11 @@ class InstagramWorker:
                         logger.warning(f"    [WARN] Could not verify aria-label change: {verify_error}")
                     
                     # CRITICAL: Take screenshot AFTER like to verify which comment was liked
-                    try:
-                        timestamp = datetime.now().strftime('%H%M%S')
-                        screenshot_path = self.logs_dir / f"after_like_{i+1}_{timestamp}.png"
-                        self.driver.save_screenshot(str(screenshot_path))
-                        logger.info(f"    [SCREENSHOT] Saved: {screenshot_path.name}")
-                    except Exception as screenshot_error:
-                        logger.warning(f"    Failed to save screenshot: {screenshot_error}")
+                    screenshot_path = self.screenshots.capture(self.driver, self.profile_id, f"after_like_{i+1}", force=True)
+                    if screenshot_path:
+                        logger.info(f"    [SCREENSHOT] Saved: {os.path.basename(screenshot_path)}")
+                    else:
+                        logger.warning("    Failed to save screenshot")
                     
                     logger.info(f"    [LIKE {i+1}/3] Success! Total session likes: {self.likes_performed}")
                     print(f"    [LIKE] Liked comment {i+1}/3")
@@ -745,21 +724,12 @@ class InstagramWorker:
             
             # Save to processed_posts
             try:
-                conn = sqlite3.connect(str(self.db_path))
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    INSERT INTO processed_posts 
-                    (post_url, instagram_username, profile_id, comments_liked, status)
-                    VALUES (?, ?, ?, ?, 'completed')
-                """, (post_url, post_author, self.profile_id, comments_liked))
-                
-                conn.commit()
-                conn.close()
+                self.db.add_processed_post(post_url, post_author, self.profile_id, comments_liked)
                 
                 logger.info(f"  Post saved to database: {comments_liked} comments liked")
             
             except sqlite3.IntegrityError:
+                self.db.processed_index.add(post_url)
                 logger.warning(f"  Post already in database (duplicate): {post_url}")
             except Exception as e:
                 logger.error(f"  Error saving post to database: {e}")
@@ -786,59 +756,19 @@ class InstagramWorker:
     
     def _count_comments(self) -> int:
         """
-        Count comments on current post (multiple detection methods)
+        Count comments on current post (multiple detection methods, one in-page snapshot)
         
         Returns:
             Number of comments found
         """
         try:
-            # Method 1: Count comment-like SVG buttons (most reliable)
-            try:
-                all_svgs = self.driver.find_elements(By.CSS_SELECTOR, "svg")
-                comment_like_buttons = []
-                
-                for svg in all_svgs:
-                    aria_label = svg.get_attribute('aria-label') or ''
-                    height = svg.get_attribute('height') or ''
-                    
-                    # Comment like buttons: aria-label contains "like"/"polub"/"lubi" and size is NOT 24x24
-                    if any(word in aria_label.lower() for word in ['like', 'polub', 'lubi', 'heart', 'serce']):
-                        if height != '24' and 'unlike' not in aria_label.lower():
-                            comment_like_buttons.append(svg)
-                
-                if len(comment_like_buttons) > 0:
-                    logger.info(f"  [METHOD 1] Found {len(comment_like_buttons)} comment like buttons")
-                    return len(comment_like_buttons)
-            except Exception as e:
-                logger.debug(f"  Method 1 failed: {e}")
-            
-            # Method 2: Count UL > LI structure (fallback)
-            try:
-                ul_elements = self.driver.find_elements(By.CSS_SELECTOR, "ul")
-                
-                for ul in ul_elements:
-                    li_children = ul.find_elements(By.CSS_SELECTOR, "li")
-                    if len(li_children) >= 2:
-                        logger.info(f"  [METHOD 2] Found {len(li_children)} LI elements in UL")
-                        return len(li_children)
-            except Exception as e:
-                logger.debug(f"  Method 2 failed: {e}")
-            
-            # Method 3: Try to find comment-like text structure (last resort)
-            try:
-                # Look for elements that might contain comment text
-                spans = self.driver.find_elements(By.CSS_SELECTOR, "span")
-                comment_texts = [s for s in spans if s.text and len(s.text) > 5]
-                
-                if len(comment_texts) > 10:  # Post with many text elements likely has comments
-                    estimated_comments = min(len(comment_texts) // 3, 10)
-                    logger.info(f"  [METHOD 3] Estimated {estimated_comments} comments from text elements")
-                    return estimated_comments
-            except Exception as e:
-                logger.debug(f"  Method 3 failed: {e}")
-            
-            logger.warning("  All comment detection methods failed, returning 0")
-            return 0
+            snapshot = take_comment_snapshot(self.driver, LIKE_LABEL_KEYWORDS, UNLIKE_LABEL_KEYWORDS)
+            count, method = count_comments(snapshot)
+            if method:
+                logger.info(f"  [{method.upper()}] Found {count} comments")
+            else:
+                logger.warning("  All comment detection methods failed, returning 0")
+            return count
         
         except Exception as e:
             logger.error(f"Error counting comments: {e}")
@@ -858,110 +788,23 @@ class InstagramWorker:
         """Scroll within comments container to load all comments"""
         try:
             logger.info("  Scrolling comments container...")
-            
-            # Find the comments UL and scroll it
-            try:
-                ul_elements = self.driver.find_elements(By.CSS_SELECTOR, "ul")
-                
-                for ul in ul_elements:
-                    li_children = ul.find_elements(By.CSS_SELECTOR, "li")
-                    if len(li_children) >= 2:
-                        # Scroll this UL element to the TOP to ensure first comments are visible
-                        self.driver.execute_script("""
-                            arguments[0].scrollIntoView({behavior: 'smooth', block: 'start'});
-                            // Scroll to TOP of comments list (scrollTop = 0)
-                            arguments[0].scrollTop = 0;
-                        """, ul)
-                        
-                        logger.info("  Scrolled comments container")
-                        time.sleep(2)
-                        return
-            except:
-                pass
-            
-            # Fallback: scroll any scrollable container
-            try:
-                self.driver.execute_script("""
-                    let containers = document.querySelectorAll('article, section, div[role="dialog"]');
-                    for (let container of containers) {
-                        if (container.scrollHeight > container.clientHeight) {
-                            container.scrollTop = container.scrollHeight;
-                            break;
-                        }
-                    }
-                """)
+            scrolled = self.driver.execute_script(SCROLL_COMMENTS_JS)
+            if scrolled == 'list':
+                logger.info("  Scrolled comments container")
+            if scrolled:
                 time.sleep(2)
-            except:
-                pass
         
         except Exception as e:
             logger.warning(f"Error scrolling comments: {e}")
     
     def _find_comment_like_buttons(self) -> List[Dict[str, Any]]:
-        """Locate the first comment <li> rows with like buttons"""
+        """Locate the first comment <li> rows with like buttons (one in-page snapshot)"""
         try:
             logger.info("  Locating comment rows with like buttons (structure-based)...")
-            comment_targets: List[Dict[str, Any]] = []
-
-            try:
-                article = self.driver.find_element(By.TAG_NAME, "article")
-            except Exception:
-                logger.warning("  Could not find <article>; using whole document")
-                article = self.driver
-
-            li_elements = article.find_elements(By.XPATH, ".//li")
-            logger.info(f"  Examining {len(li_elements)} LI elements")
-
-            for li in li_elements:
-                if len(comment_targets) >= 5:
-                    break
-
-                try:
-                    svg = li.find_element(By.XPATH, ".//svg[@aria-label]")
-                except Exception:
-                    continue
-
-                aria_label = (svg.get_attribute('aria-label') or '').lower()
-                if not any(keyword in aria_label for keyword in LIKE_LABEL_KEYWORDS):
-                    continue
-                if any(keyword in aria_label for keyword in UNLIKE_LABEL_KEYWORDS):
-                    logger.debug("    Skipping already-liked heart")
-                    continue
-
-                height = svg.get_attribute('height') or ''
-                width = svg.get_attribute('width') or ''
-                if height == '24' or width == '24':
-                    logger.debug("    Skipping 24x24 post heart")
-                    continue
-
-                try:
-                    button = svg.find_element(By.XPATH, "./ancestor::*[@role='button'][1]")
-                except Exception:
-                    try:
-                        button = svg.find_element(By.XPATH, "./ancestor::*[self::button or @role='button'][1]")
-                    except Exception:
-                        button = None
-
-                if not button:
-                    continue
-
-                text = (li.text or "").strip()
-                author = ""
-                try:
-                    author_elem = li.find_element(By.XPATH, ".//a")
-                    author = author_elem.text.strip()
-                except Exception:
-                    pass
-
-                comment_targets.append({
-                    'button': button,
-                    'svg': svg,
-                    'text': text,
-                    'author': author,
-                    'label_before': aria_label
-                })
-
-            logger.info(f"  Identified {len(comment_targets)} comment rows with like buttons")
+            snapshot = take_comment_snapshot(self.driver, LIKE_LABEL_KEYWORDS, UNLIKE_LABEL_KEYWORDS, max_targets=5)
+            comment_targets = like_targets(snapshot, limit=5)
+            logger.info(f"  Identified {len(comment_targets)} comment rows with like buttons "
+                        f"({len(snapshot['rows']) - len(comment_targets)} already liked)")
             return comment_targets
 
         except Exception as e:
@@ -985,17 +828,16 @@ class InstagramWorker:
             metadata: Additional data as dict (will be JSON serialized)
         """
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
             metadata_json = json.dumps(metadata) if metadata else None
             
-            cursor.execute("""
+            # Queued for the background writer; returns without touching SQLite
+            self.log_writer.submit("""
                 INSERT INTO engagement_log 
-                (profile_id, action, target_url, instagram_username,
+                (timestamp, profile_id, action, target_url, instagram_username,
                  success, error_message, metadata, session_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
+                utc_timestamp(),
                 self.profile_id,
                 action,
                 target_url,
@@ -1005,29 +847,25 @@ class InstagramWorker:
                 metadata_json,
                 self.session_id
             ))
-            
-            conn.commit()
-            conn.close()
         
         except Exception as e:
             logger.error(f"Error logging engagement action: {e}")
     
     def cleanup(self):
-        """Clean up resources (close browser, stop GoLogin)"""
+        """Clean up resources (return browser to the pool, flush queued logs)"""
         try:
-            if self.driver:
-                try:
-                    self.driver.quit()
-                    logger.info("Selenium driver closed")
-                except:
-                    pass
-        except:
-            pass
+            if not self.log_writer.flush():
+                logger.warning("Timed out flushing engagement log writes")
+        except Exception as e:
+            logger.error(f"Error flushing engagement log: {e}")
         
         try:
             if self.gologin_session:
-                self.gologin_manager.cleanup_session(self.gologin_session)
-                logger.info("GoLogin session stopped")
+                # Pool keeps a healthy browser warm, or quits driver and stops GoLogin
+                self.session_pool.release(self.gologin_session, reusable=self.browser_reusable)
+                self.gologin_session = None
+                self.driver = None
+                logger.info("GoLogin session released")
         except:
             pass
         
@@ -0,0 +1,131 @@
+"""
+In-page Comment Extraction
+
+Reading a post's comments element by element costs one WebDriver round-trip
+per ``find_element``/``get_attribute``/``.text`` - hundreds per post. The
+scripts here walk the DOM inside the page and return everything the worker
+needs in a single ``execute_script`` call: comment counts (by the same three
+detection methods as before) and the comment rows with their author, text,
+liked state, y-position and like-button handle.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+COMMENT_SNAPSHOT_JS = """
+const [likeWords, unlikeWords, maxTargets] = arguments;
+const hasAny = (text, words) => words.some(word => text.includes(word));
+const isPostHeart = svg => svg.getAttribute('height') === '24' || svg.getAttribute('width') === '24';
+
+// Method 1: comment-size hearts anywhere on the page
+let likeButtons = 0;
+for (const svg of document.querySelectorAll('svg')) {
+    const label = (svg.getAttribute('aria-label') || '').toLowerCase();
+    if (hasAny(label, likeWords) && !label.includes('unlike') && svg.getAttribute('height') !== '24') {
+        likeButtons++;
+    }
+}
+
+// Method 2: first list with at least two items
+let listItems = 0;
+for (const ul of document.querySelectorAll('ul')) {
+    const count = ul.querySelectorAll('li').length;
+    if (count >= 2) { listItems = count; break; }
+}
+
+// Method 3: spans with some text
+let textSpans = 0;
+for (const span of document.querySelectorAll('span')) {
+    if ((span.innerText || '').trim().length > 5) textSpans++;
+}
+
+// Comment rows: <li> with a comment-size like heart, in page order
+const root = document.querySelector('article') || document;
+const rows = [];
+let unliked = 0;
+for (const li of root.querySelectorAll('li')) {
+    if (unliked >= maxTargets) break;
+    const svg = li.querySelector('svg[aria-label]');
+    if (!svg) continue;
+    const label = svg.getAttribute('aria-label').toLowerCase();
+    if (!hasAny(label, likeWords) || isPostHeart(svg)) continue;
+    const button = svg.closest('[role="button"]') || svg.closest('button');
+    if (!button) continue;
+
+    const liked = hasAny(label, unlikeWords);
+    if (!liked) unliked++;
+    const author = li.querySelector('a');
+    rows.push({
+        author: author ? (author.innerText || '').trim() : '',
+        text: (li.innerText || '').trim(),
+        label: label,
+        liked: liked,
+        y: Math.round(button.getBoundingClientRect().top + window.scrollY),
+        button: button,
+        svg: svg
+    });
+}
+
+return {like_buttons: likeButtons, list_items: listItems, text_spans: textSpans, rows: rows};
+"""
+
+SCROLL_COMMENTS_JS = """
+// Bring the comments list into view, scrolled to its first comment
+for (const ul of document.querySelectorAll('ul')) {
+    if (ul.querySelectorAll('li').length >= 2) {
+        ul.scrollIntoView({behavior: 'smooth', block: 'start'});
+        ul.scrollTop = 0;
+        return 'list';
+    }
+}
+// Fallback: scroll the first scrollable container
+for (const container of document.querySelectorAll('article, section, div[role="dialog"]')) {
+    if (container.scrollHeight > container.clientHeight) {
+        container.scrollTop = container.scrollHeight;
+        return 'container';
+    }
+}
+return null;
+"""
+
+
+def take_comment_snapshot(driver, like_keywords: Sequence[str], unlike_keywords: Sequence[str],
+                          max_targets: int = 5) -> Dict[str, Any]:
+    """
+    Extract comment counts and rows from the open post in one round-trip.
+
+    Args:
+        driver: Selenium WebDriver on a post page
+        like_keywords: Lower-case aria-label words of a like heart
+        unlike_keywords: Lower-case aria-label words of an already liked heart
+        max_targets: Stop collecting rows after this many not-yet-liked ones
+
+    Returns:
+        {'like_buttons', 'list_items', 'text_spans', 'rows': [{'author', 'text',
+        'label', 'liked', 'y', 'button', 'svg'}, ...]}
+    """
+    snapshot = driver.execute_script(COMMENT_SNAPSHOT_JS, list(like_keywords), list(unlike_keywords), max_targets)
+    snapshot = snapshot or {}
+    snapshot.setdefault('rows', [])
+    return snapshot
+
+
+def count_comments(snapshot: Dict[str, Any]) -> Tuple[int, Optional[str]]:
+    """
+    Comment count from a snapshot, by the first detection method that finds any.
+
+    Returns:
+        (count, method) with method 'like_buttons', 'list_items', 'text_spans' or None
+    """
+    if snapshot.get('like_buttons'):
+        return snapshot['like_buttons'], 'like_buttons'
+    if snapshot.get('list_items'):
+        return snapshot['list_items'], 'list_items'
+    # Many text elements likely means comments; roughly three per comment
+    if snapshot.get('text_spans', 0) > 10:
+        return min(snapshot['text_spans'] // 3, 10), 'text_spans'
+    return 0, None
+
+
+def like_targets(snapshot: Dict[str, Any], limit: int = 5) -> List[Dict[str, Any]]:
+    """Comment rows that are not liked yet, top to bottom"""
+    return [row for row in snapshot.get('rows', []) if not row.get('liked')][:limit]
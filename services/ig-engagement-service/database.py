@@ -12,15 +12,159 @@ from typing import List, Dict, Optional, Tuple
 from contextlib import contextmanager
 import logging
 
+from shared.sqlite_pool import get_pool
+from shared.write_behind import get_writer, utc_timestamp
+from shared.dedup_index import DedupIndex
+from shared.migrations import Migration, run_migrations
+
 logger = logging.getLogger(__name__)
 
 
+# Applied in order on top of shared/ig_db_schema.sql; append, never edit
+MIGRATIONS = [
+    Migration(1, "composite indexes for hot queries", [
+        # daily_summary view: per profile/day like_comment counts
+        """CREATE INDEX IF NOT EXISTS idx_engagement_log_profile_action_day
+           ON engagement_log(profile_id, action, DATE(timestamp))""",
+        # Session drill-down ordered by time
+        "CREATE INDEX IF NOT EXISTS idx_engagement_log_session_time ON engagement_log(session_id, timestamp)",
+        # profile_stats view (covering)
+        """CREATE INDEX IF NOT EXISTS idx_processed_posts_profile_stats
+           ON processed_posts(profile_id, processed_at, comments_liked)""",
+        # get_pending_sessions
+        """CREATE INDEX IF NOT EXISTS idx_scheduled_sessions_status_datetime
+           ON scheduled_sessions(status, scheduled_datetime)""",
+        # Duplicates of the UNIQUE constraint's automatic index
+        "DROP INDEX IF EXISTS idx_processed_posts_url",
+        "DROP INDEX IF EXISTS idx_target_accounts_username",
+    ]),
+    Migration(2, "trigger-maintained daily rollups behind the dashboard views", [
+        # engagement_log counts per profile/day/action/outcome
+        """CREATE TABLE IF NOT EXISTS engagement_rollup (
+               profile_id TEXT NOT NULL,
+               day TEXT NOT NULL,
+               action TEXT NOT NULL,
+               success INTEGER NOT NULL,
+               count INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (profile_id, day, action, success)
+           ) WITHOUT ROWID""",
+        """INSERT INTO engagement_rollup (profile_id, day, action, success, count)
+           SELECT profile_id, COALESCE(DATE(timestamp), DATE('now')), action, COALESCE(success, 0), COUNT(*)
+           FROM engagement_log GROUP BY 1, 2, 3, 4""",
+        """CREATE TRIGGER IF NOT EXISTS trg_engagement_rollup_insert
+           AFTER INSERT ON engagement_log
+           BEGIN
+               INSERT INTO engagement_rollup (profile_id, day, action, success, count)
+               VALUES (NEW.profile_id, COALESCE(DATE(NEW.timestamp), DATE('now')), NEW.action,
+                       COALESCE(NEW.success, 0), 1)
+               ON CONFLICT (profile_id, day, action, success) DO UPDATE SET count = count + 1;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_engagement_rollup_delete
+           AFTER DELETE ON engagement_log
+           BEGIN
+               UPDATE engagement_rollup SET count = count - 1
+               WHERE profile_id = OLD.profile_id AND day = COALESCE(DATE(OLD.timestamp), DATE('now'))
+                 AND action = OLD.action AND success = COALESCE(OLD.success, 0);
+           END""",
+
+        # processed_posts per profile/day. first/last_processed_at only grow:
+        # deleting a post leaves them as they were.
+        """CREATE TABLE IF NOT EXISTS processed_posts_rollup (
+               profile_id TEXT NOT NULL,
+               day TEXT NOT NULL,
+               posts INTEGER NOT NULL DEFAULT 0,
+               comments_liked INTEGER NOT NULL DEFAULT 0,
+               first_processed_at TIMESTAMP,
+               last_processed_at TIMESTAMP,
+               PRIMARY KEY (profile_id, day)
+           ) WITHOUT ROWID""",
+        """INSERT INTO processed_posts_rollup
+               (profile_id, day, posts, comments_liked, first_processed_at, last_processed_at)
+           SELECT profile_id, COALESCE(DATE(processed_at), DATE('now')), COUNT(*),
+                  COALESCE(SUM(comments_liked), 0), MIN(processed_at), MAX(processed_at)
+           FROM processed_posts GROUP BY 1, 2""",
+        """CREATE TRIGGER IF NOT EXISTS trg_processed_posts_rollup_insert
+           AFTER INSERT ON processed_posts
+           BEGIN
+               INSERT INTO processed_posts_rollup
+                   (profile_id, day, posts, comments_liked, first_processed_at, last_processed_at)
+               VALUES (NEW.profile_id, COALESCE(DATE(NEW.processed_at), DATE('now')), 1,
+                       COALESCE(NEW.comments_liked, 0), NEW.processed_at, NEW.processed_at)
+               ON CONFLICT (profile_id, day) DO UPDATE SET
+                   posts = posts + 1,
+                   comments_liked = comments_liked + excluded.comments_liked,
+                   first_processed_at = MIN(COALESCE(first_processed_at, excluded.first_processed_at),
+                                            excluded.first_processed_at),
+                   last_processed_at = MAX(COALESCE(last_processed_at, excluded.last_processed_at),
+                                           excluded.last_processed_at);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_processed_posts_rollup_update
+           AFTER UPDATE OF comments_liked ON processed_posts
+           BEGIN
+               UPDATE processed_posts_rollup
+               SET comments_liked = comments_liked - COALESCE(OLD.comments_liked, 0)
+                                                   + COALESCE(NEW.comments_liked, 0)
+               WHERE profile_id = NEW.profile_id AND day = COALESCE(DATE(NEW.processed_at), DATE('now'));
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_processed_posts_rollup_delete
+           AFTER DELETE ON processed_posts
+           BEGIN
+               UPDATE processed_posts_rollup
+               SET posts = posts - 1, comments_liked = comments_liked - COALESCE(OLD.comments_liked, 0)
+               WHERE profile_id = OLD.profile_id AND day = COALESCE(DATE(OLD.processed_at), DATE('now'));
+           END""",
+
+        # Same columns as before, now read from the rollups
+        "DROP VIEW IF EXISTS daily_summary",
+        """CREATE VIEW daily_summary AS
+           SELECT
+               date,
+               profile_id,
+               like_count,
+               limit_reached,
+               (SELECT COALESCE(SUM(r.count), 0) FROM engagement_rollup r
+                WHERE r.profile_id = dl.profile_id AND r.day = dl.date
+                AND r.action = 'like_comment') as actual_likes,
+               last_updated
+           FROM daily_likes dl
+           ORDER BY date DESC, profile_id""",
+        "DROP VIEW IF EXISTS profile_stats",
+        """CREATE VIEW profile_stats AS
+           SELECT
+               profile_id,
+               SUM(posts > 0) as days_active,
+               SUM(posts) as total_posts_processed,
+               SUM(comments_liked) as total_comments_liked,
+               MIN(first_processed_at) as first_activity,
+               MAX(last_processed_at) as last_activity
+           FROM processed_posts_rollup
+           GROUP BY profile_id""",
+    ]),
+]
+
+
 class DatabaseManager:
     """Manages all database operations for Instagram engagement tracking"""
     
-    def __init__(self, db_path: Path):
+    def __init__(self, db_path: Path, pooled: bool = True, write_behind: bool = True):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            pooled: Reuse one persistent WAL connection per thread (default).
+                    False opens a fresh connection per call (legacy behaviour).
+            write_behind: Queue log_action writes to the shared background
+                          writer instead of committing inline.
+        """
         self.db_path = db_path
+        self.pool = get_pool(db_path) if pooled else None
         self._init_database()
+        self.writer = get_writer(db_path) if write_behind else None
+        self.processed_index = DedupIndex(
+            name="processed_posts",
+            loader=self._processed_post_urls,
+            verifier=self._is_post_processed_in_db,
+            version=self._last_processed_post_id,
+        )
     
     def _init_database(self):
         """Initialize database with schema"""
@@ -35,12 +179,18 @@ class DatabaseManager:
         with self._get_connection() as conn:
             conn.executescript(schema_sql)
             conn.commit()
+            run_migrations(conn, MIGRATIONS, name="ig_engagement")
         
         logger.info(f"Database initialized at {self.db_path}")
     
     @contextmanager
     def _get_connection(self):
         """Context manager for database connections"""
+        if self.pool is not None:
+            with self.pool.connection() as conn:
+                yield conn
+            return
+
         conn = sqlite3.connect(str(self.db_path))
         conn.row_factory = sqlite3.Row  # Return rows as dictionaries
         try:
@@ -53,7 +203,22 @@ class DatabaseManager:
     # ========================================
     
     def is_post_processed(self, post_url: str) -> bool:
-        """Check if a post has already been processed"""
+        """Check if a post has already been processed (Bloom-filtered, SQLite on hits)"""
+        return self.processed_index.contains(post_url)
+    
+    def _processed_post_urls(self, after: int = 0) -> List[str]:
+        """Post URLs processed after row id ``after`` (loads the dedup index)"""
+        with self._get_connection() as conn:
+            cursor = conn.execute("SELECT post_url FROM processed_posts WHERE id > ?", (after,))
+            return [row['post_url'] for row in cursor.fetchall()]
+
+    def _last_processed_post_id(self) -> int:
+        """Highest processed_posts id (other workers' posts show up as a change)"""
+        with self._get_connection() as conn:
+            return conn.execute("SELECT MAX(id) FROM processed_posts").fetchone()[0] or 0
+    
+    def _is_post_processed_in_db(self, post_url: str) -> bool:
+        """Authoritative processed_posts lookup"""
         with self._get_connection() as conn:
             cursor = conn.execute(
                 "SELECT 1 FROM processed_posts WHERE post_url = ? LIMIT 1",
@@ -75,6 +240,7 @@ class DatabaseManager:
                 (post_url, instagram_username, profile_id, comments_liked, status, notes)
             )
             conn.commit()
+        self.processed_index.add(post_url)
         logger.debug(f"Added processed post: {post_url}")
     
     # ========================================
@@ -264,6 +430,7 @@ class DatabaseManager:
     
     def complete_session(self, session_id: str):
         """Mark session as completed"""
+        self.flush()
         self.update_session(session_id, status='completed', 
                           ended_at=datetime.now().isoformat())
     
@@ -278,20 +445,28 @@ class DatabaseManager:
                    metadata: Optional[Dict] = None):
         """Log an engagement action"""
         metadata_json = json.dumps(metadata) if metadata else None
+        sql = """
+            INSERT INTO engagement_log 
+            (timestamp, profile_id, action, target_url, instagram_username, 
+             success, error_message, metadata, session_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        params = (utc_timestamp(), profile_id, action, target_url, instagram_username,
+                  success, error_message, metadata_json, session_id)
+        
+        if self.writer is not None:
+            self.writer.submit(sql, params)
+            return
         
         with self._get_connection() as conn:
-            conn.execute(
-                """
-                INSERT INTO engagement_log 
-                (profile_id, action, target_url, instagram_username, 
-                 success, error_message, metadata, session_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (profile_id, action, target_url, instagram_username, 
-                 success, error_message, metadata_json, session_id)
-            )
+            conn.execute(sql, params)
             conn.commit()
     
+    def flush(self):
+        """Wait until all queued engagement log writes are committed"""
+        if self.writer is not None:
+            self.writer.flush()
+    
     # ========================================
     # TARGET ACCOUNTS OPERATIONS
     # ========================================
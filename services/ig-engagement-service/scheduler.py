@@ -13,6 +13,7 @@ from pathlib import Path
 from config import get_settings
 from database import DatabaseManager
 from shared.browser_automation import BrowserProfileManager
+from shared.browser_automation.governor import get_governor
 
 logger = logging.getLogger(__name__)
 
@@ -131,7 +132,13 @@ class SessionScheduler:
         
         logger.info(f"Found {len(due_sessions)} due session(s)")
         
-        for session_data in due_sessions:
+        governor = get_governor()
+        for index, session_data in enumerate(due_sessions):
+            # Pace launches: leave the rest pending until the host has room
+            if not governor.has_capacity():
+                logger.info(f"Host at browser capacity ({governor.last_denial}) - "
+                            f"deferring {len(due_sessions) - index} session(s) to next check")
+                break
             try:
                 self._run_session(session_data)
             except Exception as e:
@@ -0,0 +1,53 @@
+"""
+Tests for the single-roundtrip comment extraction helpers (fake driver).
+"""
+
+import importlib.util
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+_spec = importlib.util.spec_from_file_location("ig_comment_snapshot", SERVICE_DIR / "comment_snapshot.py")
+comment_snapshot = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(comment_snapshot)
+
+
+class FakeDriver:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append((script, args))
+        return self.result
+
+
+def _row(author, liked=False, y=100):
+    return {"author": author, "text": f"{author} nice", "label": "unlike" if liked else "like",
+            "liked": liked, "y": y, "button": object(), "svg": object()}
+
+
+def test_snapshot_is_one_script_call_with_keywords():
+    driver = FakeDriver({"like_buttons": 4, "list_items": 6, "text_spans": 30,
+                         "rows": [_row("a"), _row("b", liked=True), _row("c")]})
+
+    snapshot = comment_snapshot.take_comment_snapshot(driver, ["like"], ["unlike"], max_targets=2)
+
+    assert len(driver.calls) == 1
+    assert driver.calls[0][1] == (["like"], ["unlike"], 2)
+    assert comment_snapshot.count_comments(snapshot) == (4, "like_buttons")
+    assert [row["author"] for row in comment_snapshot.like_targets(snapshot)] == ["a", "c"]
+
+
+def test_count_falls_back_through_detection_methods():
+    count = comment_snapshot.count_comments
+    assert count({"like_buttons": 0, "list_items": 5, "text_spans": 40}) == (5, "list_items")
+    assert count({"like_buttons": 0, "list_items": 0, "text_spans": 40}) == (10, "text_spans")
+    assert count({"like_buttons": 0, "list_items": 0, "text_spans": 12}) == (4, "text_spans")
+    assert count({"like_buttons": 0, "list_items": 0, "text_spans": 8}) == (0, None)
+
+
+def test_empty_page_yields_empty_snapshot():
+    snapshot = comment_snapshot.take_comment_snapshot(FakeDriver(None), ["like"], ["unlike"])
+    assert snapshot == {"rows": []}
+    assert comment_snapshot.like_targets(snapshot) == []
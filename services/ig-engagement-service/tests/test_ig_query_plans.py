@@ -0,0 +1,103 @@
+"""
+EXPLAIN QUERY PLAN regression tests for ig-engagement-service hot queries.
+
+Fails if any hot query falls back to a full table scan.
+"""
+
+import re
+import sys
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+PROJECT_ROOT = SERVICE_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Load by path: every service has a module called "database"
+_spec = importlib.util.spec_from_file_location("ig_database", SERVICE_DIR / "database.py")
+ig_database = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ig_database)
+
+FULL_SCAN = re.compile(r"^SCAN \w+$")
+
+HOT_QUERIES = {
+    "is_post_processed": (
+        "SELECT 1 FROM processed_posts WHERE post_url = ? LIMIT 1",
+        ("https://www.instagram.com/p/abc/",),
+    ),
+    "get_daily_likes": (
+        "SELECT like_count FROM daily_likes WHERE profile_id = ? AND date = ?",
+        ("p1", "2030-01-01"),
+    ),
+    "get_pending_sessions": (
+        """SELECT * FROM scheduled_sessions
+           WHERE status = 'pending' AND scheduled_datetime <= ?
+           ORDER BY scheduled_datetime ASC""",
+        ("2030-01-01T00:00:00",),
+    ),
+    "daily_summary_actual_likes": (
+        """SELECT COUNT(*) FROM engagement_log el
+           WHERE DATE(el.timestamp) = ? AND el.profile_id = ? AND el.action = 'like_comment'""",
+        ("2030-01-01", "p1"),
+    ),
+    "get_profile_stats": (
+        "SELECT * FROM profile_stats WHERE profile_id = ?",
+        ("p1",),
+    ),
+    "session_log": (
+        "SELECT * FROM engagement_log WHERE session_id = ? ORDER BY timestamp",
+        ("s1",),
+    ),
+    "get_target_accounts": (
+        "SELECT username FROM target_accounts WHERE is_active = 1",
+        (),
+    ),
+}
+
+
+@pytest.fixture
+def db(tmp_path):
+    return ig_database.DatabaseManager(tmp_path / "ig.db", write_behind=False)
+
+
+def _full_scans(conn, sql, params):
+    plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    # Scanning a view's co-routine output is fine; its own plan rows are checked
+    coroutines = {row[3].split()[-1] for row in plan if row[3].startswith("CO-ROUTINE ")}
+    return [row[3] for row in plan
+            if FULL_SCAN.match(row[3]) and row[3].split()[-1] not in coroutines]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_avoids_full_scan(db, name):
+    sql, params = HOT_QUERIES[name]
+    with db._get_connection() as conn:
+        assert _full_scans(conn, sql, params) == []
+
+
+def test_migrations_are_idempotent(tmp_path):
+    ig_database.DatabaseManager(tmp_path / "ig.db", write_behind=False)
+    db = ig_database.DatabaseManager(tmp_path / "ig.db", write_behind=False)
+
+    with db._get_connection() as conn:
+        versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+
+    assert versions == [m.version for m in ig_database.MIGRATIONS]
+
+
+def test_rollups_back_dashboard_views(db):
+    db.add_processed_post("https://www.instagram.com/p/a/", "alice", "p1", comments_liked=3)
+    db.add_processed_post("https://www.instagram.com/p/b/", "bob", "p1", comments_liked=2)
+    db.increment_daily_likes("p1", 5)
+    for _ in range(5):
+        db.log_action("p1", "like_comment", "s1")
+
+    stats = db.get_profile_stats("p1")[0]
+    assert stats["total_posts_processed"] == 2
+    assert stats["total_comments_liked"] == 5
+    assert stats["days_active"] == 1
+
+    summary = db.get_daily_summary()
+    assert [(row["profile_id"], row["actual_likes"]) for row in summary] == [("p1", 5)]
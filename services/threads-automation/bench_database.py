@@ -0,0 +1,97 @@
+"""
+Micro-benchmark for Database per-action latency.
+
+Replays the hot path of one follow in ThreadsGrowthWorker._process_list
+(is_user_followed -> log_action -> update_daily_stats) against a scratch
+database in three modes: the legacy connect-per-call mode, pooled WAL
+connections with inline commits, and pooled connections with the
+write-behind log writer.
+
+Usage:
+    python bench_database.py [--actions 500] [--threads 4]
+"""
+import os
+import sys
+import time
+import tempfile
+import argparse
+import threading
+import statistics
+from pathlib import Path
+
+# Add project root and service dir to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import Database
+
+
+def _follow_cycle(db, profile_id, i):
+    username = f"user_{i}"
+    db.is_user_followed(profile_id, username)
+    db.log_action("bench-session", profile_id, "follow", username, status="success")
+    db.update_daily_stats(profile_id, "follow", 1)
+
+
+MODES = [
+    ("connect-per-call", dict(pooled=False, write_behind=False)),
+    ("pooled (WAL)", dict(pooled=True, write_behind=False)),
+    ("pooled + write-behind", dict(pooled=True, write_behind=True)),
+]
+
+
+def run(label: str, options: dict, actions: int, threads: int) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix="threads_bench_")
+    db_path = os.path.join(tmpdir, "bench.db")
+    db = Database(db_path, **options)
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(worker_idx):
+        profile_id = f"profile_{worker_idx}"
+        local = []
+        for i in range(actions):
+            start = time.perf_counter()
+            _follow_cycle(db, profile_id, i)
+            local.append(time.perf_counter() - start)
+        db.close()
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    db.flush()  # Queued writes count toward wall time
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "mode": label,
+        "cycles": len(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "throughput": len(latencies) / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Database per-action latency")
+    parser.add_argument("--actions", type=int, default=500, help="Follow cycles per thread")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent worker threads")
+    args = parser.parse_args()
+
+    print(f"Follow cycle = is_user_followed + log_action + update_daily_stats")
+    print(f"{args.threads} threads x {args.actions} cycles\n")
+    print(f"{'mode':<22} {'cycles':>7} {'mean ms':>9} {'p50 ms':>8} {'p99 ms':>8} {'cycles/s':>10}")
+    for label, options in MODES:
+        r = run(label, options, args.actions, args.threads)
+        print(f"{r['mode']:<22} {r['cycles']:>7} {r['mean_ms']:>9.3f} {r['p50_ms']:>8.3f} "
+              f"{r['p99_ms']:>8.3f} {r['throughput']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
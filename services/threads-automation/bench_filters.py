@@ -0,0 +1,115 @@
+"""
+Micro-benchmark for the user filter engine.
+
+Classifies synthetic scraped users (mixed-script usernames, bios with and
+without GROWTH_SETTINGS skip keywords) three ways: the legacy per-call
+filter (regexes compiled and keyword lists scanned per user), the compiled
+UserFilter one user at a time, and UserFilter.classify() per follower page.
+All three must agree.
+
+Usage:
+    python bench_filters.py [--users 100000] [--page 50]
+"""
+import os
+import re
+import sys
+import time
+import random
+import string
+import argparse
+
+# Add service dir to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.filters import ThreadsFilters, ACCEPT
+from growth_config import GROWTH_SETTINGS
+
+WORDS = ["coffee", "travel", "design", "music", "photo", "life", "dog", "mom", "founder", "art",
+         "runner", "books", "chef", "Москва", "жизнь", "путешествия", "مرحبا", "fitness", "code", "blog"]
+CYRILLIC = "абвгдеёжзийклмнопрстуфхцчшщыэюя"
+ARABIC = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+
+
+def _legacy_filter_user(username, bio, settings):
+    """filter_user as it was before compilation: patterns and keywords handled per call"""
+    name = username.lower().strip() if username else ""
+    if not username:
+        lang = 'empty'
+    elif re.compile(r'[а-яё]').search(name):
+        lang = 'cyrillic'
+    elif re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]').search(name):
+        lang = 'arabic'
+    elif re.compile(r'[a-z]').search(name):
+        lang = 'latin'
+    else:
+        lang = 'other'
+    if lang not in settings.get('filter_language', ['latin', 'cyrillic']):
+        return False
+
+    bio_lower = (bio or "").lower()
+    for keyword in settings.get('keywords_blacklist', []):
+        if keyword.lower() in bio_lower:
+            return False
+    whitelist = settings.get('keywords_whitelist', [])
+    if whitelist and not any(k.lower() in bio_lower for k in whitelist):
+        return False
+    return True
+
+
+def make_users(count, seed=7):
+    rng = random.Random(seed)
+    keywords = GROWTH_SETTINGS['skip_keywords']
+    users = []
+    for _ in range(count):
+        roll = rng.random()
+        alphabet = CYRILLIC if roll < 0.2 else ARABIC if roll < 0.25 else string.ascii_lowercase + string.digits + "._"
+        username = "".join(rng.choice(alphabet) for _ in range(rng.randint(4, 16)))
+        bio_words = [rng.choice(WORDS) for _ in range(rng.randint(0, 25))]
+        if rng.random() < 0.1:
+            bio_words.insert(rng.randrange(len(bio_words) + 1), rng.choice(keywords).upper())
+        users.append((username, " ".join(bio_words)))
+    return users
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Threads user filters")
+    parser.add_argument("--users", type=int, default=100000, help="Synthetic users to classify")
+    parser.add_argument("--page", type=int, default=50, help="Users per scraped follower page")
+    args = parser.parse_args()
+
+    users = make_users(args.users)
+    settings = {
+        'filter_language': GROWTH_SETTINGS['filter_language'],
+        'keywords_blacklist': GROWTH_SETTINGS['skip_keywords'],
+        'keywords_whitelist': [],
+    }
+    user_filter = ThreadsFilters.compile(settings)
+
+    def legacy():
+        return [_legacy_filter_user(name, bio, settings) for name, bio in users]
+
+    def compiled():
+        return [user_filter.accepts(name, bio) for name, bio in users]
+
+    def batched():
+        verdicts = []
+        for i in range(0, len(users), args.page):
+            verdicts.extend(v == ACCEPT for v in user_filter.classify(users[i:i + args.page]))
+        return verdicts
+
+    print(f"{len(users)} users, pages of {args.page}, blacklist {settings['keywords_blacklist']}\n")
+    print(f"{'mode':<24} {'seconds':>8} {'users/s':>11} {'accepted':>9}")
+    expected = None
+    for label, func in [("legacy per-user", legacy), ("compiled per-user", compiled),
+                        (f"compiled batch ({args.page})", batched)]:
+        started = time.perf_counter()
+        verdicts = func()
+        elapsed = time.perf_counter() - started
+        if expected is None:
+            expected = verdicts
+        assert verdicts == expected, f"{label} disagrees with the legacy filter"
+        print(f"{label:<24} {elapsed:>8.3f} {len(users) / elapsed:>11.0f} {sum(verdicts):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -31,6 +31,12 @@ class Config:
         "skip_business_accounts": False
     }
 
+    # Worker pool: browsers allowed at once (0 = size to RAM/CPU) and
+    # how many runs may wait for a free slot
+    MAX_CONCURRENT_WORKERS = int(os.getenv("THREADS_MAX_CONCURRENT_WORKERS", "0"))
+    MAX_QUEUED_WORKERS = int(os.getenv("THREADS_MAX_QUEUED_WORKERS", "100"))
+    BROWSER_MEMORY_MB = int(os.getenv("THREADS_BROWSER_MEMORY_MB", "1500"))
+
     # API Settings
     HOST = "0.0.0.0"
     PORT = 8000
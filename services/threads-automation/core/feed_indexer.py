@@ -0,0 +1,167 @@
+"""
+Feed Post Indexer
+Extracts feed posts incrementally, one script call per scroll.
+
+Walking every Reply button in view with XPath ancestor lookups after each
+scroll re-reads the whole rendered feed every time, and the number of
+round-trips grows with the number of posts. The indexer instead keeps its
+state in the page:
+
+- reply buttons already indexed are remembered (WeakSet), so a scan only
+  reads posts rendered since the previous one;
+- post URLs already indexed are remembered too, so a post that the
+  virtualized feed re-renders into a new node is counted as recycled and
+  not returned again;
+- the post's reply/like buttons are only resolved for the posts that are
+  acted on, and are looked up again by URL if their node was recycled;
+- the end of the feed is detected when the page stops growing while
+  scrolled to the bottom and no new posts arrive.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Text of UI elements that is not post content
+UI_NOISE = ("Like", "Reply", "Share", "Translate", "followers")
+
+# Scans in a row without new posts, at the bottom of an unchanged page, that end the feed
+END_OF_FEED_SCANS = 3
+
+SCAN_JS = """
+const [noise, maxKept] = arguments;
+const index = window.__feedIndex = window.__feedIndex || {
+    scanned: new WeakSet(), urls: new Set(), handles: new Map(), height: 0
+};
+
+const postOf = replyButton => replyButton.closest('div[data-pressable-container="true"]')
+    || replyButton.closest('div.x1a2a7pz');
+
+const posts = [];
+let recycled = 0;
+for (const svg of document.querySelectorAll('svg[aria-label="Reply"]')) {
+    if (index.scanned.has(svg)) continue;
+
+    const reply = svg.closest('div[role="button"]');
+    const post = reply && postOf(reply);
+    const link = post && post.querySelector('a[href*="/post/"]');
+    // A post whose link isn't rendered yet is looked at again next scan
+    if (!link) continue;
+    const url = link.href;
+    index.scanned.add(svg);
+
+    const likeSvg = post.querySelector('svg[aria-label="Like"]');
+    index.handles.delete(url);
+    index.handles.set(url, {reply: reply, like: likeSvg && likeSvg.closest('div[role="button"]')});
+    if (index.handles.size > maxKept) index.handles.delete(index.handles.keys().next().value);
+
+    if (index.urls.has(url)) { recycled++; continue; }
+    index.urls.add(url);
+
+    // Post text for the AI prompt: the longest dir="auto" text that is not UI chrome
+    let cleanText = '';
+    for (const el of post.querySelectorAll('span[dir="auto"], div[dir="auto"]')) {
+        const text = (el.innerText || '').trim();
+        if (noise.includes(text)) continue;
+        if (text.length > cleanText.length) cleanText = text;
+    }
+    const author = post.querySelector('a[href^="/@"]');
+    posts.push({
+        url: url,
+        author: author ? author.getAttribute('href').slice(2).split('/')[0] : null,
+        text: post.innerText || '',
+        clean_text: cleanText,
+        liked: !!post.querySelector('svg[aria-label="Unlike"]')
+    });
+}
+
+const scroller = document.scrollingElement || document.documentElement;
+const height = scroller.scrollHeight;
+const grew = height !== index.height;
+index.height = height;
+return {
+    posts: posts,
+    recycled: recycled,
+    at_bottom: !grew && window.scrollY + window.innerHeight >= height - 2,
+    indexed: index.urls.size
+};
+"""
+
+HANDLES_JS = """
+const url = arguments[0];
+const index = window.__feedIndex;
+let handles = index && index.handles.get(url);
+if (!handles || !handles.reply.isConnected) {
+    // Recycled node: find the post again by its link
+    handles = null;
+    for (const link of document.querySelectorAll('a[href*="/post/"]')) {
+        if (link.href !== url) continue;
+        const post = link.closest('div[data-pressable-container="true"]') || link.closest('div.x1a2a7pz');
+        const svg = post && post.querySelector('svg[aria-label="Reply"]');
+        if (!svg) continue;
+        const likeSvg = post.querySelector('svg[aria-label="Like"]');
+        handles = {reply: svg.closest('div[role="button"]'),
+                   like: likeSvg && likeSvg.closest('div[role="button"]')};
+        break;
+    }
+}
+return handles ? {reply: handles.reply, like: handles.like || null} : {reply: null, like: null};
+"""
+
+RESET_JS = "delete window.__feedIndex;"
+
+
+class FeedIndexer:
+    """
+    Returns the feed posts rendered since the previous scan.
+
+    Args:
+        driver: Selenium WebDriver on a Threads feed
+        max_kept: Posts whose button handles stay referenced in the page
+        end_scans: Empty scans at the bottom of the feed that count as its end
+    """
+
+    def __init__(self, driver, max_kept: int = 200, end_scans: int = END_OF_FEED_SCANS):
+        self.driver = driver
+        self.max_kept = max_kept
+        self.end_scans = end_scans
+        self.indexed = 0
+        self.recycled = 0
+        self._empty_at_bottom = 0
+
+    @property
+    def at_end(self) -> bool:
+        """True once the feed stopped growing for ``end_scans`` scans"""
+        return self._empty_at_bottom >= self.end_scans
+
+    def scan(self) -> List[Dict[str, Any]]:
+        """
+        New posts in the feed ({'url', 'author', 'text', 'clean_text', 'liked'}).
+
+        Returns:
+            Posts in page order, each URL at most once per indexer
+        """
+        result = self.driver.execute_script(SCAN_JS, list(UI_NOISE), self.max_kept) or {}
+        posts = result.get('posts', [])
+        self.indexed = result.get('indexed', self.indexed)
+        self.recycled += result.get('recycled', 0)
+
+        if not posts and result.get('at_bottom'):
+            self._empty_at_bottom += 1
+        else:
+            self._empty_at_bottom = 0
+        return posts
+
+    def handles(self, url: str) -> Dict[str, Optional[Any]]:
+        """Reply and like buttons of an indexed post ({'reply', 'like'}, None when gone)"""
+        return self.driver.execute_script(HANDLES_JS, url) or {'reply': None, 'like': None}
+
+    def reset(self):
+        """Forget the page-side index (e.g. after navigating to another feed)"""
+        self.indexed = 0
+        self.recycled = 0
+        self._empty_at_bottom = 0
+        try:
+            self.driver.execute_script(RESET_JS)
+        except Exception as e:
+            logger.debug(f"Feed index reset failed: {e}")
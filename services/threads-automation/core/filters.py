@@ -1,8 +1,177 @@
 """
 Filtering Logic for Threads Automation
 Ported from 'Follow un/content.js'
+
+Patterns and keyword lists are compiled once: ``ThreadsFilters.compile()``
+turns a settings dict (GROWTH_SETTINGS, COMMENT_SETTINGS, ...) into a
+``UserFilter`` whose keyword matchers are built once, and whose ``classify()`` checks a whole
+scraped page of users by scanning all bios of the page together.
 """
 import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Regex patterns from extension (matched against the lower-cased name)
+CYRILLIC_PATTERN = re.compile(r'[а-яё]')
+LATIN_PATTERN = re.compile(r'[a-z]')
+ARABIC_PATTERN = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]')
+ASCII_LETTER_PATTERN = re.compile(r'[a-zA-Z]')
+
+# Verdicts of UserFilter.classify
+ACCEPT = 'ok'
+REJECT_LANGUAGE = 'language'
+REJECT_BLACKLIST = 'blacklist'
+REJECT_WHITELIST = 'whitelist'
+
+# Keyword lists up to this size are scanned with str.find instead of a regex
+LITERAL_SCAN_LIMIT = 16
+
+# Joins the bios of a page; keywords never contain it, so no match spans two users
+_SEPARATOR = '\x00'
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive substring matcher for a keyword list, compiled once.
+
+    Short lists (the usual handful of skip keywords) are matched with one
+    ``str.find`` pass per keyword, which beats a regex alternation in CPython;
+    longer lists become a single regex alternation.
+
+    Args:
+        keywords: Keywords to look for (matched anywhere in the text)
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        words = {k.lower() for k in keywords if k is not None}
+        # An empty keyword is a substring of everything, as with `'' in text`
+        self.match_all = '' in words
+        words.discard('')
+        words.discard(_SEPARATOR)
+        self.keywords = tuple(sorted(words, key=lambda w: (-len(w), w)))
+        self.pattern = None
+        if len(self.keywords) > LITERAL_SCAN_LIMIT:
+            self.pattern = re.compile('|'.join(map(re.escape, self.keywords)))
+
+    def __bool__(self) -> bool:
+        return self.match_all or bool(self.keywords)
+
+    def search(self, text: str) -> Optional[str]:
+        """A keyword found in ``text`` (lower-cased), or None"""
+        if self.match_all:
+            return ''
+        if not self.keywords or not text:
+            return None
+        text = text.lower()
+        if self.pattern is not None:
+            match = self.pattern.search(text)
+            return match.group() if match else None
+        for keyword in self.keywords:
+            if keyword in text:
+                return keyword
+        return None
+
+    def matches(self, texts: Sequence[str]) -> List[bool]:
+        """For each text, whether it contains a keyword - scanning all texts at once"""
+        if self.match_all:
+            return [True] * len(texts)
+        hits = [False] * len(texts)
+        if not self.keywords or not texts:
+            return hits
+
+        lowered = [text.lower() for text in texts]
+        joined = _SEPARATOR.join(lowered)
+        # Start offset of each text inside `joined`, plus the end
+        starts = [0, *accumulate(len(text) + 1 for text in lowered)]
+
+        if self.pattern is not None:
+            finders = [lambda pos, search=self.pattern.search: _match_start(search(joined, pos))]
+        else:
+            finders = [lambda pos, keyword=keyword: joined.find(keyword, pos) for keyword in self.keywords]
+
+        for find in finders:
+            pos = find(0)
+            while pos >= 0:
+                i = bisect_right(starts, pos) - 1
+                hits[i] = True
+                # The rest of this text can't change its verdict; resume at the next one
+                pos = find(starts[i + 1])
+        return hits
+
+
+def _match_start(match) -> int:
+    return match.start() if match else -1
+
+
+class UserFilter:
+    """
+    Compiled user filter: language of the name plus bio keyword lists.
+
+    Args:
+        languages: Allowed scripts of the name ('latin', 'cyrillic', 'arabic', 'other')
+        blacklist: Bio keywords that reject a user (checked first)
+        whitelist: If not empty, the bio must contain one of these
+    """
+
+    def __init__(self, languages: Iterable[str] = ('latin', 'cyrillic'),
+                 blacklist: Iterable[str] = (), whitelist: Iterable[str] = ()):
+        self.languages = frozenset(languages)
+        self.blacklist = KeywordMatcher(blacklist)
+        self.whitelist = KeywordMatcher(whitelist)
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> 'UserFilter':
+        """
+        Build from a worker settings dict.
+
+        ``keywords_blacklist`` and ``skip_keywords`` both reject a user;
+        ``keywords_whitelist`` and ``filter_language`` as in ``filter_user``.
+        """
+        return cls(
+            languages=settings.get('filter_language', ['latin', 'cyrillic']),
+            blacklist=[*settings.get('keywords_blacklist', []), *settings.get('skip_keywords', [])],
+            whitelist=settings.get('keywords_whitelist', []),
+        )
+
+    def check(self, username: str, bio: str) -> str:
+        """Verdict for one user: ACCEPT or the REJECT_* reason"""
+        if ThreadsFilters.detect_name_language(username) not in self.languages:
+            return REJECT_LANGUAGE
+        if self.blacklist and self.blacklist.search(bio or "") is not None:
+            return REJECT_BLACKLIST
+        if self.whitelist and self.whitelist.search(bio or "") is None:
+            return REJECT_WHITELIST
+        return ACCEPT
+
+    def accepts(self, username: str, bio: str) -> bool:
+        return self.check(username, bio) == ACCEPT
+
+    def classify(self, users: Iterable[Tuple[str, Optional[str]]]) -> List[str]:
+        """
+        Verdicts for a whole page of (username, bio) pairs, in order.
+
+        Each keyword list is matched over the joined bios of the page
+        instead of once per user.
+        """
+        users = list(users)
+        detect = ThreadsFilters.detect_name_language
+        verdicts = [ACCEPT if detect(name) in self.languages else REJECT_LANGUAGE for name, _ in users]
+        bios = [bio or "" for _, bio in users]
+
+        if self.blacklist:
+            for i, hit in enumerate(self.blacklist.matches(bios)):
+                if hit and verdicts[i] == ACCEPT:
+                    verdicts[i] = REJECT_BLACKLIST
+        if self.whitelist:
+            for i, hit in enumerate(self.whitelist.matches(bios)):
+                if not hit and verdicts[i] == ACCEPT:
+                    verdicts[i] = REJECT_WHITELIST
+        return verdicts
+
+
+_compiled: Dict[tuple, UserFilter] = {}
+
 
 class ThreadsFilters:
     @staticmethod
@@ -13,21 +182,20 @@ class ThreadsFilters:
         """
         if not name:
             return 'empty'
-            
-        name = name.lower().strip()
-        
-        # Regex patterns from extension
-        cyrillic_pattern = re.compile(r'[а-яё]')
-        latin_pattern = re.compile(r'[a-z]')
-        arabic_pattern = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]')
-        
-        if cyrillic_pattern.search(name):
+
+        # Most usernames are plain ASCII: only the Latin check can match
+        if name.isascii():
+            return 'latin' if ASCII_LETTER_PATTERN.search(name) else 'other'
+
+        name = name.lower()
+
+        if CYRILLIC_PATTERN.search(name):
             return 'cyrillic'
-        if arabic_pattern.search(name):
+        if ARABIC_PATTERN.search(name):
             return 'arabic'
-        if latin_pattern.search(name):
+        if LATIN_PATTERN.search(name):
             return 'latin'
-            
+
         return 'other'
 
     @staticmethod
@@ -42,51 +210,36 @@ class ThreadsFilters:
             'anonymous_profile',
             'blank_profile'
         ]
-        
+
         if not element_html:
             return False
-            
+
         # Check if img src exists and doesn't match default patterns
         # This is a basic string check; more robust check happens in Selenium context
         has_img_tag = '<img' in element_html
         is_default = any(pat in element_html for pat in default_patterns)
-        
+
         return has_img_tag and not is_default
 
+    @staticmethod
+    def compile(settings: dict) -> UserFilter:
+        """Compiled UserFilter for a settings dict (cached per distinct filter settings)"""
+        key = tuple(
+            tuple(settings.get(name) or ()) if name in settings else None
+            for name in ('filter_language', 'keywords_blacklist', 'skip_keywords', 'keywords_whitelist')
+        )
+        user_filter = _compiled.get(key)
+        if user_filter is None:
+            user_filter = _compiled[key] = UserFilter.from_settings(settings)
+        return user_filter
+
     @staticmethod
     def filter_user(username: str, bio: str, settings: dict) -> bool:
         """
         Apply all user filters based on settings.
         """
-        # 1. Language Check
-        lang = ThreadsFilters.detect_name_language(username)
-        allowed_langs = settings.get('filter_language', ['latin', 'cyrillic'])
-        if lang not in allowed_langs:
-            return False
-            
-        # 2. Keyword Filtering (Whitelist/Blacklist)
-        bio_lower = (bio or "").lower()
-        
-        # Blacklist (higher priority)
-        blacklist = settings.get('keywords_blacklist', [])
-        for keyword in blacklist:
-            if keyword.lower() in bio_lower:
-                return False
-                
-        # Whitelist (only if defined)
-        whitelist = settings.get('keywords_whitelist', [])
-        if whitelist:
-            has_match = any(k.lower() in bio_lower for k in whitelist)
-            if not has_match:
-                return False
-                
-        return True
-
-
-
-
-
-
-
-
-
+        return ThreadsFilters.compile({
+            'filter_language': settings.get('filter_language', ['latin', 'cyrillic']),
+            'keywords_blacklist': settings.get('keywords_blacklist', []),
+            'keywords_whitelist': settings.get('keywords_whitelist', []),
+        }).accepts(username, bio)
@@ -0,0 +1,221 @@
+"""
+Incremental Follower-List Feed
+Watches the followers/following modal with an in-page MutationObserver.
+
+Re-enumerating every button of the modal on each follow makes a session
+O(n^2) in the number of rows scrolled past. Instead, the observer queues
+each newly inserted row button (with the row's username) in a JS-side
+buffer, and the worker drains that buffer in small batches: one script call
+per batch plus one per button actually clicked, however long the list is.
+
+Rows hydrate in steps: a button can be inserted before its row's ``/@``
+link, or before its label is rendered. Such buttons wait in the page and
+are re-checked on the next few drains instead of being dropped.
+
+With a ``UserFilter`` the followable rows of each drained batch are
+classified together (username plus the row's display name/bio text), and
+rejected rows are skipped before their button is ever looked up.
+"""
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from core.filters import ACCEPT, UserFilter
+
+logger = logging.getLogger(__name__)
+
+# Button texts of a row that can still be followed
+FOLLOW_LABELS = ("Follow", "Подписаться")
+
+# Drains on which a button still missing its username or label is re-checked before it's dropped
+PENDING_RECHECKS = 10
+
+# Installs the observer on first use (or when the modal was re-rendered), then drains
+DRAIN_JS = """
+const [dialogSelector, buttonSelector, followLabels, limit, maxKept, maxRechecks] = arguments;
+let feed = window.__followerFeed;
+if (!feed || !feed.dialog.isConnected) {
+    if (feed) feed.observer.disconnect();
+    const dialog = document.querySelector(dialogSelector);
+    if (!dialog) return null;
+    feed = window.__followerFeed = {
+        dialog: dialog, queue: [], head: 0, queued: new WeakSet(), buttons: new Map(), inserted: 0,
+        waiting: new Map()
+    };
+    const usernameOf = feed.usernameOf = button => {
+        const row = button.parentElement && button.parentElement.parentElement;
+        const link = row && row.querySelector('a[href*="/@"]');
+        return link ? link.href.split('/@').pop().split('/')[0] : null;
+    };
+    feed.scan = root => {
+        const candidates = Array.from(root.querySelectorAll(buttonSelector));
+        const owner = root.closest(buttonSelector);
+        if (owner) candidates.unshift(owner);
+        for (const button of candidates) {
+            if (feed.queued.has(button)) continue;
+            feed.queued.add(button);
+            const username = usernameOf(button);
+            if (!username) {
+                // The row's link may hydrate later
+                feed.waiting.set(button, {tries: 0, counted: false});
+                continue;
+            }
+            feed.queue.push({username: username, button: button});
+            feed.inserted++;
+        }
+    };
+    feed.observer = new MutationObserver(mutations => {
+        for (const mutation of mutations) {
+            for (const node of mutation.addedNodes) {
+                const el = node.nodeType === 1 ? node : node.parentElement;
+                if (el && feed.dialog.contains(el)) feed.scan(el);
+            }
+        }
+    });
+    feed.observer.observe(dialog, {childList: true, subtree: true});
+    feed.scan(dialog);
+}
+
+// Buttons whose link or label was missing: queue the ones that hydrated since
+for (const [button, entry] of feed.waiting) {
+    const username = button.isConnected ? feed.usernameOf(button) : null;
+    if (username && (button.innerText || '').trim()) {
+        feed.waiting.delete(button);
+        feed.queue.push({username: username, button: button});
+        if (!entry.counted) feed.inserted++;
+    } else if (!button.isConnected || ++entry.tries > maxRechecks) {
+        feed.waiting.delete(button);
+    }
+}
+
+const rows = [];
+while (feed.head < feed.queue.length && rows.length < limit) {
+    const {username, button} = feed.queue[feed.head++];
+    // Rows recycled out of the list are dropped; re-inserted they are new nodes
+    if (!button.isConnected) continue;
+    const state = (button.innerText || '').trim();
+    if (!state) {
+        // Label not rendered yet: not a "not followable" row
+        feed.waiting.set(button, {tries: 0, counted: true});
+        continue;
+    }
+    const followable = followLabels.includes(state);
+    // Row text besides the username link and the button: display name, bio line
+    const row = button.parentElement && button.parentElement.parentElement;
+    const link = row && row.querySelector('a[href*="/@"]');
+    let about = row ? (row.innerText || '') : '';
+    for (const part of [link && link.innerText, state]) if (part) about = about.replace(part, '');
+    if (followable) {
+        feed.buttons.set(username, button);
+        if (feed.buttons.size > maxKept) feed.buttons.delete(feed.buttons.keys().next().value);
+    }
+    rows.push({username: username, state: state, followable: followable, about: about.trim()});
+}
+if (feed.head > 1000) {
+    feed.queue = feed.queue.slice(feed.head);
+    feed.head = 0;
+}
+return {rows: rows, pending: feed.queue.length - feed.head, waiting: feed.waiting.size, inserted: feed.inserted};
+"""
+
+BUTTON_JS = """
+const feed = window.__followerFeed;
+if (!feed) return null;
+const button = feed.buttons.get(arguments[0]);
+feed.buttons.delete(arguments[0]);
+return button && button.isConnected ? button : null;
+"""
+
+STOP_JS = """
+if (window.__followerFeed) {
+    window.__followerFeed.observer.disconnect();
+    delete window.__followerFeed;
+}
+"""
+
+
+class FollowerFeed:
+    """
+    Drains follower rows inserted into the modal, oldest first.
+
+    Args:
+        driver: Selenium WebDriver with the followers modal open
+        follow_labels: Button texts of rows that can be followed
+        batch_size: Rows fetched per script call
+        dialog_selector: CSS selector of the modal
+        button_selector: CSS selector of row buttons
+        user_filter: Compiled filter (``ThreadsFilters.compile``) rows must pass to be candidates
+    """
+
+    def __init__(self, driver, follow_labels=FOLLOW_LABELS, batch_size: int = 20,
+                 dialog_selector: str = '[role="dialog"]', button_selector: str = "button, div[role='button']",
+                 user_filter: Optional[UserFilter] = None):
+        self.driver = driver
+        self.user_filter = user_filter
+        self.filtered: Dict[str, int] = {}  # reject reason -> rows skipped
+        self.follow_labels = list(follow_labels)
+        self.batch_size = batch_size
+        self.dialog_selector = dialog_selector
+        self.button_selector = button_selector
+        self.pending_in_page = 0
+        self.inserted = 0
+        self._rows: Deque[Dict[str, Any]] = deque()
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """
+        Next batch of newly inserted rows ({'username', 'state', 'followable', 'about'})
+
+        Returns:
+            Rows in insertion order; empty when nothing new arrived or the modal is gone
+        """
+        result = self.driver.execute_script(
+            DRAIN_JS, self.dialog_selector, self.button_selector, self.follow_labels,
+            self.batch_size, self.batch_size * 10, PENDING_RECHECKS
+        )
+        if not result:
+            return []
+        self.pending_in_page = result['pending']
+        self.inserted = result['inserted']
+        return result['rows']
+
+    def next_candidate(self, exclude: Set[str]) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Button and username of the next followable row not in ``exclude``.
+
+        Returns:
+            (WebElement, username), or (None, None) once the buffer is empty - scroll and retry
+        """
+        while True:
+            if not self._rows:
+                rows = self.drain()
+                if not rows:
+                    return None, None
+                self._rows.extend(self._classify(rows))
+
+            row = self._rows.popleft()
+            if not row['followable'] or row['username'] in exclude:
+                continue
+            if row.get('verdict', ACCEPT) != ACCEPT:
+                self.filtered[row['verdict']] = self.filtered.get(row['verdict'], 0) + 1
+                logger.debug(f"Skipping @{row['username']}: {row['verdict']} filter")
+                continue
+            button = self.driver.execute_script(BUTTON_JS, row['username'])
+            if button is not None:
+                return button, row['username']
+
+    def _classify(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach the filter verdict to the followable rows of a batch (one classify call)"""
+        followable = [row for row in rows if row['followable']]
+        if self.user_filter is not None and followable:
+            verdicts = self.user_filter.classify((row['username'], row.get('about', '')) for row in followable)
+            for row, verdict in zip(followable, verdicts):
+                row['verdict'] = verdict
+        return rows
+
+    def stop(self):
+        """Disconnect the observer and drop the page-side buffer"""
+        self._rows.clear()
+        try:
+            self.driver.execute_script(STOP_JS)
+        except Exception as e:
+            logger.debug(f"Follower feed stop failed: {e}")
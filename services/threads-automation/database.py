@@ -4,6 +4,8 @@ Handles all SQLite database interactions for tracking actions, likes, follows, a
 Modeled after ig-engagement-service database structure
 """
 
+import os
+import sys
 import sqlite3
 import json
 import logging
@@ -12,19 +14,154 @@ from pathlib import Path
 from typing import List, Dict, Optional
 from contextlib import contextmanager
 
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from shared.sqlite_pool import get_pool, open_connection
+from shared.write_behind import get_writer, utc_timestamp
+from shared.dedup_index import DedupIndex
+from shared.migrations import Migration, run_migrations
+from shared.event_bus import get_bus
+
 logger = logging.getLogger(__name__)
 
+def _add_posts_count_column(conn):
+    """daily_limits.posts_count predates the migration runner; add only if missing"""
+    columns = [info[1] for info in conn.execute("PRAGMA table_info(daily_limits)").fetchall()]
+    if 'posts_count' not in columns:
+        conn.execute("ALTER TABLE daily_limits ADD COLUMN posts_count INTEGER DEFAULT 0")
+
+
+# Applied in order by _init_db; never edit a released migration, append a new one
+MIGRATIONS = [
+    Migration(1, "daily_limits.posts_count", _add_posts_count_column),
+    Migration(2, "composite indexes for hot queries", [
+        # is_user_followed / is_url_commented / dedup index loads / get_used_photos
+        """CREATE INDEX IF NOT EXISTS idx_log_success_profile_action_user
+           ON engagement_log(profile_id, action_type, target_username) WHERE status = 'success'""",
+        """CREATE INDEX IF NOT EXISTS idx_log_success_profile_action_url
+           ON engagement_log(profile_id, action_type, target_url) WHERE status = 'success'""",
+        # get_profile_total_stats (covering: never touches the table)
+        """CREATE INDEX IF NOT EXISTS idx_log_profile_action_status
+           ON engagement_log(profile_id, action_type, status)""",
+        # Per-session post counts on the dashboard
+        """CREATE INDEX IF NOT EXISTS idx_log_posts_by_session
+           ON engagement_log(session_id) WHERE action_type = 'post' AND status = 'success'""",
+        # get_session_actions / get_recent_actions(profile_id)
+        "CREATE INDEX IF NOT EXISTS idx_log_session_time ON engagement_log(session_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_log_profile_time ON engagement_log(profile_id, timestamp)",
+        # get_pending_tasks
+        "CREATE INDEX IF NOT EXISTS idx_schedule_status_time ON scheduled_tasks(status, scheduled_time)",
+        # /api/stats "today" queries
+        "CREATE INDEX IF NOT EXISTS idx_daily_date ON daily_limits(date)",
+        "CREATE INDEX IF NOT EXISTS idx_sessions_started_day ON sessions(date(started_at))",
+        # Superseded by the composite indexes above
+        "DROP INDEX IF EXISTS idx_log_profile",
+        "DROP INDEX IF EXISTS idx_log_session",
+        "DROP INDEX IF EXISTS idx_schedule_status",
+    ]),
+    Migration(3, "engagement_rollup per profile/day/action/status", [
+        """CREATE TABLE IF NOT EXISTS engagement_rollup (
+               profile_id TEXT NOT NULL,
+               day DATE NOT NULL,
+               action_type TEXT NOT NULL,
+               status TEXT NOT NULL,
+               count INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (profile_id, day, action_type, status)
+           ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_rollup_day ON engagement_rollup(day)",
+        # Backfill from existing history before the triggers take over
+        """INSERT INTO engagement_rollup (profile_id, day, action_type, status, count)
+           SELECT profile_id, COALESCE(DATE(timestamp), DATE('now')), action_type, COALESCE(status, ''), COUNT(*)
+           FROM engagement_log GROUP BY 1, 2, 3, 4""",
+        """CREATE TRIGGER IF NOT EXISTS trg_engagement_rollup_insert AFTER INSERT ON engagement_log
+           BEGIN
+               INSERT INTO engagement_rollup (profile_id, day, action_type, status, count)
+               VALUES (NEW.profile_id, COALESCE(DATE(NEW.timestamp), DATE('now')),
+                       NEW.action_type, COALESCE(NEW.status, ''), 1)
+               ON CONFLICT(profile_id, day, action_type, status) DO UPDATE SET count = count + 1;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_engagement_rollup_delete AFTER DELETE ON engagement_log
+           BEGIN
+               UPDATE engagement_rollup SET count = count - 1
+               WHERE profile_id = OLD.profile_id AND day = COALESCE(DATE(OLD.timestamp), DATE('now'))
+                 AND action_type = OLD.action_type AND status = COALESCE(OLD.status, '');
+           END""",
+    ]),
+    Migration(4, "photo_filename column and media catalog", [
+        "ALTER TABLE engagement_log ADD COLUMN photo_filename TEXT",
+        """UPDATE engagement_log SET photo_filename = json_extract(metadata, '$.photo_filename')
+           WHERE action_type = 'post' AND json_valid(metadata)""",
+        # get_used_photos / pick_unused_photo anti-join. Only post rows carry a
+        # filename; all four columns are keyed so the planner prefers this
+        # over idx_log_profile_action_status.
+        """CREATE INDEX IF NOT EXISTS idx_log_used_photos
+           ON engagement_log(profile_id, photo_filename, action_type, status)
+           WHERE photo_filename IS NOT NULL""",
+        # Files available per photos folder, refreshed by sync_media_catalog
+        """CREATE TABLE IF NOT EXISTS media_catalog (
+               folder TEXT NOT NULL,
+               filename TEXT NOT NULL,
+               extension TEXT NOT NULL,
+               size INTEGER,
+               mtime REAL,
+               PRIMARY KEY (folder, filename)
+           ) WITHOUT ROWID""",
+        # Directory mtime at last sync: unchanged means no rescan needed
+        """CREATE TABLE IF NOT EXISTS media_folders (
+               folder TEXT PRIMARY KEY,
+               mtime REAL NOT NULL,
+               synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+           )""",
+    ]),
+    Migration(5, "keyset index for session log pagination", [
+        # get_session_actions_page / iter_session_actions (WHERE session_id = ? AND id > ? ORDER BY id)
+        "CREATE INDEX IF NOT EXISTS idx_log_session_id ON engagement_log(session_id, id)",
+    ]),
+    Migration(6, "drop low-selectivity idx_log_action", [
+        # action_type alone is too unselective: no hot query is served better by it
+        "DROP INDEX IF EXISTS idx_log_action",
+    ]),
+]
+
+# Action types with an in-memory dedup index, and the column they dedup on
+DEDUP_COLUMNS = {
+    'follow': 'target_username',
+    'comment': 'target_url',
+}
+
 
 class Database:
     """Manages all database operations for Threads automation tracking"""
     
-    def __init__(self, db_path="threads_automation.db"):
+    def __init__(self, db_path="threads_automation.db", pooled: bool = True,
+                 write_behind: bool = True):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            pooled: Reuse one persistent WAL connection per thread (default).
+                    False opens a fresh connection per call (legacy behaviour,
+                    kept for benchmarking).
+            write_behind: Queue log_action/update_daily_stats writes to the
+                          shared background writer instead of committing inline.
+        """
         self.db_path = db_path
+        self.pool = get_pool(db_path) if pooled else None
         self._init_db()
+        self.writer = get_writer(db_path) if write_behind else None
+        self._dedup_indexes: Dict[tuple, DedupIndex] = {}
+        # Live feed of logged actions (dashboard SSE), shared by every
+        # Database instance on this file in the process
+        self.events = get_bus(f"engagement_log:{os.path.abspath(str(db_path))}")
     
     @contextmanager
     def _get_connection(self):
         """Context manager for database connections"""
+        if self.pool is not None:
+            with self.pool.connection() as conn:
+                yield conn
+            return
+
         conn = sqlite3.connect(str(self.db_path))
         conn.row_factory = sqlite3.Row  # Return rows as dictionaries
         try:
@@ -33,8 +170,49 @@ class Database:
             conn.close()
     
     def get_connection(self):
-        """Legacy method for backward compatibility"""
-        return sqlite3.connect(str(self.db_path))
+        """Legacy method for backward compatibility (caller must close)"""
+        return open_connection(self.db_path)
+
+    def _write(self, sql: str, params: tuple):
+        """Run a write statement, via the write-behind queue when enabled"""
+        if self.writer is not None:
+            self.writer.submit(sql, params)
+            return
+        with self._get_connection() as conn:
+            conn.execute(sql, params)
+            conn.commit()
+
+    def flush(self):
+        """Wait until all queued writes are committed"""
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        """Close the calling thread's pooled connection"""
+        if self.pool is not None:
+            # Refreshes planner statistics only for tables that outgrew them
+            try:
+                with self.pool.connection() as conn:
+                    conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                logger.debug(f"PRAGMA optimize failed: {e}")
+            self.pool.discard()
+
+    @staticmethod
+    def _analyze_if_missing(conn):
+        """
+        Gather planner statistics once, when engagement_log has rows but none
+        were gathered yet. Without them the planner can't tell a partial index
+        (idx_log_posts_by_session) from a wider one; ``close()`` keeps them fresh.
+        """
+        has_stats = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() and \
+            conn.execute("SELECT 1 FROM sqlite_stat1 WHERE tbl = 'engagement_log' LIMIT 1").fetchone()
+        if has_stats or not conn.execute("SELECT 1 FROM engagement_log LIMIT 1").fetchone():
+            return
+        # analysis_limit keeps this to a sample of each index
+        conn.execute("PRAGMA analysis_limit=1000")
+        conn.execute("ANALYZE")
+        conn.commit()
     
     def _init_db(self):
         """Initialize database with schema"""
@@ -83,12 +261,6 @@ class Database:
                 """)
                 
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_profile_date ON daily_limits(profile_id, date)")
-                
-                # Check and add posts_count column if missing (migration)
-                cursor.execute("PRAGMA table_info(daily_limits)")
-                columns = [info[1] for info in cursor.fetchall()]
-                if 'posts_count' not in columns:
-                    cursor.execute("ALTER TABLE daily_limits ADD COLUMN posts_count INTEGER DEFAULT 0")
 
                 # =====================================================
                 # 3. ENGAGEMENT LOG TABLE - Detailed action log with usernames
@@ -111,9 +283,6 @@ class Database:
                 """)
                 
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_log_timestamp ON engagement_log(timestamp)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_log_profile ON engagement_log(profile_id)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_log_action ON engagement_log(action_type)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_log_session ON engagement_log(session_id)")
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_log_username ON engagement_log(target_username)")
 
                 # =====================================================
@@ -130,9 +299,12 @@ class Database:
                     )
                 """)
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_schedule_time ON scheduled_tasks(scheduled_time)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_schedule_status ON scheduled_tasks(status)")
 
                 conn.commit()
+
+                # Versioned changes on top of the base schema
+                run_migrations(conn, MIGRATIONS, name="threads_automation")
+                self._analyze_if_missing(conn)
                 logger.info(f"Database initialized at {self.db_path}")
 
         except Exception as e:
@@ -166,6 +338,29 @@ class Database:
             conn.execute("UPDATE scheduled_tasks SET status = ? WHERE id = ?", (status, task_id))
             conn.commit()
 
+    def requeue_stale_tasks(self, profile_id: Optional[str] = None) -> int:
+        """
+        Put tasks left 'queued' back to 'pending'.
+
+        A queued task only lives in the server's in-memory worker pool, so it
+        is stranded when its job is cancelled or the process restarts.
+
+        Args:
+            profile_id: Only this profile's tasks (its job was cancelled); all if None
+
+        Returns:
+            Number of tasks requeued
+        """
+        sql = "UPDATE scheduled_tasks SET status = 'pending' WHERE status = 'queued'"
+        params: tuple = ()
+        if profile_id is not None:
+            sql += " AND profile_id = ?"
+            params = (profile_id,)
+        with self._get_connection() as conn:
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor.rowcount
+
 
     # ========================================
     # SESSION OPERATIONS
@@ -209,6 +404,8 @@ class Database:
     
     def complete_session(self, session_id: str, stats: Dict):
         """Mark session as completed with final stats"""
+        # Make the session's queued actions durable before closing it out
+        self.flush()
         self.update_session(
             session_id, 
             status='completed',
@@ -231,16 +428,32 @@ class Database:
         """Log a single engagement action with full details"""
         try:
             metadata_json = json.dumps(metadata) if metadata else None
+            photo_filename = metadata.get('photo_filename') if metadata else None
             
-            with self._get_connection() as conn:
-                conn.execute("""
-                    INSERT INTO engagement_log 
-                    (session_id, profile_id, action_type, target_username, target_url, 
-                     status, error_message, metadata, screenshot_path)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (session_id, profile_id, action_type, target_username, target_url,
-                      status, error, metadata_json, screenshot_path))
-                conn.commit()
+            # Timestamp is taken now, not when the background writer commits
+            timestamp = utc_timestamp()
+            self._write("""
+                INSERT INTO engagement_log 
+                (timestamp, session_id, profile_id, action_type, target_username, target_url, 
+                 status, error_message, metadata, screenshot_path, photo_filename)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (timestamp, session_id, profile_id, action_type, target_username, target_url,
+                  status, error, metadata_json, screenshot_path, photo_filename))
+            
+            self.events.publish({
+                'timestamp': timestamp,
+                'session_id': session_id,
+                'profile_id': profile_id,
+                'action_type': action_type,
+                'target_username': target_username,
+                'target_url': target_url,
+                'status': status,
+                'metadata': metadata_json,
+            })
+            
+            if status == 'success' and (profile_id, action_type) in self._dedup_indexes:
+                key = target_username if DEDUP_COLUMNS[action_type] == 'target_username' else target_url
+                self._dedup_indexes[(profile_id, action_type)].add(key)
             
             logger.debug(f"Logged action: {action_type} @{target_username} - {status}")
         except Exception as e:
@@ -274,6 +487,40 @@ class Database:
             )
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_session_actions_page(self, session_id: str, after_id: int = 0, limit: int = 200) -> List[Dict]:
+        """
+        Get one page of a session's actions in log order.
+
+        Args:
+            session_id: Session to read
+            after_id: Only rows with id greater than this (last id of the previous page)
+            limit: Max rows to return
+        """
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT * FROM engagement_log WHERE session_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (session_id, after_id, limit)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def iter_session_actions(self, session_id: str, after_id: int = 0, batch_size: int = 500):
+        """Yield every action of a session page by page, never holding more than one page"""
+        while True:
+            page = self.get_session_actions_page(session_id, after_id, batch_size)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after_id = page[-1]['id']
+
+    def get_logs_after(self, after_id: int, limit: int = 200) -> List[Dict]:
+        """Get log rows newer than after_id, oldest first (for tailing)"""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT * FROM engagement_log WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, limit)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
     # ========================================
     # DAILY STATS OPERATIONS
     # ========================================
@@ -294,16 +541,14 @@ class Database:
                 logger.warning(f"Unknown action type: {action_type}")
                 return
             
-            with self._get_connection() as conn:
-                conn.execute(f"""
-                    INSERT INTO daily_limits (profile_id, date, {column}, last_updated)
-                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                    ON CONFLICT(profile_id, date) 
-                    DO UPDATE SET 
-                        {column} = {column} + ?,
-                        last_updated = CURRENT_TIMESTAMP
-                """, (profile_id, today, count, count))
-                conn.commit()
+            self._write(f"""
+                INSERT INTO daily_limits (profile_id, date, {column}, last_updated)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(profile_id, date) 
+                DO UPDATE SET 
+                    {column} = {column} + ?,
+                    last_updated = CURRENT_TIMESTAMP
+            """, (profile_id, today, count, count))
                 
         except Exception as e:
             logger.error(f"Failed to update daily stats: {e}")
@@ -343,51 +588,179 @@ class Database:
 
     def get_used_photos(self, profile_id: str) -> set:
         """Get set of photo filenames already used by this profile"""
+        self.flush()
         with self._get_connection() as conn:
             cursor = conn.execute(
-                "SELECT metadata FROM engagement_log WHERE profile_id = ? AND action_type = 'post' AND status = 'success'",
+                """
+                SELECT photo_filename FROM engagement_log
+                WHERE profile_id = ? AND action_type = 'post' AND status = 'success'
+                  AND photo_filename IS NOT NULL
+                """,
                 (profile_id,)
             )
-            used = set()
-            for row in cursor.fetchall():
-                try:
-                    if row['metadata']:
-                        meta = json.loads(row['metadata'])
-                        if 'photo_filename' in meta:
-                            used.add(meta['photo_filename'])
-                except Exception:
-                    pass
-            return used
+            return {row[0] for row in cursor.fetchall()}
+
+    # ========================================
+    # MEDIA CATALOG OPERATIONS
+    # ========================================
+
+    def sync_media_catalog(self, folder, force: bool = False) -> bool:
+        """
+        Refresh the catalog of files in a photos folder.
+
+        The folder is only rescanned when its mtime changed since the last
+        sync (files added, removed or renamed), so repeated calls are cheap.
+
+        Args:
+            folder: Photos folder path
+            force: Rescan even if the folder looks unchanged
+
+        Returns:
+            True if the folder was rescanned
+        """
+        folder = os.path.abspath(str(folder))
+        folder_mtime = os.stat(folder).st_mtime
+
+        with self._get_connection() as conn:
+            if not force:
+                row = conn.execute("SELECT mtime FROM media_folders WHERE folder = ?", (folder,)).fetchone()
+                if row and row[0] == folder_mtime:
+                    return False
+
+            files = []
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files.append((folder, entry.name, os.path.splitext(entry.name)[1].lower(),
+                                      stat.st_size, stat.st_mtime))
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM media_catalog WHERE folder = ?", (folder,))
+                conn.executemany(
+                    "INSERT INTO media_catalog (folder, filename, extension, size, mtime) VALUES (?, ?, ?, ?, ?)",
+                    files
+                )
+                conn.execute(
+                    """
+                    INSERT INTO media_folders (folder, mtime, synced_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(folder) DO UPDATE SET mtime = excluded.mtime, synced_at = CURRENT_TIMESTAMP
+                    """,
+                    (folder, folder_mtime)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        logger.info(f"Media catalog synced: {len(files)} files in {folder}")
+        return True
+
+    def pick_unused_photo(self, profile_id: str, folder, extensions) -> Optional[str]:
+        """
+        Pick a random catalogued photo this profile has not posted yet.
+
+        Args:
+            profile_id: Profile that will post
+            folder: Photos folder (synced with sync_media_catalog)
+            extensions: Allowed lowercase extensions, e.g. ['.jpg', '.png']
+
+        Returns:
+            Filename, or None if every photo has been used
+        """
+        folder = os.path.abspath(str(folder))
+        extensions = list(extensions)
+        if not extensions:
+            return None
+        placeholders = ', '.join('?' * len(extensions))
+
+        self.flush()
+        with self._get_connection() as conn:
+            row = conn.execute(
+                f"""
+                SELECT m.filename FROM media_catalog m
+                WHERE m.folder = ? AND m.extension IN ({placeholders})
+                  AND NOT EXISTS (
+                      SELECT 1 FROM engagement_log e
+                      WHERE e.profile_id = ? AND e.action_type = 'post' AND e.status = 'success'
+                        AND e.photo_filename = m.filename
+                  )
+                ORDER BY RANDOM() LIMIT 1
+                """,
+                (folder, *extensions, profile_id)
+            ).fetchone()
+            return row[0] if row else None
 
     def is_user_followed(self, profile_id: str, username: str) -> bool:
         """Check if a specific user has already been followed by this profile"""
         if not username:
             return False
-            
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                """
-                SELECT 1 FROM engagement_log 
-                WHERE profile_id = ? AND target_username = ? AND action_type = 'follow' AND status = 'success'
-                LIMIT 1
-                """,
-                (profile_id, username)
-            )
-            return cursor.fetchone() is not None
+        return self.get_dedup_index(profile_id, 'follow').contains(username)
 
     def is_url_commented(self, profile_id: str, target_url: str) -> bool:
         """Check if a specific URL has already been commented on by this profile"""
         if not target_url:
             return False
-            
+        return self.get_dedup_index(profile_id, 'comment').contains(target_url)
+
+    # ========================================
+    # DEDUP INDEX
+    # ========================================
+
+    def get_dedup_index(self, profile_id: str, action_type: str) -> DedupIndex:
+        """
+        Get the in-memory dedup index for a profile's follows or comments.
+        
+        Loaded from engagement_log on first use (workers call this at start)
+        and kept current by log_action. SQLite is only queried when the
+        Bloom filter reports a possible hit, or on a miss after another
+        connection logged actions (picked up by engagement_log id).
+        """
+        key = (profile_id, action_type)
+        index = self._dedup_indexes.get(key)
+        if index is None:
+            column = DEDUP_COLUMNS[action_type]
+            # Queued writes must be visible to the history load
+            self.flush()
+            index = DedupIndex(
+                name=f"{action_type}:{profile_id[:8]}",
+                loader=lambda after: self._logged_targets(profile_id, action_type, column, after),
+                verifier=lambda value: self._has_logged_target(profile_id, action_type, column, value),
+                version=self._last_log_id,
+            )
+            index.load()
+            self._dedup_indexes[key] = index
+        return index
+
+    def _logged_targets(self, profile_id: str, action_type: str, column: str, after: int = 0):
+        """Successful targets of an action type for a profile, logged after row id ``after``"""
         with self._get_connection() as conn:
             cursor = conn.execute(
-                """
+                f"""
+                SELECT {column} FROM engagement_log 
+                WHERE profile_id = ? AND action_type = ? AND status = 'success' AND {column} IS NOT NULL
+                  AND id > ?
+                """,
+                (profile_id, action_type, after)
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def _last_log_id(self) -> int:
+        """Highest engagement_log id (rowid lookup, no scan)"""
+        with self._get_connection() as conn:
+            return conn.execute("SELECT MAX(id) FROM engagement_log").fetchone()[0] or 0
+
+    def _has_logged_target(self, profile_id: str, action_type: str, column: str, value: str) -> bool:
+        """Authoritative single-target check against engagement_log"""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                f"""
                 SELECT 1 FROM engagement_log 
-                WHERE profile_id = ? AND target_url = ? AND action_type = 'comment' AND status = 'success'
+                WHERE profile_id = ? AND {column} = ? AND action_type = ? AND status = 'success'
                 LIMIT 1
                 """,
-                (profile_id, target_url)
+                (profile_id, value, action_type)
             )
             return cursor.fetchone() is not None
 
@@ -402,6 +775,12 @@ class Database:
             row = cursor.fetchone()
             return dict(row) if row else {}
 
+    def count_sessions_today(self) -> int:
+        """Number of sessions started today (UTC)"""
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT COUNT(*) FROM sessions WHERE date(started_at) = date('now')").fetchone()
+            return row[0]
+
     def get_all_sessions(self, limit: int = 20) -> List[Dict]:
         """Get all sessions ordered by start time"""
         with self._get_connection() as conn:
@@ -412,20 +791,57 @@ class Database:
             return [dict(row) for row in cursor.fetchall()]
 
     def get_profile_total_stats(self, profile_id: str) -> Dict:
-        """Get total stats for a profile across all time"""
+        """Get total stats for a profile across all time (from engagement_rollup)"""
         with self._get_connection() as conn:
             cursor = conn.execute(
                 """
                 SELECT 
-                    COUNT(CASE WHEN action_type = 'like' AND status = 'success' THEN 1 END) as total_likes,
-                    COUNT(CASE WHEN action_type = 'follow' AND status = 'success' THEN 1 END) as total_follows,
-                    COUNT(CASE WHEN action_type = 'comment' AND status = 'success' THEN 1 END) as total_comments,
-                    COUNT(*) as total_actions,
-                    COUNT(CASE WHEN status = 'failed' THEN 1 END) as total_errors
-                FROM engagement_log
+                    COALESCE(SUM(CASE WHEN action_type = 'like' AND status = 'success' THEN count END), 0) as total_likes,
+                    COALESCE(SUM(CASE WHEN action_type = 'follow' AND status = 'success' THEN count END), 0) as total_follows,
+                    COALESCE(SUM(CASE WHEN action_type = 'comment' AND status = 'success' THEN count END), 0) as total_comments,
+                    COALESCE(SUM(count), 0) as total_actions,
+                    COALESCE(SUM(CASE WHEN status = 'failed' THEN count END), 0) as total_errors
+                FROM engagement_rollup
                 WHERE profile_id = ?
                 """,
                 (profile_id,)
             )
             row = cursor.fetchone()
             return dict(row) if row else {}
+
+    def get_action_totals(self, day: str = None, profile_id: str = None) -> Dict[str, int]:
+        """
+        Successful action counts by action_type from engagement_rollup
+        
+        Args:
+            day: 'YYYY-MM-DD' (UTC, like engagement_log timestamps); None for all time
+            profile_id: Limit to one profile; None for all profiles
+        """
+        sql = "SELECT action_type, SUM(count) FROM engagement_rollup WHERE status = 'success'"
+        params = []
+        if day:
+            sql += " AND day = ?"
+            params.append(day)
+        if profile_id:
+            sql += " AND profile_id = ?"
+            params.append(profile_id)
+        sql += " GROUP BY action_type"
+        
+        with self._get_connection() as conn:
+            return {row[0]: row[1] for row in conn.execute(sql, params).fetchall()}
+
+    def get_session_post_counts(self, session_ids: List[str]) -> Dict[str, int]:
+        """Successful post counts for the given sessions only"""
+        if not session_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in session_ids)
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT session_id, COUNT(*) FROM engagement_log
+                WHERE action_type = 'post' AND status = 'success' AND session_id IN ({placeholders})
+                GROUP BY session_id
+                """,
+                list(session_ids)
+            )
+            return {row[0]: row[1] for row in cursor.fetchall()}
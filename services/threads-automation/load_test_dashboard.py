@@ -0,0 +1,191 @@
+"""
+Load test for dashboard endpoint latency while workers are writing.
+
+Simulates the server's async endpoints on one event loop: C concurrent
+dashboard clients issue the stats / session list / log queries that back
+/api/stats, / and /api/logs. A few clients export a large session
+(the NDJSON endpoint's query). Meanwhile worker threads log actions
+through the write-behind writer, as running growth workers do.
+
+Two modes are compared:
+  inline   - endpoints call Database directly on the event loop (old server)
+  AsyncDB  - endpoints await the DB executor facade (shared/async_db.py)
+
+Reported: per-request latency of the fast dashboard queries and the
+event-loop lag measured by a 10 ms ticker. In inline mode every request
+waits behind whichever query is currently blocking the loop.
+
+Usage:
+    python load_test_dashboard.py [--clients 50] [--requests 40] [--writers 4] [--history 50000]
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+import argparse
+import threading
+import statistics
+from datetime import datetime
+
+# Add project root and service dir to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import Database
+from shared.async_db import AsyncDB
+
+BIG_SESSION = "load-big-session"
+
+
+def seed(db: Database, history: int):
+    """Fill a scratch database with sessions and a large action history"""
+    with db._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO sessions (id, profile_id, profile_name, status) VALUES (?, ?, ?, 'completed')",
+            [(f"s{i}", f"profile_{i % 20}", f"Profile {i % 20}") for i in range(200)] +
+            [(BIG_SESSION, "profile_0", "Profile 0")]
+        )
+        conn.executemany(
+            """INSERT INTO engagement_log (session_id, profile_id, action_type, target_username, status)
+               VALUES (?, ?, ?, ?, 'success')""",
+            [(BIG_SESSION if i % 5 == 0 else f"s{i % 200}", f"profile_{i % 20}",
+              random.choice(['follow', 'like', 'comment', 'post']), f"user_{i}") for i in range(history)]
+        )
+        conn.commit()
+
+
+def writer_loop(db: Database, idx: int, stop: threading.Event):
+    """One simulated worker: logs a follow every few ms"""
+    i = 0
+    while not stop.is_set():
+        db.log_action(f"s{idx}", f"profile_{idx}", "follow", f"w{idx}_{i}")
+        db.update_daily_stats(f"profile_{idx}", "follow", 1)
+        i += 1
+        time.sleep(0.002)
+    db.close()
+
+
+class InlineDB:
+    """The old server's behaviour: blocking calls made straight from the coroutine"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __getattr__(self, name):
+        method = getattr(self.db, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
+
+
+async def dashboard_request(adb, kind: str):
+    if kind == "stats":
+        await adb.get_action_totals(day=datetime.utcnow().date().isoformat())
+        await adb.count_sessions_today()
+    elif kind == "root":
+        sessions = await adb.get_all_sessions(limit=50)
+        await adb.get_session_post_counts([s['id'] for s in sessions])
+    elif kind == "logs":
+        await adb.get_recent_actions(limit=50)
+    elif kind == "export":
+        # NDJSON export of a large session: one heavy read
+        await adb.run(lambda: sum(1 for _ in adb.db.iter_session_actions(BIG_SESSION)))
+
+
+async def client(adb, requests: int, exporter: bool, latencies: list):
+    for _ in range(requests):
+        kind = "export" if exporter else random.choice(["stats", "root", "logs"])
+        # Latency is measured from when the request is due, so time spent
+        # waiting for a blocked event loop to get to it is counted
+        think = random.uniform(0, 0.01)
+        due = time.perf_counter() + think
+        await asyncio.sleep(think)
+        await dashboard_request(adb, kind)
+        if kind != "export":
+            latencies.append(time.perf_counter() - due)
+
+
+async def loop_lag_probe(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+
+async def run_clients(adb, clients: int, requests: int, exporters: int):
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(loop_lag_probe(stop, lags))
+    await asyncio.gather(*[
+        client(adb, requests, n < exporters, latencies) for n in range(clients)
+    ])
+    stop.set()
+    await probe
+    return latencies, lags
+
+
+def run(mode: str, args) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix="threads_load_")
+    db = Database(os.path.join(tmpdir, "load.db"))
+    seed(db, args.history)
+
+    adb = AsyncDB(db) if mode == "AsyncDB" else InlineDB(db)
+    if mode != "AsyncDB":
+        # Export still needs run(); inline it like the old endpoints did
+        async def inline_run(fn, *a, **kw):
+            return fn(*a, **kw)
+        adb.run = inline_run
+
+    stop = threading.Event()
+    writers = [threading.Thread(target=writer_loop, args=(db, n, stop), daemon=True)
+               for n in range(args.writers)]
+    for t in writers:
+        t.start()
+
+    started = time.perf_counter()
+    latencies, lags = asyncio.run(run_clients(adb, args.clients, args.requests, args.exporters))
+    wall = time.perf_counter() - started
+
+    stop.set()
+    for t in writers:
+        t.join()
+    db.flush()
+    if isinstance(adb, AsyncDB):
+        adb.shutdown()
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "max_lag_ms": max(lags) * 1000 if lags else 0.0,
+        "mean_lag_ms": statistics.mean(lags) * 1000 if lags else 0.0,
+        "rps": len(latencies) / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard latency under concurrent load")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent dashboard clients")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per client")
+    parser.add_argument("--exporters", type=int, default=2, help="Clients exporting a large session")
+    parser.add_argument("--writers", type=int, default=4, help="Worker threads logging actions")
+    parser.add_argument("--history", type=int, default=50000, help="Seeded engagement_log rows")
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.requests} requests ({args.exporters} exporting), "
+          f"{args.writers} writer threads, {args.history} seeded log rows\n")
+    print(f"{'mode':<8} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8} {'max lag ms':>11} {'mean lag ms':>12} {'req/s':>7}")
+    for mode in ("inline", "AsyncDB"):
+        r = run(mode, args)
+        print(f"{r['mode']:<8} {r['requests']:>9} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{r['max_lag_ms']:>11.2f} {r['mean_lag_ms']:>12.2f} {r['rps']:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
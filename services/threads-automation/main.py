@@ -74,9 +74,9 @@ async def get_logs():
     conn = db.get_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT id, profile_id, action_type, target_username, status, created_at 
+        SELECT id, profile_id, action_type, target_username, status, timestamp
         FROM engagement_log 
-        ORDER BY created_at DESC LIMIT 20
+        ORDER BY timestamp DESC LIMIT 20
     """)
     logs = cursor.fetchall()
     conn.close()
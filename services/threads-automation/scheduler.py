@@ -24,6 +24,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from config import Config, get_config
 from database import Database
 from shared.browser_automation import BrowserProfileManager
+from shared.browser_automation.governor import get_governor
 
 logger = logging.getLogger(__name__)
 
@@ -200,7 +201,13 @@ class ThreadsScheduler:
         
         logger.info(f"\n[SCHEDULER] Found {len(due_sessions)} due session(s)")
         
-        for session_data in due_sessions:
+        governor = get_governor()
+        for index, session_data in enumerate(due_sessions):
+            # Pace launches: leave the rest pending until the host has room
+            if not governor.has_capacity():
+                logger.info(f"Host at browser capacity ({governor.last_denial}) - "
+                            f"deferring {len(due_sessions) - index} session(s) to next check")
+                break
             try:
                 self._run_session(session_data)
             except Exception as e:
@@ -1,8 +1,9 @@
 from fastapi import FastAPI, Request, BackgroundTasks, Form, HTTPException, UploadFile, File
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 import uvicorn
+import asyncio
 import logging
 import os
 import threading
@@ -13,7 +14,7 @@ import random
 import sys
 import os
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from pathlib import Path
 import shutil
@@ -36,11 +37,17 @@ else:
     print(f"Warning: .env not found at {env_path}")
 
 from shared.browser_automation.browser_profiles import BrowserProfileManager
+from shared.browser_automation.session_pool import get_session_pool
+from shared.browser_automation.session_registry import get_registry
+from shared.browser_automation.governor import get_governor
+from shared.browser_automation.startup import startup_stats
 from threads_growth_worker import ThreadsGrowthWorker
 from threads_comment_worker import ThreadsCommentWorker
 from threads_post_worker import ThreadsPostWorker
 from database import Database
 from config import Config
+from shared.async_db import AsyncDB
+from worker_pool import WorkerPool, AdmissionError, QueueFullError, default_max_workers, PRIORITY_SCHEDULED
 
 # Setup Logger
 logging.basicConfig(level=logging.INFO)
@@ -54,8 +61,10 @@ app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), na
 app.mount("/media", StaticFiles(directory=os.path.join(BASE_DIR, "media")), name="media")
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
-# Database
+# Database (workers/threads use db directly; async endpoints await adb so
+# queries run on the DB executor instead of blocking the event loop)
 db = Database(Config.DB_PATH)
+adb = AsyncDB(db)
 
 # Profile Manager
 profile_manager = BrowserProfileManager()
@@ -69,45 +78,69 @@ for name in profile_manager.list_profile_names():
         PROFILE_ID_TO_NAME[pid] = name
 print(f"Cached {len(PROFILE_ID_TO_NAME)} profiles.")
 
-# Global State
-active_workers = {}
-worker_locks = {} # profile_id -> Lock
+def _host_admits(profile_id: str) -> bool:
+    """A job may take a pool slot: its warm browser is pooled, or the governor has room for a launch"""
+    return get_session_pool().has_idle(profile_id) or get_governor().has_capacity(relieve=True)
+
+# Worker Pool: caps concurrent browsers, queues overflow, one job per profile.
+# Jobs wait in its queue (not in a slot) while the resource governor has no room.
+worker_pool = WorkerPool(
+    max_workers=Config.MAX_CONCURRENT_WORKERS or default_max_workers(Config.BROWSER_MEMORY_MB),
+    max_queue=Config.MAX_QUEUED_WORKERS,
+    admission=_host_admits,
+)
+
+def _admission_error(e: AdmissionError) -> JSONResponse:
+    """Response for a run request the pool did not accept"""
+    status_code = 429 if isinstance(e, QueueFullError) else 200
+    return JSONResponse({"status": "error", "message": str(e)}, status_code=status_code)
+
+def _started_message(job, what: str) -> str:
+    position = worker_pool.queue_position(job)
+    if position:
+        return f"Queued {what} (position {position}, {worker_pool.running_count} running)"
+    return f"Started {what}"
 
 # Scheduler Loop
 def scheduler_loop():
     logger.info("Scheduler started.")
+    # Jobs of tasks marked 'queued' by the previous process were lost with it
+    requeued = db.requeue_stale_tasks()
+    if requeued:
+        logger.info(f"Requeued {requeued} scheduled tasks left queued by the previous run")
     while True:
         try:
             tasks = db.get_pending_tasks()
             for task in tasks:
-                logger.info(f"Executing scheduled task {task['id']}: {task['task_type']} for {task['profile_id']}")
-                
                 pid = task['profile_id']
                 
-                # Check if already running
-                if pid in active_workers and active_workers[pid].is_alive():
+                # Busy profiles keep their task pending for the next pass
+                if worker_pool.is_busy(pid):
                      logger.warning(f"Skipping task {task['id']} - Profile {pid} is busy.")
                      continue
 
-                def task_wrapper(p, t_type, t_id):
+                def run_task(p, t_type, t_id):
+                    db.update_task_status(t_id, 'running')
                     try:
                         if t_type == 'growth':
                             ThreadsGrowthWorker(p).start()
                         elif t_type == 'comment':
                             ThreadsCommentWorker(p).start()
                     finally:
-                        if p in active_workers:
-                            del active_workers[p]
-                        # Mark as completed (or failed inside worker, but here we update generic status)
-                        # Actually worker logs to engagement_log, here we just mark schedule as done
+                        # Worker logs its own results to engagement_log
                         db.update_task_status(t_id, 'completed')
 
-                t = threading.Thread(target=task_wrapper, args=(pid, task['task_type'], task['id']), daemon=True)
-                active_workers[pid] = t
-                t.start()
+                # Marked before submitting so run_task's 'running' is never overwritten
+                db.update_task_status(task['id'], 'queued')
+                try:
+                    worker_pool.submit(pid, task['task_type'], run_task, pid, task['task_type'], task['id'],
+                                       priority=PRIORITY_SCHEDULED)
+                except AdmissionError as e:
+                    logger.warning(f"Deferring task {task['id']}: {e}")
+                    db.update_task_status(task['id'], 'pending')
+                    continue
                 
-                # Update status to running immediately
-                db.update_task_status(task['id'], 'running')
+                logger.info(f"Queued scheduled task {task['id']}: {task['task_type']} for {pid}")
                 
             time.sleep(60) # Check every minute
         except Exception as e:
@@ -174,7 +207,7 @@ async def create_schedule(req: ScheduleRequest):
             if sched_time < now:
                 sched_time += timedelta(days=1)
                 
-            db.add_scheduled_task(pid, req.task_type, sched_time)
+            await adb.add_scheduled_task(pid, req.task_type, sched_time)
             scheduled_count += 1
             
     return {"status": "success", "message": f"Scheduled {scheduled_count} tasks."}
@@ -183,40 +216,22 @@ async def create_schedule(req: ScheduleRequest):
 async def read_root(request: Request):
     """Render the main control panel"""
     # Fetch recent sessions with profile names (last 50)
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, profile_id, profile_name, started_at, ended_at, status, 
-               likes_performed, follows_performed, comments_performed, 
-               errors_count, actions_performed
-        FROM sessions ORDER BY started_at DESC LIMIT 50
-    """)
-    raw_sessions = cursor.fetchall()
-    
-    # Get posts count for each session from engagement_log
-    posts_by_session = {}
-    cursor.execute("""
-        SELECT session_id, COUNT(*) 
-        FROM engagement_log 
-        WHERE action_type = 'post' AND status = 'success'
-        GROUP BY session_id
-    """)
-    for row in cursor.fetchall():
-        posts_by_session[row[0]] = row[1]
+    raw_sessions = await adb.get_all_sessions(limit=50)
     
-    conn.close()
+    # Posts count for the displayed sessions only (indexed, independent of log size)
+    posts_by_session = await adb.get_session_post_counts([s['id'] for s in raw_sessions])
     
     # Format sessions for UI
     sessions = []
     for s in raw_sessions:
-        session_id = s[0]
-        profile_id = s[1]
-        profile_name = s[2] or PROFILE_ID_TO_NAME.get(profile_id, profile_id[:8] if profile_id else "unknown")
+        session_id = s['id']
+        profile_id = s['profile_id']
+        profile_name = s['profile_name'] or PROFILE_ID_TO_NAME.get(profile_id, profile_id[:8] if profile_id else "unknown")
         
-        follows = s[7] or 0
-        comments = s[8] or 0
-        likes = s[6] or 0
-        errors = s[9] or 0
+        follows = s['follows_performed'] or 0
+        comments = s['comments_performed'] or 0
+        likes = s['likes_performed'] or 0
+        errors = s['errors_count'] or 0
         posts = posts_by_session.get(session_id, 0)
         
         # Determine session type from what was performed
@@ -247,10 +262,10 @@ async def read_root(request: Request):
         
         sessions.append({
             "session_id": session_id,
-            "time": s[3],  # started_at
+            "time": s['started_at'],
             "profile_name": profile_name,
             "type": session_type,
-            "status": s[5],  # status
+            "status": s['status'],
             "results": results_str,
             "posts": posts,
             "follows": follows,
@@ -280,31 +295,22 @@ async def run_growth(
     profile_id: str = Form(...),
     target_username: str = Form(None)
 ):
-    if profile_id in active_workers and active_workers[profile_id].is_alive():
-        return JSONResponse({"status": "error", "message": "Worker already running for this profile"})
-
     if not target_username:
          # Fallback to default if not provided (though UI enforces it)
          target_username = os.getenv("THREADS_DEFAULT_TARGET", "zuck")
 
-    def worker_wrapper(pid, target):
-        try:
-            worker = ThreadsGrowthWorker(pid, target_username=target)
-            worker.start()
-        except Exception as e:
-            logger.error(f"Growth worker failed: {e}")
-        finally:
-            if pid in active_workers:
-                del active_workers[pid]
+    def run_worker(pid, target):
+        ThreadsGrowthWorker(pid, target_username=target).start()
 
-    t = threading.Thread(target=worker_wrapper, args=(profile_id, target_username), daemon=True)
-    active_workers[profile_id] = t
-    t.start()
+    try:
+        job = worker_pool.submit(profile_id, 'growth', run_worker, profile_id, target_username)
+    except AdmissionError as e:
+        return _admission_error(e)
     
     # Auto-schedule second session 6 hours later if not already scheduled
     try:
         current_time = datetime.now()
-        pending = db.get_pending_tasks()
+        pending = await adb.get_pending_tasks()
         has_future_growth = any(
             t['profile_id'] == profile_id and 
             t['task_type'] == 'growth' and 
@@ -324,7 +330,7 @@ async def run_growth(
             # Get profile name for DB
             pname = PROFILE_ID_TO_NAME.get(profile_id, "Unknown")
             
-            db.add_scheduled_task(
+            await adb.add_scheduled_task(
                 profile_id=profile_id, 
                 task_type='growth', 
                 scheduled_time=next_time,
@@ -336,31 +342,24 @@ async def run_growth(
     except Exception as e:
         logger.error(f"Failed to auto-schedule follow-up: {e}")
     
-    return {"status": "success", "message": f"Started Growth Worker for {profile_id} on @{target_username}"}
+    return {"status": "success", "job_id": job.id,
+            "message": _started_message(job, f"Growth Worker for {profile_id} on @{target_username}")}
 
 @app.post("/api/run_comment")
 async def run_comment(
     background_tasks: BackgroundTasks,
     profile_id: str = Form(...)
 ):
-    if profile_id in active_workers and active_workers[profile_id].is_alive():
-        return JSONResponse({"status": "error", "message": "Worker already running for this profile"})
+    def run_worker(pid):
+        ThreadsCommentWorker(pid).start()
 
-    def worker_wrapper(pid):
-        try:
-            worker = ThreadsCommentWorker(pid)
-            worker.start()
-        except Exception as e:
-            logger.error(f"Comment worker failed: {e}")
-        finally:
-            if pid in active_workers:
-                del active_workers[pid]
-
-    t = threading.Thread(target=worker_wrapper, args=(profile_id,), daemon=True)
-    active_workers[profile_id] = t
-    t.start()
+    try:
+        job = worker_pool.submit(profile_id, 'comment', run_worker, profile_id)
+    except AdmissionError as e:
+        return _admission_error(e)
     
-    return {"status": "success", "message": f"Started Comment Worker for {profile_id}"}
+    return {"status": "success", "job_id": job.id,
+            "message": _started_message(job, f"Comment Worker for {profile_id}")}
 
 @app.post("/api/upload_photo")
 async def upload_photo(file: UploadFile = File(...)):
@@ -440,27 +439,19 @@ async def upload_and_post(
         logger.info(f"Photo uploaded for immediate post: {safe_filename}")
         
         # Start post worker in background with this specific photo and topic
-        if profile_id in active_workers and active_workers[profile_id].is_alive():
-            return JSONResponse({"status": "error", "message": "Worker already running for this profile"})
-
-        def worker_wrapper(pid, photo_name, topic_hint):
-            try:
-                worker = ThreadsPostWorker(pid, specific_photo=photo_name, topic_hint=topic_hint)
-                worker.start()
-            except Exception as e:
-                logger.error(f"Post worker failed: {e}")
-            finally:
-                if pid in active_workers:
-                    del active_workers[pid]
-
-        t = threading.Thread(target=worker_wrapper, args=(profile_id, safe_filename, topic), daemon=True)
-        active_workers[profile_id] = t
-        t.start()
+        def run_worker(pid, photo_name, topic_hint):
+            ThreadsPostWorker(pid, specific_photo=photo_name, topic_hint=topic_hint).start()
+
+        try:
+            job = worker_pool.submit(profile_id, 'post', run_worker, profile_id, safe_filename, topic)
+        except AdmissionError as e:
+            return _admission_error(e)
         
         return {
             "status": "success", 
-            "message": f"Photo uploaded and posting started!",
-            "filename": safe_filename
+            "message": f"Photo uploaded. {_started_message(job, 'posting')}",
+            "filename": safe_filename,
+            "job_id": job.id
         }
         
     except Exception as e:
@@ -475,24 +466,16 @@ async def run_post(
     background_tasks: BackgroundTasks,
     profile_id: str = Form(...)
 ):
-    if profile_id in active_workers and active_workers[profile_id].is_alive():
-        return JSONResponse({"status": "error", "message": "Worker already running for this profile"})
+    def run_worker(pid):
+        ThreadsPostWorker(pid).start()
 
-    def worker_wrapper(pid):
-        try:
-            worker = ThreadsPostWorker(pid)
-            worker.start()
-        except Exception as e:
-            logger.error(f"Post worker failed: {e}")
-        finally:
-            if pid in active_workers:
-                del active_workers[pid]
-
-    t = threading.Thread(target=worker_wrapper, args=(profile_id,), daemon=True)
-    active_workers[profile_id] = t
-    t.start()
+    try:
+        job = worker_pool.submit(profile_id, 'post', run_worker, profile_id)
+    except AdmissionError as e:
+        return _admission_error(e)
     
-    return {"status": "success", "message": f"Started Post Worker for {profile_id}"}
+    return {"status": "success", "job_id": job.id,
+            "message": _started_message(job, f"Post Worker for {profile_id}")}
 
 @app.post("/api/save_config")
 async def save_config(
@@ -513,104 +496,162 @@ async def save_config(
 @app.get("/api/stats")
 async def get_stats():
     """Get overall statistics"""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    
-    # Get today's stats
-    cursor.execute("""
-        SELECT 
-            SUM(follows_count) as total_follows,
-            SUM(likes_count) as total_likes,
-            SUM(comments_count) as total_comments,
-            SUM(posts_count) as total_posts
-        FROM daily_limits 
-        WHERE date = date('now')
-    """)
-    today_stats = cursor.fetchone()
-    
-    # Get active workers count
-    active_count = len([w for w in active_workers.values() if w.is_alive()])
-    
-    # Get total sessions today
-    cursor.execute("""
-        SELECT COUNT(*) 
-        FROM sessions 
-        WHERE date(started_at) = date('now')
-    """)
-    sessions_today = cursor.fetchone()[0]
-    
-    conn.close()
+    # Today's totals from the engagement_rollup table (UTC day, like the log)
+    today_totals = await adb.get_action_totals(day=datetime.utcnow().date().isoformat())
+    sessions_today = await adb.count_sessions_today()
     
     return {
         "today": {
-            "follows": today_stats[0] or 0,
-            "likes": today_stats[1] or 0,
-            "comments": today_stats[2] or 0,
-            "posts": today_stats[3] or 0,
+            "follows": today_totals.get('follow', 0),
+            "likes": today_totals.get('like', 0),
+            "comments": today_totals.get('comment', 0),
+            "posts": today_totals.get('post', 0),
             "sessions": sessions_today
         },
-        "active_workers": active_count
+        "active_workers": worker_pool.running_count,
+        "queued_workers": worker_pool.queued_count
+    }
+
+@app.get("/api/workers")
+async def get_workers():
+    """Worker pool metrics, running and queued jobs, live browsers, host load, warm browser pool and startup timings"""
+    return {
+        "metrics": worker_pool.metrics(),
+        "jobs": worker_pool.jobs(),
+        "browsers": get_registry().list_sessions(),
+        "resources": get_governor().load(),
+        "browser_pool": get_session_pool().stats(),
+        "browser_startup": startup_stats()
+    }
+
+@app.delete("/api/workers/{job_id}")
+async def cancel_worker_job(job_id: int):
+    """Cancel a queued job (running jobs cannot be cancelled)"""
+    job = next((job for job in worker_pool.jobs() if job["id"] == job_id), None)
+    if worker_pool.cancel(job_id):
+        # A scheduled task of the profile goes back to 'pending' (a profile has one job at most)
+        await adb.requeue_stale_tasks(job["profile_id"])
+        return {"status": "success", "message": f"Cancelled job {job_id}"}
+    return JSONResponse({"status": "error", "message": f"Job {job_id} is not queued"}, status_code=404)
+
+# Largest page any paginated log endpoint returns
+MAX_PAGE_SIZE = 1000
+
+def _format_action(action: Dict) -> Dict:
+    """Session action as returned by the session APIs"""
+    return {
+        "id": action["id"],
+        "time": action["timestamp"],
+        "type": action["action_type"],
+        "target": action["target_username"] or action["target_url"],
+        "status": action["status"],
+        "metadata": json.loads(action["metadata"]) if action["metadata"] else {}
+    }
+
+def _format_log(log: Dict) -> Dict:
+    """Log row as shown in the live action log"""
+    profile_id = log["profile_id"]
+    profile_name = PROFILE_ID_TO_NAME.get(profile_id, profile_id[:8] + "...")
+    return {
+        "id": log.get("id"),
+        "time": log["timestamp"],
+        "profile": profile_name,
+        "action": f"{log['action_type']} -> {log['target_username'] or 'feed'}",
+        "status": log["status"],
+        "metadata": log["metadata"]
     }
 
 @app.get("/api/session/{session_id}")
-async def get_session_details(session_id: str):
-    """Get detailed information about a specific session"""
+async def get_session_details(session_id: str, after_id: int = 0, limit: int = 200):
+    """
+    Get session info and one page of its actions.
+
+    Pass the returned next_after_id as ?after_id= to get the next page
+    (null when there are no more actions).
+    """
     try:
         # Get session info
-        session_info = db.get_session_summary(session_id)
+        session_info = await adb.get_session_summary(session_id)
         if not session_info:
             return JSONResponse({"status": "error", "message": "Session not found"}, status_code=404)
         
-        # Get all actions for this session
-        actions = db.get_session_actions(session_id)
-        
-        # Format actions with details
-        detailed_actions = []
-        for action in actions:
-            action_detail = {
-                "time": action["timestamp"],
-                "type": action["action_type"],
-                "target": action["target_username"] or action["target_url"],
-                "status": action["status"],
-                "metadata": json.loads(action["metadata"]) if action["metadata"] else {}
-            }
-            detailed_actions.append(action_detail)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        actions = await adb.get_session_actions_page(session_id, after_id, limit)
+        detailed_actions = [_format_action(action) for action in actions]
         
         return {
             "session": session_info,
-            "actions": detailed_actions
+            "actions": detailed_actions,
+            "next_after_id": actions[-1]["id"] if len(actions) == limit else None
         }
     except Exception as e:
         logger.error(f"Failed to get session details: {e}")
         return JSONResponse({"status": "error", "message": str(e)}, status_code=500)
 
+@app.get("/api/session/{session_id}/actions.ndjson")
+def stream_session_actions(session_id: str, after_id: int = 0):
+    """Stream all of a session's actions as NDJSON, one action per line"""
+    def generate():
+        for action in db.iter_session_actions(session_id, after_id):
+            yield json.dumps(_format_action(action)) + "\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="session_{session_id}.ndjson"'}
+    )
+
 @app.get("/api/logs")
-async def get_logs():
-    """Get recent logs for live stream"""
-    conn = db.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, profile_id, action_type, target_username, status, timestamp, metadata 
-        FROM engagement_log 
-        ORDER BY timestamp DESC LIMIT 50
-    """)
-    logs = cursor.fetchall()
-    conn.close()
+async def get_logs(after_id: Optional[int] = None, limit: int = 50):
+    """
+    Get logs for the live stream.
+
+    Without after_id: the latest `limit` actions, newest first.
+    With after_id: actions logged after that id, oldest first, for tailing.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if after_id is None:
+        logs = await adb.get_recent_actions(limit=limit)
+    else:
+        logs = await adb.get_logs_after(after_id, limit)
     
     # Format for JSON (use cached profile mapping)
-    log_data = []
-    for log in logs:
-        profile_id = log[1]
-        profile_name = PROFILE_ID_TO_NAME.get(profile_id, profile_id[:8] + "...")
-        
-        log_data.append({
-            "time": log[5],
-            "profile": profile_name,
-            "action": f"{log[2]} -> {log[3] or 'feed'}",
-            "status": log[4],
-            "metadata": log[6]
-        })
-    return log_data
+    return [_format_log(log) for log in logs]
+
+# Seconds between SSE keep-alive comments on an idle feed
+SSE_KEEPALIVE_SECONDS = 15
+
+@app.get("/api/logs/stream")
+async def stream_logs(request: Request):
+    """
+    Live action log as Server-Sent Events.
+
+    Fed by Database.log_action through the in-process event bus, so open
+    dashboards never query the database. Reconnecting clients resume
+    from Last-Event-ID out of the bus's recent history.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    after_seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    subscription = db.events.subscribe(after_seq=after_seq, loop=asyncio.get_running_loop())
+    
+    async def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                item = await subscription.aget(timeout=SSE_KEEPALIVE_SECONDS)
+                if item is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                seq, event = item
+                yield f"id: {seq}\ndata: {json.dumps(_format_log(event))}\n\n"
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
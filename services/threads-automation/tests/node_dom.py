@@ -0,0 +1,102 @@
+"""
+Runs page-side scripts (DRAIN_JS, SCAN_JS, ...) under node against a tiny DOM.
+
+The stub covers what those scripts use: element trees with attributes and
+text, querySelector(All)/closest for simple "tag.class[attr=value]" selectors,
+isConnected, and a MutationObserver that ``insert()`` triggers synchronously.
+Tests are skipped when node is not installed.
+"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+NODE = shutil.which("node")
+
+requires_node = pytest.mark.skipif(NODE is None, reason="node is not installed")
+
+DOM_JS = r"""
+const SIMPLE = /^(\w*)(?:\.([\w-]+))?(?:\[([\w-]+)(?:([*^]?=)["']?([^"'\]]*)["']?)?\])?$/;
+const matchesOne = (el, sel) => {
+    const [, tag, cls, attr, op, value] = sel.trim().match(SIMPLE);
+    if (tag && el.tag !== tag) return false;
+    if (cls && !(el.attrs.class || '').split(' ').includes(cls)) return false;
+    if (!attr) return true;
+    const actual = el.attrs[attr];
+    if (actual === undefined) return false;
+    if (!op) return true;
+    if (op === '=') return actual === value;
+    if (op === '^=') return actual.startsWith(value);
+    return actual.includes(value);
+};
+
+class El {
+    constructor(tag, attrs = {}, text = '') {
+        this.tag = tag; this.attrs = attrs; this.text = text;
+        this.children = []; this.parentElement = null; this.nodeType = 1;
+    }
+    append(...kids) { for (const kid of kids) { kid.parentElement = this; this.children.push(kid); } return this; }
+    remove() {
+        const siblings = this.parentElement.children;
+        siblings.splice(siblings.indexOf(this), 1);
+        this.parentElement = null;
+    }
+    get href() { return this.attrs.href && new URL(this.attrs.href, 'https://www.threads.net').href; }
+    get isConnected() { let el = this; while (el.parentElement) el = el.parentElement; return el === document.body; }
+    get innerText() { return this.text + this.children.map(c => c.innerText).join(''); }
+    getAttribute(name) { return this.attrs[name] === undefined ? null : this.attrs[name]; }
+    matches(sel) { return sel.split(',').some(one => matchesOne(this, one)); }
+    querySelectorAll(sel) {
+        const found = [];
+        const walk = el => { for (const kid of el.children) { if (kid.matches(sel)) found.push(kid); walk(kid); } };
+        walk(this);
+        return found;
+    }
+    querySelector(sel) { return this.querySelectorAll(sel)[0] || null; }
+    closest(sel) { for (let el = this; el; el = el.parentElement) if (el.matches(sel)) return el; return null; }
+    contains(el) { for (; el; el = el.parentElement) if (el === this) return true; return false; }
+}
+
+const observers = [];
+class MutationObserver {
+    constructor(callback) { this.callback = callback; }
+    observe(target) { this.target = target; observers.push(this); }
+    disconnect() { observers.splice(observers.indexOf(this), 1); }
+}
+
+const h = (tag, attrs, ...kids) => {
+    const el = new El(tag, attrs || {}, kids.filter(k => typeof k === 'string').join(''));
+    return el.append(...kids.filter(k => typeof k !== 'string'));
+};
+// Append a node and deliver the mutation to observers of an ancestor
+const insert = (parent, node) => {
+    parent.append(node);
+    for (const observer of [...observers]) {
+        if (observer.target.contains(node)) observer.callback([{addedNodes: [node]}]);
+    }
+};
+
+const document = {body: new El('body')};
+document.querySelector = sel => document.body.querySelector(sel);
+document.querySelectorAll = sel => document.body.querySelectorAll(sel);
+document.scrollingElement = {scrollHeight: 1000};
+const window = globalThis;
+window.scrollY = 0;
+window.innerHeight = 800;
+const page = (script, ...args) => new Function('arguments', 'document', 'window', 'MutationObserver', script)(
+    args, document, window, MutationObserver);
+"""
+
+
+def run_page(scenario: str):
+    """
+    Run ``scenario`` (JS using h/insert/page/document) after the DOM stub.
+
+    The scenario ends with ``return <value>``; the value comes back decoded from JSON.
+    """
+    script = DOM_JS + "\nconsole.log(JSON.stringify((() => {\n" + scenario + "\n})()));\n"
+    result = subprocess.run([NODE, "-e", script], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
@@ -0,0 +1,39 @@
+"""
+Tests for the AsyncDB facade used by the async server endpoints.
+"""
+
+import sys
+import asyncio
+import threading
+import importlib.util
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+PROJECT_ROOT = SERVICE_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from shared.async_db import AsyncDB
+
+# Load by path: every service has a module called "database"
+_spec = importlib.util.spec_from_file_location("threads_database_async", SERVICE_DIR / "database.py")
+threads_database = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(threads_database)
+
+
+def test_methods_run_on_db_executor(tmp_path):
+    db = threads_database.Database(str(tmp_path / "threads.db"), write_behind=False)
+    adb = AsyncDB(db, max_workers=2, name="test-db")
+    db.log_action("s1", "p1", "follow", "alice")
+
+    async def main():
+        loop_thread = threading.current_thread().name
+        totals = await adb.get_action_totals(profile_id="p1")
+        ran_on = await adb.run(lambda: threading.current_thread().name)
+        return loop_thread, totals, ran_on
+
+    loop_thread, totals, ran_on = asyncio.run(main())
+    adb.shutdown()
+
+    assert totals == {"follow": 1}
+    assert ran_on.startswith("test-db-executor") and ran_on != loop_thread
+    assert adb.db_path == db.db_path  # plain attributes pass through
@@ -0,0 +1,67 @@
+"""
+Tests for the live action feed behind the dashboard SSE endpoint.
+"""
+
+import sys
+import asyncio
+import threading
+import importlib.util
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+PROJECT_ROOT = SERVICE_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from shared.event_bus import EventBus
+
+# Load by path: every service has a module called "database"
+_spec = importlib.util.spec_from_file_location("threads_database_feed", SERVICE_DIR / "database.py")
+threads_database = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(threads_database)
+
+
+def test_log_action_publishes_to_subscribers(tmp_path):
+    db = threads_database.Database(str(tmp_path / "threads.db"), write_behind=False)
+    subscription = db.events.subscribe()
+
+    db.log_action("s1", "p1", "follow", "alice")
+
+    seq, event = subscription.get(timeout=1)
+    assert event["action_type"] == "follow"
+    assert event["target_username"] == "alice"
+    assert seq == db.events.last_seq
+    subscription.close()
+    assert db.events.subscriber_count == 0
+
+
+def test_replay_after_last_event_id():
+    bus = EventBus("test", history=3)
+    for i in range(5):
+        bus.publish(i)
+
+    subscription = bus.subscribe(after_seq=3)
+    assert [subscription.get(timeout=0)[1] for _ in range(2)] == [3, 4]
+    assert subscription.get(timeout=0) is None
+
+
+def test_async_subscriber_woken_by_publishing_thread():
+    bus = EventBus("test")
+
+    async def consume():
+        subscription = bus.subscribe(loop=asyncio.get_running_loop())
+        threading.Timer(0.05, bus.publish, args=("hello",)).start()
+        item = await subscription.aget(timeout=2)
+        subscription.close()
+        return item
+
+    assert asyncio.run(consume()) == (1, "hello")
+
+
+def test_slow_subscriber_drops_oldest():
+    bus = EventBus("test", subscriber_buffer=2)
+    subscription = bus.subscribe()
+    for i in range(3):
+        bus.publish(i)
+
+    assert subscription.dropped == 1
+    assert subscription.get(timeout=0)[1] == 1
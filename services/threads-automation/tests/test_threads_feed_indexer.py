@@ -0,0 +1,84 @@
+"""
+Tests for the incremental feed indexer (fake driver replaying scan results).
+"""
+
+import json
+import importlib.util
+from pathlib import Path
+
+from node_dom import requires_node, run_page
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+_spec = importlib.util.spec_from_file_location("threads_feed_indexer", SERVICE_DIR / "core" / "feed_indexer.py")
+feed_indexer = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(feed_indexer)
+
+
+class FakeDriver:
+    """Returns one prepared SCAN_JS result per call"""
+
+    def __init__(self, scans):
+        self.scans = list(scans)
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append((script, args))
+        if script == feed_indexer.SCAN_JS:
+            return self.scans.pop(0)
+        if script == feed_indexer.HANDLES_JS:
+            return {"reply": f"reply-{args[0]}", "like": None}
+        return None
+
+
+def _scan(urls, at_bottom=False, recycled=0):
+    posts = [{"url": url, "author": "a", "text": "t", "clean_text": "t", "liked": False} for url in urls]
+    return {"posts": posts, "recycled": recycled, "at_bottom": at_bottom, "indexed": 0}
+
+
+def test_scan_is_one_call_and_counts_recycled_nodes():
+    driver = FakeDriver([_scan(["u1", "u2"]), _scan(["u3"], recycled=2)])
+    feed = feed_indexer.FeedIndexer(driver)
+
+    assert [post["url"] for post in feed.scan()] == ["u1", "u2"]
+    assert [post["url"] for post in feed.scan()] == ["u3"]
+    assert len(driver.calls) == 2
+    assert feed.recycled == 2
+    assert feed.handles("u3") == {"reply": "reply-u3", "like": None}
+
+
+def test_end_of_feed_needs_consecutive_empty_scans_at_bottom():
+    driver = FakeDriver([_scan([], at_bottom=True), _scan([], at_bottom=True), _scan(["u1"]),
+                         _scan([], at_bottom=True), _scan([], at_bottom=False), _scan([], at_bottom=True),
+                         _scan([], at_bottom=True), _scan([], at_bottom=True)])
+    feed = feed_indexer.FeedIndexer(driver, end_scans=3)
+
+    for _ in range(7):
+        feed.scan()
+        assert not feed.at_end
+    feed.scan()
+    assert feed.at_end
+
+
+@requires_node
+def test_post_whose_link_renders_later_is_indexed_on_a_later_scan():
+    result = run_page(f"""
+        const SCAN_JS = {json.dumps(feed_indexer.SCAN_JS)};
+        const post = (url) => h('div', {{'data-pressable-container': 'true'}},
+            ...(url ? [h('a', {{href: url}})] : []),
+            h('span', {{dir: 'auto'}}, 'hello'),
+            h('div', {{role: 'button'}}, h('svg', {{'aria-label': 'Reply'}})));
+        const late = post(null);
+        document.body.append(post('/@a/post/1'), late);
+
+        const first = page(SCAN_JS, [], 200);
+        insert(late, h('a', {{href: '/@b/post/2'}}));
+        const second = page(SCAN_JS, [], 200);
+        const third = page(SCAN_JS, [], 200);
+        return [first, second, third].map(scan => scan.posts.map(p => p.url));
+    """)
+    assert result == [
+        ["https://www.threads.net/@a/post/1"],
+        ["https://www.threads.net/@b/post/2"],
+        [],
+    ]
@@ -0,0 +1,63 @@
+"""
+Tests for the compiled user filter engine.
+"""
+
+import importlib.util
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+_spec = importlib.util.spec_from_file_location("threads_filters", SERVICE_DIR / "core" / "filters.py")
+filters = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(filters)
+
+ThreadsFilters = filters.ThreadsFilters
+
+
+def test_detect_name_language_scripts():
+    detect = ThreadsFilters.detect_name_language
+    assert detect("John_Doe") == "latin"
+    assert detect("Иван") == "cyrillic"
+    assert detect("ivan_Ёжик") == "cyrillic"  # Cyrillic wins over Latin
+    assert detect("محمد") == "arabic"
+    assert detect("1234_.") == "other"
+    assert detect("") == "empty"
+
+
+def test_classify_page_matches_per_user_checks():
+    user_filter = filters.UserFilter(blacklist=["Shop", "nft"], whitelist=["coffee", "путешествия"])
+    users = [
+        ("alice", "I love COFFEE"),
+        ("bob", "coffee SHOP owner"),
+        ("محمد", "coffee"),
+        ("carol", "music"),
+        ("дима", "ПУТЕШЕСТВИЯ и nft"),
+        ("erin", "Путешествия"),
+        ("frank", None),
+    ]
+
+    verdicts = user_filter.classify(users)
+
+    assert verdicts == ["ok", "blacklist", "language", "whitelist", "blacklist", "ok", "whitelist"]
+    assert verdicts == [user_filter.check(name, bio) for name, bio in users]
+    assert [ThreadsFilters.filter_user(name, bio, {"keywords_blacklist": ["Shop", "nft"],
+                                                   "keywords_whitelist": ["coffee", "путешествия"]})
+            for name, bio in users] == [v == "ok" for v in verdicts]
+
+
+def test_compile_reads_skip_keywords_and_is_cached():
+    settings = {"filter_language": ["latin"], "skip_keywords": ["promo"]}
+    compiled = ThreadsFilters.compile(settings)
+
+    assert compiled is ThreadsFilters.compile(dict(settings))
+    assert compiled.check("alice", "PROMO codes") == "blacklist"
+    assert compiled.check("алиса", "hello") == "language"
+
+
+def test_long_keyword_lists_use_one_pattern():
+    words = [f"word{i}" for i in range(40)]
+    matcher = filters.KeywordMatcher(words)
+
+    assert matcher.pattern is not None
+    assert matcher.matches(["x WORD7 y", "nothing", "word39"]) == [True, False, True]
+    assert filters.KeywordMatcher([""]).matches(["a", ""]) == [True, True]
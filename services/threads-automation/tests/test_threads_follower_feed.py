@@ -0,0 +1,135 @@
+"""
+Tests for the incremental follower feed (fake driver standing in for the page buffer).
+"""
+
+import sys
+import json
+import importlib.util
+from pathlib import Path
+
+from node_dom import requires_node, run_page
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SERVICE_DIR))  # follower_feed imports core.filters
+
+_spec = importlib.util.spec_from_file_location("threads_follower_feed", SERVICE_DIR / "core" / "follower_feed.py")
+follower_feed = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(follower_feed)
+
+
+class FakeDriver:
+    """Page buffer of inserted rows, handed out in batches like DRAIN_JS"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.drains = 0
+        self.resolved = []
+
+    def execute_script(self, script, *args):
+        if script == follower_feed.DRAIN_JS:
+            self.drains += 1
+            limit = args[3]
+            batch, self.rows = self.rows[:limit], self.rows[limit:]
+            return {"rows": batch, "pending": len(self.rows), "inserted": 0}
+        if script == follower_feed.BUTTON_JS:
+            self.resolved.append(args[0])
+            return f"button-{args[0]}"
+        return None
+
+
+def _row(username, state="Follow", about=""):
+    return {"username": username, "state": state, "followable": state in follower_feed.FOLLOW_LABELS,
+            "about": about}
+
+
+def test_candidates_come_from_batches_skipping_followed_and_excluded():
+    driver = FakeDriver([_row("a", "Following"), _row("b"), _row("c"), _row("d")])
+    feed = follower_feed.FollowerFeed(driver, batch_size=2)
+
+    assert feed.next_candidate({"b"}) == ("button-c", "c")
+    assert feed.next_candidate(set()) == ("button-d", "d")
+    assert feed.next_candidate(set()) == (None, None)
+    assert driver.resolved == ["c", "d"]  # only clicked rows cost a handle lookup
+    assert driver.drains == 3
+
+
+def test_rows_rejected_by_the_user_filter_are_skipped_without_a_lookup():
+    from core.filters import ThreadsFilters
+
+    driver = FakeDriver([_row("shop.deals", about="Best PROMO codes"), _row("анна", about="Москва"),
+                         _row("مرحبا"), _row("dan", "Following", about="crypto")])
+    user_filter = ThreadsFilters.compile({"filter_language": ["latin", "cyrillic"], "skip_keywords": ["promo"]})
+    feed = follower_feed.FollowerFeed(driver, user_filter=user_filter)
+
+    assert feed.next_candidate(set()) == ("button-анна", "анна")
+    assert feed.next_candidate(set()) == (None, None)
+    assert driver.resolved == ["анна"]
+    assert feed.filtered == {"blacklist": 1, "language": 1}
+
+
+def test_missing_modal_yields_no_rows():
+    driver = FakeDriver([])
+    driver.execute_script = lambda script, *args: None
+    assert follower_feed.FollowerFeed(driver).next_candidate(set()) == (None, None)
+
+
+def _drain(limit=20):
+    args = json.dumps(['[role="dialog"]', "button, div[role='button']", list(follower_feed.FOLLOW_LABELS),
+                       limit, limit * 10, follower_feed.PENDING_RECHECKS])
+    return f"page(DRAIN_JS, ...{args})"
+
+
+@requires_node
+def test_rows_whose_link_or_label_arrive_later_are_drained_later():
+    result = run_page(f"""
+        const DRAIN_JS = {json.dumps(follower_feed.DRAIN_JS)};
+        const row = (link, label) => h('div', {{}}, ...(link ? [h('a', {{href: '/@' + link}})] : []),
+                                       h('div', {{}}, h('button', {{}}, label)));
+        const dialog = h('div', {{role: 'dialog'}});
+        const noLinkYet = row(null, 'Follow');
+        const noLabelYet = row('bob', '');
+        dialog.append(row('alice', 'Follow'), noLinkYet, noLabelYet);
+        document.body.append(dialog);
+
+        const first = {_drain()};
+        // Hydration: the link arrives in a later mutation, the label is rendered
+        insert(noLinkYet, h('a', {{href: '/@carol'}}));
+        noLabelYet.querySelector('button').text = 'Follow';
+        insert(dialog, row('dave', 'Following'));
+        const second = {_drain()};
+        return [first, second];
+    """)
+    first, second = result
+    assert [(r["username"], r["followable"]) for r in first["rows"]] == [("alice", True)]
+    assert first["waiting"] == 2
+    assert sorted((r["username"], r["followable"]) for r in second["rows"]) == [
+        ("bob", True), ("carol", True), ("dave", False)]
+    assert second["waiting"] == 0
+    assert second["inserted"] == 4
+
+
+@requires_node
+def test_buttons_that_never_hydrate_are_dropped_after_rechecks():
+    result = run_page(f"""
+        const DRAIN_JS = {json.dumps(follower_feed.DRAIN_JS)};
+        const dialog = h('div', {{role: 'dialog'}}, h('div', {{}}, h('button', {{}}, 'Close')));
+        document.body.append(dialog);
+        const waiting = [];
+        for (let i = 0; i < {follower_feed.PENDING_RECHECKS + 2}; i++) waiting.push({_drain()}.waiting);
+        return waiting;
+    """)
+    assert result[0] == 1
+    assert result[-1] == 0
+
+
+@requires_node
+def test_rows_carry_their_text_besides_username_and_label():
+    result = run_page(f"""
+        const DRAIN_JS = {json.dumps(follower_feed.DRAIN_JS)};
+        const dialog = h('div', {{role: 'dialog'}},
+            h('div', {{}}, h('a', {{href: '/@alice'}}, 'alice'), h('span', {{}}, 'Alice | NFT drops'),
+              h('div', {{}}, h('button', {{}}, 'Follow'))));
+        document.body.append(dialog);
+        return {_drain()}.rows;
+    """)
+    assert [(r["username"], r["about"]) for r in result] == [("alice", "Alice | NFT drops")]
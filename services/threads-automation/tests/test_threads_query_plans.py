@@ -0,0 +1,272 @@
+"""
+EXPLAIN QUERY PLAN regression tests for threads-automation hot queries.
+
+Fails if any hot query falls back to a full table scan.
+"""
+
+import re
+import sys
+import importlib.util
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+PROJECT_ROOT = SERVICE_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Load by path: every service has a module called "database"
+_spec = importlib.util.spec_from_file_location("threads_database", SERVICE_DIR / "database.py")
+threads_database = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(threads_database)
+
+FULL_SCAN = re.compile(r"^SCAN \w+$")
+
+HOT_QUERIES = {
+    "is_user_followed": (
+        """SELECT 1 FROM engagement_log
+           WHERE profile_id = ? AND target_username = ? AND action_type = ? AND status = 'success' LIMIT 1""",
+        ("p1", "alice", "follow"),
+    ),
+    "is_url_commented": (
+        """SELECT 1 FROM engagement_log
+           WHERE profile_id = ? AND target_url = ? AND action_type = ? AND status = 'success' LIMIT 1""",
+        ("p1", "https://www.threads.net/post/1", "comment"),
+    ),
+    "dedup_index_load": (
+        """SELECT target_username FROM engagement_log
+           WHERE profile_id = ? AND action_type = ? AND status = 'success' AND target_username IS NOT NULL
+             AND id > ?""",
+        ("p1", "follow", 0),
+    ),
+    "dedup_index_version": (
+        "SELECT MAX(id) FROM engagement_log",
+        (),
+    ),
+    "get_used_photos": (
+        """SELECT photo_filename FROM engagement_log
+           WHERE profile_id = ? AND action_type = 'post' AND status = 'success' AND photo_filename IS NOT NULL""",
+        ("p1",),
+    ),
+    "pick_unused_photo": (
+        """SELECT m.filename FROM media_catalog m
+           WHERE m.folder = ? AND m.extension IN (?, ?)
+             AND NOT EXISTS (
+                 SELECT 1 FROM engagement_log e
+                 WHERE e.profile_id = ? AND e.action_type = 'post' AND e.status = 'success'
+                   AND e.photo_filename = m.filename
+             )
+           ORDER BY RANDOM() LIMIT 1""",
+        ("/photos", ".jpg", ".png", "p1"),
+    ),
+    "get_profile_total_stats": (
+        "SELECT SUM(count), SUM(CASE WHEN status = 'failed' THEN count END) FROM engagement_rollup WHERE profile_id = ?",
+        ("p1",),
+    ),
+    "get_action_totals_today": (
+        "SELECT action_type, SUM(count) FROM engagement_rollup WHERE status = 'success' AND day = ? GROUP BY action_type",
+        ("2030-01-01",),
+    ),
+    "dashboard_posts_by_session": (
+        """SELECT session_id, COUNT(*) FROM engagement_log
+           WHERE action_type = 'post' AND status = 'success' AND session_id IN (?, ?)
+           GROUP BY session_id""",
+        ("s1", "s2"),
+    ),
+    "get_session_actions": (
+        "SELECT * FROM engagement_log WHERE session_id = ? ORDER BY timestamp ASC",
+        ("s1",),
+    ),
+    "get_session_actions_page": (
+        "SELECT * FROM engagement_log WHERE session_id = ? AND id > ? ORDER BY id LIMIT ?",
+        ("s1", 0, 200),
+    ),
+    "get_logs_after": (
+        "SELECT * FROM engagement_log WHERE id > ? ORDER BY id LIMIT ?",
+        (0, 200),
+    ),
+    "get_recent_actions_profile": (
+        "SELECT * FROM engagement_log WHERE profile_id = ? ORDER BY timestamp DESC LIMIT ?",
+        ("p1", 50),
+    ),
+    "get_pending_tasks": (
+        "SELECT * FROM scheduled_tasks WHERE status = 'pending' AND scheduled_time <= ? ORDER BY scheduled_time ASC",
+        ("2030-01-01T00:00:00",),
+    ),
+    "stats_today_daily_limits": (
+        "SELECT SUM(follows_count) FROM daily_limits WHERE date = date('now')",
+        (),
+    ),
+    "stats_today_sessions": (
+        "SELECT COUNT(*) FROM sessions WHERE date(started_at) = date('now')",
+        (),
+    ),
+    "recent_sessions": (
+        "SELECT id FROM sessions ORDER BY started_at DESC LIMIT 50",
+        (),
+    ),
+}
+
+
+@pytest.fixture
+def db(tmp_path):
+    return threads_database.Database(str(tmp_path / "threads.db"), write_behind=False)
+
+
+def _full_scans(conn, sql, params):
+    plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return [row[3] for row in plan if FULL_SCAN.match(row[3])]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_avoids_full_scan(db, name):
+    sql, params = HOT_QUERIES[name]
+    with db._get_connection() as conn:
+        assert _full_scans(conn, sql, params) == []
+
+
+def test_migrations_are_idempotent(tmp_path):
+    path = str(tmp_path / "threads.db")
+    threads_database.Database(path, write_behind=False)
+    db = threads_database.Database(path, write_behind=False)
+
+    with db._get_connection() as conn:
+        versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+        columns = [info[1] for info in conn.execute("PRAGMA table_info(daily_limits)")]
+
+    assert versions == [m.version for m in threads_database.MIGRATIONS]
+    assert "posts_count" in columns
+
+
+def test_rollup_tracks_inserts_and_deletes(db):
+    db.log_action("s1", "p1", "follow", "alice")
+    db.log_action("s1", "p1", "follow", "bob")
+    db.log_action("s1", "p1", "comment", target_url="u1", status="failed")
+
+    assert db.get_profile_total_stats("p1") == {
+        "total_likes": 0, "total_follows": 2, "total_comments": 0,
+        "total_actions": 3, "total_errors": 1,
+    }
+    assert db.get_action_totals(profile_id="p1") == {"follow": 2}
+
+    with db._get_connection() as conn:
+        conn.execute("DELETE FROM engagement_log WHERE target_username = 'bob'")
+        conn.commit()
+    assert db.get_action_totals(profile_id="p1") == {"follow": 1}
+
+
+def test_pick_unused_photo_skips_posted_files(db, tmp_path):
+    photos = tmp_path / "photos"
+    photos.mkdir()
+    for name in ("a.jpg", "b.jpg", "notes.txt"):
+        (photos / name).write_bytes(b"x")
+
+    assert db.sync_media_catalog(photos) is True
+    assert db.sync_media_catalog(photos) is False  # folder unchanged
+
+    db.log_action("s1", "p1", "post", metadata={"photo_filename": "a.jpg", "text": "hi"})
+    assert db.get_used_photos("p1") == {"a.jpg"}
+    assert db.pick_unused_photo("p1", photos, [".jpg"]) == "b.jpg"
+    assert db.pick_unused_photo("p2", photos, [".txt"]) == "notes.txt"
+
+    db.log_action("s1", "p1", "post", metadata={"photo_filename": "b.jpg"})
+    assert db.pick_unused_photo("p1", photos, [".jpg"]) is None
+
+
+def test_pick_unused_photo_anti_join_uses_photo_index(db):
+    sql, params = HOT_QUERIES["pick_unused_photo"]
+    with db._get_connection() as conn:
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    assert any("idx_log_used_photos" in detail for detail in plan), plan
+
+
+def test_session_actions_keyset_pagination(db):
+    for i in range(7):
+        db.log_action("s1", "p1", "follow", f"user{i}")
+        db.log_action("s2", "p1", "follow", f"other{i}")
+
+    first = db.get_session_actions_page("s1", limit=3)
+    second = db.get_session_actions_page("s1", after_id=first[-1]["id"], limit=3)
+    assert [a["target_username"] for a in first + second] == [f"user{i}" for i in range(6)]
+
+    streamed = list(db.iter_session_actions("s1", batch_size=2))
+    assert [a["target_username"] for a in streamed] == [f"user{i}" for i in range(7)]
+    assert db.get_logs_after(streamed[-1]["id"])[0]["target_username"] == "other6"
+
+
+def test_dashboard_post_counts_use_partial_index(tmp_path):
+    path = str(tmp_path / "threads.db")
+    db = threads_database.Database(path, write_behind=False)
+    for i in range(200):
+        db.log_action(f"s{i % 20}", "p1", "post" if i % 10 == 0 else "follow", f"user{i}")
+    # Statistics are gathered at the first startup that finds rows
+    db = threads_database.Database(path, write_behind=False)
+
+    sql, params = HOT_QUERIES["dashboard_posts_by_session"]
+    with db._get_connection() as conn:
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    assert any("idx_log_posts_by_session" in detail for detail in plan), plan
+
+
+def test_statistics_are_not_regathered_on_every_startup(tmp_path):
+    path = str(tmp_path / "threads.db")
+    db = threads_database.Database(path, write_behind=False)
+    with db._get_connection() as conn:
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'idx_log_action'").fetchone() is None
+    db.log_action("s1", "p1", "post", "user0")
+    db = threads_database.Database(path, write_behind=False)
+    for i in range(50):
+        db.log_action("s1", "p1", "follow", f"user{i}")
+    threads_database.Database(path, write_behind=False)
+
+    with db._get_connection() as conn:
+        stat = conn.execute("SELECT stat FROM sqlite_stat1 WHERE idx = 'idx_log_session_id'").fetchone()
+    # Still the single row counted when statistics were first gathered
+    assert stat[0].split()[0] == "1"
+
+
+def test_stranded_queued_tasks_go_back_to_pending(db):
+    when = datetime.now() - timedelta(minutes=1)
+    for profile_id in ("p1", "p2", "p3"):
+        db.add_scheduled_task(profile_id, "growth", when)
+    tasks = {task["profile_id"]: task["id"] for task in db.get_pending_tasks()}
+    db.update_task_status(tasks["p1"], "queued")
+    db.update_task_status(tasks["p2"], "queued")
+    db.update_task_status(tasks["p3"], "running")
+
+    # The job of p1 was cancelled
+    assert db.requeue_stale_tasks("p1") == 1
+    assert {task["profile_id"] for task in db.get_pending_tasks()} == {"p1"}
+    # Restart: every job still queued in memory is gone
+    assert db.requeue_stale_tasks() == 1
+    assert {task["profile_id"] for task in db.get_pending_tasks()} == {"p1", "p2"}
+
+
+def test_dedup_index_sees_actions_logged_by_another_instance(tmp_path):
+    path = str(tmp_path / "threads.db")
+    worker_db = threads_database.Database(path, write_behind=False)
+    other_db = threads_database.Database(path, write_behind=False)
+    worker_db.log_action("s1", "p1", "follow", "alice")
+    assert worker_db.is_user_followed("p1", "alice")
+
+    other_db.log_action("s2", "p1", "follow", "bob")
+    other_db.log_action("s2", "p2", "follow", "carol")
+    assert worker_db.is_user_followed("p1", "bob")
+    assert not worker_db.is_user_followed("p1", "carol")
+
+
+def test_legacy_get_connection_rows_work_by_index_and_name(db):
+    db.log_action("s1", "p1", "follow", "alice")
+    db.flush()
+
+    # main.py reads rows by position; newer callers by column name
+    conn = db.get_connection()
+    try:
+        row = conn.execute("""SELECT id, profile_id, action_type, target_username, status, timestamp
+                              FROM engagement_log ORDER BY timestamp DESC LIMIT 20""").fetchone()
+    finally:
+        conn.close()
+    assert (row[1], row[2], row[3], row[4]) == ("p1", "follow", "alice", "success")
+    assert row["target_username"] == "alice"
+    assert row[5] == row["timestamp"]
@@ -0,0 +1,125 @@
+"""
+Tests for the bounded worker pool behind the threads server run endpoints.
+"""
+
+import time
+import threading
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+_spec = importlib.util.spec_from_file_location("threads_worker_pool", SERVICE_DIR / "worker_pool.py")
+worker_pool = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(worker_pool)
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def gate():
+    event = threading.Event()
+    yield event
+    event.set()  # never leave pool threads blocked
+
+
+def test_caps_concurrency_and_runs_by_priority(gate):
+    pool = worker_pool.WorkerPool(max_workers=1, max_queue=10, name="test-priority")
+    order = []
+
+    pool.submit("p0", "growth", gate.wait)
+    _wait_for(lambda: pool.running_count == 1)
+    pool.submit("p1", "comment", order.append, "scheduled-1", priority=worker_pool.PRIORITY_SCHEDULED)
+    pool.submit("p2", "comment", order.append, "scheduled-2", priority=worker_pool.PRIORITY_SCHEDULED)
+    manual = pool.submit("p3", "post", order.append, "manual")
+
+    assert pool.running_count == 1
+    assert pool.queue_position(manual) == 1
+    assert pool.metrics()["queued_by_kind"] == {"comment": 2, "post": 1}
+
+    gate.set()
+    _wait_for(lambda: pool.completed == 4)
+    assert order == ["manual", "scheduled-1", "scheduled-2"]
+    assert pool.metrics()["running"] == 0
+
+
+def test_one_job_per_profile(gate):
+    pool = worker_pool.WorkerPool(max_workers=2, max_queue=10, name="test-profile")
+    pool.submit("p1", "growth", gate.wait)
+
+    with pytest.raises(worker_pool.ProfileBusyError):
+        pool.submit("p1", "comment", lambda: None)
+
+    gate.set()
+    _wait_for(lambda: not pool.is_busy("p1"))
+    pool.submit("p1", "comment", lambda: None)
+    _wait_for(lambda: pool.completed == 2)
+
+
+def test_rejects_when_queue_full_and_records_failures(gate):
+    pool = worker_pool.WorkerPool(max_workers=1, max_queue=1, name="test-full")
+    pool.submit("p1", "growth", gate.wait)
+    _wait_for(lambda: pool.running_count == 1)
+    queued = pool.submit("p2", "growth", lambda: 1 / 0)
+
+    with pytest.raises(worker_pool.QueueFullError):
+        pool.submit("p3", "growth", lambda: None)
+    assert pool.rejected == 1
+
+    gate.set()
+    _wait_for(lambda: pool.failed == 1)
+    assert queued.state == "failed"
+    assert "division" in queued.error
+
+
+def test_cancel_queued_job(gate):
+    pool = worker_pool.WorkerPool(max_workers=1, max_queue=5, name="test-cancel")
+    pool.submit("p1", "growth", gate.wait)
+    _wait_for(lambda: pool.running_count == 1)
+    job = pool.submit("p2", "growth", lambda: None)
+
+    assert pool.cancel(job.id) is True
+    assert job.state == "cancelled"
+    assert not pool.is_busy("p2")
+    assert pool.queued_count == 0
+
+
+def test_jobs_wait_in_queue_until_admitted(gate, monkeypatch):
+    monkeypatch.setattr(worker_pool, "ADMISSION_RETRY_INTERVAL", 0.01)
+    room = threading.Event()
+    asked = []
+
+    def admission(profile_id):
+        asked.append(profile_id)
+        return room.is_set()
+
+    pool = worker_pool.WorkerPool(max_workers=2, max_queue=5, name="test-admission", admission=admission)
+    job = pool.submit("p1", "growth", lambda: None)
+    _wait_for(lambda: len(asked) >= 3)
+
+    # Not admitted: no slot taken, still cancellable and counted as waiting
+    assert job.state == "waiting_for_host"
+    assert pool.running_count == 0
+    assert pool.queue_position(job) == 1
+    assert pool.metrics()["admission_deferred"] == 1
+
+    room.set()
+    _wait_for(lambda: pool.completed == 1)
+    assert job.state == "completed"
+    assert set(asked) == {"p1"}
+
+
+def test_failing_admission_check_does_not_stall_the_queue():
+    def admission(profile_id):
+        raise RuntimeError("governor unavailable")
+
+    pool = worker_pool.WorkerPool(max_workers=1, max_queue=5, name="test-admission-error", admission=admission)
+    pool.submit("p1", "growth", lambda: None)
+    _wait_for(lambda: pool.completed == 1)
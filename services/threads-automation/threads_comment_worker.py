@@ -20,10 +20,13 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException,
 
 from shared.browser_automation.gologin_manager import GoLoginManager, GoLoginSession
 from shared.browser_automation.browser_profiles import BrowserProfileManager
+from shared.browser_automation.screenshots import get_screenshot_service
 from config import Config
 from database import Database
 from core.ai_generator import AICommentGenerator
 from core.selectors import SELECTORS
+from core.feed_indexer import FeedIndexer
+from core.filters import KeywordMatcher
 from comment_config import COMMENT_SETTINGS
 
 logger = logging.getLogger(__name__)
@@ -32,6 +35,7 @@ class ThreadsCommentWorker:
     def __init__(self, profile_id, db=None):
         self.profile_id = profile_id
         self.settings = COMMENT_SETTINGS
+        self.skip_keywords = KeywordMatcher(self.settings['skip_keywords'])
         self.db = db or Database(Config.DB_PATH)
         self.gologin = GoLoginManager(gologin_token=Config.GOLOGIN_TOKEN)
         self.ai = AICommentGenerator()
@@ -42,6 +46,7 @@ class ThreadsCommentWorker:
         
         self.screenshot_dir = Path(__file__).parent / 'screenshots' / 'comments'
         self.screenshot_dir.mkdir(parents=True, exist_ok=True)
+        self.screenshots = get_screenshot_service(self.screenshot_dir)
         
         self.stats = {
             "likes": 0,
@@ -63,16 +68,11 @@ class ThreadsCommentWorker:
         except:
             return self.profile_id[:8]
 
-    def take_screenshot(self, driver, name):
-        try:
-            ts = datetime.now().strftime('%H%M%S')
-            filename = f'{ts}_{name}.png'
-            path = self.screenshot_dir / filename
-            driver.save_screenshot(str(path))
-            return str(path)
-        except Exception as e:
-            print(f"[ERROR] Screenshot failed: {e}")
-            return None
+    def take_screenshot(self, driver, name, force=False):
+        path = self.screenshots.capture(driver, self.profile_id, name, force=force)
+        if not path:
+            print(f"[ERROR] Screenshot failed: {name}")
+        return path
 
     def start(self):
         print(f"\n{'='*80}")
@@ -91,6 +91,9 @@ class ThreadsCommentWorker:
                 self.db.update_session(self.session_id, status='completed', log_summary='Daily limit reached')
                 return
 
+            # Load comment history once so per-post checks stay in memory
+            self.db.get_dedup_index(self.profile_id, 'comment')
+
             print("[1/4] Launching browser...")
             with GoLoginSession(self.gologin, self.profile_id) as session:
                 driver = session['driver']
@@ -123,46 +126,25 @@ class ThreadsCommentWorker:
 
     def _process_feed(self, driver):
         print("[3/4] Processing Feed...")
-        processed_urls = set()
+        # Posts are indexed in-page; each scan returns only posts new since the last scroll
+        self.feed = FeedIndexer(driver)
         scrolls = 0
         
         while self.stats['comments'] < self.settings['max_comments_per_session'] and scrolls < self.settings['max_scrolls']:
-            # SIMPLE APPROACH: Find Reply buttons directly, then get parent post
-            reply_buttons = driver.find_elements(By.CSS_SELECTOR, 'svg[aria-label="Reply"]')
-            print(f"[LOOP] Found {len(reply_buttons)} Reply buttons in view.")
+            posts = self.feed.scan()
+            print(f"[LOOP] Found {len(posts)} new posts in view ({self.feed.indexed} indexed).")
             
-            for reply_svg in reply_buttons:
+            for post in posts:
                 if self.stats['comments'] >= self.settings['max_comments_per_session']:
                     break
                     
                 try:
-                    # Get the clickable reply button container
-                    reply_btn = reply_svg.find_element(By.XPATH, "./ancestor::div[@role='button'][1]")
-                    
-                    # Find the post container (go up from reply button)
-                    # Try data-pressable-container first, then general parent
-                    try:
-                        post = reply_btn.find_element(By.XPATH, "./ancestor::div[@data-pressable-container='true'][1]")
-                    except:
-                        # Fallback: go up several levels
-                        post = reply_btn.find_element(By.XPATH, "./ancestor::div[contains(@class, 'x1a2a7pz')][1]")
-                    
-                    # Get post URL for deduplication
-                    try:
-                        link_el = post.find_element(By.CSS_SELECTOR, 'a[href*="/post/"]')
-                        post_url = link_el.get_attribute('href')
-                    except:
-                        post_url = f"post_{id(post)}"  # Fallback ID
-                        
-                    if post_url in processed_urls:
-                        continue
-                        
-                    processed_urls.add(post_url)
+                    post_url = post['url']
                     self.stats['processed'] += 1
                     
                     # Process this post
                     if self._should_process_post(post, post_url):
-                        success = self._comment_on_post(driver, post, reply_btn, post_url)
+                        success = self._comment_on_post(driver, post, post_url)
                         if success:
                             delay = random.uniform(self.settings['comments_delay_min'], self.settings['comments_delay_max'])
                             print(f"[WAIT] Sleeping {delay:.1f}s before next comment...")
@@ -180,6 +162,10 @@ class ThreadsCommentWorker:
                 print(f"{'='*60}")
                 break
             
+            if self.feed.at_end:
+                print(f"[END] Reached the end of the feed after {scrolls} scrolls.")
+                break
+            
             # Scroll down
             print(f"[SCROLL] Loading more posts... (comments: {self.stats['comments']}/{self.settings['max_comments_per_session']})")
             driver.execute_script("window.scrollBy(0, 800);")
@@ -194,23 +180,23 @@ class ThreadsCommentWorker:
         
         # 2. Filter content
         try:
-            text = post.text.lower()
+            text = post['text'].lower()
             
             # Skip short/long posts
             if len(text) < self.settings['min_post_length']: return False
             if len(text) > self.settings['max_post_length']: return False
             
-            # Skip keywords
-            for kw in self.settings['skip_keywords']:
-                if kw in text:
-                    print(f"[SKIP] Keyword '{kw}' found in post.")
-                    return False
+            # Skip keywords (one precompiled pattern for the whole list)
+            kw = self.skip_keywords.search(text)
+            if kw is not None:
+                print(f"[SKIP] Keyword '{kw}' found in post.")
+                return False
             
             return True
         except:
             return False
 
-    def _comment_on_post(self, driver, post, reply_btn, url):
+    def _comment_on_post(self, driver, post, url):
         """
         Simple flow:
         1. Extract text from post
@@ -224,19 +210,8 @@ class ThreadsCommentWorker:
         print(f"{'='*60}")
         
         try:
-            # 1. EXTRACT TEXT (using [dir="auto"] - proven to work)
-            text_elements = post.find_elements(By.CSS_SELECTOR, 'span[dir="auto"], div[dir="auto"]')
-            clean_text = ""
-            max_len = 0
-            
-            for el in text_elements:
-                text = el.text.strip()
-                # Filter UI noise
-                if text in ["Like", "Reply", "Share", "Translate", "followers"]: 
-                    continue
-                if len(text) > max_len:
-                    max_len = len(text)
-                    clean_text = text
+            # 1. EXTRACT TEXT (longest [dir="auto"] text, read by the feed indexer)
+            clean_text = post['clean_text']
             
             # Remove "Translate" suffix if present
             if clean_text.endswith("Translate"):
@@ -253,16 +228,20 @@ class ThreadsCommentWorker:
                 
             print(f"[TEXT] '{clean_text[:80]}...'")
             
+            # Buttons are resolved only now, for the one post we act on
+            handles = self.feed.handles(url)
+            reply_btn = handles['reply']
+            if reply_btn is None:
+                print("[SKIP] Post left the page")
+                return False
+            
             # 2. CLICK LIKE (if enabled and not already liked)
             if self.settings.get('enable_like', True):
                 try:
-                    # Check if already liked
-                    unlike_btns = post.find_elements(By.CSS_SELECTOR, 'svg[aria-label="Unlike"]')
-                    if unlike_btns:
+                    if post['liked']:
                         print("[LIKE] Already liked")
-                    else:
-                        like_svg = post.find_element(By.CSS_SELECTOR, 'svg[aria-label="Like"]')
-                        like_btn = like_svg.find_element(By.XPATH, "./ancestor::div[@role='button'][1]")
+                    elif handles['like'] is not None:
+                        like_btn = handles['like']
                         
                         print("[LIKE] Clicking...")
                         driver.execute_script("arguments[0].click();", like_btn)
@@ -402,7 +381,7 @@ class ThreadsCommentWorker:
             
         except Exception as e:
             print(f"[ERROR] {e}")
-            self.take_screenshot(driver, 'error_comment')
+            self.take_screenshot(driver, 'error_comment', force=True)
             return False
 
     def _human_type(self, element, text):
@@ -22,9 +22,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'
 
 from shared.browser_automation.gologin_manager import GoLoginManager, GoLoginSession
 from shared.browser_automation.browser_profiles import BrowserProfileManager
+from shared.browser_automation.screenshots import get_screenshot_service
 from config import Config
 from database import Database
 from core.selectors import SELECTORS
+from core.follower_feed import FollowerFeed
+from core.filters import ThreadsFilters
 from growth_config import GROWTH_SETTINGS, TARGETS
 
 logger = logging.getLogger(__name__)
@@ -41,6 +44,7 @@ class ThreadsGrowthWorker:
         
         self.screenshot_dir = Path(__file__).parent / 'screenshots' / 'growth'
         self.screenshot_dir.mkdir(parents=True, exist_ok=True)
+        self.screenshots = get_screenshot_service(self.screenshot_dir)
         
         self.stats = {
             "follows": 0,
@@ -57,13 +61,10 @@ class ThreadsGrowthWorker:
             return self.profile_id[:8]
         except: return self.profile_id[:8]
 
-    def take_screenshot(self, driver, name):
-        try:
-            filename = f"{datetime.now().strftime('%H%M%S')}_{name}.png"
-            path = self.screenshot_dir / filename
-            driver.save_screenshot(str(path))
-            print(f"[SCREENSHOT] {filename}")
-        except: pass
+    def take_screenshot(self, driver, name, force=False):
+        # Routine frames may be skipped as unchanged: their path is printed once written
+        return self.screenshots.capture(driver, self.profile_id, name, force=force,
+                                        on_saved=lambda path: print(f"[SCREENSHOT] {os.path.basename(path)}"))
 
     def start(self):
         print(f"\n{'='*60}")
@@ -79,6 +80,9 @@ class ThreadsGrowthWorker:
                 print("[LIMIT] Daily limit reached.")
                 return
 
+            # Load follow history once so per-row checks stay in memory
+            self.db.get_dedup_index(self.profile_id, 'follow')
+
             print("[1/4] Launching browser...")
             with GoLoginSession(self.gologin, self.profile_id) as session:
                 driver = session['driver']
@@ -178,106 +182,82 @@ class ThreadsGrowthWorker:
         # Track users to avoid processing same button repeatedly if it fails
         processed_users = set()
 
-        while count < self.settings['max_follows_per_session']:
-            try:
-                # Re-find modal to avoid stale element
-                modal = driver.find_element(By.CSS_SELECTOR, '[role="dialog"]')
-                
-                # Find a candidate button
-                btn, username = self._find_button(modal, processed_users)
+        # Rows inserted into the modal are queued in-page; we only drain new ones,
+        # classifying each batch against the language/keyword settings
+        feed = FollowerFeed(driver, user_filter=ThreadsFilters.compile(self.settings))
+
+        try:
+            while count < self.settings['max_follows_per_session']:
+                try:
+                    # Find a candidate button
+                    btn, username = feed.next_candidate(processed_users)
                 
-                if not btn:
-                    print("[LOOP] Scrolling...")
-                    self._scroll(driver, modal)
-                    time.sleep(2)
-                    continue
+                    if not btn:
+                        print("[LOOP] Scrolling...")
+                        # Re-find modal to avoid stale element
+                        modal = driver.find_element(By.CSS_SELECTOR, '[role="dialog"]')
+                        self._scroll(driver, modal)
+                        time.sleep(2)
+                        continue
 
-                processed_users.add(username)
+                    processed_users.add(username)
 
-                # Check DB
-                if self.db.is_user_followed(self.profile_id, username):
-                    print(f"[SKIP] Already followed @{username}")
-                    continue
+                    # Check DB
+                    if self.db.is_user_followed(self.profile_id, username):
+                        print(f"[SKIP] Already followed @{username}")
+                        continue
 
-                # HUMAN ACTION
-                print(f"[ACTION] Following @{username}...")
+                    # HUMAN ACTION
+                    print(f"[ACTION] Following @{username}...")
                 
-                # 1. Hover
-                if self.settings['hover_before_click']:
-                    ActionChains(driver).move_to_element(btn).perform()
-                    time.sleep(random.uniform(0.5, 1.5))
+                    # 1. Hover
+                    if self.settings['hover_before_click']:
+                        ActionChains(driver).move_to_element(btn).perform()
+                        time.sleep(random.uniform(0.5, 1.5))
                 
-                # 2. Click
-                btn.click()
+                    # 2. Click
+                    btn.click()
                 
-                # 3. Verify (The Safety Valve)
-                if self._verify_follow(btn):
-                    # Success
-                    self.db.log_action(self.session_id, self.profile_id, "follow", username, "success")
-                    self.db.update_daily_stats(self.profile_id, "follow", 1)
-                    count += 1
-                    break_counter += 1
-                    self.stats['follows'] += 1
-                    print(f"[SUCCESS] Followed @{username} ({count}/{self.settings['max_follows_per_session']})")
+                    # 3. Verify (The Safety Valve)
+                    if self._verify_follow(btn):
+                        # Success
+                        self.db.log_action(self.session_id, self.profile_id, "follow", username, "success")
+                        self.db.update_daily_stats(self.profile_id, "follow", 1)
+                        count += 1
+                        break_counter += 1
+                        self.stats['follows'] += 1
+                        print(f"[SUCCESS] Followed @{username} ({count}/{self.settings['max_follows_per_session']})")
                     
-                    # 4. Imperfect Timing
-                    delay = random.uniform(self.settings['delay_min'], self.settings['delay_max'])
-                    print(f"[WAIT] Sleeping {delay:.1f}s...")
-                    time.sleep(delay)
+                        # 4. Imperfect Timing
+                        delay = random.uniform(self.settings['delay_min'], self.settings['delay_max'])
+                        print(f"[WAIT] Sleeping {delay:.1f}s...")
+                        time.sleep(delay)
                     
-                    # 5. Coffee Break?
-                    if self.settings['enable_breaks'] and break_counter >= next_break_at:
-                        duration = random.randint(self.settings['break_duration_min'], self.settings['break_duration_max'])
-                        print(f"\n[COFFEE BREAK] Taking a {duration}s break to act human...\n")
-                        time.sleep(duration)
-                        break_counter = 0
-                        next_break_at = random.randint(self.settings['break_every_min'], self.settings['break_every_max'])
+                        # 5. Coffee Break?
+                        if self.settings['enable_breaks'] and break_counter >= next_break_at:
+                            duration = random.randint(self.settings['break_duration_min'], self.settings['break_duration_max'])
+                            print(f"\n[COFFEE BREAK] Taking a {duration}s break to act human...\n")
+                            time.sleep(duration)
+                            break_counter = 0
+                            next_break_at = random.randint(self.settings['break_every_min'], self.settings['break_every_max'])
                 
-                else:
-                    # REJECTED
-                    print(f"\n{'!'*40}")
-                    print(f"[REJECTED] Button reverted for @{username}!")
-                    print(f"[SAFETY VALVE] Stopping session immediately.")
-                    print(f"{'!'*40}\n")
-                    self.stats['rejected'] += 1
-                    self.db.log_action(self.session_id, self.profile_id, "follow", username, "rejected", "Button reverted")
-                    return # STOP SESSION
+                    else:
+                        # REJECTED
+                        print(f"\n{'!'*40}")
+                        print(f"[REJECTED] Button reverted for @{username}!")
+                        print(f"[SAFETY VALVE] Stopping session immediately.")
+                        print(f"{'!'*40}\n")
+                        self.stats['rejected'] += 1
+                        self.db.log_action(self.session_id, self.profile_id, "follow", username, "rejected", "Button reverted")
+                        return # STOP SESSION
 
-            except Exception as e:
-                print(f"[ERROR] Loop error: {e}")
-                time.sleep(1)
-
-    def _find_button(self, modal, processed):
-        # Find "Follow" buttons
-        buttons = modal.find_elements(By.TAG_NAME, "button")
-        # Also check divs that act as buttons
-        buttons.extend(modal.find_elements(By.CSS_SELECTOR, "div[role='button']"))
-        
-        for btn in buttons:
-            try:
-                if not btn.is_displayed(): continue
-                txt = btn.text.strip()
-                
-                # Strict check: Text must be "Follow" (or localized)
-                # Exclude "Following", "Requested", "Followers"
-                if txt in ["Follow", "Подписаться"] or (txt == "Follow" and "ing" not in txt):
-                    
-                    # Get username from row
-                    username = "unknown"
-                    try:
-                        row = btn.find_element(By.XPATH, "./../..")
-                        links = row.find_elements(By.TAG_NAME, "a")
-                        for l in links:
-                            href = l.get_attribute('href')
-                            if href and '/@' in href:
-                                username = href.split('/@')[-1].split('/')[0]
-                                break
-                    except: pass
-                    
-                    if username not in processed:
-                        return btn, username
-            except: continue
-        return None, None
+                except Exception as e:
+                    print(f"[ERROR] Loop error: {e}")
+                    time.sleep(1)
+        finally:
+            if feed.filtered:
+                print(f"[FILTER] Skipped by filters: {feed.filtered}")
+            feed.stop()
 
     def _verify_follow(self, btn):
         """Check if button text changes from Follow -> Following"""
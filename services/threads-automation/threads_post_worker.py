@@ -21,6 +21,7 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from shared.browser_automation.gologin_manager import GoLoginManager, GoLoginSession
 from shared.browser_automation.browser_profiles import BrowserProfileManager
+from shared.browser_automation.screenshots import get_screenshot_service
 from config import Config
 from database import Database
 from core.ai_generator import AICommentGenerator
@@ -41,6 +42,7 @@ class ThreadsPostWorker:
         
         self.screenshot_dir = Path(__file__).parent / 'screenshots' / 'posts'
         self.screenshot_dir.mkdir(parents=True, exist_ok=True)
+        self.screenshots = get_screenshot_service(self.screenshot_dir)
         
         self.profile_name = self._get_profile_name()
         
@@ -58,16 +60,11 @@ class ThreadsPostWorker:
             return self.profile_id[:8]
         except: return self.profile_id[:8]
 
-    def take_screenshot(self, driver, name):
-        try:
-            ts = datetime.now().strftime('%H%M%S')
-            filename = f'{ts}_{name}.png'
-            path = self.screenshot_dir / filename
-            driver.save_screenshot(str(path))
-            return str(path)
-        except Exception as e:
-            print(f"[ERROR] Screenshot failed: {e}")
-            return None
+    def take_screenshot(self, driver, name, force=False):
+        path = self.screenshots.capture(driver, self.profile_id, name, force=force)
+        if not path:
+            print(f"[ERROR] Screenshot failed: {name}")
+        return path
 
     def start(self):
         print(f"\n{'='*80}")
@@ -156,25 +153,21 @@ class ThreadsPostWorker:
             else:
                 print(f"[WARN] Specific photo not found: {self.specific_photo}, selecting random...")
         
-        # Otherwise, select random unused photo
-        allowed = set(self.settings['allowed_extensions'])
-        all_photos = [
-            f for f in folder.iterdir() 
-            if f.is_file() and f.suffix.lower() in allowed
-        ]
+        # Otherwise, select random unused photo from the media catalog
+        allowed = [ext.lower() for ext in self.settings['allowed_extensions']]
+        self.db.sync_media_catalog(folder)
         
-        if not all_photos:
-            print(f"[ERROR] No photos found in {folder}")
-            return None
-            
-        used_photos = self.db.get_used_photos(self.profile_id)
-        available = [f for f in all_photos if f.name not in used_photos]
+        photo = self.db.pick_unused_photo(self.profile_id, folder, allowed)
+        if photo and not (folder / photo).exists():
+            # Removed within the folder's mtime resolution; rescan and retry
+            self.db.sync_media_catalog(folder, force=True)
+            photo = self.db.pick_unused_photo(self.profile_id, folder, allowed)
         
-        if not available:
-            print("[WARN] All photos used! Stopping.")
+        if not photo:
+            print("[WARN] No unused photos found (folder empty or all used). Stopping.")
             return None
             
-        return str(random.choice(available))
+        return str(folder / photo)
 
     def _generate_caption(self, photo_path):
         """Generate AI caption with topic hint"""
@@ -321,7 +314,7 @@ class ThreadsPostWorker:
 
         except Exception as e:
             print(f"[ERROR] Post creation flow failed: {e}")
-            self.take_screenshot(driver, 'post_error')
+            self.take_screenshot(driver, 'post_error', force=True)
             return False
 
     def _human_type(self, element, text):
@@ -18,6 +18,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'
 
 from selenium.webdriver.common.by import By
 from shared.browser_automation.gologin_manager import GoLoginManager, GoLoginSession
+from shared.browser_automation.screenshots import get_screenshot_service
 from config import Config
 from database import Database
 from core.actions import ThreadsActions
@@ -40,6 +41,7 @@ class ThreadsWorker:
         # Create directories
         self.screenshot_dir = Path(__file__).parent / 'screenshots'
         self.screenshot_dir.mkdir(exist_ok=True)
+        self.screenshots = get_screenshot_service(self.screenshot_dir)
         self.log_dir = Path(__file__).parent / 'logs'
         self.log_dir.mkdir(exist_ok=True)
         
@@ -54,18 +56,14 @@ class ThreadsWorker:
         self.processed_users = set()
         self.followed_users = []  # Track who we followed
 
-    def take_screenshot(self, driver, name):
-        """Save screenshot for debugging and proof"""
-        try:
-            ts = datetime.now().strftime('%H%M%S')
-            filename = f'{ts}_{name}.png'
-            path = self.screenshot_dir / filename
-            driver.save_screenshot(str(path))
-            print(f"[SCREENSHOT] {path}")
-            return str(path)
-        except Exception as e:
-            print(f"[ERROR] Screenshot failed: {e}")
-            return None
+    def take_screenshot(self, driver, name, force=False):
+        """Save screenshot for debugging and proof (written in the background; unchanged frames are skipped unless forced)"""
+        # Routine frames may be skipped as unchanged: their path is printed once written
+        path = self.screenshots.capture(driver, self.profile_id, name, force=force,
+                                        on_saved=lambda saved: print(f"[SCREENSHOT] {saved}"))
+        if not path:
+            print(f"[ERROR] Screenshot failed: {name}")
+        return path
 
     def _extract_username_from_post(self, element):
         """Extract username from a post element by finding nearby links"""
@@ -311,7 +309,7 @@ class ThreadsWorker:
                                 print(f"[3/4] ✅ FOLLOWED @{username}!")
                                 
                                 # Screenshot (proof of follow)
-                                ss_path = self.take_screenshot(driver, f'follow_{self.stats["follows"]:02d}_{username}')
+                                ss_path = self.take_screenshot(driver, f'follow_{self.stats["follows"]:02d}_{username}', force=True)
                                 
                                 # Log to DB
                                 self.db.log_action(
@@ -347,7 +345,7 @@ class ThreadsWorker:
                         print(f"[3/4] ✅ LIKED @{username}!")
                         
                         # Screenshot
-                        ss_path = self.take_screenshot(driver, f'like_{self.stats["likes"]:02d}_{username}')
+                        ss_path = self.take_screenshot(driver, f'like_{self.stats["likes"]:02d}_{username}', force=True)
                         
                         # Log to DB
                         self.db.log_action(
@@ -21,6 +21,9 @@ def wipe_data():
     tables = [
         "sessions",
         "engagement_log",
+        "engagement_rollup",
+        "media_catalog",
+        "media_folders",
         "daily_limits",
         "scheduled_tasks",
         "scheduled_sessions"
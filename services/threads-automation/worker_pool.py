@@ -0,0 +1,356 @@
+"""
+Bounded worker pool for browser automation jobs.
+
+Every growth/comment/post run drives its own GoLogin (Orbita) browser, so
+the number that may run at once is capped by machine RAM and CPU. Jobs
+over the cap wait in a priority queue (FIFO within a priority), a profile
+never has more than one job queued or running, and the pool keeps
+queue-depth and wait-time metrics for the /api/workers endpoint.
+
+An optional admission check (the host resource governor) is asked before
+the next job takes a slot. While it says no, the job stays queued and is
+asked again every ADMISSION_RETRY_INTERVAL seconds, or as soon as a job
+finishes or a new one is submitted - slots are never held by jobs waiting
+for the host.
+"""
+
+import os
+import time
+import heapq
+import logging
+import threading
+import itertools
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first
+PRIORITY_MANUAL = 0
+PRIORITY_SCHEDULED = 10
+
+# Rough resident size of one Orbita browser plus its worker
+DEFAULT_BROWSER_MEMORY_MB = 1500
+CPUS_PER_BROWSER = 1
+DEFAULT_MAX_QUEUE = 100
+
+# Finished jobs kept for wait/run time statistics
+STATS_WINDOW = 200
+
+# Seconds between admission checks while the host has no room
+ADMISSION_RETRY_INTERVAL = 2.0
+
+
+class AdmissionError(Exception):
+    """Job was not admitted to the pool"""
+
+
+class ProfileBusyError(AdmissionError):
+    """The profile already has a queued or running job"""
+
+
+class QueueFullError(AdmissionError):
+    """Every slot is busy and the overflow queue is full"""
+
+
+def _available_memory_mb() -> Optional[int]:
+    """Available physical memory in MB, or None if it cannot be determined"""
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return int(psutil.virtual_memory().available // (1024 * 1024))
+    except ImportError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_max_workers(browser_memory_mb: int = DEFAULT_BROWSER_MEMORY_MB) -> int:
+    """How many browsers this machine can run at once (at least 1)"""
+    by_cpu = max(1, (os.cpu_count() or 1) // CPUS_PER_BROWSER)
+    memory_mb = _available_memory_mb()
+    by_memory = max(1, memory_mb // browser_memory_mb) if memory_mb else by_cpu
+    return min(by_cpu, by_memory)
+
+
+class Job:
+    """One unit of work submitted to the pool"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, profile_id: str, kind: str, fn: Callable, args: tuple, kwargs: dict, priority: int):
+        self.id = next(self._ids)
+        self.profile_id = profile_id
+        self.kind = kind
+        self.priority = priority
+        self.state = 'queued'  # queued, waiting_for_host, running, completed, failed, cancelled
+        self.error: Optional[str] = None
+        self.submitted_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+
+    @property
+    def wait_seconds(self) -> float:
+        end = self.started_at or datetime.now()
+        return (end - self.submitted_at).total_seconds()
+
+    @property
+    def run_seconds(self) -> Optional[float]:
+        if not self.started_at:
+            return None
+        return ((self.finished_at or datetime.now()) - self.started_at).total_seconds()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "profile_id": self.profile_id,
+            "kind": self.kind,
+            "priority": self.priority,
+            "state": self.state,
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "wait_seconds": round(self.wait_seconds, 1),
+            "run_seconds": round(self.run_seconds, 1) if self.run_seconds is not None else None,
+            "error": self.error,
+        }
+
+
+class WorkerPool:
+    """
+    Fixed set of worker threads pulling jobs from a priority queue.
+
+    Args:
+        max_workers: Jobs allowed to run at once (default: sized to RAM/CPU)
+        max_queue: Jobs allowed to wait; submissions beyond it are rejected
+        name: Thread name prefix
+        admission: Called with a job's profile ID before it takes a slot;
+                   while it returns False the job stays queued
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: int = DEFAULT_MAX_QUEUE,
+                 name: str = "worker", admission: Optional[Callable[[str], bool]] = None):
+        self.max_workers = max_workers or default_max_workers()
+        self.max_queue = max_queue
+        self.admission = admission
+
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._active: Dict[str, Job] = {}  # profile_id -> queued or running job
+        self._running: Dict[int, Job] = {}
+        self._finished: deque = deque(maxlen=STATS_WINDOW)
+        self._admitting = False  # a thread is running the admission check
+        self._admission_retry_at = 0.0
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.admission_deferred = 0
+
+        self._threads = [
+            threading.Thread(target=self._worker_loop, name=f"{name}-{n}", daemon=True)
+            for n in range(self.max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Worker pool started: {self.max_workers} concurrent, queue limit {self.max_queue}")
+
+    # ========================================
+    # SUBMISSION
+    # ========================================
+
+    def submit(self, profile_id: str, kind: str, fn: Callable, *args,
+               priority: int = PRIORITY_MANUAL, **kwargs) -> Job:
+        """
+        Queue fn(*args, **kwargs) to run for a profile.
+
+        Raises:
+            ProfileBusyError: Profile already has a queued or running job
+            QueueFullError: No free slot and the overflow queue is full
+        """
+        with self._cond:
+            if profile_id in self._active:
+                self.rejected += 1
+                raise ProfileBusyError(f"Worker already running or queued for profile {profile_id}")
+            free_slots = self.max_workers - len(self._running)
+            if len(self._heap) >= self.max_queue + max(0, free_slots):
+                self.rejected += 1
+                raise QueueFullError(f"Worker queue is full ({self.max_queue} waiting)")
+
+            job = Job(profile_id, kind, fn, args, kwargs, priority)
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self._active[profile_id] = job
+            self.submitted += 1
+            self._admission_retry_at = 0.0
+            self._cond.notify()
+
+        logger.info(f"Queued {kind} job {job.id} for {profile_id} (priority {priority})")
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job that has not started yet"""
+        with self._cond:
+            for i, (_, _, job) in enumerate(self._heap):
+                if job.id == job_id:
+                    self._heap.pop(i)
+                    heapq.heapify(self._heap)
+                    job.state = 'cancelled'
+                    self._active.pop(job.profile_id, None)
+                    return True
+        return False
+
+    # ========================================
+    # STATE & METRICS
+    # ========================================
+
+    def is_busy(self, profile_id: str) -> bool:
+        with self._cond:
+            return profile_id in self._active
+
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    @property
+    def queued_count(self) -> int:
+        return len(self._heap)
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        """
+        1-based position of a job waiting for a slot.
+
+        None if the job is running or is about to be picked up by an idle
+        worker thread.
+        """
+        with self._cond:
+            free_slots = self.max_workers - len(self._running)
+            if any(queued.state == 'waiting_for_host' for _, _, queued in self._heap):
+                free_slots = 0  # idle threads can't start anything until the host has room
+            for index, (_, _, queued) in enumerate(sorted(self._heap)):
+                if queued is job:
+                    position = index + 1 - free_slots
+                    return position if position > 0 else None
+        return None
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Running jobs followed by queued jobs in run order"""
+        with self._cond:
+            running = list(self._running.values())
+            queued = [job for _, _, job in sorted(self._heap)]
+        return [job.to_dict() for job in running + queued]
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            queued = [job for _, _, job in self._heap]
+            finished = list(self._finished)
+            running = len(self._running)
+
+        waits = sorted(job.wait_seconds for job in finished)
+        runs = [job.run_seconds for job in finished if job.run_seconds is not None]
+        queued_by_kind: Dict[str, int] = {}
+        for job in queued:
+            queued_by_kind[job.kind] = queued_by_kind.get(job.kind, 0) + 1
+
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": running,
+            "queued": len(queued),
+            "queued_by_kind": queued_by_kind,
+            "oldest_queued_wait_seconds": round(max((job.wait_seconds for job in queued), default=0.0), 1),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "admission_deferred": self.admission_deferred,
+            # Over the last STATS_WINDOW finished jobs
+            "wait_seconds_avg": round(sum(waits) / len(waits), 1) if waits else 0.0,
+            "wait_seconds_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 1) if waits else 0.0,
+            "wait_seconds_max": round(waits[-1], 1) if waits else 0.0,
+            "run_seconds_avg": round(sum(runs) / len(runs), 1) if runs else 0.0,
+        }
+
+    # ========================================
+    # WORKER THREADS
+    # ========================================
+
+    def _next_job(self) -> Job:
+        """Block until the head of the queue is admitted, then take it as running"""
+        while True:
+            with self._cond:
+                while True:
+                    retry_in = self._admission_retry_at - time.monotonic()
+                    if self._heap and not self._admitting and retry_in <= 0:
+                        break
+                    self._cond.wait(retry_in if self._heap and retry_in > 0 else None)
+                job = self._heap[0][2]
+                if self.admission is None:
+                    return self._start(job)
+                self._admitting = True
+
+            # Outside the lock: the check may close idle browsers to make room
+            try:
+                admitted = self.admission(job.profile_id)
+            except Exception as e:
+                logger.warning(f"Admission check for {job.profile_id} failed, starting anyway: {e}")
+                admitted = True
+
+            with self._cond:
+                self._admitting = False
+                self._cond.notify_all()
+                if not self._heap or self._heap[0][2] is not job:
+                    continue  # cancelled or overtaken meanwhile: check the new head
+                if admitted:
+                    return self._start(job)
+                if job.state == 'queued':
+                    job.state = 'waiting_for_host'
+                    self.admission_deferred += 1
+                    logger.info(f"{job.kind} job {job.id} for {job.profile_id} waiting for host capacity")
+                self._admission_retry_at = time.monotonic() + ADMISSION_RETRY_INTERVAL
+
+    def _start(self, job: Job) -> Job:
+        """Pop the head job and mark it running (lock held)"""
+        heapq.heappop(self._heap)
+        job.state = 'running'
+        job.started_at = datetime.now()
+        self._running[job.id] = job
+        return job
+
+    def _worker_loop(self):
+        while True:
+            job = self._next_job()
+
+            logger.info(f"Starting {job.kind} job {job.id} for {job.profile_id} after {job.wait_seconds:.1f}s in queue")
+            try:
+                job._fn(*job._args, **job._kwargs)
+                job.state = 'completed'
+            except Exception as e:
+                job.state = 'failed'
+                job.error = str(e)
+                logger.error(f"{job.kind} job {job.id} for {job.profile_id} failed: {e}")
+            finally:
+                job.finished_at = datetime.now()
+                with self._cond:
+                    self._running.pop(job.id, None)
+                    self._active.pop(job.profile_id, None)
+                    self._finished.append(job)
+                    # Its browser is gone: the host may have room now
+                    self._admission_retry_at = 0.0
+                    self._cond.notify_all()
+                    if job.state == 'completed':
+                        self.completed += 1
+                    else:
+                        self.failed += 1
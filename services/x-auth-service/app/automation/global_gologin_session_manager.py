@@ -3,16 +3,26 @@ Global GoLogin Session Manager
 
 Maintains GoLogin sessions across API requests using a singleton pattern.
 This solves the issue where each API request creates a new manager instance.
+
+Browsers are launched and attached through the shared GoLoginManager and
+tracked in the shared session registry (shared/browser_automation), so
+they are visible to every service and use the shared port allocator.
 """
 
+import sys
 import threading
 import time
 import logging
+from pathlib import Path
 from typing import Dict, Any, Optional, List
 from selenium import webdriver
-from gologin import GoLogin
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+
+# Add project root to path to access shared modules
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from shared.browser_automation.gologin_manager import GoLoginManager
+from shared.browser_automation.session_registry import get_registry
 
 # Import browser startup handler
 try:
@@ -41,13 +51,18 @@ class GlobalGoLoginSessionManager:
         if self._initialized:
             return
             
-        self.local_sessions = {}  # profile_id -> session data
+        self.registry = get_registry()
         self.logger = logging.getLogger(__name__)
         self._session_lock = threading.Lock()
         self._initialized = True
         
         self.logger.debug("Global GoLogin Session Manager initialized")
     
+    @property
+    def local_sessions(self) -> Dict[str, Dict[str, Any]]:
+        """profile_id -> session data for browsers running in this process"""
+        return self.registry.local_sessions()
+    
     @classmethod
     def get_instance(cls):
         """Get the singleton instance of the GlobalGoLoginSessionManager."""
@@ -79,10 +94,8 @@ class GlobalGoLoginSessionManager:
                             'start_time': existing_session.get('start_time')
                         }
                 
-                # Initialize GoLogin for local execution
+                # GoLogin options for local execution
                 gl_config = {
-                    "token": gologin_token,
-                    "profile_id": profile_id,
                     "timeout": 30,  # Set timeout for HTTP requests
                     "retry_count": 2  # Limit retries
                 }
@@ -140,43 +153,20 @@ class GlobalGoLoginSessionManager:
                     # Non-headless mode still gets language forcing and basic automation params
                     gl_config["extra_params"] = base_params
                 
-                gl = GoLogin(gl_config)
-                
-                # Start browser and get WebSocket URL
-                try:
-                    debugger_address = gl.start()
-                except Exception as gologin_error:
-                    # Handle GoLogin library errors that might not be proper exceptions
-                    self.logger.error(f"GoLogin start error: {gologin_error}")
-                    self.logger.error(f"GoLogin error type: {type(gologin_error)}")
-                    # Convert to proper exception if needed
-                    if not isinstance(gologin_error, BaseException):
-                        raise Exception(f"GoLogin error: {gologin_error}")
-                    else:
-                        raise gologin_error
-                
-                if not debugger_address:
+                # Launch, wait for DevTools and attach Selenium (shared lifecycle)
+                manager = GoLoginManager(gologin_token=gologin_token, local_mode=False)
+                session_data = manager.start_session(profile_id, headless=headless, extra_config=gl_config)
+                if not session_data:
                     return {
                         'status': 'failed',
-                        'error': 'Failed to get debugger address from GoLogin',
+                        'error': 'Failed to start GoLogin browser or attach Selenium',
                         'profile_id': profile_id
                     }
                 
-                # Get Chromium version for WebDriver
-                chromium_version = gl.get_chromium_version()
-                
-                # Install and configure WebDriver
-                service = Service(ChromeDriverManager(driver_version=chromium_version).install())
-                
-                chrome_options = webdriver.ChromeOptions()
-                chrome_options.add_experimental_option("debuggerAddress", debugger_address)
-                
-                # Minimal configuration - most settings are handled by GoLogin extra_params
-                # Note: Language and automation settings are passed to GoLogin's browser startup
-                # When connecting to existing browser via debuggerAddress, redundant args are avoided
-                
-                # Create WebDriver instance
-                driver = webdriver.Chrome(service=service, options=chrome_options)
+                gl = session_data['gl']
+                driver = session_data['driver']
+                debugger_address = session_data['debugger_address']
+                chromium_version = (session_data.get('browser_version') or '').split('/')[-1]  # "Chrome/131.0..."
                 
                 # Apply advanced stealth via CDP (Chrome DevTools Protocol) - executes before any page loads
                 if headless:
@@ -392,21 +382,17 @@ class GlobalGoLoginSessionManager:
                     startup_handler.schedule_post_launch_tasks(profile_id, driver, delay_seconds=20)
                     self.logger.info(f"Scheduled post-launch tasks for profile {profile_id}")
                 
-                # Store session data globally
+                # Store session data globally (re-published with the execution mode)
                 execution_mode = 'headless' if headless else 'local'
-                session_data = {
+                session_data.update({
+                    'manager': manager,
                     'gologin_instance': gl,
-                    'driver': driver,
-                    'debugger_address': debugger_address,
                     'chromium_version': chromium_version,
-                    'start_time': time.time(),
                     'execution_mode': execution_mode,
-                    'headless': headless,
                     'status': 'active',
                     'gologin_token': gologin_token
-                }
-                
-                self.local_sessions[profile_id] = session_data
+                })
+                self.registry.register(profile_id, session_data, backend=manager.backend.name)
                 
                 self.logger.debug(f"Global {execution_mode} session started successfully for profile {profile_id}")
                 
@@ -457,14 +443,14 @@ class GlobalGoLoginSessionManager:
                 if startup_handler:
                     startup_handler.cancel_tasks_for_profile(profile_id)
                 
-                if profile_id not in self.local_sessions:
+                if profile_id not in self.registry:
                     return {
                         'status': 'warning',
                         'profile_id': profile_id,
                         'message': 'No active local session found'
                     }
                 
-                session_data = self.local_sessions[profile_id]
+                session_data = self.registry.get(profile_id)
                 start_time = session_data.get('start_time', time.time())
                 session_duration = time.time() - start_time
                 
@@ -481,16 +467,16 @@ class GlobalGoLoginSessionManager:
                         # Then quit the driver
                         driver.quit()
                         driver_closed = True
+                        session_data['driver'] = None
                         self.logger.debug(f"WebDriver closed successfully for {profile_id}")
                 except Exception as e:
                     self.logger.warning(f"Error closing WebDriver for {profile_id}: {e}")
                 
-                # Stop GoLogin instance
+                # Stop GoLogin, release its port and unregister it
                 try:
                     gl = session_data.get('gologin_instance')
+                    session_data['manager'].cleanup_session(session_data)
                     if gl:
-                        gl.stop()
-                        
                         # Optionally delete profile if cleanup is enabled
                         if cleanup:
                             gl.delete(profile_id)
@@ -513,8 +499,8 @@ class GlobalGoLoginSessionManager:
                     except Exception as e:
                         self.logger.warning(f"Error during process cleanup for {profile_id}: {e}")
                 
-                # Remove from active sessions
-                del self.local_sessions[profile_id]
+                # Remove from active sessions (normally done by cleanup_session)
+                self.registry.unregister(profile_id)
                 
                 self.logger.debug(f"Global local session stopped for profile {profile_id}")
                 
@@ -580,8 +566,8 @@ class GlobalGoLoginSessionManager:
                 profile_id: {
                     'start_time': session['start_time'],
                     'duration': time.time() - session['start_time'],
-                    'execution_mode': session['execution_mode'],
-                    'status': session['status'],
+                    'execution_mode': session.get('execution_mode', session.get('backend')),
+                    'status': session.get('status', 'active'),
                     'debugger_address': session.get('debugger_address'),
                     'chromium_version': session.get('chromium_version')
                 }
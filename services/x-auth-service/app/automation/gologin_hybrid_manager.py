@@ -13,13 +13,10 @@ import time
 import logging
 from typing import Dict, List, Optional, Any, Tuple
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
 # Add the current directory to path to import local modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from gologin import GoLogin
 from gologin_manager_enhanced import EnhancedGoLoginManager
 from fix_db_connections import DBConnection
 from twitter_automation_patterns import (
@@ -27,6 +24,7 @@ from twitter_automation_patterns import (
     automation_manager
 )
 from global_gologin_session_manager import global_session_manager
+from shared.browser_automation.screenshots import get_screenshot_service
 
 class GoLoginHybridManager(EnhancedGoLoginManager):
     """
@@ -39,7 +37,6 @@ class GoLoginHybridManager(EnhancedGoLoginManager):
     def __init__(self, db_path='twitter_accounts.db', default_mode='cloud'):
         super().__init__(db_path)
         self.default_mode = default_mode  # 'cloud' or 'local'
-        self.local_sessions = {}  # profile_id -> local session data
         
         # Initialize database tables for local session tracking
         self._init_local_session_tables()
@@ -80,8 +77,8 @@ class GoLoginHybridManager(EnhancedGoLoginManager):
     
     def _check_local_session_exists(self, profile_id: str) -> bool:
         """Check if a local session exists for the profile (in memory or database)."""
-        # First check memory
-        if profile_id in self.local_sessions:
+        # First check the shared session registry (this process)
+        if profile_id in self.registry:
             return True
         
         # Then check database
@@ -261,20 +258,26 @@ class GoLoginHybridManager(EnhancedGoLoginManager):
         
         try:
             driver = global_session_manager.get_driver(profile_id)
-            screenshot_base64 = driver.get_screenshot_as_base64()
             
-            # Store screenshot in database (optional)
-            with DBConnection(self.db_path) as (conn, c):
-                c.execute('''
-                    INSERT INTO session_screenshots 
-                    (profile_id, screenshot_data, timestamp)
-                    VALUES (?, ?, CURRENT_TIMESTAMP)
-                ''', (profile_id, screenshot_base64))
+            def record(path):
+                # Store the file's path in the database (the image stays on disk)
+                with DBConnection(self.db_path) as (conn, c):
+                    c.execute('''
+                        INSERT INTO session_screenshots 
+                        (profile_id, screenshot_url, timestamp)
+                        VALUES (?, ?, CURRENT_TIMESTAMP)
+                    ''', (profile_id, path))
+            
+            # Compressed and written in the background
+            screenshot_path = get_screenshot_service('logs/screenshots').capture(
+                driver, profile_id, 'manual', force=True, on_saved=record)
+            if not screenshot_path:
+                raise RuntimeError("Screenshot capture failed")
             
             return {
                 'status': 'success',
                 'profile_id': profile_id,
-                'screenshot_data': screenshot_base64[:100] + '...',  # Truncated for response
+                'screenshot_path': screenshot_path,
                 'message': 'Screenshot captured successfully'
             }
             
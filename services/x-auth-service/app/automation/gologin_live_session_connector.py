@@ -11,12 +11,13 @@ https://cloudbrowser.gologin.com/connect?token=${token}&profile=${profileId}
 
 import os
 import sys
+import time
 import asyncio
 import json
 import base64
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Union
 import aiohttp
 import websockets
 from concurrent.futures import ThreadPoolExecutor
@@ -33,6 +34,11 @@ except ImportError:
 from gologin_session_monitor import GoLoginSessionMonitor
 from fix_db_connections import DBConnection
 
+# Add project root to path to access shared modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+from shared.browser_automation.session_registry import get_registry
+from shared.tick_scheduler import get_scheduler
+
 class GoLoginLiveConnector:
     """Direct WebSocket connector for GoLogin cloud browsers."""
     
@@ -48,9 +54,13 @@ class GoLoginLiveConnector:
         # WebSocket connection settings
         self.cloud_browser_base = 'https://cloudbrowser.gologin.com/connect'
         
-        # Active connections
+        # Active connections (Playwright handles); the cloud browsers behind
+        # them are published in the shared session registry
         self.active_connections = {}  # profile_id -> connection_data
+        self.registry = get_registry()
         self.session_monitor = GoLoginSessionMonitor(db_path)
+        self.scheduler = get_scheduler()
+        self.screenshots = self.session_monitor.screenshots
         
         # Executor for blocking operations
         self.executor = ThreadPoolExecutor(max_workers=4)
@@ -196,20 +206,20 @@ class GoLoginLiveConnector:
                 'page': page,
                 'profile_id': profile_id,
                 'connected_at': datetime.now(),
-                'monitoring_options': monitoring_options,
-                'monitoring_task': None
+                'monitoring_options': monitoring_options
             }
             
             # Store connection
             connection_id = profile_id or f"new_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             self.active_connections[connection_id] = connection_data
+            if profile_id:
+                connection_data['registry_session'] = {'ws_endpoint': ws_url, 'status': 'active',
+                                                       'execution_mode': 'cloud'}
+                self.registry.register(profile_id, connection_data['registry_session'], backend='cloud_browser')
             
             # Start monitoring if enabled
             if monitoring_options.get('live_screenshots') or monitoring_options.get('performance_monitoring'):
-                monitoring_task = asyncio.create_task(
-                    self._monitor_browser_session(connection_id, connection_data)
-                )
-                connection_data['monitoring_task'] = monitoring_task
+                self._schedule_live_monitoring(connection_id, connection_data)
             
             self.logger.info(f"Successfully connected to browser with Playwright (Profile: {profile_id})")
             
@@ -343,56 +353,54 @@ class GoLoginLiveConnector:
                 'profile_id': profile_id
             }
     
-    async def _monitor_browser_session(self, connection_id: str, connection_data: Dict[str, Any]):
-        """Monitor browser session with live screenshots and performance metrics."""
-        try:
-            page = connection_data.get('page')
-            profile_id = connection_data.get('profile_id', connection_id)
-            options = connection_data['monitoring_options']
-            
-            screenshot_interval = options.get('screenshot_interval', 5)
-            
-            self.logger.info(f"Starting live monitoring for connection {connection_id}")
-            
-            while connection_id in self.active_connections:
-                try:
-                    # Take screenshot if enabled
-                    if options.get('live_screenshots') and page:
-                        screenshot_data = await self._take_live_screenshot(page, profile_id)
-                        if screenshot_data:
-                            # Store screenshot in database
-                            await self._store_screenshot_async(profile_id, screenshot_data)
-                    
-                    # Collect performance metrics if enabled
-                    if options.get('performance_monitoring') and page:
-                        metrics = await self._collect_live_metrics(page, profile_id)
-                        if metrics:
-                            await self._store_metrics_async(profile_id, metrics)
-                    
-                    # Wait for next interval
-                    await asyncio.sleep(screenshot_interval)
-                    
-                except Exception as e:
-                    self.logger.error(f"Error in monitoring loop for {connection_id}: {e}")
-                    await asyncio.sleep(screenshot_interval * 2)  # Wait longer on error
-            
-            self.logger.info(f"Monitoring stopped for connection {connection_id}")
-            
-        except Exception as e:
-            self.logger.error(f"Fatal error in browser monitoring for {connection_id}: {e}")
+    def _schedule_live_monitoring(self, connection_id: str, connection_data: Dict[str, Any]):
+        """Register live screenshot/metrics ticks on the shared scheduler (run on this event loop)."""
+        options = connection_data['monitoring_options']
+        interval = options.get('screenshot_interval', 5)
+        
+        if options.get('live_screenshots'):
+            async def screenshot_tick():
+                await self._live_screenshot_tick(connection_id, connection_data)
+            self.scheduler.schedule(connection_id, 'live_screenshot', screenshot_tick, interval=interval)
+        
+        if options.get('performance_monitoring'):
+            async def metrics_tick():
+                await self._live_metrics_tick(connection_id, connection_data)
+            self.scheduler.schedule(connection_id, 'live_metrics', metrics_tick,
+                                    interval=options.get('metrics_interval', interval))
+        
+        self.logger.info(f"Scheduled live monitoring for connection {connection_id}")
+    
+    async def _live_screenshot_tick(self, connection_id: str, connection_data: Dict[str, Any]):
+        """One live screenshot; raising lets the scheduler back off a failing page."""
+        page = connection_data.get('page')
+        if connection_id not in self.active_connections or not page:
+            return
+        profile_id = connection_data.get('profile_id') or connection_id
+        screenshot_data = await self._take_live_screenshot(page, profile_id)
+        if not screenshot_data:
+            raise RuntimeError(f"No screenshot from {connection_id}")
+        self._store_screenshot(profile_id, screenshot_data)
     
-    async def _take_live_screenshot(self, page, profile_id: str) -> Optional[str]:
-        """Take a live screenshot from the browser page."""
+    async def _live_metrics_tick(self, connection_id: str, connection_data: Dict[str, Any]):
+        """One live metrics sample."""
+        page = connection_data.get('page')
+        if connection_id not in self.active_connections or not page:
+            return
+        profile_id = connection_data.get('profile_id') or connection_id
+        metrics = await self._collect_live_metrics(page, profile_id)
+        if not metrics:
+            raise RuntimeError(f"No metrics from {connection_id}")
+        await self._store_metrics_async(profile_id, metrics)
+    
+    async def _take_live_screenshot(self, page, profile_id: str) -> Optional[bytes]:
+        """Take a live screenshot from the browser page (JPEG, compressed by the browser)."""
         try:
-            # Take screenshot
-            screenshot_bytes = await page.screenshot(type='png', full_page=False)
-            
-            # Convert to base64
-            screenshot_base64 = base64.b64encode(screenshot_bytes).decode('utf-8')
+            screenshot_bytes = await page.screenshot(type='jpeg', quality=self.screenshots.quality, full_page=False)
             
             self.logger.debug(f"Live screenshot captured for profile {profile_id}")
             
-            return screenshot_base64
+            return screenshot_bytes
             
         except Exception as e:
             self.logger.error(f"Error taking live screenshot: {e}")
@@ -426,50 +434,40 @@ class GoLoginLiveConnector:
             self.logger.error(f"Error collecting live metrics: {e}")
             return None
     
-    async def _store_screenshot_async(self, profile_id: str, screenshot_data: str):
-        """Store screenshot data asynchronously."""
-        def store_screenshot():
-            try:
-                with DBConnection(self.db_path) as (conn, c):
-                    c.execute('''
-                        INSERT INTO session_screenshots 
-                        (profile_id, screenshot_data, timestamp)
-                        VALUES (?, ?, CURRENT_TIMESTAMP)
-                    ''', (profile_id, screenshot_data))
-            except Exception as e:
-                self.logger.error(f"Error storing screenshot: {e}")
+    def _store_screenshot(self, profile_id: str, screenshot_data: bytes, force: bool = False) -> Union[str, bool, None]:
+        """
+        Hand a screenshot to the background screenshot service; its path is recorded once written.
         
-        # Run in executor to avoid blocking
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(self.executor, store_screenshot)
+        Returns the path only for a forced frame (routine ones may be skipped as unchanged).
+        """
+        return self.screenshots.submit(
+            screenshot_data, profile_id, 'live', image_format='jpeg', force=force,
+            on_saved=lambda path: self.session_monitor.record_screenshot(profile_id, path)
+        )
     
     async def _store_metrics_async(self, profile_id: str, metrics: Dict[str, Any]):
-        """Store performance metrics asynchronously."""
+        """Record performance metrics in the monitor's metrics store."""
         def store_metrics():
             try:
-                with DBConnection(self.db_path) as (conn, c):
-                    # Store multiple metrics
-                    metric_entries = [
-                        ('memory_used_mb', metrics.get('memory_used', 0) / 1024 / 1024, 'MB'),
-                        ('memory_total_mb', metrics.get('memory_total', 0) / 1024 / 1024, 'MB'),
-                        ('page_load_time_ms', metrics.get('load_time', 0), 'ms'),
-                        ('dom_ready_time_ms', metrics.get('dom_ready', 0), 'ms')
-                    ]
-                    
-                    for metric_name, metric_value, metric_unit in metric_entries:
-                        c.execute('''
-                            INSERT INTO session_metrics 
-                            (profile_id, metric_name, metric_value, metric_unit, timestamp)
-                            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                        ''', (profile_id, metric_name, metric_value, metric_unit))
-                    
-                    # Store page info as activity
-                    if metrics.get('page_url'):
-                        self.session_monitor._log_activity(profile_id, 'page_navigation', {
-                            'url': metrics.get('page_url'),
-                            'title': metrics.get('page_title', ''),
-                            'load_time_ms': metrics.get('load_time', 0)
-                        })
+                timestamp = time.time()
+                metric_entries = [
+                    ('js_heap_used_mb', metrics.get('memory_used', 0) / 1024 / 1024, 'MB'),
+                    ('js_heap_total_mb', metrics.get('memory_total', 0) / 1024 / 1024, 'MB'),
+                    ('page_load_time_ms', metrics.get('load_time', 0), 'ms'),
+                    ('dom_ready_time_ms', metrics.get('dom_ready', 0), 'ms')
+                ]
+                
+                for metric_name, metric_value, metric_unit in metric_entries:
+                    self.session_monitor.metrics.record(profile_id, metric_name, metric_value, metric_unit,
+                                                        page_url=metrics.get('page_url'), timestamp=timestamp)
+                
+                # Store page info as activity
+                if metrics.get('page_url'):
+                    self.session_monitor._log_activity(profile_id, 'page_navigation', {
+                        'url': metrics.get('page_url'),
+                        'title': metrics.get('page_title', ''),
+                        'load_time_ms': metrics.get('load_time', 0)
+                    })
                         
             except Exception as e:
                 self.logger.error(f"Error storing metrics: {e}")
@@ -544,16 +542,19 @@ class GoLoginLiveConnector:
                 }
             
             # Take screenshot
-            screenshot_base64 = await self._take_live_screenshot(page, connection_data.get('profile_id', connection_id))
+            profile_id = connection_data.get('profile_id', connection_id)
+            screenshot_data = await self._take_live_screenshot(page, profile_id)
             
-            if screenshot_base64:
-                # Store screenshot
-                await self._store_screenshot_async(connection_data.get('profile_id', connection_id), screenshot_base64)
+            if screenshot_data:
+                # Store screenshot (manual captures are kept even if unchanged)
+                loop = asyncio.get_event_loop()
+                screenshot_path = await loop.run_in_executor(
+                    self.executor, lambda: self._store_screenshot(profile_id, screenshot_data, force=True))
                 
                 return {
                     'status': 'success',
                     'connection_id': connection_id,
-                    'screenshot_data': screenshot_base64[:100] + '...',  # Truncated for response
+                    'screenshot_path': screenshot_path,
                     'message': 'Screenshot captured successfully'
                 }
             else:
@@ -628,10 +629,8 @@ class GoLoginLiveConnector:
             
             connection_data = self.active_connections[connection_id]
             
-            # Stop monitoring task if running
-            monitoring_task = connection_data.get('monitoring_task')
-            if monitoring_task and not monitoring_task.done():
-                monitoring_task.cancel()
+            # Unschedule its monitoring ticks
+            self.scheduler.cancel(connection_id)
             
             # Close browser connection
             browser = connection_data.get('browser')
@@ -648,8 +647,10 @@ class GoLoginLiveConnector:
             if profile_id and connection_data.get('connection_type') == 'playwright':
                 await self._stop_cloud_session(profile_id)
             
-            # Remove from active connections
+            # Remove from active connections (and the registry, if we published it)
             del self.active_connections[connection_id]
+            if profile_id and self.registry.get(profile_id) is connection_data.get('registry_session'):
+                self.registry.unregister(profile_id)
             
             # Log disconnection
             profile_id = connection_data.get('profile_id', connection_id)
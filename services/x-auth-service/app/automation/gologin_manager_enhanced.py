@@ -24,7 +24,6 @@ import time
 import random
 import json
 import os
-import threading
 import requests
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
@@ -42,7 +41,16 @@ from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
+import sys
+from pathlib import Path
+# Add project root to path to access shared modules
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
 from fix_db_connections import DBConnection
+from shared.browser_automation.backends import CloudBrowserBackend
+from shared.browser_automation.ports import get_port_allocator
+from shared.browser_automation.session_registry import get_registry
 
 # Configure logging
 logging.basicConfig(
@@ -56,35 +64,6 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-# Port manager for local sessions
-class PortManager:
-    def __init__(self, start_port: int = 3500, end_port: int = 3600):
-        self.start_port = start_port
-        self.end_port = end_port
-        self.used_ports = set()
-        self.lock = threading.Lock()
-        
-    def get_available_port(self) -> Optional[int]:
-        """Get an available port from the range."""
-        with self.lock:
-            for port in range(self.start_port, self.end_port + 1):
-                if port not in self.used_ports:
-                    import socket
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    try:
-                        sock.bind(('localhost', port))
-                        sock.close()
-                        self.used_ports.add(port)
-                        return port
-                    except OSError:
-                        continue
-            return None
-    
-    def release_port(self, port: int):
-        """Release a port back to the available pool."""
-        with self.lock:
-            self.used_ports.discard(port)
-
 class EnhancedGoLoginManager:
     """Enhanced GoLogin manager with cloud support, port management, and profile synchronization."""
     
@@ -107,24 +86,22 @@ class EnhancedGoLoginManager:
         self.cloud_timeout = int(os.getenv('GOLOGIN_CLOUD_TIMEOUT', '300'))
         self.max_concurrent = int(os.getenv('GOLOGIN_MAX_CONCURRENT_PROFILES', '5'))
         
-        # Port management
-        port_start = int(os.getenv('GOLOGIN_PORT_RANGE_START', '3500'))
-        port_end = int(os.getenv('GOLOGIN_PORT_RANGE_END', '3600'))
-        self.port_manager = PortManager(port_start, port_end)
+        # Port management (shared allocator, GOLOGIN_PORT_RANGE_START/END)
+        self.port_manager = get_port_allocator()
         
         # Profile synchronization
         self.sync_profiles = os.getenv('GOLOGIN_SYNC_PROFILES', 'true').lower() == 'true'
         self.auto_update_profiles = os.getenv('GOLOGIN_AUTO_UPDATE_PROFILES', 'true').lower() == 'true'
         
-        # Active sessions tracking
-        self.active_sessions = {}
-        self.sessions_lock = threading.Lock()
+        # Active sessions are tracked in the shared session registry
+        self.registry = get_registry()
         
         # GoLogin API base URL (from official SDK)
         self.api_base = 'https://api.gologin.com'
         
         # Enhanced HTTP session with connection pooling and retry logic
         self.session = self._create_http_session()
+        self.cloud_backend = CloudBrowserBackend(self.gologin_token, http=self.session, api_base=self.api_base)
         
         # Initialize database tables
         self._init_database_tables()
@@ -133,6 +110,11 @@ class EnhancedGoLoginManager:
         if self.sync_profiles and self.api_enabled:
             self._sync_profiles_from_cloud()
     
+    @property
+    def active_sessions(self) -> Dict[str, Dict[str, Any]]:
+        """profile_id -> session info for cloud sessions started by this process"""
+        return self.registry.local_sessions(backend=self.cloud_backend.name)
+    
     def _init_database_tables(self):
         """Initialize enhanced GoLogin-related database tables."""
         try:
@@ -445,7 +427,7 @@ class EnhancedGoLoginManager:
             # Get assigned port for local execution
             assigned_port = None
             if execution_mode == 'local':
-                assigned_port = self.port_manager.get_available_port()
+                assigned_port = self.port_manager.get_available_port(profile_id)
                 if not assigned_port:
                     self.logger.warning("No available ports for local execution")
             
@@ -535,16 +517,15 @@ class EnhancedGoLoginManager:
     def start_cloud_session(self, profile_id: str) -> Dict[str, Any]:
         """Start a profile session in GoLogin cloud."""
         try:
-            url = f'{self.api_base}/browser/{profile_id}/web'
-            # Use enhanced session with connection pooling
-            response = self.session.post(url, timeout=30)
+            # Uses the enhanced session with connection pooling
+            response, _ = self.cloud_backend.start(profile_id)
             
             if response.status_code == 202:
-                # Store in memory
-                self.active_sessions[profile_id] = {
+                # Store in the shared registry
+                self.registry.register(profile_id, {
                     'start_time': time.time(),
                     'status': 'running'
-                }
+                }, backend=self.cloud_backend.name)
                 
                 # Store in database for persistence
                 with DBConnection(self.db_path) as (conn, c):
@@ -597,13 +578,7 @@ class EnhancedGoLoginManager:
                     'message': 'No active session found to stop'
                 }
             
-            headers = {
-                'Authorization': f'Bearer {self.gologin_token}',
-                'Content-Type': 'application/json'
-            }
-            
-            url = f'{self.api_base}/browser/{profile_id}/web'
-            response = requests.delete(url, headers=headers, timeout=30)
+            response = self.cloud_backend.stop(profile_id)
             
             # GoLogin might return 404 if session already stopped
             if response.status_code in [200, 204, 404]:
@@ -611,9 +586,9 @@ class EnhancedGoLoginManager:
                 
                 # Get session duration from database if not in memory
                 start_time = None
-                if profile_id in self.active_sessions:
-                    start_time = self.active_sessions[profile_id].get('start_time', time.time())
-                    del self.active_sessions[profile_id]
+                session_info = self.registry.unregister(profile_id)
+                if session_info:
+                    start_time = session_info.get('start_time', time.time())
                 else:
                     # Check database for session start time
                     with DBConnection(self.db_path) as (conn, c):
@@ -746,7 +721,7 @@ class EnhancedGoLoginManager:
                 'execution_mode': self.execution_mode,
                 'use_cloud': self.use_cloud,
                 'max_concurrent': self.max_concurrent,
-                'available_ports': len(range(self.port_manager.start_port, self.port_manager.end_port + 1)) - len(self.port_manager.used_ports),
+                'available_ports': self.port_manager.available_count,
                 'active_sessions': len(self.active_sessions),
                 'browser_version': data.get('currentBrowserV', 'Unknown')
             }
@@ -33,6 +33,42 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from shared.db_connections import DBConnection
+from shared.write_behind import get_writer
+from shared.metric_store import get_store
+from shared.tick_scheduler import get_scheduler
+from shared.browser_automation.cdp_metrics import CDPMetricsCollector
+from shared.browser_automation.session_registry import get_registry
+from shared.browser_automation.screenshots import get_screenshot_service
+
+# Seconds between CDP metric samples of a monitored profile (overridable per monitor)
+DEFAULT_METRICS_INTERVAL = float(os.getenv('GOLOGIN_METRICS_INTERVAL', '15'))
+
+# Recent metric samples kept in memory per profile; older data comes from the 1m/1h rollups
+METRICS_RING_SIZE = int(os.getenv('GOLOGIN_METRICS_RING_SIZE', '720'))
+
+# Days raw activity rows are kept; per-type counts live on in the activity rollups
+ACTIVITY_RETENTION_DAYS = float(os.getenv('GOLOGIN_ACTIVITY_RETENTION_DAYS', '2'))
+
+# Monitoring ticks are held back while this many writes are waiting for the database
+WRITER_BACKLOG_LIMIT = int(os.getenv('GOLOGIN_MONITOR_WRITER_BACKLOG', '2000'))
+
+# Monitoring screenshots are files (compressed, de-duplicated, per-profile quota); the table keeps their paths
+SCREENSHOT_DIR = os.getenv('GOLOGIN_SCREENSHOT_DIR', 'logs/screenshots')
+
+INSERT_SCREENSHOT_SQL = '''
+    INSERT INTO session_screenshots (profile_id, screenshot_url, timestamp)
+    VALUES (?, ?, ?)
+'''
+
+INSERT_ACTIVITY_SQL = '''
+    INSERT INTO session_activity_logs (profile_id, activity_type, activity_data, timestamp)
+    VALUES (?, ?, ?, ?)
+'''
+
+
+def _sqlite_time(epoch: float) -> str:
+    """Epoch seconds in SQLite CURRENT_TIMESTAMP format (UTC)"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(epoch))
 
 class GoLoginSessionMonitor:
     """Enhanced monitoring system for GoLogin cloud sessions."""
@@ -48,13 +84,25 @@ class GoLoginSessionMonitor:
         
         self.api_base = 'https://api.gologin.com'
         
-        # Session monitoring state
+        # Session monitoring state; every profile's screenshot/metrics ticks
+        # run on one shared scheduler instead of a thread per profile
         self.active_monitors = {}  # profile_id -> monitor_data
         self.monitoring_lock = threading.Lock()
         
         # Initialize database tables for monitoring
         self._init_monitoring_tables()
         
+        # Real browser metrics over CDP. Metrics and activity keep a ring buffer of
+        # recent samples plus 1m/1h rollup tables, written in batches
+        self.metrics_collector = CDPMetricsCollector()
+        self.writer = get_writer(self.db_path)
+        self.metrics = get_store(self.db_path, 'session_metrics', ring_size=METRICS_RING_SIZE)
+        self.activity = get_store(self.db_path, 'session_activity')
+        self._activity_pruned = 0.0
+        self.registry = get_registry()
+        self.screenshots = get_screenshot_service(SCREENSHOT_DIR)
+        self.scheduler = get_scheduler(pressure=lambda: self.writer.pending > WRITER_BACKLOG_LIMIT)
+        
         self.logger.debug("GoLogin Session Monitor initialized")
     
     def _init_monitoring_tables(self):
@@ -87,7 +135,7 @@ class GoLoginSessionMonitor:
                     )
                 ''')
                 
-                # Session performance metrics
+                # Raw performance samples (legacy; metrics are now kept as rollups)
                 c.execute('''
                     CREATE TABLE IF NOT EXISTS session_metrics (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -96,6 +144,7 @@ class GoLoginSessionMonitor:
                         metric_name TEXT NOT NULL,
                         metric_value REAL,
                         metric_unit TEXT,
+                        page_url TEXT,
                         timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         FOREIGN KEY (profile_id) REFERENCES gologin_profiles(profile_id)
                     )
@@ -188,6 +237,7 @@ class GoLoginSessionMonitor:
             if not monitoring_options:
                 monitoring_options = {
                     'screenshot_interval': 30,  # seconds
+                    'metrics_interval': DEFAULT_METRICS_INTERVAL,  # seconds
                     'activity_logging': True,
                     'performance_monitoring': True,
                     'auto_screenshot': True
@@ -201,25 +251,13 @@ class GoLoginSessionMonitor:
                         'profile_id': profile_id
                     }
                 
-                # Create monitoring thread
                 monitor_data = {
                     'profile_id': profile_id,
                     'start_time': time.time(),
-                    'options': monitoring_options,
-                    'stop_event': threading.Event(),
-                    'thread': None
+                    'options': monitoring_options
                 }
-                
-                # Start monitoring thread
-                monitor_thread = threading.Thread(
-                    target=self._monitoring_worker,
-                    args=(profile_id, monitor_data),
-                    daemon=True
-                )
-                monitor_data['thread'] = monitor_thread
-                
                 self.active_monitors[profile_id] = monitor_data
-                monitor_thread.start()
+                self._schedule_monitoring(profile_id, monitoring_options)
                 
                 # Log monitoring start
                 self._log_activity(profile_id, 'monitoring_start', {
@@ -257,15 +295,13 @@ class GoLoginSessionMonitor:
                 
                 monitor_data = self.active_monitors[profile_id]
                 
-                # Signal stop to monitoring thread
-                monitor_data['stop_event'].set()
-                
-                # Wait for thread to finish (with timeout)
-                if monitor_data['thread'].is_alive():
-                    monitor_data['thread'].join(timeout=5)
+                # Unschedule its ticks (a run in flight finishes on its own)
+                self.scheduler.cancel(profile_id)
                 
                 # Remove from active monitors
                 del self.active_monitors[profile_id]
+                self.metrics_collector.forget(profile_id)
+                self.metrics.forget(profile_id)
                 
                 # Calculate monitoring duration
                 duration = time.time() - monitor_data['start_time']
@@ -293,86 +329,62 @@ class GoLoginSessionMonitor:
                 'profile_id': profile_id
             }
     
-    def _monitoring_worker(self, profile_id: str, monitor_data: Dict[str, Any]):
-        """Background worker thread for session monitoring."""
-        stop_event = monitor_data['stop_event']
-        options = monitor_data['options']
-        screenshot_interval = options.get('screenshot_interval', 30)
-        
-        try:
-            self.logger.info(f"Monitoring worker started for profile {profile_id}")
-            
-            last_screenshot = 0
-            
-            while not stop_event.is_set():
-                try:
-                    current_time = time.time()
-                    
-                    # Take screenshot if enabled and interval reached
-                    if (options.get('auto_screenshot', True) and 
-                        current_time - last_screenshot >= screenshot_interval):
-                        
-                        screenshot_result = self.take_session_screenshot(profile_id)
-                        if screenshot_result.get('status') == 'success':
-                            last_screenshot = current_time
-                    
-                    # Collect performance metrics if enabled
-                    if options.get('performance_monitoring', True):
-                        self._collect_performance_metrics(profile_id)
-                    
-                    # Sleep for a short interval before next check
-                    stop_event.wait(5)  # Check every 5 seconds
-                    
-                except Exception as e:
-                    self.logger.error(f"Error in monitoring worker for {profile_id}: {e}")
-                    stop_event.wait(10)  # Wait longer on error
-            
-            self.logger.info(f"Monitoring worker stopped for profile {profile_id}")
-            
-        except Exception as e:
-            self.logger.error(f"Fatal error in monitoring worker for {profile_id}: {e}")
+    def _schedule_monitoring(self, profile_id: str, options: Dict[str, Any]):
+        """Register the profile's screenshot and metrics ticks with the shared scheduler."""
+        if options.get('auto_screenshot', True):
+            self.scheduler.schedule(profile_id, 'screenshot', lambda: self._screenshot_tick(profile_id),
+                                    interval=options.get('screenshot_interval', 30))
+        if options.get('performance_monitoring', True):
+            self.scheduler.schedule(profile_id, 'metrics', lambda: self._collect_performance_metrics(profile_id),
+                                    interval=options.get('metrics_interval', DEFAULT_METRICS_INTERVAL))
+    
+    def _screenshot_tick(self, profile_id: str):
+        """Scheduled screenshot; raising lets the scheduler back off a failing profile."""
+        result = self.take_session_screenshot(profile_id)
+        if result.get('status') != 'success':
+            raise RuntimeError(result.get('error', 'screenshot failed'))
     
     def take_session_screenshot(self, profile_id: str, 
                               save_to_db: bool = True) -> Dict[str, Any]:
-        """Take a screenshot of the current session."""
+        """
+        Capture the session's browser through its local driver, or over its
+        DevTools websocket for sessions without one (cloud sessions).
+        
+        The frame is written in the background and skipped if nothing changed
+        since the previous one, so only its queueing is reported here; its
+        path is recorded once it is on disk.
+        """
         try:
-            headers = {
-                'Authorization': f'Bearer {self.gologin_token}',
-                'Content-Type': 'application/json'
-            }
-            
-            # Note: GoLogin doesn't have a direct screenshot API for cloud sessions
-            # This is a placeholder for when/if such functionality becomes available
-            # For now, we simulate screenshot capability
-            
-            # In a real implementation, you would:
-            # 1. Connect to the browser session via WebSocket/CDP
-            # 2. Use Chrome DevTools Protocol to take screenshot
-            # 3. Or use GoLogin's API if they provide screenshot endpoints
-            
-            # Simulated screenshot data (in real implementation, this would be actual image data)
-            screenshot_data = {
-                'timestamp': datetime.now().isoformat(),
-                'profile_id': profile_id,
-                'status': 'simulated',  # Would be 'captured' for real screenshots
-                'message': 'Screenshot functionality requires browser connection'
-            }
-            
-            if save_to_db:
-                with DBConnection(self.db_path) as (conn, c):
-                    c.execute('''
-                        INSERT INTO session_screenshots 
-                        (profile_id, screenshot_data, timestamp)
-                        VALUES (?, ?, CURRENT_TIMESTAMP)
-                    ''', (profile_id, json.dumps(screenshot_data)))
+            session = self.registry.get(profile_id) or self.registry.find(profile_id)
+            driver = session.get('driver') if session else None
+            on_saved = (lambda saved: self.record_screenshot(profile_id, saved)) if save_to_db else None
+            if driver is not None:
+                queued = self.screenshots.capture(driver, profile_id, 'monitor', on_saved=on_saved)
+            else:
+                image_format = self.screenshots.image_format
+                data = self.metrics_collector.capture_screenshot(profile_id, image_format,
+                                                                 self.screenshots.quality)
+                if data is None:
+                    return {
+                        'status': 'error',
+                        'error': 'Browser not reachable through a driver or CDP',
+                        'profile_id': profile_id
+                    }
+                queued = self.screenshots.submit(data, profile_id, 'monitor', image_format=image_format,
+                                                 on_saved=on_saved)
+            if not queued:
+                return {
+                    'status': 'error',
+                    'error': 'Screenshot capture failed',
+                    'profile_id': profile_id
+                }
             
-            self.logger.info(f"Screenshot taken for profile {profile_id}")
+            self.logger.debug(f"Screenshot queued for profile {profile_id}")
             
             return {
                 'status': 'success',
                 'profile_id': profile_id,
-                'screenshot_data': screenshot_data,
-                'message': 'Screenshot capability ready (requires browser connection setup)'
+                'queued': True
             }
             
         except Exception as e:
@@ -383,6 +395,10 @@ class GoLoginSessionMonitor:
                 'profile_id': profile_id
             }
     
+    def record_screenshot(self, profile_id: str, path: str):
+        """Record a stored screenshot file (batched)."""
+        self.writer.submit(INSERT_SCREENSHOT_SQL, (profile_id, path, _sqlite_time(time.time())))
+    
     def get_session_activity_log(self, profile_id: str, 
                                hours: int = 24, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent activity log for a session."""
@@ -394,8 +410,17 @@ class GoLoginSessionMonitor:
     
     def _get_recent_activity(self, profile_id: str, 
                            hours: int = 24, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get recent activity from database."""
+        """Get recent activity, from the ring buffer when it covers the window."""
         try:
+            recent = self.activity.recent(profile_id, seconds=hours * 3600, limit=limit)
+            oldest = self.activity.oldest_recent(profile_id)
+            if len(recent) >= limit or (oldest is not None and oldest <= time.time() - hours * 3600):
+                return [
+                    {'type': event['series'], 'data': event['data'] or {}, 'timestamp': _sqlite_time(event['timestamp'])}
+                    for event in recent
+                ]
+            
+            self.writer.flush(timeout=5)
             with DBConnection(self.db_path) as (conn, c):
                 c.execute('''
                     SELECT activity_type, activity_data, timestamp
@@ -421,73 +446,68 @@ class GoLoginSessionMonitor:
             self.logger.error(f"Error getting recent activity for {profile_id}: {e}")
             return []
     
-    def _collect_performance_metrics(self, profile_id: str):
-        """Collect performance metrics for a session."""
+    def _collect_performance_metrics(self, profile_id: str) -> int:
+        """
+        Sample the profile's browser over CDP and record the rows in the metrics store.
+        
+        Returns:
+            Number of metric rows recorded (0 if the browser isn't reachable over CDP)
+        """
         try:
-            # Simulate performance metrics collection
-            # In real implementation, this would connect to browser and collect:
-            # - Memory usage
-            # - CPU usage
-            # - Network activity
-            # - Page load times
-            # - JavaScript errors
+            sample = self.metrics_collector.collect(profile_id)
+            if not sample:
+                return 0
             
-            metrics = [
-                ('memory_usage_mb', 150.5, 'MB'),
-                ('cpu_usage_percent', 12.3, '%'),
-                ('page_load_time_ms', 850, 'ms')
-            ]
-            
-            with DBConnection(self.db_path) as (conn, c):
-                for metric_name, metric_value, metric_unit in metrics:
-                    c.execute('''
-                        INSERT INTO session_metrics 
-                        (profile_id, metric_name, metric_value, metric_unit, timestamp)
-                        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                    ''', (profile_id, metric_name, metric_value, metric_unit))
+            timestamp = time.time()
+            for metric_name, metric_value, metric_unit in sample['metrics']:
+                self.metrics.record(profile_id, metric_name, metric_value, metric_unit,
+                                    page_url=sample['page_url'], timestamp=timestamp)
+            return len(sample['metrics'])
             
         except Exception as e:
             self.logger.error(f"Error collecting performance metrics for {profile_id}: {e}")
+            return 0
     
     def _get_session_metrics(self, profile_id: str, hours: int = 1) -> Dict[str, Any]:
-        """Get performance metrics for a session."""
+        """Get performance metrics for a session (aggregated from the rollups)."""
         try:
-            with DBConnection(self.db_path) as (conn, c):
-                c.execute('''
-                    SELECT metric_name, AVG(metric_value) as avg_value, 
-                           MAX(metric_value) as max_value, metric_unit,
-                           COUNT(*) as sample_count
-                    FROM session_metrics
-                    WHERE profile_id = ? 
-                    AND timestamp > datetime('now', '-{} hours')
-                    GROUP BY metric_name, metric_unit
-                '''.format(hours), (profile_id,))
-                
-                metrics = {}
-                for row in c.fetchall():
-                    metrics[row[0]] = {
-                        'average': round(row[1], 2),
-                        'maximum': round(row[2], 2),
-                        'unit': row[3],
-                        'samples': row[4]
-                    }
-                
-                return metrics
-                
+            return self.metrics.summary(profile_id, hours=hours)
         except Exception as e:
             self.logger.error(f"Error getting session metrics for {profile_id}: {e}")
             return {}
     
+    def get_metric_series(self, profile_id: str, metric_name: str, hours: int = 1,
+                          resolution: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Chart points for one metric: 1-minute buckets, or 1-hour ones for long windows."""
+        try:
+            return self.metrics.points(profile_id, metric_name, hours=hours, resolution=resolution)
+        except Exception as e:
+            self.logger.error(f"Error getting {metric_name} series for {profile_id}: {e}")
+            return []
+    
+    def get_slowest_pages(self, profile_id: Optional[str] = None, hours: int = 1,
+                          metric_name: str = 'page_load_time_ms', limit: int = 10) -> List[Dict[str, Any]]:
+        """Pages (optionally of one profile) with the highest average value of a metric."""
+        try:
+            return self.metrics.top_pages(metric_name, hours=hours, profile_id=profile_id, limit=limit)
+        except Exception as e:
+            self.logger.error(f"Error getting slowest pages: {e}")
+            return []
+    
     def _log_activity(self, profile_id: str, activity_type: str, 
                      activity_data: Dict[str, Any]):
-        """Log session activity to database."""
+        """Log session activity (batched; raw rows are kept for ACTIVITY_RETENTION_DAYS)."""
         try:
-            with DBConnection(self.db_path) as (conn, c):
-                c.execute('''
-                    INSERT INTO session_activity_logs 
-                    (profile_id, activity_type, activity_data, timestamp)
-                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                ''', (profile_id, activity_type, json.dumps(activity_data)))
+            now = time.time()
+            self.activity.record(profile_id, activity_type, timestamp=now, data=activity_data)
+            self.writer.submit(INSERT_ACTIVITY_SQL, (
+                profile_id, activity_type, json.dumps(activity_data), _sqlite_time(now)
+            ))
+            
+            if now - self._activity_pruned >= 600:
+                self._activity_pruned = now
+                self.writer.submit('DELETE FROM session_activity_logs WHERE timestamp < ?',
+                                   (_sqlite_time(now - ACTIVITY_RETENTION_DAYS * 86400),))
                 
         except Exception as e:
             self.logger.error(f"Error logging activity for {profile_id}: {e}")
@@ -506,7 +526,7 @@ class GoLoginSessionMonitor:
                         'duration_seconds': duration,
                         'duration_formatted': f"{int(duration // 60)}m {int(duration % 60)}s",
                         'options': monitor_data['options'],
-                        'thread_alive': monitor_data['thread'].is_alive()
+                        'jobs': self.scheduler.jobs(profile_id)
                     })
                 
                 return monitoring_info
@@ -518,6 +538,9 @@ class GoLoginSessionMonitor:
     def cleanup_old_data(self, days: int = 7) -> Dict[str, Any]:
         """Clean up old monitoring data to save space."""
         try:
+            self.metrics.prune()
+            self.activity.prune()
+            self.writer.flush(timeout=5)
             with DBConnection(self.db_path) as (conn, c):
                 # Clean up old activity logs
                 c.execute('''
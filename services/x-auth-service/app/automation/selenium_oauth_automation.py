@@ -26,9 +26,7 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from gologin import GoLogin
 from selenium.common.exceptions import TimeoutException
 
@@ -39,6 +37,14 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from shared.db_connections import DBConnection
+from shared.browser_automation.startup import StartupTimer, wait_for_devtools, record_startup
+from shared.browser_automation.driver_cache import get_chromedriver_service
+from shared.browser_automation.governor import get_governor
+from shared.browser_automation.screenshots import get_screenshot_service
+from shared.browser_automation.element_snapshot import snapshot_elements
+
+# ChromeDriver matching the GoLogin (Orbita) build this flow runs against
+CHROMEDRIVER_VERSION = "133.0.6943.54"
 
 # Note: X login credentials should be stored in a table like:
 # CREATE TABLE x_login_credentials (
@@ -451,7 +457,7 @@ class SeleniumOAuthAutomator:
                 print(f"[OAUTH] ? Redirected to unknown page", flush=True)
             self._log_browser_state(driver, f"{log_prefix} OAuth page loaded")
 
-            self._capture_stage_screenshot(driver, screenshots, "oauth_page_loaded")
+            self._capture_stage_screenshot(driver, profile_id, screenshots, "oauth_page_loaded")
 
             print(f"\n[OAUTH] STEP 4: Detecting page state", flush=True)
             self.logger.info(f"{log_prefix} STEP 4: Detecting page state")
@@ -464,7 +470,7 @@ class SeleniumOAuthAutomator:
                 error = f"Not on authorization page. Current state: {page_state}. Current URL: {driver.current_url}"
                 print(f"[OAUTH] [X] {error}", flush=True)
                 self.logger.error(f"{log_prefix} {error}")
-                self._capture_stage_screenshot(driver, screenshots, "wrong_page_state", is_error=True)
+                self._capture_stage_screenshot(driver, profile_id, screenshots, "wrong_page_state", is_error=True)
                 return {'success': False, 'error': error}
 
             print(f"[OAUTH] ✓ On authorization page!", flush=True)
@@ -477,11 +483,11 @@ class SeleniumOAuthAutomator:
             if not auth_result.get('success'):
                 error = auth_result.get('error', 'Authorization handling failed')
                 print(f"[OAUTH] [X] Authorization failed: {error}", flush=True)
-                self._capture_stage_screenshot(driver, screenshots, "authorization_failed", is_error=True)
+                self._capture_stage_screenshot(driver, profile_id, screenshots, "authorization_failed", is_error=True)
                 return {'success': False, 'error': error}
 
             print(f"[OAUTH] [OK] Authorization successful!", flush=True)
-            self._capture_stage_screenshot(driver, screenshots, "authorize_clicked")
+            self._capture_stage_screenshot(driver, profile_id, screenshots, "authorize_clicked")
 
             print(f"\n[OAUTH] STEP 6: Waiting for callback", flush=True)
             self.logger.info(f"{log_prefix} STEP 6: Waiting for callback")
@@ -490,12 +496,12 @@ class SeleniumOAuthAutomator:
             if not callback_result.get('success'):
                 error = callback_result.get('error', 'Callback handling failed')
                 print(f"[OAUTH] [X] Callback failed: {error}", flush=True)
-                self._capture_stage_screenshot(driver, screenshots, "callback_failed", is_error=True)
+                self._capture_stage_screenshot(driver, profile_id, screenshots, "callback_failed", is_error=True)
                 return {'success': False, 'error': error}
 
             print(f"[OAUTH] [OK] Callback detected!", flush=True)
 
-            self._capture_stage_screenshot(driver, screenshots, "callback_detected")
+            self._capture_stage_screenshot(driver, profile_id, screenshots, "callback_detected")
 
             self.logger.info(f"{log_prefix} OAUTH AUTHORIZATION SUCCESSFUL")
             return {
@@ -520,6 +526,12 @@ class SeleniumOAuthAutomator:
 
     def _start_gologin_session(self, profile_id: str) -> Optional[Dict[str, Any]]:
         """Start GoLogin profile and attach Selenium."""
+        governor = get_governor()
+        if not governor.acquire(profile_id):
+            print(f"[GOLOGIN] ERROR: Host over browser resource budget ({governor.last_denial})", flush=True)
+            self.logger.error(f"Not starting {profile_id}: host over browser resource budget")
+            return None
+
         try:
             import tempfile
             import sys
@@ -550,30 +562,43 @@ class SeleniumOAuthAutomator:
                 sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace', line_buffering=True)
 
             gl = GoLogin(gl_config)
+            timer = StartupTimer(profile_id)
 
             print(f"[GOLOGIN] Starting browser session...", flush=True)
             debugger_address = gl.start()
+            timer.mark("orbita_launch")
             print(f"[GOLOGIN] Browser started! Debugger: {debugger_address}", flush=True)
+            debug_port = (debugger_address or '').rsplit(':', 1)[-1]
+            governor.track(profile_id, pid=getattr(getattr(gl, 'process', None), 'pid', None),
+                           port=int(debug_port) if debug_port.isdigit() else None)
 
             if not debugger_address:
                 print(f"[GOLOGIN] ERROR: No debugger address returned!", flush=True)
                 self.logger.error("Failed to start GoLogin session")
+                record_startup(timer, success=False)
+                governor.release(profile_id)
                 return None
 
-            # Wait for browser to fully initialize before connecting Selenium
-            print(f"[GOLOGIN] Waiting 15 seconds for browser to stabilize...", flush=True)
-            time.sleep(15)
+            # Wait until DevTools answers before connecting Selenium
+            print(f"[GOLOGIN] Waiting for browser DevTools to respond...", flush=True)
+            ready = wait_for_devtools(debugger_address)
+            timer.mark("cdp_ready")
+            if ready is None:
+                print(f"[GOLOGIN] WARNING: DevTools not answering, trying Selenium anyway", flush=True)
 
             print(f"[GOLOGIN] Connecting Selenium to browser...", flush=True)
             driver = self._connect_selenium(debugger_address)
+            timer.mark("selenium_attached")
+            record_startup(timer, success=driver is not None)
 
             if not driver:
                 print(f"[GOLOGIN] ERROR: Selenium connection failed!", flush=True)
                 gl.stop()
                 shutil.rmtree(tmpdir, ignore_errors=True)
+                governor.release(profile_id)
                 return None
 
-            print(f"[GOLOGIN] [OK] Session ready!", flush=True)
+            print(f"[GOLOGIN] [OK] Session ready in {timer.total:.1f}s ({timer.summary()})", flush=True)
             return {
                 'gl': gl,
                 'driver': driver,
@@ -592,19 +617,19 @@ class SeleniumOAuthAutomator:
                     pass
             if 'tmpdir' in locals():
                 shutil.rmtree(tmpdir, ignore_errors=True)
+            governor.release(profile_id)
             return None
 
-    def _capture_stage_screenshot(self, driver: webdriver.Chrome, screenshots: List[str], stage: str, is_error: bool = False):
-        try:
-            os.makedirs('logs/screenshots', exist_ok=True)
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            suffix = "error" if is_error else "stage"
-            filename = f"logs/screenshots/{suffix}_{stage}_{timestamp}.png"
-            driver.save_screenshot(filename)
-            screenshots.append(filename)
-            self.logger.info(f"Screenshot captured", extra={"stage": stage, "file": filename})
-        except Exception as e:
-            self.logger.warning(f"Failed to capture screenshot for stage {stage}: {e}")
+    def _capture_stage_screenshot(self, driver: webdriver.Chrome, profile_id: str, screenshots: List[str],
+                                  stage: str, is_error: bool = False):
+        suffix = "error" if is_error else "stage"
+        # Stage frames are skipped when unchanged, so files are listed once written
+        queued = get_screenshot_service('logs/screenshots').capture(
+            driver, profile_id, f"{suffix}_{stage}", force=is_error, on_saved=screenshots.append)
+        if queued:
+            self.logger.info(f"Screenshot captured", extra={"stage": stage})
+        else:
+            self.logger.warning(f"Failed to capture screenshot for stage {stage}")
     
     def _connect_selenium(self, debugger_address: str) -> Optional[webdriver.Chrome]:
         """Connect Selenium to the GoLogin browser"""
@@ -622,38 +647,14 @@ class SeleniumOAuthAutomator:
             chrome_options.add_argument("--disable-dev-shm-usage")
             chrome_options.add_argument("--disable-gpu")
             
-            # Always use webdriver-manager to fetch matching 64-bit ChromeDriver v133
-            os.environ["WDM_ARCH"] = "64"
-            print("[SELENIUM] Downloading/locating ChromeDriver v133...", flush=True)
-
-            # Always download ChromeDriver v133 to match GoLogin browser
-            chromedriver_path = ChromeDriverManager(driver_version="133.0.6943.54").install()
-            # Fix path if webdriver-manager returns directory or non-.exe file
-            if chromedriver_path:
-                print(f"[SELENIUM] ChromeDriver path: {chromedriver_path}")
-
-                if os.path.isdir(chromedriver_path):
-                    print("[SELENIUM] Path is a directory, appending chromedriver.exe")
-                    chromedriver_path = os.path.join(chromedriver_path, "chromedriver.exe")
-                elif not chromedriver_path.endswith(".exe"):
-                    print("[SELENIUM] Path is not an .exe, fixing it")
-                    chromedriver_dir = os.path.dirname(chromedriver_path)
-                    chromedriver_path = os.path.join(chromedriver_dir, "chromedriver.exe")
-
-                chromedriver_exists = os.path.exists(chromedriver_path)
-                print(f"[SELENIUM] Using ChromeDriver: {chromedriver_path}")
-                print(f"[SELENIUM] ChromeDriver exists: {chromedriver_exists}")
-            else:
-                print("[SELENIUM] No explicit ChromeDriver path - will use system PATH")
-                chromedriver_exists = False
-
-            # Create Service with downloaded ChromeDriver
-            if chromedriver_path and chromedriver_exists:
-                print(f"[SELENIUM] Creating Service with ChromeDriver: {chromedriver_path}", flush=True)
-                service = Service(chromedriver_path)
-            else:
-                print("[SELENIUM] ERROR: ChromeDriver not found or invalid", flush=True)
+            # ChromeDriver v133 to match GoLogin browser, resolved once and shared
+            print("[SELENIUM] Locating ChromeDriver v133...", flush=True)
+            try:
+                service = get_chromedriver_service(driver_version=CHROMEDRIVER_VERSION)
+            except RuntimeError as e:
+                print(f"[SELENIUM] ERROR: {e}", flush=True)
                 return None
+            print(f"[SELENIUM] Using ChromeDriver: {service.path}", flush=True)
             
             print(f"[SELENIUM] Creating Chrome driver with debugger: {debugger_address}", flush=True)
             
@@ -730,19 +731,9 @@ class SeleniumOAuthAutomator:
                 chrome_options.add_argument("--disable-web-security")
                 chrome_options.add_argument("--disable-features=VizDisplayCompositor")
                 
-                os.environ["WDM_ARCH"] = "64"
-                chromedriver_path = ChromeDriverManager(driver_version="133.0.6943.54").install()
-                print(f"[SELENIUM ALT] Raw path from ChromeDriverManager: {chromedriver_path}")
-                
-                if os.path.isdir(chromedriver_path):
-                    print("[SELENIUM ALT] Path is a directory, appending chromedriver.exe")
-                    chromedriver_path = os.path.join(chromedriver_path, "chromedriver.exe")
-                elif not chromedriver_path.endswith(".exe"):
-                    print("[SELENIUM ALT] Path is not an .exe, fixing it")
-                    chromedriver_dir = os.path.dirname(chromedriver_path)
-                    chromedriver_path = os.path.join(chromedriver_dir, "chromedriver.exe")
+                service = get_chromedriver_service(driver_version=CHROMEDRIVER_VERSION)
+                print(f"[SELENIUM ALT] Using ChromeDriver: {service.path}")
                 
-                service = Service(chromedriver_path)
                 driver = webdriver.Chrome(service=service, options=chrome_options)
                 driver.get("chrome://version/")
                 self.logger.info("ALTERNATIVE SELENIUM CONNECTION SUCCESSFUL")
@@ -881,13 +872,13 @@ class SeleniumOAuthAutomator:
                     self.logger.info(f"Post-login page state: {page_state}")
                     
                     if page_state != "authorization_form":
-                        self._save_debug_screenshot(driver, "login_success_but_no_auth_form")
+                        self._save_debug_screenshot(driver, profile_id, "login_success_but_no_auth_form")
                         return {
                             'success': False, 
                             'error': f'Login successful but authorization form not found. Page state: {page_state}'
                         }
                 else:
-                    self._save_debug_screenshot(driver, "login_failed")
+                    self._save_debug_screenshot(driver, profile_id, "login_failed")
                     return {
                         'success': False, 
                         'error': 'Could not complete X login - check credentials and account status'
@@ -907,13 +898,13 @@ class SeleniumOAuthAutomator:
                     self.logger.info(f"Post-2FA page state: {page_state}")
                     
                     if page_state != "authorization_form":
-                        self._save_debug_screenshot(driver, "2fa_success_but_no_auth_form")
+                        self._save_debug_screenshot(driver, profile_id, "2fa_success_but_no_auth_form")
                         return {
                             'success': False, 
                             'error': f'2FA successful but authorization form not found. Page state: {page_state}'
                         }
                 else:
-                    self._save_debug_screenshot(driver, "2fa_failed")
+                    self._save_debug_screenshot(driver, profile_id, "2fa_failed")
                     return {
                         'success': False,
                         'error': '2FA verification failed or no 2FA secret available'
@@ -924,7 +915,7 @@ class SeleniumOAuthAutomator:
                 print(f"[OAUTH] This account needs to verify its email before authorizing apps", flush=True)
                 print(f"[OAUTH] Current URL: {driver.current_url}", flush=True)
                 self.logger.error(f"Account requires email verification: {driver.current_url}")
-                self._save_debug_screenshot(driver, "verification_required")
+                self._save_debug_screenshot(driver, profile_id, "verification_required")
                 return {
                     'success': False,
                     'error': 'X account requires email verification - please verify email in X settings first'
@@ -935,21 +926,21 @@ class SeleniumOAuthAutomator:
                 print(f"[OAUTH] This account is locked or suspended by X", flush=True)
                 print(f"[OAUTH] Current URL: {driver.current_url}", flush=True)
                 self.logger.error(f"Account is locked or suspended: {driver.current_url}")
-                self._save_debug_screenshot(driver, "account_locked")
+                self._save_debug_screenshot(driver, profile_id, "account_locked")
                 return {
                     'success': False,
                     'error': 'X account is locked or suspended - please resolve in X settings first'
                 }
                 
             elif page_state == "rate_limited":
-                self._save_debug_screenshot(driver, "rate_limited")
+                self._save_debug_screenshot(driver, profile_id, "rate_limited")
                 return {
                     'success': False,
                     'error': 'Rate limited by X - please try again later'
                 }
                 
             elif page_state == "captcha_required":
-                self._save_debug_screenshot(driver, "captcha_required")
+                self._save_debug_screenshot(driver, profile_id, "captcha_required")
                 return {
                     'success': False,
                     'error': 'CAPTCHA required - manual intervention needed'
@@ -957,7 +948,7 @@ class SeleniumOAuthAutomator:
                 
             else:
                 self.logger.warning(f"Unknown page state: {page_state} - attempting to proceed")
-                self._save_debug_screenshot(driver, f"unknown_state_{page_state}")
+                self._save_debug_screenshot(driver, profile_id, f"unknown_state_{page_state}")
                 
                 # Wait and re-analyze
                 time.sleep(5)
@@ -978,13 +969,13 @@ class SeleniumOAuthAutomator:
                         self.logger.info(f"Post-login page state: {page_state}")
                         
                         if page_state not in ["authorization_form", "already_logged_in"]:
-                            self._save_debug_screenshot(driver, "login_success_but_no_auth_form")
+                            self._save_debug_screenshot(driver, profile_id, "login_success_but_no_auth_form")
                             return {
                                 'success': False, 
                                 'error': f'Login successful but authorization form not found. Page state: {page_state}'
                             }
                     else:
-                        self._save_debug_screenshot(driver, "login_failed_after_reanalysis")
+                        self._save_debug_screenshot(driver, profile_id, "login_failed_after_reanalysis")
                         return {
                             'success': False, 
                             'error': 'Could not complete X login after re-analysis - check credentials and account status'
@@ -1234,7 +1225,7 @@ class SeleniumOAuthAutomator:
             
             if not username_filled:
                 self.logger.error("Could not find username field")
-                self._save_debug_screenshot(driver, "username_field_not_found")
+                self._save_debug_screenshot(driver, profile_id, "username_field_not_found")
                 return False
             
             time.sleep(1)
@@ -1530,31 +1521,31 @@ class SeleniumOAuthAutomator:
             # Strategy 1: Find buttons by form context and positioning
             if context == "username_next":
                 # Look for button near username field
-                username_field = driver.find_element(By.CSS_SELECTOR, 'input[autocomplete="username"]')
-                # Find the next clickable element (usually a button)
-                buttons = driver.find_elements(By.CSS_SELECTOR, 'div[role="button"], button')
-                for button in buttons:
-                    if button.is_displayed() and button.is_enabled():
-                        # Check if button is near the username field (same form section)
-                        try:
-                            if abs(button.location['y'] - username_field.location['y']) < 200:
-                                self.logger.info("Found Next button by structural positioning")
-                                return button
-                        except:
-                            continue
-                            
+                field_selector = 'input[autocomplete="username"]'
+                button_selector = 'div[role="button"], button'
+                label = "Next"
             elif context == "password_login":
                 # Look for submit button near password field
-                password_field = driver.find_element(By.CSS_SELECTOR, 'input[type="password"]')
-                buttons = driver.find_elements(By.CSS_SELECTOR, 'div[role="button"], button, input[type="submit"]')
-                for button in buttons:
-                    if button.is_displayed() and button.is_enabled():
-                        try:
-                            if abs(button.location['y'] - password_field.location['y']) < 200:
-                                self.logger.info("Found Login button by structural positioning")
-                                return button
-                        except:
-                            continue
+                field_selector = 'input[type="password"]'
+                button_selector = 'div[role="button"], button, input[type="submit"]'
+                label = "Login"
+            else:
+                return None
+            
+            fields = snapshot_elements(driver, field_selector, fields=('rect',), limit=1)
+            if not fields:
+                return None
+            field_y = fields[0].rect['y']
+            
+            # Positions of all visible buttons in one call instead of three round-trips each
+            buttons = snapshot_elements(driver, button_selector, fields=('enabled', 'rect'), visible_only=True)
+            for button in buttons:
+                # Check if button is near the field (same form section)
+                if button.enabled and abs(button.rect['y'] - field_y) < 200:
+                    element = button.element
+                    if element is not None:
+                        self.logger.info(f"Found {label} button by structural positioning")
+                        return element
             
         except Exception as e:
             self.logger.warning(f"Structural button detection failed: {e}")
@@ -1791,16 +1782,11 @@ class SeleniumOAuthAutomator:
             self.logger.warning(f"Could not detect page state: {e}")
             return "unknown"
     
-    def _save_debug_screenshot(self, driver: webdriver.Chrome, filename_suffix: str):
-        """Save a screenshot for debugging purposes."""
+    def _save_debug_screenshot(self, driver: webdriver.Chrome, profile_id: str, filename_suffix: str):
+        """Save a screenshot for debugging purposes (written in the background)."""
         try:
-            # Create screenshots directory if it doesn't exist
-            os.makedirs('logs/screenshots', exist_ok=True)
-            
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = f"logs/screenshots/debug_{filename_suffix}_{timestamp}.png"
-            
-            driver.save_screenshot(filename)
+            filename = get_screenshot_service('logs/screenshots').capture(
+                driver, profile_id, f"debug_{filename_suffix}", force=True)
             self.logger.info(f"Debug screenshot saved: {filename}")
             
             # Also log current URL and page title (with unicode safety)
@@ -2673,6 +2659,7 @@ class SeleniumOAuthAutomator:
                 gl.stop()
             except:
                 pass
+            get_governor().release(getattr(gl, 'profile_id', None))
     
     def create_job_record(self, profile_id: str, api_app: str) -> int:
         """Create job record for tracking"""
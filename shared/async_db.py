@@ -0,0 +1,64 @@
+"""
+Awaitable facade over the blocking SQLite database classes.
+
+FastAPI endpoints are ``async def`` and run on the event loop, so calling
+``Database`` methods directly would block every other request for the
+duration of the query. ``AsyncDB`` runs each call on a small dedicated
+executor instead:
+
+- The event loop never waits on SQLite.
+- DB concurrency is bounded by ``max_workers``, independent of the
+  framework's general threadpool (which also runs background tasks).
+- Executor threads are long-lived, so each keeps its pooled connection
+  (see ``sqlite_pool``) warm across requests.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class AsyncDB:
+    """
+    Wraps a database object so its methods can be awaited.
+
+    ``await adb.get_stats(...)`` runs ``db.get_stats(...)`` on the DB
+    executor; non-callable attributes are returned as-is. Use ``run()`` for
+    ad-hoc functions.
+
+    Args:
+        db: Object with blocking methods (e.g. threads ``Database``)
+        max_workers: Number of DB executor threads
+        name: Thread name prefix
+    """
+
+    def __init__(self, db: Any, max_workers: int = DEFAULT_MAX_WORKERS, name: str = "db"):
+        self.db = db
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-executor")
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the DB executor and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.db, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        return call
+
+    def shutdown(self, wait: bool = True):
+        """Stop the executor (pending calls finish first when wait=True)."""
+        self._executor.shutdown(wait=wait)
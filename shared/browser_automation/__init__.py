@@ -7,11 +7,35 @@ Includes GoLogin profile management, Selenium utilities, and browser control.
 
 from .gologin_manager import GoLoginManager
 from .selenium_base import SeleniumBase
+from .element_snapshot import ElementRecord, snapshot_elements
 from .browser_profiles import BrowserProfileManager
+from .session_pool import BrowserSessionPool, get_session_pool
+from .session_registry import SessionRegistry, get_registry
+from .ports import PortAllocator, get_port_allocator
+from .governor import ResourceGovernor, get_governor
+from .cdp_metrics import CDPMetricsCollector
+from .screenshots import ScreenshotService, get_screenshot_service
+from .backends import GoLoginBackend, OrbitaBackend, CloudBrowserBackend
 
 __all__ = [
     "GoLoginManager",
     "SeleniumBase",
+    "ElementRecord",
+    "snapshot_elements",
     "BrowserProfileManager",
+    "BrowserSessionPool",
+    "get_session_pool",
+    "SessionRegistry",
+    "get_registry",
+    "PortAllocator",
+    "get_port_allocator",
+    "ResourceGovernor",
+    "get_governor",
+    "CDPMetricsCollector",
+    "ScreenshotService",
+    "get_screenshot_service",
+    "GoLoginBackend",
+    "OrbitaBackend",
+    "CloudBrowserBackend",
 ]
 
@@ -0,0 +1,126 @@
+"""
+GoLogin Launch Backends
+
+How a profile's browser is brought up and torn down, separated from the
+session lifecycle (readiness probe, Selenium attach, registry, pooling):
+
+    OrbitaBackend        GoLogin SDK runs Orbita on this machine, either with the
+                         profile synced from GoLogin cloud or a local profile
+    CloudBrowserBackend  GoLogin runs the browser in its cloud (REST API); there is
+                         no debugger address to attach Selenium to
+"""
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from gologin import GoLogin
+
+from .startup import StartupTimer
+
+
+class GoLoginBackend:
+    """Base class: start() returns (handle, debugger_address); stop(handle) tears it down"""
+
+    name = "base"
+
+    def __init__(self, gologin_token: str):
+        self.gologin_token = gologin_token
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def start(self, profile_id: str, tmpdir: Optional[str] = None, port: Optional[int] = None,
+              timer: Optional[StartupTimer] = None,
+              extra_config: Optional[Dict[str, Any]] = None) -> Tuple[Any, Optional[str]]:
+        raise NotImplementedError
+
+    def stop(self, handle: Any):
+        raise NotImplementedError
+
+
+class OrbitaBackend(GoLoginBackend):
+    """
+    Launch Orbita through the GoLogin SDK.
+
+    Args:
+        gologin_token: GoLogin API token
+        local: Use the local profile copy ("local" mode) instead of syncing from cloud
+    """
+
+    def __init__(self, gologin_token: str, local: bool = False):
+        super().__init__(gologin_token)
+        self.local = local
+        self.name = "local" if local else "cloud"
+
+    def start(self, profile_id: str, tmpdir: Optional[str] = None, port: Optional[int] = None,
+              timer: Optional[StartupTimer] = None,
+              extra_config: Optional[Dict[str, Any]] = None) -> Tuple[GoLogin, Optional[str]]:
+        """
+        Start the profile's browser.
+
+        Args:
+            profile_id: GoLogin profile ID
+            tmpdir: Directory the profile is unpacked into
+            port: Remote-debugging port (from the shared PortAllocator)
+            timer: Receives profile_fetch / orbita_launch marks
+            extra_config: Extra GoLogin options (extra_params, timeout, ...)
+        """
+        gl_config: Dict[str, Any] = {"token": self.gologin_token, "profile_id": profile_id}
+        if tmpdir:
+            gl_config["tmpdir"] = tmpdir
+        if port:
+            gl_config["port"] = port
+        if self.local:
+            gl_config["local"] = True
+        gl_config.update(extra_config or {})
+
+        gl = GoLogin(gl_config)
+
+        # gl.start() is createStartup() (fetch profile, unpack it into tmpdir)
+        # followed by spawnBrowser(); call them separately when available so
+        # the two phases can be timed apart
+        if hasattr(gl, 'createStartup') and hasattr(gl, 'spawnBrowser') and getattr(gl, 'spawn_browser', True):
+            gl.createStartup()
+            if timer:
+                timer.mark("profile_fetch")
+            debugger_address = gl.spawnBrowser()
+        else:
+            debugger_address = gl.start()
+        if timer:
+            timer.mark("orbita_launch")
+        return gl, debugger_address
+
+    def stop(self, handle: GoLogin):
+        handle.stop()
+
+
+class CloudBrowserBackend(GoLoginBackend):
+    """
+    Start/stop a profile's browser in GoLogin cloud via the REST API.
+
+    Args:
+        gologin_token: GoLogin API token
+        http: requests.Session to use (e.g. one with retries and pooling)
+        api_base: GoLogin API base URL
+    """
+
+    name = "cloud_browser"
+
+    def __init__(self, gologin_token: str, http: Optional[requests.Session] = None,
+                 api_base: str = 'https://api.gologin.com'):
+        super().__init__(gologin_token)
+        self.api_base = api_base
+        self.http = http or requests.Session()
+        self.headers = {'Authorization': f'Bearer {gologin_token}', 'Content-Type': 'application/json'}
+
+    def start(self, profile_id: str, tmpdir: Optional[str] = None, port: Optional[int] = None,
+              timer: Optional[StartupTimer] = None,
+              extra_config: Optional[Dict[str, Any]] = None) -> Tuple[requests.Response, None]:
+        """Returns the API response (202 = started); there is no debugger address"""
+        response = self.http.post(f'{self.api_base}/browser/{profile_id}/web', headers=self.headers, timeout=30)
+        if timer:
+            timer.mark("orbita_launch")
+        return response, None
+
+    def stop(self, profile_id: str) -> requests.Response:
+        """Returns the API response (200/204 = stopped, 404 = already stopped)"""
+        return self.http.delete(f'{self.api_base}/browser/{profile_id}/web', headers=self.headers, timeout=30)
@@ -0,0 +1,373 @@
+"""
+Browser Performance Metrics over CDP
+
+Samples a running browser through the Chrome DevTools Protocol:
+Performance.getMetrics (JS heap, DOM size, layout/script time), the
+page's navigation timing, and the RSS/CPU of the browser's processes.
+The browser is reached the same way for every session: its
+browser-level DevTools websocket (from the registry's ws_endpoint or
+debugger_address), or the session's own Selenium driver when no
+endpoint is known.
+
+Each sample is a list of (metric_name, value, unit) rows for one page,
+so slow profiles and slow pages can be told apart. Navigation timing is
+reported once per document; script/layout time as the time spent since
+the previous sample of the same document.
+
+The duration counters run from Performance.enable, so the websocket
+transport keeps one attached page session per profile between samples
+(closed by ``forget()``); a sample taken on a new session only sets the
+baseline for the next one.
+"""
+
+import os
+import json
+import base64
+import logging
+import itertools
+import threading
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+from .governor import get_governor
+from .session_registry import get_registry
+
+# Performance.getMetrics name -> (metric_name, unit, scale)
+GAUGES = {
+    'JSHeapUsedSize': ('js_heap_used_mb', 'MB', 1 / (1024 * 1024)),
+    'JSHeapTotalSize': ('js_heap_total_mb', 'MB', 1 / (1024 * 1024)),
+    'Nodes': ('dom_nodes', 'count', 1),
+    'JSEventListeners': ('js_event_listeners', 'count', 1),
+    'Documents': ('documents', 'count', 1),
+    'Frames': ('frames', 'count', 1),
+}
+
+# Cumulative seconds since Performance.enable; reported as ms spent since the previous sample
+DURATIONS = {
+    'TaskDuration': ('task_ms', 'ms'),
+    'ScriptDuration': ('script_ms', 'ms'),
+    'LayoutDuration': ('layout_ms', 'ms'),
+    'RecalcStyleDuration': ('style_recalc_ms', 'ms'),
+}
+
+NAVIGATION_TIMING_JS = """
+(() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    return JSON.stringify({
+        url: location.href,
+        ttfb: nav ? nav.responseStart - nav.startTime : null,
+        dom_content_loaded: nav && nav.domContentLoadedEventEnd ? nav.domContentLoadedEventEnd - nav.startTime : null,
+        load: nav && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null
+    });
+})()
+"""
+
+Row = Tuple[str, float, str]
+
+LOOPBACK_HOSTS = ('localhost', '::1')
+
+
+class CDPError(RuntimeError):
+    """A CDP command failed or the browser could not be reached"""
+
+
+class _WebSocketCDP:
+    """Minimal synchronous CDP client on a browser-level DevTools websocket"""
+
+    def __init__(self, ws_url: str, timeout: float):
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        try:
+            from websockets.sync.client import connect
+            self._ws = connect(ws_url, open_timeout=timeout, max_size=None)
+            self._recv = lambda: self._ws.recv(timeout=self.timeout)
+        except ImportError:
+            try:
+                import websocket
+            except ImportError:
+                raise CDPError("No websocket client installed (websockets or websocket-client)")
+            self._ws = websocket.create_connection(ws_url, timeout=timeout)
+            self._recv = self._ws.recv
+        except Exception as e:
+            raise CDPError(f"Could not connect to {ws_url}: {e}")
+
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None,
+             session_id: Optional[str] = None) -> Dict[str, Any]:
+        message = {'id': next(self._ids), 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        try:
+            self._ws.send(json.dumps(message))
+            while True:
+                reply = json.loads(self._recv())
+                if reply.get('id') == message['id']:
+                    break  # anything else is an event
+        except Exception as e:
+            raise CDPError(f"{method} failed: {e}")
+        if 'error' in reply:
+            raise CDPError(f"{method}: {reply['error'].get('message')}")
+        return reply.get('result', {})
+
+    def close(self):
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+class _PageSession:
+    """A browser websocket with a flattened session attached to its first page"""
+
+    def __init__(self, ws_url: str, timeout: float):
+        self.ws_url = ws_url
+        self.sampled = False  # Performance counters read at least once
+        self.cdp = _WebSocketCDP(ws_url, timeout)
+        try:
+            targets = self.cdp.send('Target.getTargets').get('targetInfos', [])
+            pages = [t for t in targets if t.get('type') == 'page']
+            if not pages:
+                raise CDPError("Browser has no open page")
+            self.page_url = pages[0].get('url')
+            self.session_id = self.cdp.send('Target.attachToTarget',
+                                            {'targetId': pages[0]['targetId'], 'flatten': True})['sessionId']
+            self.send('Performance.enable')
+        except CDPError:
+            self.cdp.close()
+            raise
+
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return self.cdp.send(method, params, session_id=self.session_id)
+
+    def close(self):
+        try:
+            self.cdp.send('Target.detachFromTarget', {'sessionId': self.session_id})
+        except CDPError:
+            pass
+        self.cdp.close()
+
+
+class CDPMetricsCollector:
+    """
+    Samples browser performance metrics over CDP.
+
+    Args:
+        timeout: Seconds allowed for connecting and for each CDP command
+    """
+
+    def __init__(self, timeout: float = 5.0):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.timeout = timeout
+        self.registry = get_registry()
+        self.governor = get_governor()
+        self._previous: Dict[str, Tuple[str, Dict[str, float]]] = {}  # profile -> (url, durations)
+        self._sessions: Dict[str, _PageSession] = {}  # profile -> attached page session
+        self._lock = threading.Lock()
+
+    def collect(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Take one sample of a running profile's browser.
+
+        Args:
+            profile_id: GoLogin profile ID
+
+        Returns:
+            {'profile_id', 'page_url', 'metrics': [(name, value, unit), ...]}, or
+            None if the profile isn't running in a browser reachable over CDP
+        """
+        session = self.registry.get(profile_id) or self.registry.find(profile_id)
+        if not session:
+            return None
+
+        transports = []
+        ws_url = self._browser_ws_url(session)
+        if ws_url:
+            local = _is_local(session, ws_url)
+            transports.append(lambda: self._collect_websocket(profile_id, ws_url, local))
+        if session.get('driver') is not None:
+            transports.append(lambda: self._collect_selenium(session['driver']))
+
+        for transport in transports:
+            try:
+                page_url, perf, timing, rows, fresh = transport()
+                break
+            except CDPError as e:
+                self.logger.debug(f"No CDP metrics for {profile_id}: {e}")
+        else:
+            return None
+
+        values = {m['name']: m['value'] for m in perf if 'name' in m and 'value' in m}
+        durations = {key: values[key] for key in DURATIONS if key in values}
+        with self._lock:
+            previous = self._previous.get(profile_id)
+            self._previous[profile_id] = (page_url, durations)
+
+        rows.extend(
+            (name, round(values[key] * scale, 2), unit)
+            for key, (name, unit, scale) in GAUGES.items() if key in values
+        )
+        if not previous or previous[0] != page_url:
+            rows.extend(self._timing_rows(timing))
+        elif not fresh:
+            # Counters of a newly enabled session are only a baseline
+            rows.extend(self._duration_rows(previous[1], durations))
+        if not any(name in ('browser_rss_mb', 'browser_cpu_percent') for name, _, _ in rows):
+            rows.extend(self._governor_rows(profile_id))
+        return {'profile_id': profile_id, 'page_url': page_url, 'metrics': rows}
+
+    def forget(self, profile_id: str):
+        """Drop the previous sample and CDP session of a profile (its monitoring stopped)"""
+        with self._lock:
+            self._previous.pop(profile_id, None)
+            page = self._sessions.pop(profile_id, None)
+        if page:
+            page.close()
+
+    def capture_screenshot(self, profile_id: str, image_format: str = 'jpeg',
+                           quality: int = 60) -> Optional[bytes]:
+        """
+        Grab the viewport of a profile's page over its DevTools websocket.
+
+        For sessions without a local Selenium driver (cloud sessions found
+        through the registry); shares the metrics' attached page session.
+
+        Returns:
+            Image bytes in ``image_format``, or None if the browser isn't reachable
+        """
+        session = self.registry.get(profile_id) or self.registry.find(profile_id)
+        ws_url = self._browser_ws_url(session) if session else None
+        if not ws_url:
+            return None
+        try:
+            page = self._page(profile_id, ws_url)
+        except CDPError as e:
+            self.logger.debug(f"No CDP screenshot for {profile_id}: {e}")
+            return None
+        try:
+            data = page.send('Page.captureScreenshot', {'format': image_format, 'quality': quality})['data']
+        except (CDPError, KeyError) as e:
+            self._drop(profile_id, page)
+            self.logger.debug(f"No CDP screenshot for {profile_id}: {e}")
+            return None
+        self._keep(profile_id, page)
+        return base64.b64decode(data)
+
+    # ========================================
+    # TRANSPORTS
+    # ========================================
+
+    def _browser_ws_url(self, session: Dict[str, Any]) -> Optional[str]:
+        if session.get('ws_endpoint'):
+            return session['ws_endpoint']
+        if session.get('debugger_address'):
+            try:
+                url = f"http://{session['debugger_address']}/json/version"
+                with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                    return json.loads(response.read().decode('utf-8')).get('webSocketDebuggerUrl')
+            except Exception as e:
+                self.logger.debug(f"DevTools at {session['debugger_address']} not answering: {e}")
+        return None
+
+    def _page(self, profile_id: str, ws_url: str) -> _PageSession:
+        """The profile's attached page session (attached again if the browser changed)"""
+        with self._lock:
+            page = self._sessions.get(profile_id)
+        if page is None or page.ws_url != ws_url:
+            if page:
+                page.close()
+            page = _PageSession(ws_url, self.timeout)
+        return page
+
+    def _keep(self, profile_id: str, page: _PageSession):
+        with self._lock:
+            self._sessions[profile_id] = page
+
+    def _drop(self, profile_id: str, page: _PageSession):
+        # Page closed or browser restarted: attach again on the next call
+        with self._lock:
+            if self._sessions.get(profile_id) is page:
+                del self._sessions[profile_id]
+        page.close()
+
+    def _collect_websocket(self, profile_id: str, ws_url: str, local: bool = True):
+        page = self._page(profile_id, ws_url)
+        try:
+            perf = page.send('Performance.getMetrics').get('metrics', [])
+            timing = page.send('Runtime.evaluate', {'expression': NAVIGATION_TIMING_JS, 'returnByValue': True}
+                               ).get('result', {}).get('value')
+        except CDPError:
+            self._drop(profile_id, page)
+            raise
+        self._keep(profile_id, page)
+        fresh, page.sampled = not page.sampled, True
+
+        rows: List[Row] = []
+        # The browser's pids are only meaningful in this host's /proc
+        if local:
+            try:
+                processes = page.cdp.send('SystemInfo.getProcessInfo').get('processInfo', [])
+                rss_mb = _rss_mb([p['id'] for p in processes if p.get('id')])
+                if rss_mb is not None:
+                    rows.append(('browser_rss_mb', round(rss_mb, 1), 'MB'))
+            except CDPError:
+                pass  # not exposed by every browser build
+
+        timing = json.loads(timing) if timing else {}
+        return timing.get('url') or page.page_url, perf, timing, rows, fresh
+
+    def _collect_selenium(self, driver):
+        try:
+            driver.execute_cdp_cmd('Performance.enable', {})
+            perf = driver.execute_cdp_cmd('Performance.getMetrics', {}).get('metrics', [])
+            timing = json.loads(driver.execute_script(f"return {NAVIGATION_TIMING_JS.strip()}") or '{}')
+        except Exception as e:
+            raise CDPError(str(e))
+        return timing.get('url'), perf, timing, [], False
+
+    # ========================================
+    # ROWS
+    # ========================================
+
+    @staticmethod
+    def _duration_rows(previous: Dict[str, float], current: Dict[str, float]) -> List[Row]:
+        """Milliseconds spent since the previous sample (the counters restart on navigation)"""
+        rows = []
+        for key, value in current.items():
+            delta = value - previous.get(key, value)
+            if delta >= 0:
+                name, unit = DURATIONS[key]
+                rows.append((name, round(delta * 1000, 1), unit))
+        return rows
+
+    @staticmethod
+    def _timing_rows(timing: Dict[str, Any]) -> List[Row]:
+        names = (('ttfb', 'ttfb_ms'), ('dom_content_loaded', 'dom_content_loaded_ms'), ('load', 'page_load_time_ms'))
+        return [(name, round(timing[key], 1), 'ms') for key, name in names if timing.get(key)]
+
+    def _governor_rows(self, profile_id: str) -> List[Row]:
+        usage = self.governor.usage(profile_id)
+        if not usage or not usage['rss_mb']:
+            return []
+        return [('browser_rss_mb', usage['rss_mb'], 'MB'), ('browser_cpu_percent', usage['cpu_percent'], '%')]
+
+
+def _is_local(session: Dict[str, Any], ws_url: str) -> bool:
+    """Whether the session's browser runs on this host (cloud sessions and remote endpoints don't)"""
+    if session.get('execution_mode') == 'cloud':
+        return False
+    host = urllib.parse.urlsplit(ws_url).hostname or ''
+    return host in LOOPBACK_HOSTS or host.startswith('127.')
+
+
+def _rss_mb(pids: List[int]) -> Optional[float]:
+    """Summed RSS of local processes from /proc/<pid>/statm (None if none are readable)"""
+    page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+    total, found = 0, False
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                total += int(f.read().split()[1]) * page_size
+                found = True
+        except (OSError, ValueError, IndexError):
+            continue
+    return total / (1024 * 1024) if found else None
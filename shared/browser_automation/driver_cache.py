@@ -0,0 +1,253 @@
+"""
+ChromeDriver Resolution Cache
+
+Resolves the ChromeDriver binary for an Orbita major version once and
+reuses it: per process in memory, across processes through a small JSON
+index guarded by a file lock, and offline from webdriver-manager's own
+download cache. Drivers attach through one long-lived chromedriver
+process per binary (SharedService) instead of spawning one per browser.
+
+Configuration (environment):
+    GOLOGIN_CHROMEDRIVER_VERSION   Major version used when the browser version is unknown (default 141)
+    BROWSER_STATE_DIR              Where the index and lock live (see state.py)
+"""
+
+import os
+import re
+import glob
+import time
+import atexit
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from .state import STATE_DIR, file_lock, read_json, write_json
+
+try:
+    from selenium.webdriver.chrome.service import Service
+except ImportError:  # resolution helpers still work without selenium
+    Service = object
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAJOR = os.getenv('GOLOGIN_CHROMEDRIVER_VERSION', '141')
+CACHE_DIR = STATE_DIR
+WDM_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.wdm', 'drivers', 'chromedriver')
+
+DRIVER_NAMES = ('chromedriver', 'chromedriver.exe')
+
+_resolved: Dict[str, str] = {}
+_services: Dict[str, 'SharedService'] = {}
+_retired: List['SharedService'] = []  # invalidated but maybe still serving drivers
+_lock = threading.Lock()
+
+
+def major_version(version: Optional[str]) -> str:
+    """
+    Major version from "Chrome/141.0.7390.54", "141.0.7390.54" or "141".
+
+    Falls back to GOLOGIN_CHROMEDRIVER_VERSION when it cannot be parsed.
+    """
+    match = re.search(r'(\d+)(?:\.\d+)*', version or '')
+    return match.group(1) if match else DEFAULT_MAJOR
+
+
+# ========================================
+# CROSS-PROCESS INDEX
+# ========================================
+
+def _index_path() -> str:
+    return os.path.join(CACHE_DIR, 'chromedriver.json')
+
+
+@contextmanager
+def _file_lock():
+    """Exclusive lock shared by every process resolving drivers"""
+    with file_lock(os.path.join(CACHE_DIR, 'chromedriver.lock')):
+        yield
+
+
+def _read_index() -> Dict[str, dict]:
+    return read_json(_index_path(), {})
+
+
+def _write_index(index: Dict[str, dict]):
+    write_json(_index_path(), index)
+
+
+def _is_executable(path: Optional[str]) -> bool:
+    return bool(path) and os.path.isfile(path) and (os.name == 'nt' or os.access(path, os.X_OK))
+
+
+# ========================================
+# RESOLUTION
+# ========================================
+
+def _normalize(path: Optional[str]) -> Optional[str]:
+    """
+    Point at the chromedriver binary itself.
+
+    Some webdriver-manager releases return the download directory or a
+    sibling file (e.g. THIRD_PARTY_NOTICES.chromedriver) instead.
+    """
+    if not path:
+        return None
+    folder = path if os.path.isdir(path) else os.path.dirname(path)
+    if os.path.basename(path) in DRIVER_NAMES and _is_executable(path):
+        return path
+    for name in DRIVER_NAMES:
+        candidate = os.path.join(folder, name)
+        if _is_executable(candidate):
+            return candidate
+    return None
+
+
+def _find_downloaded(major: str) -> Optional[str]:
+    """Newest chromedriver for this major already in webdriver-manager's cache (works offline)"""
+    candidates = []
+    for name in DRIVER_NAMES:
+        for path in glob.glob(os.path.join(WDM_CACHE_DIR, '**', name), recursive=True):
+            parts = os.path.relpath(path, WDM_CACHE_DIR).split(os.sep)
+            if any(part == major or part.startswith(f"{major}.") for part in parts) and _is_executable(path):
+                candidates.append(path)
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def _download(major: str, driver_version: Optional[str]) -> Optional[str]:
+    """Ask webdriver-manager for the driver (network); None when offline or unavailable"""
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError:
+        return None
+
+    os.environ.setdefault("WDM_ARCH", "64")
+    try:
+        return _normalize(ChromeDriverManager(driver_version=driver_version or major).install())
+    except Exception as e:
+        logger.warning(f"ChromeDriver {driver_version or major} download failed: {e}")
+        return None
+
+
+def resolve_chromedriver(browser_version: Optional[str] = None, driver_version: Optional[str] = None) -> str:
+    """
+    Path to the ChromeDriver binary matching a browser's major version.
+
+    Args:
+        browser_version: Browser version string (e.g. DevTools "Chrome/141.0.7390.54")
+        driver_version: Exact driver version to download if not cached (default: the major)
+
+    Returns:
+        Path to an executable chromedriver
+
+    Raises:
+        RuntimeError: No matching driver cached, downloadable or on PATH
+    """
+    major = major_version(driver_version or browser_version)
+
+    with _lock:
+        path = _resolved.get(major)
+        if _is_executable(path):
+            return path
+
+        entry = _read_index().get(major, {})
+        if _is_executable(entry.get('path')):
+            _resolved[major] = entry['path']
+            return entry['path']
+
+        with _file_lock():
+            # Another process may have resolved it while we waited
+            index = _read_index()
+            path = index.get(major, {}).get('path')
+            source = 'index'
+            if not _is_executable(path):
+                started = time.monotonic()
+                path, source = _find_downloaded(major), 'wdm-cache'
+                if not path:
+                    path, source = _download(major, driver_version), 'download'
+                if not path:
+                    path, source = shutil.which('chromedriver'), 'PATH'
+                if not path:
+                    raise RuntimeError(f"No ChromeDriver available for browser major version {major}")
+                index[major] = {'path': path, 'source': source, 'resolved_at': time.time()}
+                _write_index(index)
+                logger.info(f"Resolved ChromeDriver {major} from {source} in "
+                            f"{time.monotonic() - started:.2f}s: {path}")
+
+        _resolved[major] = path
+        return path
+
+
+def invalidate_chromedriver(browser_version: Optional[str] = None):
+    """Forget a cached driver (e.g. after a version mismatch) so the next call re-resolves"""
+    major = major_version(browser_version)
+    with _lock:
+        _resolved.pop(major, None)
+        service = _services.pop(major, None)
+        if service is not None:
+            _retired.append(service)
+        with _file_lock():
+            index = _read_index()
+            if index.pop(major, None) is not None:
+                _write_index(index)
+    logger.info(f"Invalidated cached ChromeDriver {major}")
+
+
+# ========================================
+# SHARED SERVICE
+# ========================================
+
+class SharedService(Service):
+    """
+    Chrome Service whose chromedriver process serves every driver in the process.
+
+    webdriver.Chrome() calls start() and quit() calls stop(); start() is a
+    no-op while the process is alive and stop() never kills it, so only
+    the first browser pays for spawning chromedriver. shutdown() stops it.
+    """
+
+    def __init__(self, executable_path: str):
+        super().__init__(executable_path=executable_path)
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            process = getattr(self, 'process', None)
+            if process is not None and process.poll() is None:
+                return
+            super().start()
+
+    def stop(self):
+        pass
+
+    def shutdown(self):
+        super().stop()
+
+
+def get_chromedriver_service(browser_version: Optional[str] = None,
+                             driver_version: Optional[str] = None) -> SharedService:
+    """
+    Shared Service for the ChromeDriver matching a browser version.
+
+    Args:
+        browser_version: Browser version string (e.g. DevTools "Chrome/141.0.7390.54")
+        driver_version: Exact driver version to download if not cached
+    """
+    path = resolve_chromedriver(browser_version, driver_version)
+    major = major_version(driver_version or browser_version)
+    with _lock:
+        service = _services.get(major)
+        if service is None or service.path != path:
+            service = SharedService(path)
+            _services[major] = service
+        return service
+
+
+@atexit.register
+def _shutdown_services():
+    for service in list(_services.values()) + _retired:
+        try:
+            service.shutdown()
+        except Exception:
+            pass
@@ -0,0 +1,172 @@
+"""
+Batched Element Snapshots
+
+Inspecting elements one by one costs a WebDriver round-trip per call:
+``is_displayed()``, ``.text`` and ``get_attribute()`` on every match of a
+selector add up to N x M HTTP requests. ``snapshot_elements`` reads the
+requested fields of every match inside the page with one ``execute_script``
+and returns plain ``ElementRecord`` objects.
+
+The matched elements stay referenced on the page side (a small per-window
+cache keyed by snapshot token), so a record's ``element`` is only resolved -
+one more round-trip - for the few matches the caller actually acts on.
+
+Fields:
+    text        Rendered text (``innerText``), trimmed and capped at ``text_limit``
+    visible     Rendered with a non-empty box (roughly ``is_displayed()``)
+    enabled     Not disabled / aria-disabled
+    rect        {'x', 'y', 'width', 'height'} in page coordinates
+    tag         Lower-case tag name
+    <other>     Property or attribute of that name, like ``get_attribute()``
+"""
+
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_FIELDS = ('text', 'visible')
+
+# How many snapshots per window keep their elements referenced
+CACHED_SNAPSHOTS = 16
+
+SNAPSHOT_JS = """
+const [selector, by, root, fields, related, limit, visibleOnly, textLimit, token, cached] = arguments;
+const scope = root || document;
+
+let matches;
+if (by === 'xpath') {
+    const result = document.evaluate(selector, scope, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    matches = [];
+    for (let i = 0; i < result.snapshotLength; i++) matches.push(result.snapshotItem(i));
+} else {
+    matches = Array.from(scope.querySelectorAll(selector));
+}
+
+const isVisible = el => {
+    const style = getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden' || parseFloat(style.opacity) === 0) return false;
+    const box = el.getBoundingClientRect();
+    return box.width > 0 && box.height > 0;
+};
+
+const read = (el, field) => {
+    switch (field) {
+        case 'text': return (el.innerText || el.textContent || '').trim().slice(0, textLimit);
+        case 'visible': return isVisible(el);
+        case 'enabled': return !el.disabled && el.getAttribute('aria-disabled') !== 'true';
+        case 'tag': return el.tagName.toLowerCase();
+        case 'rect': {
+            const box = el.getBoundingClientRect();
+            return {x: Math.round(box.left + window.scrollX), y: Math.round(box.top + window.scrollY),
+                    width: Math.round(box.width), height: Math.round(box.height)};
+        }
+        default: {
+            const value = el[field];
+            if (['string', 'number', 'boolean'].includes(typeof value)) return value;
+            return el.getAttribute(field);
+        }
+    }
+};
+
+const kept = [];
+const records = [];
+for (const el of matches) {
+    if (limit && records.length >= limit) break;
+    if (visibleOnly && !isVisible(el)) continue;
+    const record = {index: kept.length};
+    for (const field of fields) record[field] = read(el, field);
+    for (const [key, [css, field, up]] of Object.entries(related)) {
+        let anchor = el;
+        for (let i = 0; i < up && anchor.parentElement; i++) anchor = anchor.parentElement;
+        const target = anchor.querySelector(css);
+        record[key] = target ? read(target, field) : null;
+    }
+    kept.push(el);
+    records.push(record);
+}
+
+const cache = window.__elementSnapshots = window.__elementSnapshots || new Map();
+cache.set(token, kept);
+while (cache.size > cached) cache.delete(cache.keys().next().value);
+return records;
+"""
+
+RESOLVE_JS = """
+const cache = window.__elementSnapshots;
+const kept = cache && cache.get(arguments[0]);
+const el = kept && kept[arguments[1]];
+return el && el.isConnected ? el : null;
+"""
+
+
+class ElementRecord:
+    """
+    Fields of one matched element; ``record.text`` or ``record['text']``.
+
+    Args:
+        driver: Driver the snapshot was taken with
+        token: Snapshot token the page-side element cache is keyed by
+        data: Field values as returned by the page
+    """
+
+    __slots__ = ('index', 'data', '_driver', '_token', '_element')
+
+    def __init__(self, driver, token: str, data: Dict[str, Any]):
+        self.index = data.pop('index')
+        self.data = data
+        self._driver = driver
+        self._token = token
+        self._element = None
+
+    def __getattr__(self, name: str):
+        try:
+            return self.data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name: str):
+        return self.data[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.data.get(name, default)
+
+    @property
+    def element(self):
+        """WebElement of this match (one round-trip, then cached); None once it left the page"""
+        if self._element is None:
+            self._element = self._driver.execute_script(RESOLVE_JS, self._token, self.index)
+        return self._element
+
+    def __repr__(self) -> str:
+        return f"ElementRecord({self.index}, {self.data!r})"
+
+
+def snapshot_elements(driver, selector: str, fields: Sequence[str] = DEFAULT_FIELDS, by: str = 'css selector',
+                      root=None, related: Optional[Dict[str, Tuple[str, str, int]]] = None,
+                      limit: Optional[int] = None, visible_only: bool = False,
+                      text_limit: int = 500) -> List[ElementRecord]:
+    """
+    Read fields of every element matching a selector in one script call.
+
+    Args:
+        driver: Selenium WebDriver
+        selector: CSS selector, or an XPath when ``by`` is 'xpath' (``By.XPATH``)
+        fields: Field names to read (see module docstring)
+        by: 'css selector' or 'xpath' - the values of ``By.CSS_SELECTOR`` / ``By.XPATH``
+        root: WebElement to search within (default: whole document)
+        related: Extra values read from a nearby element, as
+            ``{key: (css, field, levels_up)}``: the first ``css`` match inside the
+            match's ``levels_up``-th ancestor (0 = the match itself), or None
+        limit: Stop after this many records
+        visible_only: Skip matches that are not visible (filtered in the page)
+        text_limit: Max characters of each 'text' value
+
+    Returns:
+        ElementRecord per match, in document order
+    """
+    token = uuid.uuid4().hex[:12]
+    related_specs = {key: list(spec) for key, spec in (related or {}).items()}
+    rows = driver.execute_script(
+        SNAPSHOT_JS, selector, by, root, list(fields), related_specs,
+        limit or 0, visible_only, text_limit, token, CACHED_SNAPSHOTS
+    )
+    return [ElementRecord(driver, token, row) for row in rows or []]
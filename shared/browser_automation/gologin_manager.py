@@ -13,29 +13,40 @@ import tempfile
 import shutil
 import logging
 from typing import Optional, Dict, Any
-from gologin import GoLogin
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
+
+from .backends import GoLoginBackend, OrbitaBackend
+from .ports import get_port_allocator
+from .governor import get_governor
+from .session_registry import get_registry
+from .session_pool import BrowserSessionPool, get_session_pool
+from .startup import StartupTimer, wait_for_devtools, record_startup
+from .driver_cache import get_chromedriver_service, invalidate_chromedriver
 
 
 class GoLoginManager:
     """
     Manages GoLogin browser profiles and Selenium connections.
     
-    Supports both cloud and local execution modes.
+    The session lifecycle (launch, readiness probe, Selenium attach,
+    registration, cleanup) is shared by every service; how the browser is
+    launched is delegated to a backend (see backends.py). Every launch
+    takes its debugging port from the shared PortAllocator, waits for a
+    slot from the ResourceGovernor and is recorded in the shared
+    SessionRegistry.
     """
     
-    def __init__(self, gologin_token: Optional[str] = None, local_mode: bool = None):
+    def __init__(self, gologin_token: Optional[str] = None, local_mode: bool = None,
+                 backend: Optional[GoLoginBackend] = None):
         """
         Initialize GoLogin Manager.
         
         Args:
             gologin_token: GoLogin API token (defaults to GOLOGIN_TOKEN env var)
             local_mode: Use local Orbita instance (defaults to GOLOGIN_LOCAL_MODE env var)
+            backend: Launch backend (defaults to OrbitaBackend for the chosen mode)
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         
@@ -51,105 +62,173 @@ class GoLoginManager:
         else:
             self.use_local_mode = local_mode
         
-        self.logger.info(f"GoLogin Manager initialized - Mode: {'LOCAL' if self.use_local_mode else 'CLOUD'}")
+        self.backend = backend or OrbitaBackend(self.gologin_token, local=self.use_local_mode)
+        self.ports = get_port_allocator()
+        self.registry = get_registry()
+        self.governor = get_governor()
+        
+        self.logger.info(f"GoLogin Manager initialized - Mode: {self.backend.name.upper()}")
     
-    def start_session(self, profile_id: str, headless: bool = False) -> Optional[Dict[str, Any]]:
+    def start_session(self, profile_id: str, headless: bool = False,
+                      extra_config: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
         Start a GoLogin browser session and connect Selenium.
         
         Args:
             profile_id: GoLogin profile ID
             headless: Run browser in headless mode
+            extra_config: Extra GoLogin options passed to the backend (extra_params, timeout, ...)
             
         Returns:
             Dictionary containing:
                 - driver: Selenium WebDriver instance
                 - gl: GoLogin instance
                 - tmpdir: Temporary directory path
+                - port: Remote-debugging port
                 - debugger_address: Browser debugger address
-            Returns None if session fails to start
+                - browser_version: Browser string from DevTools /json/version
+                - startup_timings: Seconds spent in each startup phase
+            Returns None if session fails to start (or the host stays over
+            its resource budgets for GOLOGIN_ADMISSION_TIMEOUT)
         """
         gl = None
         tmpdir = None
+        port = None
+        timer = StartupTimer(profile_id)
+        
+        if not self.governor.acquire(profile_id):
+            self.logger.error(f"Not starting {profile_id}: host over browser resource budget "
+                              f"({self.governor.last_denial})")
+            return None
         
         try:
             # Create temporary directory
             tmpdir = tempfile.mkdtemp(prefix="gologin_")
             self.logger.info(f"Created temp directory: {tmpdir}")
             
-            # Prepare GoLogin configuration
-            gl_config = {
-                "token": self.gologin_token,
-                "profile_id": profile_id,
-                "tmpdir": tmpdir,
-            }
-            
-            if self.use_local_mode:
-                gl_config["local"] = True
-                self.logger.info("Using LOCAL mode - connecting to Orbita on this machine")
+            port = self.ports.get_available_port(profile_id)
+            if port is None:
+                self.logger.warning("No free debugging port in range - letting GoLogin choose")
             
             # Fix UTF-8 encoding for international characters
             self._fix_encoding()
             
-            # Initialize GoLogin
-            self.logger.info(f"Initializing GoLogin with profile: {profile_id}")
-            gl = GoLogin(gl_config)
-            
             # Start browser session
-            self.logger.info("Starting browser session...")
-            debugger_address = gl.start()
+            self.logger.info(f"Starting browser session for profile {profile_id} ({self.backend.name})...")
+            gl, debugger_address = self.backend.start(
+                profile_id, tmpdir=tmpdir, port=port, timer=timer, extra_config=extra_config
+            )
             
             if not debugger_address:
-                self.logger.error("Failed to start GoLogin session - no debugger address returned")
-                return None
+                raise RuntimeError("Failed to start GoLogin session - no debugger address returned")
             
             self.logger.info(f"Browser started successfully - Debugger: {debugger_address}")
+            process = getattr(gl, 'process', None)
+            self.governor.track(profile_id, pid=getattr(process, 'pid', None),
+                                port=port or self._port_of(debugger_address))
             
-            # Wait for browser to stabilize
-            stabilization_time = 15
-            self.logger.info(f"Waiting {stabilization_time}s for browser to stabilize...")
-            time.sleep(stabilization_time)
+            # Wait until DevTools answers instead of a fixed stabilization sleep
+            version_info = wait_for_devtools(debugger_address)
+            timer.mark("cdp_ready")
+            if version_info is None:
+                raise RuntimeError(f"Browser DevTools never became ready at {debugger_address}")
             
             # Connect Selenium
-            driver = self._connect_selenium(debugger_address)
+            driver = self._connect_selenium(debugger_address, browser_version=version_info.get('Browser'))
+            timer.mark("selenium_attached")
             if not driver:
-                self.logger.error("Failed to connect Selenium to browser")
-                gl.stop()
-                shutil.rmtree(tmpdir, ignore_errors=True)
-                return None
+                raise RuntimeError("Failed to connect Selenium to browser")
             
+            record_startup(timer, success=True)
             self.logger.info("GoLogin session ready!")
             
-            return {
+            session_data = {
                 'driver': driver,
                 'gl': gl,
                 'tmpdir': tmpdir,
+                'port': port,
                 'debugger_address': debugger_address,
+                'browser_version': version_info.get('Browser'),
+                'headless': headless,
+                'status': 'active',
+                'startup_timings': timer.to_dict(),
             }
+            self.registry.register(profile_id, session_data, backend=self.backend.name)
+            session_data['profile_id'] = profile_id
+            return session_data
         
         except Exception as e:
             self.logger.error(f"Error starting GoLogin session: {e}", exc_info=True)
+            record_startup(timer, success=False)
             
             # Cleanup on error
             if gl:
                 try:
-                    gl.stop()
+                    self.backend.stop(gl)
                 except Exception:
                     pass
             
             if tmpdir:
                 shutil.rmtree(tmpdir, ignore_errors=True)
+            self.ports.release_port(port)
+            self.governor.release(profile_id)
             
             return None
     
-    def _connect_selenium(self, debugger_address: str, max_retries: int = 3) -> Optional[webdriver.Chrome]:
+    @staticmethod
+    def _port_of(debugger_address: str) -> Optional[int]:
+        """Port from a "host:port" debugger address"""
+        try:
+            return int(debugger_address.rsplit(':', 1)[1])
+        except (IndexError, ValueError):
+            return None
+    
+    def attach_session(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Attach Selenium to a browser another process (or service) started.
+        
+        The browser stays owned by that process: cleanup_session() on the
+        returned dict detaches without closing it.
+        
+        Args:
+            profile_id: GoLogin profile ID
+            
+        Returns:
+            Session dict with driver and debugger_address, or None if the
+            profile isn't running or doesn't answer
+        """
+        record = self.registry.find(profile_id)
+        if not record or not record.get('debugger_address'):
+            return None
+        
+        version_info = wait_for_devtools(record['debugger_address'], timeout=5)
+        if version_info is None:
+            self.logger.warning(f"Registered browser for {profile_id} at {record['debugger_address']} is not answering")
+            return None
+        
+        driver = self._connect_selenium(record['debugger_address'], browser_version=version_info.get('Browser'))
+        if not driver:
+            return None
+        self.logger.info(f"Attached to {profile_id} browser owned by {record.get('owner')} (pid {record.get('pid')})")
+        return {
+            'driver': driver,
+            'profile_id': profile_id,
+            'debugger_address': record['debugger_address'],
+            'browser_version': version_info.get('Browser'),
+            'attached': True,
+        }
+    
+    def _connect_selenium(self, debugger_address: str, max_retries: int = 3,
+                          browser_version: Optional[str] = None) -> Optional[webdriver.Chrome]:
         """
         Connect Selenium WebDriver to the GoLogin browser.
-        Uses webdriver-manager to automatically download matching ChromeDriver version.
+        The ChromeDriver for the browser's major version is resolved once
+        (see driver_cache.py) and its chromedriver process is shared.
         
         Args:
             debugger_address: Browser debugger address (e.g., "127.0.0.1:9222")
             max_retries: Number of connection attempts
+            browser_version: Browser version from DevTools (e.g. "Chrome/141.0.7390.54")
             
         Returns:
             WebDriver instance or None if connection fails
@@ -166,22 +245,15 @@ class GoLoginManager:
                 chrome_options.add_argument("--no-default-browser-check")
                 chrome_options.add_argument("--disable-blink-features=AutomationControlled")
                 
-                # Use webdriver-manager to get matching ChromeDriver
-                # For Orbita browser (GoLogin), try version 141 specifically
+                # Cached ChromeDriver matching the Orbita major version
+                service = get_chromedriver_service(browser_version)
                 try:
-                    # Try to use ChromeDriver version 141.x for Orbita 141
-                    service = Service(ChromeDriverManager(driver_version="141").install())
                     driver = webdriver.Chrome(service=service, options=chrome_options)
-                except Exception as version_error:
-                    self.logger.warning(f"ChromeDriver 141 failed: {version_error}, trying auto-detect")
-                    try:
-                        service = Service(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install())
-                        driver = webdriver.Chrome(service=service, options=chrome_options)
-                    except Exception as wdm_error:
-                        # Final fallback: try without specifying chrome_type
-                        self.logger.warning(f"ChromeDriverManager with CHROMIUM failed, trying default: {wdm_error}")
-                        service = Service(ChromeDriverManager().install())
-                        driver = webdriver.Chrome(service=service, options=chrome_options)
+                except WebDriverException as e:
+                    if "only supports" in str(e):
+                        # Cached driver doesn't match this browser; re-resolve next attempt
+                        invalidate_chromedriver(browser_version)
+                    raise
                 
                 # Test connection
                 driver.current_url
@@ -189,10 +261,12 @@ class GoLoginManager:
                 self.logger.info("Selenium connected successfully")
                 return driver
             
-            except WebDriverException as e:
+            except (WebDriverException, RuntimeError) as e:
                 self.logger.warning(f"Selenium connection attempt {attempt} failed: {e}")
                 if attempt < max_retries:
-                    time.sleep(2)
+                    # Back off, then make sure DevTools is still answering
+                    time.sleep(min(0.5 * 2 ** (attempt - 1), 4.0))
+                    wait_for_devtools(debugger_address, timeout=10)
                 else:
                     self.logger.error("All Selenium connection attempts failed")
                     return None
@@ -206,6 +280,18 @@ class GoLoginManager:
         Args:
             session_data: Dictionary returned by start_session()
         """
+        if session_data.get('attached'):
+            # Browser belongs to another process: end our WebDriver session
+            # only (quitting a debuggerAddress session leaves the browser running)
+            try:
+                session_data['driver'].quit()
+            except Exception as e:
+                self.logger.warning(f"Error detaching driver: {e}")
+            return
+        
+        if session_data.get('profile_id'):
+            self.registry.unregister(session_data['profile_id'])
+        
         try:
             # Close Selenium driver
             if 'driver' in session_data and session_data['driver']:
@@ -218,7 +304,7 @@ class GoLoginManager:
             # Stop GoLogin session
             if 'gl' in session_data and session_data['gl']:
                 try:
-                    session_data['gl'].stop()
+                    self.backend.stop(session_data['gl'])
                     self.logger.info("GoLogin session stopped")
                 except Exception as e:
                     self.logger.warning(f"Error stopping GoLogin: {e}")
@@ -230,6 +316,9 @@ class GoLoginManager:
                     self.logger.info(f"Temp directory cleaned: {session_data['tmpdir']}")
                 except Exception as e:
                     self.logger.warning(f"Error cleaning tmpdir: {e}")
+            
+            self.ports.release_port(session_data.get('port'))
+            self.governor.release(session_data.get('profile_id'))
         
         except Exception as e:
             self.logger.error(f"Error during session cleanup: {e}")
@@ -261,28 +350,35 @@ class GoLoginSession:
     """
     Context manager for GoLogin sessions with automatic cleanup.
     
+    Browsers are leased from the warm session pool: on exit a healthy
+    browser is kept open for the next run on the same profile instead of
+    being closed (see session_pool.py; GOLOGIN_POOL_IDLE_TTL=0 disables).
+    
     Usage:
         manager = GoLoginManager()
         with GoLoginSession(manager, profile_id) as session:
             driver = session['driver']
             driver.get('https://example.com')
             # ... automation code ...
-        # Session automatically cleaned up
+        # Session returned to the pool (or cleaned up)
     """
     
-    def __init__(self, manager: GoLoginManager, profile_id: str, headless: bool = False):
+    def __init__(self, manager: GoLoginManager, profile_id: str, headless: bool = False,
+                 pool: Optional[BrowserSessionPool] = None):
         self.manager = manager
         self.profile_id = profile_id
         self.headless = headless
+        self.pool = pool or get_session_pool()
         self.session_data = None
     
     def __enter__(self) -> Dict[str, Any]:
-        self.session_data = self.manager.start_session(self.profile_id, self.headless)
+        self.session_data = self.pool.acquire(self.manager, self.profile_id, self.headless)
         if not self.session_data:
             raise RuntimeError(f"Failed to start GoLogin session for profile {self.profile_id}")
         return self.session_data
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.session_data:
-            self.manager.cleanup_session(self.session_data)
-
+            # A WebDriver error means the browser itself may be broken
+            reusable = exc_type is None or not issubclass(exc_type, WebDriverException)
+            self.pool.release(self.session_data, reusable=reusable)
@@ -0,0 +1,423 @@
+"""
+Browser Resource Governor
+
+Admission control for browsers on one host. Every launch first acquires
+a slot; a slot is granted only while the browsers already running (their
+whole process trees, read from /proc) and the host stay under the
+configured budgets. Launches over budget wait in FIFO order until a
+browser exits or load drops, and idle pooled browsers are closed to make
+room. load() reports the current numbers so schedulers can pace launches.
+
+Budgets (environment, 0 disables a check):
+    GOLOGIN_MAX_BROWSERS          Browsers running at once (default 0)
+    GOLOGIN_MEMORY_BUDGET_MB      Total RSS of all browsers (default 0)
+    GOLOGIN_MIN_FREE_MEMORY_MB    Host MemAvailable kept free after a launch (default 1024)
+    GOLOGIN_CPU_BUDGET_PERCENT    Host CPU use above which launches wait (default 85)
+    GOLOGIN_BROWSER_MEMORY_MB     Expected RSS of a new browser until one is measured (default 1500)
+    GOLOGIN_ADMISSION_TIMEOUT     Seconds a launch waits for a slot (default 300)
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_BROWSER_MEMORY_MB = 1500
+DEFAULT_MIN_FREE_MEMORY_MB = 1024
+DEFAULT_CPU_BUDGET_PERCENT = 85.0
+DEFAULT_ADMISSION_TIMEOUT = 300.0
+SAMPLE_INTERVAL = 2.0
+
+_CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+_PAGE_KB = (os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096) // 1024
+
+
+class _Browser:
+    """A running browser holding a slot"""
+
+    def __init__(self, profile_id: str):
+        self.profile_id = profile_id
+        self.admitted_at = time.time()
+        self.pid: Optional[int] = None
+        self.port: Optional[int] = None
+        self.rss_mb = 0.0
+        self.cpu_percent = 0.0
+        self.processes = 0
+        self.alive = True
+        self._cpu_ticks: Optional[int] = None
+
+
+class ResourceGovernor:
+    """
+    Admits browser launches while running browsers stay under budget.
+
+    Args:
+        max_browsers: Browsers running at once (0 = unlimited)
+        memory_budget_mb: Total RSS of all browsers (0 = unlimited)
+        min_free_memory_mb: Host MemAvailable that must remain after a launch
+        cpu_budget_percent: Host CPU use above which launches wait (0 = unlimited)
+        browser_memory_mb: Expected RSS of a browser until one has been measured
+        admission_timeout: Default seconds acquire() waits
+        proc_root: procfs mount (for tests)
+    """
+
+    def __init__(self, max_browsers: int = 0, memory_budget_mb: float = 0,
+                 min_free_memory_mb: float = DEFAULT_MIN_FREE_MEMORY_MB,
+                 cpu_budget_percent: float = DEFAULT_CPU_BUDGET_PERCENT,
+                 browser_memory_mb: float = DEFAULT_BROWSER_MEMORY_MB,
+                 admission_timeout: float = DEFAULT_ADMISSION_TIMEOUT,
+                 proc_root: str = '/proc'):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_browsers = max_browsers
+        self.memory_budget_mb = memory_budget_mb
+        self.min_free_memory_mb = min_free_memory_mb
+        self.cpu_budget_percent = cpu_budget_percent
+        self.browser_memory_mb = browser_memory_mb
+        self.admission_timeout = admission_timeout
+        self.proc_root = proc_root
+
+        self._browsers: Dict[str, _Browser] = {}
+        self._waiters: deque = deque()
+        self._cond = threading.Condition()
+        self._pressure_handlers: List[Callable[[], bool]] = []
+
+        self._sampled_at = 0.0
+        self._host_cpu: Optional[Tuple[int, int]] = None  # (busy, total) jiffies
+        self.host_cpu_percent = 0.0
+        self.mem_available_mb: Optional[float] = None
+        self.mem_total_mb: Optional[float] = None
+        self.last_denial: Optional[str] = None
+
+        self.admitted = 0
+        self.waited = 0
+        self.timed_out = 0
+
+    # ========================================
+    # ADMISSION
+    # ========================================
+
+    def acquire(self, profile_id: str, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a slot to launch a profile's browser.
+
+        Args:
+            profile_id: GoLogin profile ID
+            timeout: Seconds to wait (default admission_timeout)
+
+        Returns:
+            True once admitted, False if no slot freed up in time
+        """
+        timeout = self.admission_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        ticket = object()
+        waited = False
+
+        with self._cond:
+            self._waiters.append(ticket)
+        try:
+            while True:
+                with self._cond:
+                    if self._waiters[0] is ticket and self._can_admit():
+                        self._waiters.popleft()
+                        self._browsers[profile_id] = _Browser(profile_id)
+                        self.admitted += 1
+                        self._cond.notify_all()
+                        return True
+                    at_head = self._waiters[0] is ticket
+
+                # Ask idle pooled browsers to make room (outside the lock:
+                # closing a browser calls release())
+                if at_head and self._relieve_pressure():
+                    continue
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timed_out += 1
+                    self.logger.warning(f"No browser slot for {profile_id} within {timeout:.0f}s "
+                                        f"({self.last_denial})")
+                    return False
+                if not waited:
+                    waited = True
+                    self.waited += 1
+                    self.logger.info(f"Launch of {profile_id} waiting for a browser slot ({self.last_denial})")
+                with self._cond:
+                    self._cond.wait(min(remaining, SAMPLE_INTERVAL))
+        finally:
+            with self._cond:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    self._cond.notify_all()
+
+    def track(self, profile_id: str, pid: Optional[int] = None, port: Optional[int] = None):
+        """
+        Attach the launched browser's process to its slot.
+
+        Args:
+            profile_id: GoLogin profile ID
+            pid: Browser main process ID, if known
+            port: Remote-debugging port (used to find the process when pid is unknown)
+        """
+        with self._cond:
+            browser = self._browsers.get(profile_id)
+            if browser is None:
+                return
+            browser.pid = pid or browser.pid
+            browser.port = port or browser.port
+            self._sampled_at = 0.0  # measure it on the next check
+
+    def release(self, profile_id: Optional[str]):
+        """Free a profile's slot (browser closed or launch failed)"""
+        if not profile_id:
+            return
+        with self._cond:
+            if self._browsers.pop(profile_id, None) is not None:
+                self._sampled_at = 0.0  # re-measure before admitting the next one
+                self._cond.notify_all()
+
+    def has_capacity(self, relieve: bool = False) -> bool:
+        """
+        Whether a launch now would be admitted without waiting.
+
+        Args:
+            relieve: If not, first ask idle pooled browsers to make room
+                     (as a waiting acquire() would)
+        """
+        with self._cond:
+            if self._waiters:
+                return False
+            if self._can_admit():
+                return True
+        if relieve and self._relieve_pressure():
+            with self._cond:
+                return not self._waiters and self._can_admit()
+        return False
+
+    def add_pressure_handler(self, handler: Callable[[], bool]):
+        """Register a callable that frees a browser when launches are waiting (returns True if it did)"""
+        self._pressure_handlers.append(handler)
+
+    def _relieve_pressure(self) -> bool:
+        for handler in self._pressure_handlers:
+            try:
+                if handler():
+                    return True
+            except Exception as e:
+                self.logger.warning(f"Pressure handler failed: {e}")
+        return False
+
+    def _can_admit(self) -> bool:
+        """Check budgets against a fresh sample (lock held); sets last_denial"""
+        self._sample()
+        running = len(self._browsers)
+        measured = [b.rss_mb for b in self._browsers.values() if b.rss_mb > 0]
+        expected_mb = sum(measured) / len(measured) if measured else self.browser_memory_mb
+        launching = sum(1 for b in self._browsers.values() if b.rss_mb <= 0)
+
+        if self.max_browsers and running >= self.max_browsers:
+            self.last_denial = f"{running}/{self.max_browsers} browsers running"
+            return False
+        # The host checks apply even with none of ours running: other services
+        # launch browsers on the same host. Our own memory budget always lets one through.
+        if self.memory_budget_mb and running:
+            projected = sum(measured) + expected_mb * (launching + 1)
+            if projected > self.memory_budget_mb:
+                self.last_denial = f"browser memory {projected:.0f}/{self.memory_budget_mb:.0f} MB"
+                return False
+        if self.min_free_memory_mb and self.mem_available_mb is not None:
+            # Browsers still launching haven't shown up in MemAvailable yet
+            free_after = self.mem_available_mb - expected_mb * (launching + 1)
+            if free_after < self.min_free_memory_mb:
+                self.last_denial = f"host would have {free_after:.0f} MB free " \
+                                   f"(min {self.min_free_memory_mb:.0f})"
+                return False
+        if self.cpu_budget_percent and self.host_cpu_percent > self.cpu_budget_percent:
+            self.last_denial = f"host CPU {self.host_cpu_percent:.0f}% > {self.cpu_budget_percent:.0f}%"
+            return False
+        self.last_denial = None
+        return True
+
+    # ========================================
+    # MEASUREMENT
+    # ========================================
+
+    def _sample(self, force: bool = False):
+        """Refresh host and per-browser usage from /proc at most every SAMPLE_INTERVAL (lock held)"""
+        now = time.monotonic()
+        if not force and now - self._sampled_at < SAMPLE_INTERVAL:
+            return
+        elapsed = now - self._sampled_at if self._sampled_at else 0.0
+        self._sampled_at = now
+
+        self._sample_host()
+        if not self._browsers or not os.path.isdir(self.proc_root):
+            return
+
+        processes = self._read_processes()
+        children: Dict[int, List[int]] = {}
+        for pid, (ppid, _, _) in processes.items():
+            children.setdefault(ppid, []).append(pid)
+
+        for browser in self._browsers.values():
+            if browser.pid is None and browser.port:
+                browser.pid = self._find_pid_by_port(browser.port, processes)
+            if browser.pid is None:
+                continue
+            if browser.pid not in processes:
+                browser.alive = False
+                browser.rss_mb = browser.cpu_percent = 0.0
+                browser.processes = 0
+                continue
+
+            tree = [browser.pid]
+            for pid in tree:
+                tree.extend(children.get(pid, ()))
+            ticks = sum(processes[pid][1] for pid in tree)
+            browser.rss_mb = sum(processes[pid][2] for pid in tree) * _PAGE_KB / 1024
+            browser.processes = len(tree)
+            if browser._cpu_ticks is not None and elapsed > 0:
+                browser.cpu_percent = max(0.0, (ticks - browser._cpu_ticks) / _CLK_TCK / elapsed * 100)
+            browser._cpu_ticks = ticks
+
+    def _sample_host(self):
+        meminfo = {}
+        try:
+            with open(os.path.join(self.proc_root, 'meminfo')) as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    meminfo[key] = int(value.split()[0]) / 1024
+            self.mem_total_mb = meminfo.get('MemTotal')
+            self.mem_available_mb = meminfo.get('MemAvailable')
+        except (OSError, ValueError, IndexError):
+            try:
+                import psutil
+                memory = psutil.virtual_memory()
+                self.mem_total_mb = memory.total / (1024 * 1024)
+                self.mem_available_mb = memory.available / (1024 * 1024)
+            except ImportError:
+                pass
+
+        try:
+            with open(os.path.join(self.proc_root, 'stat')) as f:
+                values = [int(v) for v in f.readline().split()[1:]]
+            idle = values[3] + (values[4] if len(values) > 4 else 0)
+            total = sum(values[:8])
+            busy = total - idle
+            if self._host_cpu is not None and total > self._host_cpu[1]:
+                self.host_cpu_percent = 100.0 * (busy - self._host_cpu[0]) / (total - self._host_cpu[1])
+            self._host_cpu = (busy, total)
+        except (OSError, ValueError, IndexError):
+            try:
+                import psutil
+                self.host_cpu_percent = psutil.cpu_percent(interval=None)
+            except ImportError:
+                pass
+
+    def _read_processes(self) -> Dict[int, Tuple[int, int, int]]:
+        """pid -> (ppid, utime+stime ticks, rss pages) for every process"""
+        processes = {}
+        for entry in os.listdir(self.proc_root):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(os.path.join(self.proc_root, entry, 'stat')) as f:
+                    stat = f.read()
+                # comm may contain spaces/parens; fields resume after the last ')'
+                fields = stat[stat.rindex(')') + 2:].split()
+                processes[int(entry)] = (int(fields[1]), int(fields[11]) + int(fields[12]), int(fields[21]))
+            except (OSError, ValueError, IndexError):
+                continue
+        return processes
+
+    def _find_pid_by_port(self, port: int, processes: Dict[int, Tuple[int, int, int]]) -> Optional[int]:
+        """Browser main process: the topmost one launched with --remote-debugging-port=<port>"""
+        flag = f'--remote-debugging-port={port}'.encode()
+        matches = set()
+        for pid in processes:
+            try:
+                with open(os.path.join(self.proc_root, str(pid), 'cmdline'), 'rb') as f:
+                    if flag in f.read().split(b'\0'):
+                        matches.add(pid)
+            except OSError:
+                continue
+        roots = [pid for pid in matches if processes[pid][0] not in matches]
+        return min(roots) if roots else None
+
+    # ========================================
+    # REPORTING
+    # ========================================
+
+    def usage(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Latest RSS/CPU of a profile's browser process tree, or None if it isn't tracked"""
+        with self._cond:
+            self._sample()
+            browser = self._browsers.get(profile_id)
+            if browser is None or browser.pid is None:
+                return None
+            return {
+                "pid": browser.pid,
+                "processes": browser.processes,
+                "rss_mb": round(browser.rss_mb, 1),
+                "cpu_percent": round(browser.cpu_percent, 1),
+            }
+
+    def load(self) -> Dict[str, Any]:
+        """Current browser and host load, budgets, and whether a launch would be admitted"""
+        with self._cond:
+            self._sample(force=True)
+            can_admit = not self._waiters and self._can_admit()
+            browsers = [
+                {
+                    "profile_id": b.profile_id,
+                    "pid": b.pid,
+                    "port": b.port,
+                    "alive": b.alive,
+                    "processes": b.processes,
+                    "rss_mb": round(b.rss_mb, 1),
+                    "cpu_percent": round(b.cpu_percent, 1),
+                    "running_seconds": round(time.time() - b.admitted_at, 1),
+                }
+                for b in self._browsers.values()
+            ]
+            return {
+                "running": len(browsers),
+                "waiting": len(self._waiters),
+                "can_admit": can_admit,
+                "denial": self.last_denial,
+                "browsers_rss_mb": round(sum(b["rss_mb"] for b in browsers), 1),
+                "browsers_cpu_percent": round(sum(b["cpu_percent"] for b in browsers), 1),
+                "host_cpu_percent": round(self.host_cpu_percent, 1),
+                "host_mem_available_mb": round(self.mem_available_mb) if self.mem_available_mb is not None else None,
+                "host_mem_total_mb": round(self.mem_total_mb) if self.mem_total_mb is not None else None,
+                "budgets": {
+                    "max_browsers": self.max_browsers,
+                    "memory_budget_mb": self.memory_budget_mb,
+                    "min_free_memory_mb": self.min_free_memory_mb,
+                    "cpu_budget_percent": self.cpu_budget_percent,
+                },
+                "admitted": self.admitted,
+                "waited": self.waited,
+                "timed_out": self.timed_out,
+                "browsers": browsers,
+            }
+
+
+_governor: Optional[ResourceGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> ResourceGovernor:
+    """Process-wide governor configured from the environment"""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = ResourceGovernor(
+                max_browsers=int(os.getenv('GOLOGIN_MAX_BROWSERS', '0')),
+                memory_budget_mb=float(os.getenv('GOLOGIN_MEMORY_BUDGET_MB', '0')),
+                min_free_memory_mb=float(os.getenv('GOLOGIN_MIN_FREE_MEMORY_MB', DEFAULT_MIN_FREE_MEMORY_MB)),
+                cpu_budget_percent=float(os.getenv('GOLOGIN_CPU_BUDGET_PERCENT', DEFAULT_CPU_BUDGET_PERCENT)),
+                browser_memory_mb=float(os.getenv('GOLOGIN_BROWSER_MEMORY_MB', DEFAULT_BROWSER_MEMORY_MB)),
+                admission_timeout=float(os.getenv('GOLOGIN_ADMISSION_TIMEOUT', DEFAULT_ADMISSION_TIMEOUT)),
+            )
+        return _governor
@@ -0,0 +1,196 @@
+"""
+Debugging Port Allocation
+
+One allocator for every local Orbita launch on the machine, so two
+browsers never try to listen on the same remote-debugging port.
+
+Free ports are kept in a free-list, so handing one out does not scan the
+range. Every allocation is recorded as a lease (profile_id, pid, expiry)
+in a shared JSON file under the state directory; leases survive
+restarts and are reclaimed once their owning process is gone or they
+expire, so ports of crashed sessions return to the range.
+
+Configuration (environment):
+    GOLOGIN_PORT_RANGE_START   First port handed out (default 3500)
+    GOLOGIN_PORT_RANGE_END     Last port handed out (default 3600)
+    GOLOGIN_PORT_LEASE_TTL     Seconds a lease is valid without renew() (default 0 = until released)
+"""
+
+import os
+import time
+import socket
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set
+
+from .state import STATE_DIR, file_lock, read_json, write_json, pid_alive
+
+
+class PortAllocator:
+    """
+    Hands out free TCP ports from a fixed range.
+
+    Args:
+        start_port: First port in the range
+        end_port: Last port in the range (inclusive)
+        path: Shared lease file (default <state dir>/ports.json)
+        lease_ttl: Seconds a lease is valid without renew() (0 = until released)
+    """
+
+    def __init__(self, start_port: int = 3500, end_port: int = 3600,
+                 path: Optional[str] = None, lease_ttl: float = 0):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.start_port = start_port
+        self.end_port = end_port
+        self.path = path or os.path.join(STATE_DIR, 'ports.json')
+        self.lock_path = self.path + '.lock'
+        self.lease_ttl = lease_ttl
+        self.pid = os.getpid()
+
+        self.used_ports: Set[int] = set()  # leased by this process
+        self.lock = threading.Lock()
+        self._free: Deque[int] = deque(range(start_port, end_port + 1))
+        self._leased_elsewhere = 0
+
+    def get_available_port(self, profile_id: Optional[str] = None) -> Optional[int]:
+        """
+        Lease a free, bindable port.
+
+        Args:
+            profile_id: Profile the port is for (recorded in the lease)
+
+        Returns:
+            The port, or None if the range is exhausted
+        """
+        with self.lock:
+            try:
+                with file_lock(self.lock_path):
+                    leases = self._read_leases()
+                    port = self._take(leases)
+                    if port is not None:
+                        leases[str(port)] = self._lease(profile_id)
+                        write_json(self.path, leases)
+            except OSError as e:
+                # Without the lease file ports are still unique within this process
+                self.logger.warning(f"Could not update port leases {self.path}: {e}")
+                port = self._take({})
+
+            if port is not None:
+                self.used_ports.add(port)
+            return port
+
+    def release_port(self, port: Optional[int]):
+        """Return a port to the range"""
+        if port is None:
+            return
+        with self.lock:
+            if port not in self.used_ports:
+                return
+            self.used_ports.discard(port)
+            self._free.append(port)
+            try:
+                with file_lock(self.lock_path):
+                    leases = self._read_leases()
+                    if leases.get(str(port), {}).get('pid') == self.pid:
+                        del leases[str(port)]
+                        write_json(self.path, leases)
+            except OSError as e:
+                self.logger.warning(f"Could not update port leases {self.path}: {e}")
+
+    def renew(self, port: int):
+        """Extend a lease of this process by lease_ttl (no-op without a TTL)"""
+        if not self.lease_ttl:
+            return
+        with self.lock, file_lock(self.lock_path):
+            leases = self._read_leases()
+            lease = leases.get(str(port))
+            if lease and lease.get('pid') == self.pid:
+                lease['expires_at'] = time.time() + self.lease_ttl
+                write_json(self.path, leases)
+
+    def leases(self) -> Dict[str, Dict[str, Any]]:
+        """Live leases of every process, keyed by port"""
+        with self.lock, file_lock(self.lock_path):
+            return self._read_leases()
+
+    @property
+    def available_count(self) -> int:
+        """Free ports as of this process's last look at the lease file"""
+        return (self.end_port - self.start_port + 1) - len(self.used_ports) - self._leased_elsewhere
+
+    # ========================================
+    # INTERNALS (self.lock and the file lock held)
+    # ========================================
+
+    def _lease(self, profile_id: Optional[str]) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            'profile_id': profile_id,
+            'pid': self.pid,
+            'leased_at': now,
+            'expires_at': now + self.lease_ttl if self.lease_ttl else None,
+        }
+
+    def _read_leases(self) -> Dict[str, Dict[str, Any]]:
+        """Lease file without leases of dead processes, expired or stale ones"""
+        leases = read_json(self.path, {})
+        now = time.time()
+        live = {}
+        for key, lease in leases.items():
+            pid = lease.get('pid')
+            expires_at = lease.get('expires_at')
+            if pid == self.pid:
+                alive = int(key) in self.used_ports
+            else:
+                alive = pid_alive(pid) and not (expires_at and expires_at < now)
+            if alive:
+                live[key] = lease
+            else:
+                self.logger.info(f"Reclaimed port {key} from {lease.get('profile_id')} (pid {pid})")
+
+        if len(live) != len(leases):
+            write_json(self.path, live)
+        self._leased_elsewhere = sum(
+            1 for key, lease in live.items()
+            if lease.get('pid') != self.pid and self.start_port <= int(key) <= self.end_port
+        )
+        return live
+
+    def _take(self, leases: Dict[str, Dict[str, Any]]) -> Optional[int]:
+        """Pop the first free-list port not leased elsewhere and bindable"""
+        for _ in range(len(self._free)):
+            port = self._free.popleft()
+            if str(port) not in leases and self._bindable(port):
+                return port
+            # Busy for now (another process or a foreign listener); retry it last
+            self._free.append(port)
+        return None
+
+    @staticmethod
+    def _bindable(port: int) -> bool:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind(('127.0.0.1', port))
+            return True
+        except OSError:
+            return False
+        finally:
+            sock.close()
+
+
+_allocator: Optional[PortAllocator] = None
+_allocator_lock = threading.Lock()
+
+
+def get_port_allocator() -> PortAllocator:
+    """Process-wide port allocator configured from the environment"""
+    global _allocator
+    with _allocator_lock:
+        if _allocator is None:
+            _allocator = PortAllocator(
+                int(os.getenv('GOLOGIN_PORT_RANGE_START', '3500')),
+                int(os.getenv('GOLOGIN_PORT_RANGE_END', '3600')),
+                lease_ttl=float(os.getenv('GOLOGIN_PORT_LEASE_TTL', '0')),
+            )
+        return _allocator
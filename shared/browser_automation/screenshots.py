@@ -0,0 +1,362 @@
+"""
+Background Screenshot Service
+
+Screenshots are the audit trail of every worker, but a full-resolution PNG
+written synchronously per action is slow and fills the disk. This service
+takes over everything after the grab:
+
+- the grab itself stays on the caller's thread (the driver belongs to it)
+  and is compressed by the browser where possible: CDP
+  ``Page.captureScreenshot`` in WebP/JPEG instead of a PNG;
+- hashing, re-encoding and the disk write run on one background thread;
+- a frame whose perceptual (difference) hash is within ``hash_threshold``
+  bits of the profile's previous frame is not stored, unless forced, so a
+  routine frame's path is only known once it is written (``on_saved``);
+- each profile has a disk quota under ``<root>/<profile_id>/``; the least
+  recently used frames are evicted once it is exceeded.
+
+Pillow is optional. Without it frames are kept in the format the browser
+produced and only byte-identical frames are skipped.
+
+Configuration (environment):
+    SCREENSHOT_QUOTA_MB     Per-profile disk quota (default 200)
+    SCREENSHOT_FORMAT       webp or jpeg (default webp)
+    SCREENSHOT_QUALITY      Encoder quality 1-100 (default 60)
+"""
+
+import io
+import os
+import re
+import time
+import queue
+import atexit
+import base64
+import hashlib
+import logging
+import itertools
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    from PIL import Image, features
+except ImportError:  # optional: frames are stored as captured
+    Image = None
+
+DEFAULT_QUOTA_MB = float(os.getenv('SCREENSHOT_QUOTA_MB', '200'))
+DEFAULT_FORMAT = os.getenv('SCREENSHOT_FORMAT', 'webp').lower()
+DEFAULT_QUALITY = int(os.getenv('SCREENSHOT_QUALITY', '60'))
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+PIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG', 'png': 'PNG'}
+
+# CDP errors meaning the browser rejects the requested format (older builds and webp)
+FORMAT_REJECTED = ('format', 'invalid parameters')
+# CDP errors meaning the driver has no CDP at all (remote/non-Chromium drivers)
+CDP_UNSUPPORTED = ('unknown command', 'not supported', 'not implemented', 'unknown method')
+
+_STOP = object()
+
+
+class ScreenshotService:
+    """
+    Captures, de-duplicates, compresses and stores screenshots per profile.
+
+    Args:
+        root: Directory holding one sub-directory per profile
+        quota_mb: Disk quota per profile
+        image_format: 'webp' or 'jpeg' (WebP falls back to JPEG when unsupported)
+        quality: Encoder quality 1-100
+        max_width: Wider frames are scaled down (Pillow only)
+        hash_threshold: Max differing hash bits (of 64) for a frame to count as unchanged
+        queue_size: Frames waiting for the background thread before new ones are dropped
+    """
+
+    def __init__(self, root: str, quota_mb: float = DEFAULT_QUOTA_MB, image_format: str = DEFAULT_FORMAT,
+                 quality: int = DEFAULT_QUALITY, max_width: int = 1280, hash_threshold: int = 4,
+                 queue_size: int = 64):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.root = str(root)
+        self.quota_bytes = int(quota_mb * 1024 * 1024)
+        self.image_format = image_format if image_format in ('webp', 'jpeg') else 'jpeg'
+        if self.image_format == 'webp' and Image is not None and not features.check('webp'):
+            self.image_format = 'jpeg'
+        self.quality = quality
+        self.max_width = max_width
+        self.hash_threshold = hash_threshold
+
+        self.saved = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.evicted = 0
+
+        self._names = itertools.count()  # keeps same-named frames of one millisecond apart
+
+        # Per driver: the CDP format it accepts, None if it has no CDP (default: image_format)
+        self._cdp_formats: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+        self._last_hash: Dict[str, Any] = {}
+        self._index: Dict[str, OrderedDict] = {}  # profile_id -> path -> size, least recently used first
+        self._usage: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name='screenshots', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush, 10.0)
+
+    # ========================================
+    # CAPTURE
+    # ========================================
+
+    def capture(self, driver, profile_id: str, name: str, force: bool = False,
+                on_saved: Optional[Callable[[str], None]] = None) -> Union[str, bool, None]:
+        """
+        Grab the driver's viewport and queue it for storage.
+
+        Args:
+            driver: Selenium WebDriver
+            profile_id: Profile the frame belongs to
+            name: Short label, part of the file name
+            force: Store even if unchanged (errors, proof of an action)
+            on_saved: Called with the path from the background thread once written
+
+        Returns:
+            See ``submit``; None also if the frame could not be taken
+        """
+        try:
+            data, image_format = self._grab(driver)
+        except Exception as e:
+            self.logger.warning(f"Screenshot {name} of {profile_id} failed: {e}")
+            return None
+        return self.submit(data, profile_id, name, image_format=image_format, force=force, on_saved=on_saved)
+
+    def submit(self, data: bytes, profile_id: str, name: str, image_format: str = 'png',
+               force: bool = False, on_saved: Optional[Callable[[str], None]] = None) -> Union[str, bool, None]:
+        """
+        Queue an already captured image (e.g. from Playwright) for storage.
+
+        Returns:
+            Path the frame is written to if ``force`` is set. A routine frame may
+            still be skipped as unchanged, so it only returns True (queued); its
+            path goes to ``on_saved`` if it is written. None if the queue was full.
+        """
+        stored_format = self.image_format if Image is not None else image_format
+        now = time.time()
+        stamp = f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(now))}_{int(now * 1000) % 1000:03d}"
+        filename = f"{stamp}_{next(self._names) % 10000:04d}_{_safe(name)}.{EXTENSIONS[stored_format]}"
+        path = os.path.join(self.root, _safe(profile_id), filename)
+        item = (data, image_format, stored_format, profile_id, path, force, on_saved)
+        try:
+            # Forced frames wait briefly for room; routine ones are dropped under load
+            if force:
+                self._queue.put(item, timeout=5)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            self.logger.debug(f"Screenshot queue full, dropped {name} of {profile_id}")
+            return None
+        return path if force else True
+
+    def _grab(self, driver):
+        """Viewport image and its format; the browser compresses it over CDP when it can"""
+        cdp_format = self._cdp_format(driver)
+        if cdp_format and hasattr(driver, 'execute_cdp_cmd'):
+            try:
+                result = driver.execute_cdp_cmd('Page.captureScreenshot', {
+                    'format': cdp_format, 'quality': self.quality, 'captureBeyondViewport': False
+                })
+                return base64.b64decode(result['data']), cdp_format
+            except Exception as e:
+                message = str(e).lower()
+                if any(reason in message for reason in FORMAT_REJECTED):
+                    # Older builds reject webp
+                    fallback = 'jpeg' if cdp_format == 'webp' else None
+                elif any(reason in message for reason in CDP_UNSUPPORTED):
+                    fallback = None
+                else:
+                    raise  # e.g. the browser is gone: says nothing about other drivers or formats
+                self._remember_cdp_format(driver, fallback)
+                self.logger.debug(f"CDP {cdp_format} screenshot unavailable ({e}), falling back")
+                if fallback:
+                    return self._grab(driver)
+        return driver.get_screenshot_as_png(), 'png'
+
+    def _cdp_format(self, driver) -> Optional[str]:
+        try:
+            return self._cdp_formats.get(driver, self.image_format)
+        except TypeError:  # not weak-referenceable
+            return self.image_format
+
+    def _remember_cdp_format(self, driver, cdp_format: Optional[str]):
+        try:
+            self._cdp_formats[driver] = cdp_format
+        except TypeError:
+            pass
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until every queued frame has been processed"""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    # ========================================
+    # BACKGROUND THREAD
+    # ========================================
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            try:
+                self._store(*item)
+            except Exception as e:
+                self.logger.error(f"Storing screenshot {item[4]} failed: {e}")
+
+    def _store(self, data: bytes, image_format: str, stored_format: str, profile_id: str,
+               path: str, force: bool, on_saved: Optional[Callable[[str], None]]):
+        image = None
+        if Image is not None:
+            image = Image.open(io.BytesIO(data))
+            frame_hash = _difference_hash(image)
+        else:
+            frame_hash = hashlib.sha1(data).digest()
+
+        previous = self._last_hash.get(profile_id)
+        self._last_hash[profile_id] = frame_hash
+        if not force and previous is not None and _similar(previous, frame_hash, self.hash_threshold):
+            self.skipped += 1
+            return
+
+        if image is not None and (image_format != stored_format or image.width > self.max_width):
+            data = self._encode(image, stored_format)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self.saved += 1
+
+        self._account(profile_id, path, len(data))
+        if on_saved:
+            on_saved(path)
+
+    def _encode(self, image, stored_format: str) -> bytes:
+        if image.width > self.max_width:
+            image = image.resize((self.max_width, round(image.height * self.max_width / image.width)))
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        out = io.BytesIO()
+        image.save(out, PIL_FORMATS[stored_format], quality=self.quality)
+        return out.getvalue()
+
+    # ========================================
+    # QUOTA
+    # ========================================
+
+    def _load_index(self, profile_id: str) -> OrderedDict:
+        """Files already on disk for a profile, least recently used first (by mtime)"""
+        index = self._index.get(profile_id)
+        if index is None:
+            directory = os.path.join(self.root, _safe(profile_id))
+            entries = []
+            if os.path.isdir(directory):
+                for entry in os.scandir(directory):
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.path, stat.st_size))
+            index = self._index[profile_id] = OrderedDict((p, size) for _, p, size in sorted(entries))
+            self._usage[profile_id] = sum(index.values())
+        return index
+
+    def _account(self, profile_id: str, path: str, size: int):
+        with self._lock:
+            index = self._load_index(profile_id)
+            self._usage[profile_id] += size - index.pop(path, 0)
+            index[path] = size
+            while self._usage[profile_id] > self.quota_bytes and len(index) > 1:
+                oldest, oldest_size = index.popitem(last=False)
+                self._usage[profile_id] -= oldest_size
+                try:
+                    os.remove(oldest)
+                except OSError:
+                    pass
+                self.evicted += 1
+
+    def touch(self, path: str):
+        """Mark a stored frame as used so it is evicted last"""
+        with self._lock:
+            for index in self._index.values():
+                if path in index:
+                    index.move_to_end(path)
+                    break
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def frames(self, profile_id: str, limit: Optional[int] = None) -> List[str]:
+        """Stored frames of a profile, most recently used first"""
+        with self._lock:
+            paths = list(reversed(self._load_index(profile_id)))
+        return paths[:limit] if limit else paths
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            usage = {profile_id: round(size / (1024 * 1024), 1) for profile_id, size in self._usage.items()}
+        return {
+            'saved': self.saved,
+            'skipped_unchanged': self.skipped,
+            'dropped': self.dropped,
+            'evicted': self.evicted,
+            'queued': self._queue.qsize(),
+            'usage_mb': usage,
+        }
+
+    def close(self, timeout: float = 30.0):
+        """Process queued frames and stop the background thread"""
+        self.flush(timeout)
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+def _safe(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9._@-]+', '_', str(name))[:80] or 'frame'
+
+
+def _difference_hash(image) -> int:
+    """64-bit dHash: brightness gradients of a 9x8 grayscale thumbnail"""
+    pixels = image.convert('L').resize((9, 8)).tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def _similar(previous, current, threshold: int) -> bool:
+    if isinstance(current, int) and isinstance(previous, int):
+        return bin(previous ^ current).count('1') <= threshold
+    return previous == current
+
+
+_services: Dict[str, ScreenshotService] = {}
+_services_lock = threading.Lock()
+
+
+def get_screenshot_service(root: str, **kwargs) -> ScreenshotService:
+    """Get the process-wide screenshot service for a directory (kwargs apply on creation)"""
+    key = os.path.abspath(str(root))
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = ScreenshotService(key, **kwargs)
+        return service
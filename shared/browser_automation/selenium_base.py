@@ -7,7 +7,7 @@ Common Selenium operations and helper functions for browser automation.
 import time
 import logging
 import os
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict, Sequence
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -20,6 +20,8 @@ from selenium.common.exceptions import (
     WebDriverException
 )
 
+from .element_snapshot import ElementRecord, DEFAULT_FIELDS, snapshot_elements
+
 
 class SeleniumBase:
     """Base class providing common Selenium utilities."""
@@ -328,6 +330,40 @@ class SeleniumBase:
         except (NoSuchElementException, StaleElementReferenceException):
             return False
     
+    def snapshot(
+        self,
+        selector: str,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        by: By = By.CSS_SELECTOR,
+        root: Optional[webdriver.remote.webelement.WebElement] = None,
+        related: Optional[Dict[str, Tuple[str, str, int]]] = None,
+        limit: Optional[int] = None,
+        visible_only: bool = False
+    ) -> List[ElementRecord]:
+        """
+        Read text, attributes, visibility and boxes of all matches in one call.
+        
+        Args:
+            selector: Element selector (CSS or XPath)
+            fields: Fields to read ('text', 'visible', 'enabled', 'rect', 'tag' or an attribute)
+            by: By.CSS_SELECTOR or By.XPATH
+            root: Element to search within (default: whole page)
+            related: {key: (css, field, levels_up)} values read from a nearby element
+            limit: Maximum number of records
+            visible_only: Skip invisible matches
+            
+        Returns:
+            List of ElementRecords (``record.element`` resolves the WebElement on demand)
+        """
+        try:
+            return snapshot_elements(
+                self.driver, selector, fields, by=by, root=root,
+                related=related, limit=limit, visible_only=visible_only
+            )
+        except WebDriverException as e:
+            self.logger.warning(f"Snapshot failed for {selector}: {e}")
+            return []
+    
     def take_screenshot(self, filename: str, directory: str = "logs/screenshots") -> bool:
         """
         Take a screenshot and save to file.
@@ -0,0 +1,259 @@
+"""
+Warm GoLogin Session Pool
+
+Keeps recently used browsers open so back-to-back runs on the same profile
+skip the cold start (profile download, Orbita launch, Selenium attach).
+
+A session is leased to one worker at a time. When it is returned, extra
+tabs are closed, and it stays idle until it is leased again, its idle TTL
+expires, or the idle cap evicts it. Every lease health-checks the browser
+first; dead ones are cleaned up and replaced by a cold start.
+
+Configuration (environment):
+    GOLOGIN_POOL_IDLE_TTL   Seconds an idle browser is kept (default 300, 0 disables pooling)
+    GOLOGIN_POOL_MAX_IDLE   Max idle browsers kept at once (default 2)
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .governor import get_governor
+
+DEFAULT_IDLE_TTL = 300
+DEFAULT_MAX_IDLE = 2
+REAPER_INTERVAL = 30
+
+
+class _PooledSession:
+    """Pool bookkeeping for one browser"""
+
+    def __init__(self, key: Tuple[str, bool], manager, session_data: Dict[str, Any]):
+        self.key = key
+        self.manager = manager
+        self.session_data = session_data
+        self.created_at = time.monotonic()
+        self.idle_since: Optional[float] = None
+        self.leases = 0
+
+
+class BrowserSessionPool:
+    """
+    Pool of warm GoLogin browser sessions, at most one per profile.
+
+    Args:
+        idle_ttl: Seconds an idle session is kept (0 disables pooling)
+        max_idle: Max idle sessions kept at once (oldest evicted first)
+    """
+
+    def __init__(self, idle_ttl: float = DEFAULT_IDLE_TTL, max_idle: int = DEFAULT_MAX_IDLE):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.idle_ttl = idle_ttl
+        self.max_idle = max_idle
+
+        self._idle: Dict[Tuple[str, bool], _PooledSession] = {}
+        self._leased: Dict[int, _PooledSession] = {}  # id(session_data) -> entry
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+        self.cold_starts = 0
+        self.warm_leases = 0
+        self.health_failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.idle_ttl > 0 and self.max_idle > 0
+
+    # ========================================
+    # LEASING
+    # ========================================
+
+    def acquire(self, manager, profile_id: str, headless: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Lease a browser for a profile, warm if one is idle and healthy.
+
+        Args:
+            manager: GoLoginManager used for cold starts (and later cleanup)
+            profile_id: GoLogin profile ID
+            headless: Run browser in headless mode
+
+        Returns:
+            Session dict as from GoLoginManager.start_session(), or None
+        """
+        key = (profile_id, headless)
+        with self._lock:
+            entry = self._idle.pop(key, None)
+
+        if entry is not None:
+            if self._is_healthy(entry) and not self._expired(entry):
+                entry.idle_since = None
+                entry.leases += 1
+                entry.session_data['reused'] = True
+                with self._lock:
+                    self._leased[id(entry.session_data)] = entry
+                    self.warm_leases += 1
+                self.logger.info(f"Reusing warm browser for profile {profile_id} (lease #{entry.leases})")
+                return entry.session_data
+            self._close(entry, reason="unhealthy or expired")
+
+        session_data = manager.start_session(profile_id, headless)
+        if not session_data:
+            return None
+        session_data['reused'] = False
+        entry = _PooledSession(key, manager, session_data)
+        entry.leases = 1
+        with self._lock:
+            self._leased[id(session_data)] = entry
+            self.cold_starts += 1
+        return session_data
+
+    def has_idle(self, profile_id: str) -> bool:
+        """Whether a warm browser is waiting for this profile (its run needs no launch)"""
+        with self._lock:
+            return any(key[0] == profile_id for key in self._idle)
+
+    def release(self, session_data: Dict[str, Any], reusable: bool = True):
+        """
+        Return a leased session. It is kept warm if pooling is enabled,
+        reusable is True and the browser still responds; otherwise closed.
+        """
+        with self._lock:
+            entry = self._leased.pop(id(session_data), None)
+        if entry is None:
+            self.logger.warning("Released a session that was not leased from this pool")
+            return
+
+        if not (self.enabled and reusable and self._reset(entry)):
+            self._close(entry, reason="not reusable")
+            return
+
+        entry.idle_since = time.monotonic()
+        evicted = []
+        with self._lock:
+            previous = self._idle.pop(entry.key, None)
+            if previous is not None:
+                evicted.append(previous)
+            self._idle[entry.key] = entry
+            while len(self._idle) > self.max_idle:
+                oldest = min(self._idle.values(), key=lambda e: e.idle_since)
+                evicted.append(self._idle.pop(oldest.key))
+            self._ensure_reaper()
+
+        for old in evicted:
+            self._close(old, reason="idle cap")
+        self.logger.info(f"Browser for profile {entry.key[0]} kept warm for {self.idle_ttl}s")
+
+    # ========================================
+    # HEALTH & RESET
+    # ========================================
+
+    def _expired(self, entry: _PooledSession) -> bool:
+        return entry.idle_since is not None and time.monotonic() - entry.idle_since > self.idle_ttl
+
+    def _is_healthy(self, entry: _PooledSession) -> bool:
+        """Browser still answers WebDriver commands"""
+        try:
+            driver = entry.session_data['driver']
+            driver.execute_script("return 1")
+            return bool(driver.window_handles)
+        except Exception as e:
+            self.health_failures += 1
+            self.logger.warning(f"Pooled browser for profile {entry.key[0]} failed health check: {e}")
+            return False
+
+    def _reset(self, entry: _PooledSession) -> bool:
+        """Close extra tabs and blank the page so the next lease starts clean"""
+        try:
+            driver = entry.session_data['driver']
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Could not reset browser for profile {entry.key[0]}: {e}")
+            return False
+
+    def _close(self, entry: _PooledSession, reason: str):
+        self.logger.info(f"Closing browser for profile {entry.key[0]} ({reason})")
+        entry.manager.cleanup_session(entry.session_data)
+
+    # ========================================
+    # IDLE REAPER
+    # ========================================
+
+    def _ensure_reaper(self):
+        """Start the idle reaper thread (lock held)"""
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap_loop, name="gologin-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        while not self._stop.wait(min(REAPER_INTERVAL, self.idle_ttl)):
+            self.reap()
+
+    def reap(self):
+        """Close idle sessions past their TTL"""
+        with self._lock:
+            expired = [entry for entry in self._idle.values() if self._expired(entry)]
+            for entry in expired:
+                del self._idle[entry.key]
+        for entry in expired:
+            self._close(entry, reason="idle TTL")
+
+    def evict_idle(self) -> bool:
+        """Close the longest-idle session to free resources; False if none is idle"""
+        with self._lock:
+            if not self._idle:
+                return False
+            oldest = min(self._idle.values(), key=lambda e: e.idle_since)
+            del self._idle[oldest.key]
+        self._close(oldest, reason="resource pressure")
+        return True
+
+    def close_all(self):
+        """Close every idle session (leased ones are closed on release)"""
+        self._stop.set()
+        with self._lock:
+            idle = list(self._idle.values())
+            self._idle.clear()
+            self.idle_ttl = 0
+        for entry in idle:
+            self._close(entry, reason="shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "idle_profiles": [key[0] for key in self._idle],
+                "cold_starts": self.cold_starts,
+                "warm_leases": self.warm_leases,
+                "health_failures": self.health_failures,
+                "idle_ttl": self.idle_ttl,
+                "max_idle": self.max_idle,
+            }
+
+
+_pool: Optional[BrowserSessionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> BrowserSessionPool:
+    """Process-wide session pool configured from the environment"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserSessionPool(
+                idle_ttl=float(os.getenv('GOLOGIN_POOL_IDLE_TTL', DEFAULT_IDLE_TTL)),
+                max_idle=int(os.getenv('GOLOGIN_POOL_MAX_IDLE', DEFAULT_MAX_IDLE)),
+            )
+            atexit.register(_pool.close_all)
+            get_governor().add_pressure_handler(_pool.evict_idle)
+        return _pool
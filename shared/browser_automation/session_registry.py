@@ -0,0 +1,160 @@
+"""
+Live Browser Session Registry
+
+One registry of running GoLogin browsers for every session manager.
+Each process keeps its own sessions (driver and GoLogin handles) in
+memory and publishes a serializable record of them to a shared JSON file,
+so any service can see which profiles are running where and attach to a
+browser's debugger address. Records of processes that died are dropped
+the next time the file is read.
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from .state import STATE_DIR, file_lock, read_json, write_json, pid_alive
+
+# Session dict keys that are copied into the shared record
+PUBLIC_FIELDS = ('debugger_address', 'ws_endpoint', 'port', 'browser_version', 'headless', 'execution_mode', 'status')
+
+
+class SessionRegistry:
+    """
+    Registry of live browser sessions keyed by profile ID.
+
+    Args:
+        path: Shared registry file (default <state dir>/sessions.json)
+        owner: Name recorded for sessions started by this process
+    """
+
+    def __init__(self, path: Optional[str] = None, owner: Optional[str] = None):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.path = path or os.path.join(STATE_DIR, 'sessions.json')
+        self.lock_path = self.path + '.lock'
+        self.owner = owner or os.getenv('SERVICE_NAME') or os.path.basename(sys.argv[0] or 'python')
+        self.pid = os.getpid()
+
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    # ========================================
+    # THIS PROCESS
+    # ========================================
+
+    def register(self, profile_id: str, session: Dict[str, Any], backend: str) -> Dict[str, Any]:
+        """
+        Track a session started by this process and publish its record.
+
+        Args:
+            profile_id: GoLogin profile ID
+            session: Session dict (driver, GoLogin handle, debugger_address, ...)
+            backend: Backend that launched it ("local", "cloud", "cloud_browser")
+
+        Returns:
+            The published record
+        """
+        record = {
+            'profile_id': profile_id,
+            'backend': backend,
+            'owner': self.owner,
+            'pid': self.pid,
+            'started_at': session.get('start_time') or time.time(),
+        }
+        record.update({key: session[key] for key in PUBLIC_FIELDS if session.get(key) is not None})
+
+        with self._lock:
+            session.setdefault('start_time', record['started_at'])
+            session['backend'] = backend
+            self._sessions[profile_id] = session
+            self._publish(profile_id, record)
+        return record
+
+    def unregister(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Stop tracking a session of this process; returns its session dict"""
+        with self._lock:
+            session = self._sessions.pop(profile_id, None)
+            self._publish(profile_id, None)
+        return session
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Session dict of a profile running in this process"""
+        with self._lock:
+            return self._sessions.get(profile_id)
+
+    def __contains__(self, profile_id: str) -> bool:
+        with self._lock:
+            return profile_id in self._sessions
+
+    def local_sessions(self, backend: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of this process's sessions, optionally for one backend"""
+        with self._lock:
+            return {
+                profile_id: session for profile_id, session in self._sessions.items()
+                if backend is None or session.get('backend') == backend
+            }
+
+    # ========================================
+    # ALL PROCESSES
+    # ========================================
+
+    def list_sessions(self, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Records of live sessions across every process on this machine"""
+        with file_lock(self.lock_path):
+            records = self._read_live()
+        return [
+            record for record in records.values()
+            if backend is None or record.get('backend') == backend
+        ]
+
+    def find(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Record of a running profile, whichever process owns it"""
+        with file_lock(self.lock_path):
+            return self._read_live().get(profile_id)
+
+    def _read_live(self) -> Dict[str, Dict[str, Any]]:
+        """Registry contents without records of dead processes (lock held)"""
+        records = read_json(self.path, {})
+        live = {
+            profile_id: record for profile_id, record in records.items()
+            if (profile_id in self._sessions if record.get('pid') == self.pid
+                else pid_alive(record.get('pid')))
+        }
+        if len(live) != len(records):
+            write_json(self.path, live)
+        return live
+
+    def _publish(self, profile_id: str, record: Optional[Dict[str, Any]]):
+        try:
+            with file_lock(self.lock_path):
+                records = self._read_live()
+                if record is None:
+                    if records.get(profile_id, {}).get('pid') != self.pid:
+                        return
+                    records.pop(profile_id, None)
+                else:
+                    previous = records.get(profile_id)
+                    if previous and previous.get('pid') != self.pid:
+                        self.logger.warning(f"Profile {profile_id} is also registered by "
+                                            f"{previous.get('owner')} (pid {previous.get('pid')})")
+                    records[profile_id] = record
+                write_json(self.path, records)
+        except OSError as e:
+            # The shared file is for visibility only; never fail a session over it
+            self.logger.warning(f"Could not update session registry {self.path}: {e}")
+
+
+_registry: Optional[SessionRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> SessionRegistry:
+    """Process-wide session registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SessionRegistry()
+        return _registry
@@ -0,0 +1,136 @@
+"""
+Browser Startup Readiness & Timing
+
+Polls the DevTools endpoint of a freshly launched browser instead of
+sleeping a fixed time, and records how long each startup phase took so
+slow launches can be traced to profile fetch, Orbita launch, CDP or
+Selenium attach.
+"""
+
+import json
+import time
+import logging
+import threading
+import urllib.request
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Startup phases in launch order
+PHASES = ("profile_fetch", "orbita_launch", "cdp_ready", "selenium_attached")
+
+# Launches kept for startup_stats()
+STARTUP_HISTORY = 500
+
+
+def wait_for_devtools(debugger_address: str, timeout: float = 60.0,
+                      initial_delay: float = 0.1, max_delay: float = 2.0) -> Optional[Dict[str, Any]]:
+    """
+    Poll http://<debugger_address>/json/version until the browser answers.
+
+    Args:
+        debugger_address: Browser debugger address (e.g., "127.0.0.1:9222")
+        timeout: Give up after this many seconds
+        initial_delay: First retry delay; doubles after each failed poll
+        max_delay: Upper bound for the retry delay
+
+    Returns:
+        The /json/version payload (Browser, webSocketDebuggerUrl, ...) or None on timeout
+    """
+    url = f"http://{debugger_address}/json/version"
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    attempts = 0
+
+    while True:
+        attempts += 1
+        try:
+            with urllib.request.urlopen(url, timeout=min(2.0, max(0.1, deadline - time.monotonic()))) as response:
+                info = json.loads(response.read().decode('utf-8'))
+                logger.info(f"DevTools ready at {debugger_address} after {attempts} poll(s): {info.get('Browser', '?')}")
+                return info
+        except Exception as e:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"DevTools at {debugger_address} not ready after {timeout:.0f}s ({attempts} polls): {e}")
+                return None
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
+
+
+class StartupTimer:
+    """
+    Measures consecutive startup phases.
+
+    Usage:
+        timer = StartupTimer(profile_id)
+        ...profile fetch...
+        timer.mark("profile_fetch")
+        ...launch...
+        timer.mark("orbita_launch")
+    """
+
+    def __init__(self, profile_id: str):
+        self.profile_id = profile_id
+        self.started = time.monotonic()
+        self._last = self.started
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> float:
+        """Record the time since the previous mark as this phase's duration"""
+        now = time.monotonic()
+        self.phases[phase] = now - self._last
+        self._last = now
+        return self.phases[phase]
+
+    @property
+    def total(self) -> float:
+        return self._last - self.started
+
+    def to_dict(self) -> Dict[str, float]:
+        timings = {phase: round(seconds, 3) for phase, seconds in self.phases.items()}
+        timings["total"] = round(self.total, 3)
+        return timings
+
+    def summary(self) -> str:
+        parts = ", ".join(f"{phase}={seconds:.2f}s" for phase, seconds in self.phases.items())
+        return f"{parts}, total={self.total:.2f}s"
+
+
+_history: deque = deque(maxlen=STARTUP_HISTORY)
+_history_lock = threading.Lock()
+
+
+def record_startup(timer: StartupTimer, success: bool):
+    """Log a launch's phase timings and keep them for startup_stats()"""
+    entry = {"profile_id": timer.profile_id, "success": success, "timings": timer.to_dict()}
+    with _history_lock:
+        _history.append(entry)
+    logger.info(f"Browser startup {'ok' if success else 'FAILED'} for {timer.profile_id}: {timer.summary()}")
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def startup_stats() -> Dict[str, Any]:
+    """Per-phase avg/p50/p95/max over the last STARTUP_HISTORY launches"""
+    with _history_lock:
+        history = list(_history)
+
+    stats: Dict[str, Any] = {
+        "launches": len(history),
+        "failed": sum(1 for entry in history if not entry["success"]),
+        "phases": {},
+    }
+    for phase in PHASES + ("total",):
+        values = sorted(entry["timings"][phase] for entry in history if phase in entry["timings"])
+        if values:
+            stats["phases"][phase] = {
+                "avg": round(sum(values) / len(values), 3),
+                "p50": round(_percentile(values, 0.5), 3),
+                "p95": round(_percentile(values, 0.95), 3),
+                "max": round(values[-1], 3),
+            }
+    return stats
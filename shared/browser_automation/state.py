@@ -0,0 +1,83 @@
+"""
+Cross-Process Browser State
+
+Small helpers shared by the driver cache, session registry and port
+allocator: one state directory, an exclusive file lock, atomic JSON
+read/write and a process liveness check.
+
+Configuration (environment):
+    BROWSER_STATE_DIR   Where state files live (default ~/.cache/browser_automation;
+                        CHROMEDRIVER_CACHE_DIR is honoured for compatibility)
+"""
+
+import os
+import json
+from contextlib import contextmanager
+from typing import Any
+
+STATE_DIR = os.getenv('BROWSER_STATE_DIR') or os.getenv('CHROMEDRIVER_CACHE_DIR') or \
+    os.path.join(os.path.expanduser('~'), '.cache', 'browser_automation')
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive lock on a lock file, shared by every process on the machine"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a+') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10s
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def read_json(path: str, default: Any) -> Any:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path: str, data: Any):
+    """Write via a temp file so readers never see a partial file"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process is still running (assumed alive if it can't be checked)"""
+    if not pid:
+        return False
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name == 'nt':
+        return True  # os.kill(pid, 0) would send CTRL_C_EVENT on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
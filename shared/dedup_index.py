@@ -0,0 +1,187 @@
+"""
+In-memory dedup index for "already followed / commented / processed" checks.
+
+A worker loads a profile's history once into a Bloom filter and keeps it
+current as it logs new actions. Most candidates are new, and for those the
+filter answers "definitely not seen" without touching SQLite. Only when the
+filter reports a possible hit is the database asked, so SQLite stays the
+source of truth and Bloom false positives never cause a wrong answer.
+
+Other processes (and other Database instances) write the same history. With
+a ``version`` callback (the history's high-water mark, e.g. ``MAX(id)`` of
+the log table), a filter miss first checks whether the history grew since
+the last load and, if so, adds just the new keys before answering.
+"""
+
+import math
+import hashlib
+import logging
+import threading
+from typing import Callable, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+MIN_CAPACITY = 10000
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity: int, false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE):
+        """
+        Initialize filter.
+
+        Args:
+            capacity: Number of items the filter is sized for
+            false_positive_rate: Target false positive rate at capacity
+        """
+        self.capacity = max(1, capacity)
+        self.num_bits = max(8, int(-self.capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+class DedupIndex:
+    """
+    Bloom-filtered membership index backed by SQLite.
+
+    Args:
+        name: Label used in log messages (e.g. "follow:<profile_id>")
+        loader: Returns every key already recorded (called on load/rebuild).
+                With ``version``, called as ``loader(after)`` and returns the
+                keys recorded after that high-water mark (0 for all)
+        verifier: Authoritative SQLite check for one key
+        false_positive_rate: Target Bloom false positive rate
+        version: Current high-water mark of the history (e.g. ``MAX(id)``);
+                 lets a filter miss pick up keys written by other connections
+    """
+
+    def __init__(self, name: str,
+                 loader: Callable[..., Iterable[str]],
+                 verifier: Callable[[str], bool],
+                 false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+                 version: Optional[Callable[[], int]] = None):
+        self.name = name
+        self._loader = loader
+        self._verifier = verifier
+        self._version = version
+        self._fp_rate = false_positive_rate
+        self._bloom: Optional[BloomFilter] = None
+        # High-water mark of the history the filter was last synced to
+        self._mark = 0
+        # Keys added by this process: exact answers even before a write-behind
+        # queue has committed them to SQLite
+        self._recent: Set[str] = set()
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.db_checks = 0
+        self.false_positives = 0
+        self.catch_ups = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._bloom is not None
+
+    def load(self):
+        """Build the filter from the full history (idempotent)."""
+        with self._lock:
+            if self._bloom is None:
+                self._rebuild()
+
+    def _rebuild(self, min_capacity: int = 0):
+        """Rebuild filter from history plus keys added since (lock held)."""
+        if self._version is not None:
+            # Taken before loading: rows committed meanwhile are loaded again by the next catch-up
+            self._mark = self._version() or 0
+            keys = [k for k in self._loader(0) if k]
+        else:
+            keys = [k for k in self._loader() if k]
+        capacity = max(MIN_CAPACITY, min_capacity, 2 * (len(keys) + len(self._recent)))
+        bloom = BloomFilter(capacity, self._fp_rate)
+        for key in keys:
+            bloom.add(key)
+        for key in self._recent:
+            bloom.add(key)
+        self._bloom = bloom
+        logger.info(f"Dedup index '{self.name}' loaded {len(keys)} keys "
+                    f"({bloom.size_bytes // 1024} KB, capacity {capacity})")
+
+    def add(self, key: str):
+        """Record a key that was just logged."""
+        if not key:
+            return
+        with self._lock:
+            if self._bloom is None:
+                self._rebuild()
+            self._recent.add(key)
+            self._add_to_filter([key])
+
+    def _add_to_filter(self, keys: Iterable[str]):
+        """Add keys to the filter, growing it when over capacity (lock held)."""
+        for key in keys:
+            self._bloom.add(key)
+        if self._bloom.count > self._bloom.capacity:
+            # Keep the false positive rate near target as history grows
+            self._rebuild(min_capacity=self._bloom.capacity * 2)
+
+    def _catch_up(self) -> bool:
+        """
+        Add keys recorded by other connections since the last sync (lock held).
+
+        Returns:
+            True if the history changed since then
+        """
+        if self._version is None:
+            return False
+        mark = self._version() or 0
+        if mark == self._mark:
+            return False
+        keys = [k for k in self._loader(self._mark) if k]
+        self._mark = mark
+        self.catch_ups += 1
+        self._add_to_filter(keys)
+        return True
+
+    def contains(self, key: str) -> bool:
+        """True if key has been recorded. Hits SQLite only on filter hits."""
+        if not key:
+            return False
+        with self._lock:
+            if self._bloom is None:
+                self._rebuild()
+            self.lookups += 1
+            if key in self._recent:
+                return True
+            if key not in self._bloom:
+                # A miss is only final if nobody else wrote to the history meanwhile
+                if not self._catch_up() or key not in self._bloom:
+                    return False
+            self.db_checks += 1
+
+        found = self._verifier(key)
+        if not found:
+            with self._lock:
+                self.false_positives += 1
+        return found
@@ -0,0 +1,165 @@
+"""
+In-process publish/subscribe for live dashboard feeds.
+
+Worker threads ``publish()`` events as they happen; each subscriber (for
+example one open Server-Sent Events connection) gets its own bounded
+buffer, so any number of dashboards can follow the feed without reading
+the database. Slow subscribers lose their oldest events rather than
+blocking publishers.
+
+Every event gets an increasing sequence number, and the bus keeps the
+last ``history`` events so a reconnecting client can resume from the last
+sequence number it saw (SSE ``Last-Event-ID``).
+"""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY = 200
+DEFAULT_SUBSCRIBER_BUFFER = 1000
+
+
+class Subscription:
+    """
+    One subscriber's buffer of ``(seq, event)`` pairs.
+
+    Use ``get()`` from a thread or ``await aget()`` from the event loop
+    the subscription was created on.
+    """
+
+    def __init__(self, bus: "EventBus", maxsize: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self._bus = bus
+        self._events: deque = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._loop = loop
+        self._wakeup = asyncio.Event() if loop is not None else None
+        self.closed = False
+        self.dropped = 0
+
+    def _push(self, item: Tuple[int, Any]):
+        with self._cond:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(item)
+            self._cond.notify()
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                # Event loop already closed; nobody is waiting
+                pass
+
+    def _pop(self) -> Optional[Tuple[int, Any]]:
+        with self._cond:
+            return self._events.popleft() if self._events else None
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[int, Any]]:
+        """Next ``(seq, event)``, or None after ``timeout`` seconds."""
+        with self._cond:
+            if not self._events:
+                self._cond.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+    async def aget(self, timeout: Optional[float] = None) -> Optional[Tuple[int, Any]]:
+        """Async ``get()``; requires the subscription to have a loop."""
+        item = self._pop()
+        if item is not None:
+            return item
+        self._wakeup.clear()
+        # Re-check after clearing: a push between the first check and the
+        # clear has already scheduled its wakeup and would otherwise be missed
+        item = self._pop()
+        if item is not None:
+            return item
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self._pop()
+
+    def close(self):
+        """Stop receiving events."""
+        if not self.closed:
+            self.closed = True
+            self._bus._unsubscribe(self)
+
+
+class EventBus:
+    """
+    Fan-out of events to every current subscriber.
+
+    Args:
+        name: Label used in log messages
+        history: Number of recent events kept for replay
+        subscriber_buffer: Max events buffered per subscriber
+    """
+
+    def __init__(self, name: str, history: int = DEFAULT_HISTORY,
+                 subscriber_buffer: int = DEFAULT_SUBSCRIBER_BUFFER):
+        self.name = name
+        self.subscriber_buffer = subscriber_buffer
+        self._history: deque = deque(maxlen=history)
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def publish(self, event: Any) -> int:
+        """Deliver an event to all subscribers. Never blocks on them."""
+        with self._lock:
+            self._seq += 1
+            item = (self._seq, event)
+            self._history.append(item)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription._push(item)
+        return item[0]
+
+    def subscribe(self, after_seq: Optional[int] = None,
+                  loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        """
+        Start receiving events.
+
+        Args:
+            after_seq: Also replay buffered events newer than this sequence number
+            loop: Event loop to wake for ``aget()`` (None for thread consumers)
+        """
+        subscription = Subscription(self, self.subscriber_buffer, loop)
+        with self._lock:
+            if after_seq is not None:
+                for item in self._history:
+                    if item[0] > after_seq:
+                        subscription._events.append(item)
+            self._subscribers.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+
+_buses: Dict[str, EventBus] = {}
+_buses_lock = threading.Lock()
+
+
+def get_bus(name: str) -> EventBus:
+    """Get the process-wide event bus with this name."""
+    with _buses_lock:
+        bus = _buses.get(name)
+        if bus is None:
+            bus = EventBus(name)
+            _buses[name] = bus
+        return bus
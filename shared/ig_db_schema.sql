@@ -20,7 +20,6 @@ CREATE TABLE IF NOT EXISTS processed_posts (
     notes TEXT
 );
 
-CREATE INDEX IF NOT EXISTS idx_processed_posts_url ON processed_posts(post_url);
 CREATE INDEX IF NOT EXISTS idx_processed_posts_username ON processed_posts(instagram_username);
 CREATE INDEX IF NOT EXISTS idx_processed_posts_date ON processed_posts(processed_at);
 
@@ -77,7 +76,6 @@ CREATE TABLE IF NOT EXISTS target_accounts (
     notes TEXT
 );
 
-CREATE INDEX IF NOT EXISTS idx_target_accounts_username ON target_accounts(username);
 CREATE INDEX IF NOT EXISTS idx_target_accounts_active ON target_accounts(is_active);
 
 -- =====================================================
@@ -129,6 +127,8 @@ CREATE INDEX IF NOT EXISTS idx_scheduled_sessions_date ON scheduled_sessions(sch
 -- =====================================================
 -- VIEWS FOR EASY QUERYING
 -- =====================================================
+-- daily_summary and profile_stats are redefined by migration 2 in
+-- services/ig-engagement-service/database.py to read the rollup tables.
 
 -- Daily summary view
 CREATE VIEW IF NOT EXISTS daily_summary AS
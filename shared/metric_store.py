@@ -0,0 +1,320 @@
+"""
+Bounded time-series store for per-profile metrics and events.
+
+Recent samples stay in a fixed-size in-memory ring buffer per profile, so
+"what happened in the last few minutes" is answered without SQLite.
+Every sample is also folded into 1-minute and 1-hour rollup rows
+(count/sum/min/max per profile, series and page). Rollups are aggregated
+in memory and upserted through the write-behind writer once their minute
+closes, so the database grows with time buckets instead of samples, and
+rows older than each rollup's retention are pruned automatically.
+
+Dashboards read the rollups: ``summary()`` for per-series aggregates,
+``points()`` for charts and ``top_pages()`` for the slowest pages.
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared.sqlite_pool import get_pool, open_connection
+from shared.write_behind import WriteBehindWriter, get_writer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RING_SIZE = 720  # 3 hours at one sample per 15 s
+
+# Rollup name -> (bucket seconds, default retention seconds)
+ROLLUPS = {
+    '1m': (60, 2 * 86400),
+    '1h': (3600, 90 * 86400),
+}
+
+PRUNE_INTERVAL = 600
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        profile_id TEXT NOT NULL,
+        series TEXT NOT NULL,
+        page_url TEXT NOT NULL DEFAULT '',
+        bucket TEXT NOT NULL,
+        unit TEXT NOT NULL DEFAULT '',
+        count INTEGER NOT NULL,
+        sum REAL NOT NULL,
+        min REAL,
+        max REAL,
+        PRIMARY KEY (profile_id, series, page_url, bucket)
+    ) WITHOUT ROWID
+'''
+
+_UPSERT = '''
+    INSERT INTO {table} (profile_id, series, page_url, bucket, unit, count, sum, min, max)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (profile_id, series, page_url, bucket) DO UPDATE SET
+        unit = excluded.unit,
+        count = count + excluded.count,
+        sum = sum + excluded.sum,
+        min = MIN(min, excluded.min),
+        max = MAX(max, excluded.max)
+'''
+
+# (profile_id, series, unit, page_url, minute start)
+_Key = Tuple[str, str, str, str, int]
+
+
+def _bucket_text(epoch: float) -> str:
+    """Bucket start in SQLite datetime() format (UTC)"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(epoch))
+
+
+class TimeSeriesStore:
+    """
+    Ring buffer plus 1-minute/1-hour rollup tables for one kind of series.
+
+    Args:
+        db_path: SQLite database holding the rollup tables
+        prefix: Table name prefix (tables are <prefix>_1m and <prefix>_1h)
+        ring_size: Recent samples kept in memory per profile
+        retention: Seconds to keep each rollup ({'1m': ..., '1h': ...})
+        writer: Write-behind writer (default: the process-wide one for db_path)
+    """
+
+    def __init__(self, db_path: str, prefix: str, ring_size: int = DEFAULT_RING_SIZE,
+                 retention: Optional[Dict[str, float]] = None,
+                 writer: Optional[WriteBehindWriter] = None):
+        self.db_path = str(db_path)
+        self.tables = {name: f"{prefix}_{name}" for name in ROLLUPS}
+        self.ring_size = ring_size
+        self.retention = {name: seconds for name, (_, seconds) in ROLLUPS.items()}
+        self.retention.update(retention or {})
+        self.writer = writer or get_writer(self.db_path)
+
+        self._rings: Dict[str, deque] = {}
+        self._open: Dict[_Key, List[float]] = {}  # -> [count, sum, min, max]
+        self._current_minute = 0
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+        self._create_tables()
+        atexit.register(self.flush)
+
+    def _create_tables(self):
+        conn = open_connection(self.db_path)
+        try:
+            for table in self.tables.values():
+                conn.execute(_SCHEMA.format(table=table))
+                conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_bucket ON {table}(bucket)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ========================================
+    # WRITING
+    # ========================================
+
+    def record(self, profile_id: str, series: str, value: float = 1.0, unit: str = '',
+               page_url: Optional[str] = None, timestamp: Optional[float] = None,
+               data: Optional[Dict[str, Any]] = None):
+        """
+        Record one sample.
+
+        Args:
+            profile_id: Profile the sample belongs to
+            series: Metric name or event type
+            value: Sample value (1 for events, so rollup counts are event counts)
+            unit: Unit of the value
+            page_url: Page the sample was taken on
+            timestamp: Epoch seconds (default now)
+            data: Extra details kept in the ring buffer only
+        """
+        timestamp = timestamp or time.time()
+        minute = int(timestamp // 60) * 60
+        key = (profile_id, series, unit or '', page_url or '', minute)
+
+        with self._lock:
+            ring = self._rings.get(profile_id)
+            if ring is None:
+                ring = self._rings[profile_id] = deque(maxlen=self.ring_size)
+            ring.append((timestamp, series, value, unit, page_url, data))
+
+            agg = self._open.get(key)
+            if agg is None:
+                self._open[key] = [1, value, value, value]
+            else:
+                agg[0] += 1
+                agg[1] += value
+                agg[2] = min(agg[2], value)
+                agg[3] = max(agg[3], value)
+
+            closed = []
+            if minute > self._current_minute:
+                # A new minute started: earlier minutes are complete
+                self._current_minute = minute
+                closed = [k for k in self._open if k[4] < minute]
+                closed = [(k, self._open.pop(k)) for k in closed]
+
+        self._write(closed)
+        self._maybe_prune()
+
+    def flush(self, profile_id: Optional[str] = None, wait: bool = False):
+        """
+        Write open (partial) minutes too; later samples of the same minute add to them.
+
+        Args:
+            profile_id: Only this profile's buckets (default all)
+            wait: Block until the rows are committed
+        """
+        with self._lock:
+            keys = [k for k in self._open if profile_id is None or k[0] == profile_id]
+            items = [(k, self._open.pop(k)) for k in keys]
+        self._write(items)
+        if wait:
+            self.writer.flush()
+
+    def _write(self, items: List[Tuple[_Key, List[float]]]):
+        # One table at a time so the writer batches each run into one executemany
+        for name, (seconds, _) in ROLLUPS.items():
+            sql = _UPSERT.format(table=self.tables[name])
+            for (profile_id, series, unit, page_url, minute), (count, total, low, high) in items:
+                bucket = _bucket_text(minute - minute % seconds)
+                self.writer.submit(sql, (profile_id, series, page_url, bucket, unit, count, total, low, high))
+
+    # ========================================
+    # RETENTION
+    # ========================================
+
+    def _maybe_prune(self):
+        now = time.monotonic()
+        if now - self._last_prune < PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        self.prune()
+
+    def prune(self):
+        """Queue deletion of rollup rows older than their retention"""
+        for name, table in self.tables.items():
+            cutoff = _bucket_text(time.time() - self.retention[name])
+            self.writer.submit(f'DELETE FROM {table} WHERE bucket < ?', (cutoff,))
+
+    def forget(self, profile_id: str):
+        """Write out and drop a profile's in-memory state (it stopped)"""
+        self.flush(profile_id)
+        with self._lock:
+            self._rings.pop(profile_id, None)
+
+    # ========================================
+    # READING
+    # ========================================
+
+    def recent(self, profile_id: str, seconds: Optional[float] = None,
+               series: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Raw samples from the ring buffer, newest first"""
+        cutoff = time.time() - seconds if seconds else 0
+        with self._lock:
+            samples = list(self._rings.get(profile_id, ()))
+        result = []
+        for timestamp, name, value, unit, page_url, data in reversed(samples):
+            if timestamp < cutoff or (limit is not None and len(result) >= limit):
+                break
+            if series is None or name == series:
+                result.append({'timestamp': timestamp, 'series': name, 'value': value,
+                               'unit': unit, 'page_url': page_url, 'data': data})
+        return result
+
+    def oldest_recent(self, profile_id: str) -> Optional[float]:
+        """Timestamp of the oldest sample still in the ring buffer"""
+        with self._lock:
+            ring = self._rings.get(profile_id)
+            return ring[0][0] if ring else None
+
+    def _table_for(self, seconds: float, resolution: Optional[str] = None) -> str:
+        """Finest rollup that still covers the window"""
+        if resolution:
+            return self.tables[resolution]
+        name = '1m' if seconds <= self.retention['1m'] else '1h'
+        return self.tables[name]
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        with get_pool(self.db_path).connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def summary(self, profile_id: str, hours: float = 1) -> Dict[str, Dict[str, Any]]:
+        """Per-series average/min/max/sample count over the last hours"""
+        self.flush(profile_id, wait=True)
+        table = self._table_for(hours * 3600)
+        rows = self._query(f'''
+            SELECT series, unit, SUM(sum) / SUM(count), MIN(min), MAX(max), SUM(count)
+            FROM {table}
+            WHERE profile_id = ? AND bucket >= ?
+            GROUP BY series, unit
+        ''', (profile_id, _bucket_text(time.time() - hours * 3600)))
+        return {
+            row[0]: {
+                'average': round(row[2], 2),
+                'minimum': round(row[3], 2),
+                'maximum': round(row[4], 2),
+                'unit': row[1],
+                'samples': row[5],
+            }
+            for row in rows
+        }
+
+    def points(self, profile_id: str, series: str, hours: float = 1,
+               resolution: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Chart points (one per bucket, oldest first) for one series"""
+        self.flush(profile_id, wait=True)
+        table = self._table_for(hours * 3600, resolution)
+        rows = self._query(f'''
+            SELECT bucket, SUM(sum) / SUM(count), MIN(min), MAX(max), SUM(count)
+            FROM {table}
+            WHERE profile_id = ? AND series = ? AND bucket >= ?
+            GROUP BY bucket
+            ORDER BY bucket
+        ''', (profile_id, series, _bucket_text(time.time() - hours * 3600)))
+        return [
+            {'bucket': row[0], 'average': round(row[1], 2), 'minimum': row[2], 'maximum': row[3], 'samples': row[4]}
+            for row in rows
+        ]
+
+    def top_pages(self, series: str, hours: float = 1, profile_id: Optional[str] = None,
+                  limit: int = 10) -> List[Dict[str, Any]]:
+        """Pages with the highest average value of a series"""
+        self.flush(profile_id, wait=True)
+        table = self._table_for(hours * 3600)
+        rows = self._query(f'''
+            SELECT profile_id, page_url, SUM(sum) / SUM(count), MAX(max), SUM(count)
+            FROM {table}
+            WHERE series = ? AND page_url != '' AND bucket >= ?
+            AND (? IS NULL OR profile_id = ?)
+            GROUP BY profile_id, page_url
+            ORDER BY SUM(sum) / SUM(count) DESC
+            LIMIT ?
+        ''', (series, _bucket_text(time.time() - hours * 3600), profile_id, profile_id, limit))
+        return [
+            {'profile_id': row[0], 'page_url': row[1], 'average': round(row[2], 2),
+             'maximum': round(row[3], 2), 'samples': row[4]}
+            for row in rows
+        ]
+
+
+_stores: Dict[Tuple[str, str], TimeSeriesStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_path: str, prefix: str, **kwargs) -> TimeSeriesStore:
+    """
+    Get the process-wide store for a database file and table prefix.
+
+    Sharing one store keeps every sample of a profile in the same ring
+    buffer; keyword arguments only apply when the store is created.
+    """
+    key = (os.path.abspath(str(db_path)), prefix)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = TimeSeriesStore(key[0], prefix, **kwargs)
+        return store
@@ -0,0 +1,104 @@
+"""
+Versioned SQLite schema migrations shared by all microservices.
+
+Each service declares an ordered list of ``Migration`` objects. At startup
+``run_migrations`` applies the ones newer than the version recorded in the
+``schema_version`` table, each in its own transaction, so running it again
+(or from several processes at once) is a no-op.
+"""
+
+import sqlite3
+import logging
+from typing import Callable, List, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+
+class Migration:
+    """
+    One schema change.
+
+    Args:
+        version: Strictly increasing integer
+        description: Short human-readable summary (stored in schema_version)
+        apply: List of SQL statements, or a callable taking the connection
+    """
+
+    def __init__(self, version: int, description: str,
+                 apply: Union[Sequence[str], Callable[[sqlite3.Connection], None]]):
+        self.version = version
+        self.description = description
+        self.apply = apply
+
+    def run(self, conn: sqlite3.Connection):
+        if callable(self.apply):
+            self.apply(conn)
+        else:
+            for statement in self.apply:
+                conn.execute(statement)
+
+
+def _ensure_version_table(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Highest applied migration version (0 for a fresh database)."""
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn: sqlite3.Connection, migrations: List[Migration], name: str = "database") -> int:
+    """
+    Apply pending migrations in version order.
+
+    Args:
+        conn: Open connection (left open)
+        migrations: The service's full migration list
+        name: Label for log messages
+
+    Returns:
+        Number of migrations applied by this call
+    """
+    versions = [m.version for m in migrations]
+    if versions != sorted(set(versions)):
+        raise ValueError(f"{name} migrations must have unique, increasing versions: {versions}")
+
+    current = get_schema_version(conn)
+    applied = 0
+
+    for migration in migrations:
+        if migration.version <= current:
+            continue
+
+        # IMMEDIATE takes the write lock up front so concurrent startups
+        # serialize here; re-check the version once we hold it.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (migration.version,)).fetchone()
+            if row:
+                conn.rollback()
+                continue
+            migration.run(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (migration.version, migration.description)
+            )
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"{name} migration {migration.version} ({migration.description}) failed: {e}")
+            raise
+
+        applied += 1
+        logger.info(f"{name} migrated to schema version {migration.version}: {migration.description}")
+
+    return applied
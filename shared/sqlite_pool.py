@@ -0,0 +1,162 @@
+"""
+Shared SQLite connection layer for all microservices.
+
+Keeps one persistent connection per thread per database file instead of
+opening and closing a connection for every statement. Connections are
+configured for concurrent access from many workers sharing one file
+(WAL journaling, synchronous=NORMAL, busy timeout) and use a larger
+prepared-statement cache so hot queries are compiled only once.
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Defaults tuned for a dozen workers writing to the same file
+DEFAULT_BUSY_TIMEOUT_MS = 30000
+DEFAULT_CACHED_STATEMENTS = 256
+DEFAULT_CACHE_SIZE_KB = 8192
+
+
+def configure_connection(conn: sqlite3.Connection,
+                         busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS) -> sqlite3.Connection:
+    """Apply the shared PRAGMA set to a connection."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA cache_size=-{DEFAULT_CACHE_SIZE_KB}")
+    return conn
+
+
+def open_connection(db_path: str,
+                    busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+                    check_same_thread: bool = True) -> sqlite3.Connection:
+    """
+    Open a new configured connection (not pooled).
+
+    Use this for callers that manage the connection lifetime themselves.
+    """
+    conn = sqlite3.connect(
+        str(db_path),
+        timeout=busy_timeout_ms / 1000.0,
+        cached_statements=DEFAULT_CACHED_STATEMENTS,
+        check_same_thread=check_same_thread,
+    )
+    conn.row_factory = sqlite3.Row
+    return configure_connection(conn, busy_timeout_ms)
+
+
+class SQLiteConnectionPool:
+    """
+    Per-thread persistent connections to one SQLite database file.
+
+    Each thread lazily opens its own connection on first use and keeps it
+    for the lifetime of the thread, so sqlite3's statement cache is reused
+    across calls. Connections left behind by finished threads are closed the
+    next time any thread opens a connection, or by ``close_all()``.
+    """
+
+    def __init__(self, db_path: str, busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS):
+        """
+        Initialize pool.
+
+        Args:
+            db_path: Path to the SQLite database file
+            busy_timeout_ms: How long a writer waits on a locked database
+        """
+        self.db_path = str(db_path)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it if needed."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # check_same_thread=False only so close_all() can close it from
+            # another thread; the connection is never shared for queries.
+            conn = open_connection(self.db_path, self.busy_timeout_ms, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._prune_dead_threads()
+                self._connections[threading.current_thread()] = conn
+            logger.debug(f"Opened pooled connection to {self.db_path} "
+                         f"(thread {threading.current_thread().name})")
+        return conn
+
+    def _prune_dead_threads(self):
+        """Close connections owned by threads that have exited (lock held)."""
+        for thread in [t for t in self._connections if not t.is_alive()]:
+            try:
+                self._connections.pop(thread).close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing connection: {e}")
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Context manager yielding this thread's connection.
+
+        Any open transaction is rolled back if the block raises, so a failed
+        statement never leaves the persistent connection holding a lock.
+        """
+        conn = self.get()
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    def discard(self):
+        """Close and forget the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                self._connections.pop(threading.current_thread(), None)
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing connection: {e}")
+
+    def close_all(self):
+        """Close every connection opened by this pool."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections = {}
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing connection: {e}")
+        self._local = threading.local()
+        logger.info(f"Closed {len(connections)} pooled connections to {self.db_path}")
+
+
+_pools: Dict[str, SQLiteConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str, busy_timeout_ms: Optional[int] = None) -> SQLiteConnectionPool:
+    """
+    Get the process-wide pool for a database file.
+
+    All Database objects pointing at the same file share one pool, so a
+    worker thread reuses a single connection regardless of how many
+    Database instances it creates.
+    """
+    key = os.path.abspath(str(db_path))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SQLiteConnectionPool(key, busy_timeout_ms or DEFAULT_BUSY_TIMEOUT_MS)
+            _pools[key] = pool
+        return pool
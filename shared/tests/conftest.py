@@ -0,0 +1,42 @@
+"""
+Test setup for the shared modules.
+
+``shared/`` is imported from the project root. ``browser_automation/__init__.py``
+imports gologin and selenium, so its modules are imported through the
+stand-in package ``browser_automation_under_test`` instead: its ``__path__`` is
+the real directory, so relative imports between the modules still resolve.
+
+    from browser_automation_under_test import screenshots
+"""
+
+import sys
+import types
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BROWSER_AUTOMATION_DIR = PROJECT_ROOT / "shared" / "browser_automation"
+BROWSER_PACKAGE = "browser_automation_under_test"
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+_package = types.ModuleType(BROWSER_PACKAGE)
+_package.__path__ = [str(BROWSER_AUTOMATION_DIR)]
+sys.modules.setdefault(BROWSER_PACKAGE, _package)
+
+
+def load_fresh(name: str):
+    """A new copy of a browser_automation module (module-level caches start empty)"""
+    spec = importlib.util.spec_from_file_location(f"{BROWSER_PACKAGE}.{name}", BROWSER_AUTOMATION_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def fresh_module():
+    """``fresh_module("ports")`` - see ``load_fresh``"""
+    return load_fresh
@@ -0,0 +1,70 @@
+"""
+Tests for the DevTools readiness probe and startup phase timings.
+"""
+
+import json
+import time
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from browser_automation_under_test import startup
+
+
+class VersionHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({"Browser": "Chrome/141.0.0.0"}).encode()
+        self.send_response(200 if self.path == "/json/version" else 404)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_probe_connects_as_soon_as_devtools_answers():
+    port = _free_port()
+    server = HTTPServer(("127.0.0.1", port), VersionHandler)
+    # Browser "comes up" 0.3s after launch
+    timer = threading.Timer(0.3, server.serve_forever)
+    timer.start()
+    try:
+        started = time.monotonic()
+        info = startup.wait_for_devtools(f"127.0.0.1:{port}", timeout=5, initial_delay=0.05, max_delay=0.2)
+        elapsed = time.monotonic() - started
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert info == {"Browser": "Chrome/141.0.0.0"}
+    assert elapsed < 1.0
+
+
+def test_probe_gives_up_after_timeout():
+    started = time.monotonic()
+    assert startup.wait_for_devtools(f"127.0.0.1:{_free_port()}", timeout=0.3, initial_delay=0.05) is None
+    assert time.monotonic() - started < 1.0
+
+
+def test_phase_timings_are_aggregated():
+    timer = startup.StartupTimer("p1")
+    time.sleep(0.01)
+    timer.mark("orbita_launch")
+    timer.mark("cdp_ready")
+    startup.record_startup(timer, success=True)
+    startup.record_startup(startup.StartupTimer("p2"), success=False)
+
+    timings = timer.to_dict()
+    assert timings["orbita_launch"] >= 0.01
+    assert timings["total"] >= timings["orbita_launch"]
+
+    stats = startup.startup_stats()
+    assert stats["launches"] >= 2 and stats["failed"] >= 1
+    assert stats["phases"]["orbita_launch"]["max"] >= 0.01
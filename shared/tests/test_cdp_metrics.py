@@ -0,0 +1,200 @@
+"""
+Tests for CDP browser metrics sampling (fake Selenium driver and fake DevTools websocket).
+"""
+
+import os
+import json
+import base64
+
+from browser_automation_under_test import cdp_metrics
+
+
+class FakeDriver:
+    def __init__(self):
+        self.url = "https://www.threads.net/"
+        self.script_seconds = 1.0
+
+    def execute_cdp_cmd(self, method, params):
+        if method == "Performance.getMetrics":
+            return {"metrics": [
+                {"name": "JSHeapUsedSize", "value": 64 * 1024 * 1024},
+                {"name": "Nodes", "value": 1200},
+                {"name": "ScriptDuration", "value": self.script_seconds},
+            ]}
+        return {}
+
+    def execute_script(self, script):
+        return json.dumps({"url": self.url, "ttfb": 120.4, "dom_content_loaded": 800.0, "load": 1500.25})
+
+
+class FakeRegistry:
+    def __init__(self, sessions):
+        self.sessions = sessions
+
+    def get(self, profile_id):
+        return self.sessions.get(profile_id)
+
+    def find(self, profile_id):
+        return None
+
+
+class FakeGovernor:
+    def usage(self, profile_id):
+        return {"pid": 100, "processes": 5, "rss_mb": 900.0, "cpu_percent": 12.5}
+
+
+def _collector(sessions):
+    collector = cdp_metrics.CDPMetricsCollector()
+    collector.registry = FakeRegistry(sessions)
+    collector.governor = FakeGovernor()
+    return collector
+
+
+def test_first_sample_of_a_page_reports_navigation_timing():
+    collector = _collector({"p1": {"driver": FakeDriver()}})
+
+    sample = collector.collect("p1")
+    metrics = {name: (value, unit) for name, value, unit in sample["metrics"]}
+
+    assert sample["page_url"] == "https://www.threads.net/"
+    assert metrics["js_heap_used_mb"] == (64.0, "MB")
+    assert metrics["dom_nodes"] == (1200, "count")
+    assert metrics["page_load_time_ms"] == (1500.2, "ms")
+    assert metrics["browser_rss_mb"] == (900.0, "MB")
+    assert "script_ms" not in metrics
+
+
+def test_later_samples_report_time_spent_since_previous():
+    driver = FakeDriver()
+    collector = _collector({"p1": {"driver": driver}})
+    collector.collect("p1")
+
+    driver.script_seconds = 1.25
+    metrics = {name: value for name, value, _ in collector.collect("p1")["metrics"]}
+    assert metrics["script_ms"] == 250.0
+    assert "page_load_time_ms" not in metrics
+
+    driver.url = "https://www.threads.net/@someone"
+    metrics = {name: value for name, value, _ in collector.collect("p1")["metrics"]}
+    assert "script_ms" not in metrics
+    assert metrics["page_load_time_ms"] == 1500.2
+
+
+def test_unknown_or_unreachable_profile_yields_nothing():
+    collector = _collector({"cloud": {"status": "active"}})
+    assert collector.collect("missing") is None
+    assert collector.collect("cloud") is None
+
+
+class FakeBrowserCDP:
+    """Stands in for _WebSocketCDP; counters run from Performance.enable"""
+
+    connections = []
+
+    def __init__(self, ws_url, timeout):
+        self.calls = []
+        self.closed = False
+        self.script_seconds = 0.0
+        self.fail_next = False
+        FakeBrowserCDP.connections.append(self)
+
+    def send(self, method, params=None, session_id=None):
+        self.calls.append(method)
+        if self.fail_next:
+            self.fail_next = False
+            raise cdp_metrics.CDPError(f"{method} failed: connection closed")
+        if method == "Target.getTargets":
+            return {"targetInfos": [{"type": "page", "targetId": "t1", "url": "https://www.threads.net/"}]}
+        if method == "Target.attachToTarget":
+            return {"sessionId": "s1"}
+        if method == "Performance.enable":
+            self.script_seconds = 0.0
+        if method == "Performance.getMetrics":
+            self.script_seconds += 0.5
+            return {"metrics": [{"name": "ScriptDuration", "value": self.script_seconds}]}
+        if method == "Runtime.evaluate":
+            return {"result": {"value": json.dumps({"url": "https://www.threads.net/", "load": 900.0})}}
+        if method == "SystemInfo.getProcessInfo":
+            return {"processInfo": [{"id": os.getpid(), "type": "browser"}]}
+        if method == "Page.captureScreenshot":
+            return {"data": base64.b64encode(f"{params['format']}-frame".encode()).decode()}
+        return {}
+
+    def close(self):
+        self.closed = True
+
+
+def _websocket_collector(monkeypatch):
+    FakeBrowserCDP.connections = []
+    monkeypatch.setattr(cdp_metrics, "_WebSocketCDP", FakeBrowserCDP)
+    return _collector({"p1": {"ws_endpoint": "ws://127.0.0.1:9222/devtools/browser/x"}})
+
+
+def test_websocket_session_is_kept_between_samples(monkeypatch):
+    collector = _websocket_collector(monkeypatch)
+    collector.collect("p1")
+    metrics = {name: value for name, value, _ in collector.collect("p1")["metrics"]}
+    metrics_later = {name: value for name, value, _ in collector.collect("p1")["metrics"]}
+
+    assert len(FakeBrowserCDP.connections) == 1
+    assert FakeBrowserCDP.connections[0].calls.count("Performance.enable") == 1
+    assert metrics["script_ms"] == 500.0
+    assert metrics_later["script_ms"] == 500.0
+
+
+def test_forget_detaches_and_a_new_session_is_only_a_baseline(monkeypatch):
+    collector = _websocket_collector(monkeypatch)
+    collector.collect("p1")
+    collector.collect("p1")
+    first = FakeBrowserCDP.connections[0]
+
+    collector.forget("p1")
+    assert first.closed and "Target.detachFromTarget" in first.calls
+
+    metrics = {name: value for name, value, _ in collector.collect("p1")["metrics"]}
+    assert len(FakeBrowserCDP.connections) == 2
+    assert "script_ms" not in metrics
+    assert metrics["page_load_time_ms"] == 900.0
+
+
+def test_failed_session_is_reattached_without_bogus_durations(monkeypatch):
+    collector = _websocket_collector(monkeypatch)
+    collector.collect("p1")
+    FakeBrowserCDP.connections[0].fail_next = True
+    assert collector.collect("p1") is None
+    assert FakeBrowserCDP.connections[0].closed
+
+    metrics = {name: value for name, value, _ in collector.collect("p1")["metrics"]}
+    assert len(FakeBrowserCDP.connections) == 2
+    assert "script_ms" not in metrics
+    metrics = {name: value for name, value, _ in collector.collect("p1")["metrics"]}
+    assert metrics["script_ms"] == 500.0
+
+
+def test_screenshot_of_a_driverless_session_shares_the_page_session(monkeypatch):
+    collector = _websocket_collector(monkeypatch)
+
+    assert collector.capture_screenshot("p1", "webp") == b"webp-frame"
+    first = {name for name, _, _ in collector.collect("p1")["metrics"]}
+    second = {name for name, _, _ in collector.collect("p1")["metrics"]}
+
+    assert len(FakeBrowserCDP.connections) == 1
+    assert "script_ms" not in first and "script_ms" in second
+    assert collector.capture_screenshot("unknown") is None
+
+
+def test_process_memory_is_only_read_for_browsers_on_this_host(monkeypatch):
+    FakeBrowserCDP.connections = []
+    monkeypatch.setattr(cdp_metrics, "_WebSocketCDP", FakeBrowserCDP)
+    collector = _collector({
+        "local": {"ws_endpoint": "ws://127.0.0.1:9222/devtools/browser/x"},
+        "cloud": {"ws_endpoint": "wss://cloudbrowser.gologin.com/connect?token=t", "execution_mode": "cloud"},
+    })
+    collector.governor.usage = lambda profile_id: None
+
+    local = {name for name, _, _ in collector.collect("local")["metrics"]}
+    cloud = {name for name, _, _ in collector.collect("cloud")["metrics"]}
+
+    assert "browser_rss_mb" in local
+    assert "browser_rss_mb" not in cloud
+    assert "SystemInfo.getProcessInfo" not in FakeBrowserCDP.connections[1].calls
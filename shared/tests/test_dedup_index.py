@@ -0,0 +1,113 @@
+"""
+Tests for the Bloom-filtered dedup index: visibility of writes made by other
+connections, and growth of the filter.
+"""
+
+import sqlite3
+
+from shared.dedup_index import DedupIndex, MIN_CAPACITY
+
+
+class History:
+    """A log table written by several connections, as in the services."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        conn = self._connect()
+        conn.execute("CREATE TABLE log (id INTEGER PRIMARY KEY AUTOINCREMENT, target TEXT)")
+        conn.commit()
+        conn.close()
+        self.verifications = 0
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def log(self, *targets):
+        conn = self._connect()
+        conn.executemany("INSERT INTO log (target) VALUES (?)", [(t,) for t in targets])
+        conn.commit()
+        conn.close()
+
+    def targets(self, after=0):
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute("SELECT target FROM log WHERE id > ?", (after,))]
+        finally:
+            conn.close()
+
+    def has(self, target):
+        self.verifications += 1
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT 1 FROM log WHERE target = ?", (target,)).fetchone() is not None
+        finally:
+            conn.close()
+
+    def last_id(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT MAX(id) FROM log").fetchone()[0] or 0
+        finally:
+            conn.close()
+
+    def index(self):
+        return DedupIndex("test", loader=self.targets, verifier=self.has, version=self.last_id)
+
+
+def test_writes_by_other_connections_are_seen_after_load(tmp_path):
+    history = History(tmp_path / "log.db")
+    history.log("alice")
+    index = history.index()
+    index.load()
+    assert index.contains("alice")
+
+    # Another Database instance / process logs after our filter was loaded
+    history.log("bob")
+    assert index.contains("bob")
+    assert index.catch_ups == 1
+    assert not index.contains("carol")
+
+
+def test_miss_without_new_writes_does_not_reload(tmp_path):
+    history = History(tmp_path / "log.db")
+    history.log("alice")
+    index = history.index()
+    index.load()
+
+    for name in ("bob", "carol", "dave"):
+        assert not index.contains(name)
+    assert index.catch_ups == 0
+    assert history.verifications == 0
+
+
+def test_keys_added_locally_are_seen_before_commit(tmp_path):
+    history = History(tmp_path / "log.db")
+    index = history.index()
+    index.add("queued-not-committed")
+    assert index.contains("queued-not-committed")
+    assert history.verifications == 0
+
+
+def test_filter_is_rebuilt_larger_when_history_outgrows_it(tmp_path):
+    history = History(tmp_path / "log.db")
+    index = history.index()
+    index.load()
+    capacity = index._bloom.capacity
+    assert capacity == MIN_CAPACITY
+
+    history.log(*(f"user{i}" for i in range(capacity + 1)))
+    assert index.contains("user0")
+    assert index._bloom.capacity >= 2 * capacity
+    assert index.contains(f"user{capacity}")
+    assert index.contains("user123")
+    assert not index.contains("nobody")
+
+
+def test_index_without_version_keeps_plain_loader(tmp_path):
+    history = History(tmp_path / "log.db")
+    history.log("alice")
+    index = DedupIndex("legacy", loader=lambda: history.targets(), verifier=history.has)
+    assert index.contains("alice")
+    history.log("bob")
+    # Without a version callback a miss is answered from the filter alone
+    assert not index.contains("bob")
@@ -0,0 +1,64 @@
+"""
+Tests for the cross-process ChromeDriver resolution cache.
+"""
+
+import os
+import json
+import stat
+from pathlib import Path
+
+import pytest
+
+@pytest.fixture
+def driver_cache(tmp_path, monkeypatch, fresh_module):
+    # Loaded fresh per test so module-level caches start empty
+    module = fresh_module("driver_cache")
+    monkeypatch.setattr(module, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(module, "WDM_CACHE_DIR", str(tmp_path / "wdm"))
+    monkeypatch.setattr(module, "_download", lambda major, version: None)  # offline
+    monkeypatch.setattr(module.shutil, "which", lambda name: None)
+    return module
+
+
+def _fake_driver(root: Path, version: str) -> str:
+    path = root / "wdm" / "linux64" / version / "chromedriver-linux64" / "chromedriver"
+    path.parent.mkdir(parents=True)
+    path.write_text("#!/bin/sh\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def test_major_version_parsing(driver_cache):
+    assert driver_cache.major_version("Chrome/141.0.7390.54") == "141"
+    assert driver_cache.major_version("133.0.6943.54") == "133"
+    assert driver_cache.major_version(None) == driver_cache.DEFAULT_MAJOR
+
+
+def test_resolves_offline_from_wdm_cache_once(driver_cache, tmp_path, monkeypatch):
+    _fake_driver(tmp_path, "133.0.6943.54")
+    expected = _fake_driver(tmp_path, "141.0.7390.54")
+
+    assert driver_cache.resolve_chromedriver("Chrome/141.0.7390.54") == expected
+    index = json.loads((tmp_path / "cache" / "chromedriver.json").read_text())
+    assert index["141"]["path"] == expected and index["141"]["source"] == "wdm-cache"
+
+    # Later lookups (and other processes, via the index) never scan again
+    monkeypatch.setattr(driver_cache, "_find_downloaded", lambda major: pytest.fail("rescanned"))
+    assert driver_cache.resolve_chromedriver("141") == expected
+    driver_cache._resolved.clear()
+    assert driver_cache.resolve_chromedriver("141") == expected
+
+
+def test_stale_entry_is_re_resolved_and_missing_driver_raises(driver_cache, tmp_path):
+    path = _fake_driver(tmp_path, "141.0.7390.54")
+    driver_cache.resolve_chromedriver("141")
+    os.remove(path)
+
+    with pytest.raises(RuntimeError):
+        driver_cache.resolve_chromedriver("141")
+
+    replacement = _fake_driver(tmp_path, "141.0.7400.1")
+    assert driver_cache.resolve_chromedriver("141") == replacement
+
+    driver_cache.invalidate_chromedriver("141")
+    assert "141" not in json.loads((tmp_path / "cache" / "chromedriver.json").read_text())
@@ -0,0 +1,50 @@
+"""
+Tests for batched element snapshots (fake driver standing in for the page).
+"""
+
+
+from browser_automation_under_test import element_snapshot
+
+
+class FakeDriver:
+    """Answers the snapshot script with fixed rows and resolves handles by index"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append((script, args))
+        if script == element_snapshot.RESOLVE_JS:
+            return f"element-{args[1]}"
+        return [dict(row) for row in self.rows]
+
+
+def test_one_script_call_for_all_matches_and_fields():
+    driver = FakeDriver([
+        {"index": 0, "text": "Follow", "profile_href": "https://www.threads.net/@alice"},
+        {"index": 1, "text": "Following", "profile_href": None},
+    ])
+
+    records = element_snapshot.snapshot_elements(
+        driver, "button", fields=("text",), root="modal",
+        related={"profile_href": ("a[href*='/@']", "href", 2)}, limit=10, visible_only=True)
+
+    assert len(driver.calls) == 1
+    selector, by, root, fields, related, limit, visible_only = driver.calls[0][1][:7]
+    assert (selector, by, root, fields, limit, visible_only) == ("button", "css selector", "modal", ["text"], 10, True)
+    assert related == {"profile_href": ["a[href*='/@']", "href", 2]}
+    assert [record.text for record in records] == ["Follow", "Following"]
+    assert records[0]["profile_href"].endswith("/@alice")
+    assert records[1].get("missing", "-") == "-"
+
+
+def test_element_handles_resolve_lazily_once():
+    driver = FakeDriver([{"index": 0, "text": "a"}, {"index": 1, "text": "b"}])
+    records = element_snapshot.snapshot_elements(driver, "li")
+    token = driver.calls[0][1][8]
+
+    assert records[1].element == "element-1"
+    assert records[1].element == "element-1"
+    assert driver.calls[1][1] == (token, 1)
+    assert len(driver.calls) == 2  # second access is cached, records[0] never resolved
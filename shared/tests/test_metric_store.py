@@ -0,0 +1,92 @@
+"""
+Tests for the ring-buffer + rollup time-series store.
+"""
+
+import time
+import sqlite3
+
+from shared.metric_store import TimeSeriesStore
+from shared.write_behind import WriteBehindWriter
+
+# Start of an hour a few hours ago (well inside the default retention)
+T0 = (int(time.time()) // 3600 - 3) * 3600.0
+
+
+def _bucket(epoch):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch))
+
+
+def _store(tmp_path, **kwargs):
+    db_path = str(tmp_path / "metrics.db")
+    return TimeSeriesStore(db_path, "m", writer=WriteBehindWriter(db_path), **kwargs)
+
+
+def _rows(store, table):
+    store.flush(wait=True)
+    conn = sqlite3.connect(store.db_path)
+    try:
+        return conn.execute(f"SELECT profile_id, series, page_url, bucket, count, sum, min, max "
+                            f"FROM {table} ORDER BY bucket").fetchall()
+    finally:
+        conn.close()
+
+
+def test_samples_roll_up_into_minutes_and_hours(tmp_path):
+    store = _store(tmp_path)
+    store.record("p1", "load_ms", 100, "ms", page_url="/a", timestamp=T0 + 5)
+    store.record("p1", "load_ms", 300, "ms", page_url="/a", timestamp=T0 + 50)
+    store.record("p1", "load_ms", 200, "ms", page_url="/a", timestamp=T0 + 70)
+
+    assert _rows(store, "m_1m") == [
+        ("p1", "load_ms", "/a", _bucket(T0), 2, 400.0, 100.0, 300.0),
+        ("p1", "load_ms", "/a", _bucket(T0 + 60), 1, 200.0, 200.0, 200.0),
+    ]
+    assert _rows(store, "m_1h") == [
+        ("p1", "load_ms", "/a", _bucket(T0), 3, 600.0, 100.0, 300.0),
+    ]
+
+    # A flushed partial minute keeps accumulating
+    store.record("p1", "load_ms", 500, "ms", page_url="/a", timestamp=T0 + 80)
+    assert _rows(store, "m_1m")[-1][4:] == (2, 700.0, 200.0, 500.0)
+
+
+def test_ring_buffer_keeps_only_recent_samples(tmp_path):
+    store = _store(tmp_path, ring_size=3)
+    for i in range(5):
+        store.record("p1", "event", timestamp=T0 + i, data={"i": i})
+
+    recent = store.recent("p1")
+    assert [sample["data"]["i"] for sample in recent] == [4, 3, 2]
+    assert store.oldest_recent("p1") == T0 + 2
+    assert store.recent("p1", limit=1)[0]["timestamp"] == T0 + 4
+
+    store.forget("p1")
+    assert store.recent("p1") == []
+    assert _rows(store, "m_1h")[0][4] == 5
+
+
+def test_summary_and_top_pages_read_rollups(tmp_path):
+    store = _store(tmp_path)
+    now = time.time()
+    store.record("p1", "load_ms", 100, "ms", page_url="/fast", timestamp=now)
+    store.record("p1", "load_ms", 900, "ms", page_url="/slow", timestamp=now)
+    store.record("p2", "load_ms", 500, "ms", page_url="/mid", timestamp=now)
+
+    summary = store.summary("p1", hours=1)
+    assert summary["load_ms"] == {"average": 500.0, "minimum": 100.0, "maximum": 900.0,
+                                  "unit": "ms", "samples": 2}
+
+    pages = store.top_pages("load_ms", hours=1)
+    assert [(page["profile_id"], page["page_url"]) for page in pages] == [
+        ("p1", "/slow"), ("p2", "/mid"), ("p1", "/fast")]
+    assert len(store.top_pages("load_ms", profile_id="p2")) == 1
+
+
+def test_prune_drops_rollups_past_retention(tmp_path):
+    store = _store(tmp_path, retention={"1m": 3600})
+    store.record("p1", "load_ms", 100, timestamp=T0)
+    store.flush(wait=True)
+
+    store.prune()
+    assert _rows(store, "m_1m") == []
+    assert len(_rows(store, "m_1h")) == 1
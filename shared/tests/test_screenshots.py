@@ -0,0 +1,116 @@
+"""
+Tests for the background screenshot service (fake drivers, byte payloads).
+"""
+
+import base64
+from pathlib import Path
+
+from browser_automation_under_test import screenshots
+
+# Exercise the dependency-free path (byte-identical frames are the unchanged ones)
+screenshots.Image = None
+
+
+class CDPDriver:
+    """Browser that only knows JPEG over CDP"""
+
+    def __init__(self):
+        self.frame = b"frame-1"
+        self.formats = []
+
+    def execute_cdp_cmd(self, method, params):
+        self.formats.append(params["format"])
+        if params["format"] != "jpeg":
+            raise RuntimeError("Invalid format")
+        return {"data": base64.b64encode(self.frame).decode()}
+
+
+class WebPDriver:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.formats = []
+
+    def execute_cdp_cmd(self, method, params):
+        if not self.alive:
+            raise RuntimeError("disconnected: not connected to DevTools")
+        self.formats.append(params["format"])
+        return {"data": base64.b64encode(b"webp-frame").decode()}
+
+    def get_screenshot_as_png(self):
+        raise AssertionError("a dead browser should not be asked for a PNG")
+
+
+class PlainDriver:
+    def get_screenshot_as_png(self):
+        return b"\x89PNG" + b"x" * 100
+
+
+def test_unchanged_frames_are_skipped_unless_forced(tmp_path):
+    service = screenshots.ScreenshotService(tmp_path)
+    driver = CDPDriver()
+    saved = []
+
+    first = service.capture(driver, "p1", "tick", on_saved=saved.append)
+    skipped = service.capture(driver, "p1", "tick", on_saved=saved.append)
+    forced = service.capture(driver, "p1", "proof", force=True)
+    driver.frame = b"frame-2"
+    changed = service.capture(driver, "p1", "tick2", on_saved=saved.append)
+    service.flush()
+
+    assert driver.formats[:2] == ["webp", "jpeg"]
+    # Routine frames are only queued; paths come from on_saved once written
+    assert first is True and skipped is True and changed is True
+    assert len(saved) == 2 and all(Path(path).exists() for path in saved)
+    assert saved[0].endswith("_tick.jpg") and Path(saved[0]).parent == tmp_path / "p1"
+    assert Path(forced).exists() and forced.endswith("_proof.jpg")
+    assert service.saved == 3 and service.skipped == 1
+
+
+def test_quota_evicts_least_recently_used_frames(tmp_path):
+    service = screenshots.ScreenshotService(tmp_path, quota_mb=250 / (1024 * 1024))
+    for i in range(4):
+        service.submit(bytes([i]) * 100, "p1", f"frame_{i}")
+    service.flush()
+
+    frames = service.frames("p1")
+    assert len(frames) == 2
+    assert frames[0].endswith("frame_3.png")
+    assert service.evicted == 2
+    assert service.stats()["usage_mb"]["p1"] == round(200 / (1024 * 1024), 1)
+
+
+def test_driver_without_cdp_falls_back_to_png(tmp_path):
+    service = screenshots.ScreenshotService(tmp_path)
+    saved = []
+
+    assert service.capture(PlainDriver(), "p/2", "no cdp", on_saved=saved.append) is True
+    service.flush()
+
+    assert len(saved) == 1
+    assert saved[0].endswith("_no_cdp.png")
+    assert Path(saved[0]).parent.name == "p_2"
+
+
+def test_a_dead_browser_does_not_downgrade_other_drivers(tmp_path):
+    service = screenshots.ScreenshotService(tmp_path)
+    old_build, healthy = CDPDriver(), WebPDriver()
+
+    assert service.capture(WebPDriver(alive=False), "p1", "crashed", force=True) is None
+    assert service.capture(old_build, "p2", "tick") is True
+    assert service.capture(old_build, "p2", "tick2") is True
+    assert service.capture(healthy, "p3", "tick") is True
+    service.flush()
+
+    # The rejected format is remembered for that driver only
+    assert old_build.formats == ["webp", "jpeg", "jpeg"]
+    assert healthy.formats == ["webp"]
+
+
+def test_frames_with_the_same_name_in_one_second_keep_their_own_files(tmp_path):
+    service = screenshots.ScreenshotService(tmp_path)
+    paths = [service.submit(bytes([i]) * 10, "p1", "proof", force=True) for i in range(3)]
+    service.flush()
+
+    assert len(set(paths)) == 3
+    assert all(Path(path).exists() for path in paths)
+    assert len(service.frames("p1")) == 3
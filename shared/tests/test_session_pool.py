@@ -0,0 +1,125 @@
+"""
+Tests for the warm GoLogin session pool used by GoLoginSession.
+"""
+
+
+from browser_automation_under_test import session_pool
+
+
+class FakeSwitch:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current = handle
+
+
+class FakeDriver:
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.current = "main"
+        self.url = None
+        self.alive = True
+        self.switch_to = FakeSwitch(self)
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("browser gone")
+        return 1
+
+    def get(self, url):
+        if not self.alive:
+            raise RuntimeError("browser gone")
+        self.url = url
+
+    def close(self):
+        self.window_handles.remove(self.current)
+
+
+class FakeManager:
+    def __init__(self):
+        self.started = 0
+        self.cleaned = []
+
+    def start_session(self, profile_id, headless=False):
+        self.started += 1
+        return {"driver": FakeDriver(), "profile_id": profile_id}
+
+    def cleanup_session(self, session_data):
+        self.cleaned.append(session_data)
+
+
+def test_reuses_healthy_session_and_resets_tabs():
+    manager = FakeManager()
+    pool = session_pool.BrowserSessionPool(idle_ttl=60, max_idle=2)
+
+    first = pool.acquire(manager, "p1")
+    first["driver"].window_handles.append("popup")
+    pool.release(first)
+
+    assert first["driver"].window_handles == ["main"]
+    assert first["driver"].url == "about:blank"
+
+    second = pool.acquire(manager, "p1")
+    assert second is first and second["reused"]
+    assert manager.started == 1 and manager.cleaned == []
+    assert pool.stats()["warm_leases"] == 1
+    pool.close_all()
+
+
+def test_unhealthy_or_unreusable_sessions_are_replaced():
+    manager = FakeManager()
+    pool = session_pool.BrowserSessionPool(idle_ttl=60, max_idle=2)
+
+    first = pool.acquire(manager, "p1")
+    pool.release(first)
+    first["driver"].alive = False
+
+    second = pool.acquire(manager, "p1")
+    assert second is not first and not second["reused"]
+    assert manager.cleaned == [first]
+
+    pool.release(second, reusable=False)
+    assert manager.cleaned == [first, second]
+    assert pool.stats()["idle"] == 0
+
+
+def test_idle_cap_and_ttl_close_sessions():
+    manager = FakeManager()
+    pool = session_pool.BrowserSessionPool(idle_ttl=60, max_idle=1)
+
+    a = pool.acquire(manager, "a")
+    b = pool.acquire(manager, "b")
+    pool.release(a)
+    pool.release(b)
+    assert manager.cleaned == [a]  # oldest idle evicted
+    assert pool.stats()["idle_profiles"] == ["b"]
+
+    pool.idle_ttl = 0.0001
+    pool._idle[("b", False)].idle_since -= 1
+    pool.reap()
+    assert manager.cleaned == [a, b]
+    pool.close_all()
+
+
+def test_disabled_pool_closes_on_release():
+    manager = FakeManager()
+    pool = session_pool.BrowserSessionPool(idle_ttl=0)
+
+    session = pool.acquire(manager, "p1")
+    pool.release(session)
+    assert manager.cleaned == [session]
+
+
+def test_evict_idle_closes_oldest_idle_session():
+    manager = FakeManager()
+    pool = session_pool.BrowserSessionPool(idle_ttl=60, max_idle=2)
+    first = pool.acquire(manager, "p1")
+    second = pool.acquire(manager, "p2")
+    pool.release(first)
+    pool.release(second)
+
+    assert pool.evict_idle() is True
+    assert pool.stats()["idle_profiles"] == ["p2"]
+    assert pool.evict_idle() is True
+    assert pool.evict_idle() is False
@@ -0,0 +1,81 @@
+"""
+Tests for the shared live-session registry and debugging port allocator.
+"""
+
+import pytest
+
+from conftest import load_fresh as _load
+
+
+@pytest.fixture
+def registry_module():
+    return _load("session_registry")
+
+
+def test_register_is_visible_to_other_processes(registry_module, tmp_path):
+    path = str(tmp_path / "sessions.json")
+    ours = registry_module.SessionRegistry(path=path, owner="threads")
+    theirs = registry_module.SessionRegistry(path=path, owner="x-auth")
+    theirs.pid = ours.pid + 1  # pretend to be another process
+
+    session = {"driver": object(), "debugger_address": "127.0.0.1:3500", "port": 3500}
+    ours.register("p1", session, backend="cloud")
+
+    assert ours.get("p1") is session and "p1" in ours
+    assert session["backend"] == "cloud"
+    record = theirs.find("p1")
+    assert record["owner"] == "threads"
+    assert record["debugger_address"] == "127.0.0.1:3500"
+    assert "driver" not in record
+    assert [r["profile_id"] for r in theirs.list_sessions(backend="cloud")] == ["p1"]
+    assert theirs.list_sessions(backend="local") == []
+
+    assert ours.unregister("p1") is session
+    assert theirs.find("p1") is None
+
+
+def test_records_of_dead_processes_are_pruned(registry_module, tmp_path, monkeypatch):
+    path = str(tmp_path / "sessions.json")
+    dead = registry_module.SessionRegistry(path=path, owner="crashed")
+    dead.pid = 999999
+    dead.register("p1", {"debugger_address": "127.0.0.1:3501"}, backend="cloud")
+
+    monkeypatch.setattr(registry_module, "pid_alive", lambda pid: pid != 999999)
+    registry = registry_module.SessionRegistry(path=path)
+    assert registry.find("p1") is None
+    assert registry_module.read_json(path, None) == {}
+
+
+def test_port_allocator_reuses_released_ports(tmp_path):
+    ports = _load("ports")
+    allocator = ports.PortAllocator(start_port=45000, end_port=45001, path=str(tmp_path / "ports.json"))
+    allocator._bindable = lambda port: True
+
+    first = allocator.get_available_port("p1")
+    second = allocator.get_available_port("p2")
+    assert {first, second} == {45000, 45001}
+    assert allocator.get_available_port("p3") is None
+    assert allocator.available_count == 0
+    assert allocator.leases()[str(first)]["profile_id"] == "p1"
+
+    allocator.release_port(first)
+    assert str(first) not in allocator.leases()
+    assert allocator.get_available_port("p3") == first
+
+
+def test_port_leases_of_dead_processes_are_reclaimed(tmp_path, monkeypatch):
+    ports = _load("ports")
+    path = str(tmp_path / "ports.json")
+    crashed = ports.PortAllocator(start_port=45000, end_port=45000, path=path)
+    crashed.pid = 999999
+    crashed._bindable = lambda port: True
+    assert crashed.get_available_port("p1") == 45000
+
+    allocator = ports.PortAllocator(start_port=45000, end_port=45000, path=path)
+    allocator._bindable = lambda port: True
+    monkeypatch.setattr(ports, "pid_alive", lambda pid: True)
+    assert allocator.get_available_port("p2") is None
+
+    monkeypatch.setattr(ports, "pid_alive", lambda pid: pid != 999999)
+    assert allocator.get_available_port("p2") == 45000
+    assert allocator.leases()["45000"]["pid"] == allocator.pid
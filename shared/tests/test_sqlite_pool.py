@@ -0,0 +1,92 @@
+"""
+Tests for the per-thread SQLite connection pool.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from shared.sqlite_pool import SQLiteConnectionPool, get_pool, open_connection
+
+
+def _in_thread(fn):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()))
+    thread.start()
+    thread.join()
+    return result[0], thread
+
+
+def test_each_thread_reuses_its_own_connection(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "pool.db"))
+    conn = pool.get()
+    assert pool.get() is conn
+    with pool.connection() as same:
+        assert same is conn
+
+    other, _ = _in_thread(pool.get)
+    assert other is not conn
+
+
+def test_connections_of_finished_threads_are_closed(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "pool.db"))
+    other, thread = _in_thread(pool.get)
+    assert not thread.is_alive()
+
+    # Opening a connection on another thread prunes the dead thread's one
+    _in_thread(pool.get)
+    with pytest.raises(sqlite3.ProgrammingError):
+        other.execute("SELECT 1")
+
+
+def test_connections_use_wal_and_shared_pragmas(tmp_path):
+    conn = SQLiteConnectionPool(str(tmp_path / "pool.db"), busy_timeout_ms=1234).get()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    assert conn.row_factory is sqlite3.Row
+
+
+def test_failed_block_rolls_back_and_keeps_connection(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "pool.db"))
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("boom")
+
+    assert not conn.in_transaction
+    assert pool.get() is conn
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_get_pool_is_shared_per_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert get_pool("shared.db") is get_pool(str(tmp_path / "shared.db"))
+    assert get_pool("shared.db") is not get_pool("other.db")
+
+
+def test_discard_and_close_all(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "pool.db"))
+    first = pool.get()
+    pool.discard()
+    second = pool.get()
+    assert second is not first
+
+    pool.close_all()
+    with pytest.raises(sqlite3.ProgrammingError):
+        second.execute("SELECT 1")
+    assert pool.get() is not second
+
+
+def test_open_connection_rows_support_index_and_name(tmp_path):
+    conn = open_connection(str(tmp_path / "plain.db"))
+    row = conn.execute("SELECT 1 AS id, 'alice' AS name").fetchone()
+    assert (row[0], row["name"]) == (1, "alice")
+    assert tuple(row) == (1, "alice")
+    conn.close()
@@ -0,0 +1,98 @@
+"""
+Tests for the shared one-thread monitoring scheduler.
+"""
+
+import time
+import asyncio
+import threading
+
+from shared.tick_scheduler import TickScheduler
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_jobs_of_many_owners_share_one_scheduler_and_cancel_per_owner():
+    scheduler = TickScheduler(max_workers=2)
+    runs = {"a": 0, "b": 0}
+
+    def tick(owner):
+        runs[owner] += 1
+
+    scheduler.schedule("a", "metrics", lambda: tick("a"), interval=0.02)
+    scheduler.schedule("b", "metrics", lambda: tick("b"), interval=0.02)
+    assert _wait_for(lambda: runs["a"] >= 3 and runs["b"] >= 3)
+
+    assert scheduler.cancel("a") == 1
+    time.sleep(0.05)
+    stopped_at = runs["a"]
+    time.sleep(0.1)
+    assert runs["a"] == stopped_at
+    assert [job["owner"] for job in scheduler.jobs()] == ["b"]
+    scheduler.stop()
+
+
+def test_slow_job_is_coalesced_and_stretched():
+    scheduler = TickScheduler(max_workers=2, max_stretch=4)
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(time.monotonic())
+        release.wait(1)
+
+    scheduler.schedule("p1", "screenshot", slow, interval=0.02)
+    time.sleep(0.15)
+    release.set()
+    assert _wait_for(lambda: scheduler.jobs("p1")[0]["runs"] >= 1)
+
+    job = scheduler.jobs("p1")[0]
+    assert len(calls) == 1
+    assert job["coalesced"] >= 1
+    assert job["current_interval"] == 0.02 * 4
+    scheduler.stop()
+
+
+def test_pressure_holds_back_new_runs():
+    pressured = [True]
+    scheduler = TickScheduler(pressure=lambda: pressured[0])
+    runs = []
+
+    scheduler.schedule("p1", "metrics", lambda: runs.append(1), interval=0.01)
+    time.sleep(0.1)
+    assert runs == []
+    assert scheduler.jobs("p1")[0]["deferred"] >= 1
+
+    pressured[0] = False
+    assert _wait_for(lambda: runs, timeout=3)
+    scheduler.stop()
+
+
+def test_coroutine_jobs_run_on_their_event_loop():
+    scheduler = TickScheduler()
+
+    async def main():
+        loop_thread = threading.current_thread()
+        seen = []
+
+        async def tick():
+            seen.append(threading.current_thread())
+
+        scheduler.schedule("conn", "live_screenshot", tick, interval=0.01)
+        for _ in range(200):
+            if len(seen) >= 2:
+                break
+            await asyncio.sleep(0.01)
+        scheduler.cancel("conn")
+        return loop_thread, seen
+
+    loop_thread, seen = asyncio.run(main())
+    assert len(seen) >= 2
+    assert all(thread is loop_thread for thread in seen)
+    scheduler.stop()
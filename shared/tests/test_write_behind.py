@@ -0,0 +1,174 @@
+"""
+Tests for the write-behind writer: batching, journal replay and failure handling.
+"""
+
+import os
+import json
+import sqlite3
+
+from shared import write_behind
+from shared.write_behind import WriteBehindWriter, _Journal
+
+INSERT = "INSERT INTO events (id, name) VALUES (?, ?)"
+
+
+def _db(tmp_path):
+    path = str(tmp_path / "events.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT id, name FROM events ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def _journal(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def _crash(writer):
+    """The writer's process dies: nothing more is written, its journal lock is released"""
+    writer._closed = True
+    writer._journal.close()
+
+
+def test_events_are_written_in_batches(tmp_path):
+    path = _db(tmp_path)
+    writer = WriteBehindWriter(path, batch_size=100, flush_interval=60)
+    for i in range(250):
+        writer.submit(INSERT, (i, f"e{i}"))
+    assert writer.flush()
+
+    assert len(_rows(path)) == 250
+    assert writer.events_written == 250
+    assert writer.batches_written == 3
+    assert _journal(writer.journal_path) == []
+    writer.close()
+
+
+def test_rejected_statements_go_to_failed_journal_and_the_rest_commit(tmp_path):
+    path = _db(tmp_path)
+    writer = WriteBehindWriter(path, batch_size=100, flush_interval=60)
+    writer.submit(INSERT, (1, "a"))
+    writer.submit(INSERT, (2, "b"))
+    writer.submit(INSERT, (1, "duplicate"))
+    writer.submit(INSERT, (3, None))
+    writer.submit(INSERT, (4, "d"))
+    assert writer.flush()
+    writer.close()
+
+    assert _rows(path) == [(1, "a"), (2, "b"), (4, "d")]
+    failed = _journal(writer.failed_path)
+    assert [entry["params"] for entry in failed] == [[1, "duplicate"], [3, None]]
+    assert all("constraint" in entry["error"].lower() for entry in failed)
+    assert not os.path.exists(writer.journal_path)
+
+
+def test_events_are_kept_in_journal_while_database_is_locked(tmp_path, monkeypatch):
+    path = _db(tmp_path)
+    open_connection = write_behind.open_connection
+    monkeypatch.setattr(write_behind, "open_connection", lambda db: open_connection(db, busy_timeout_ms=50))
+    writer = WriteBehindWriter(path, batch_size=100, flush_interval=60)
+    writer.submit(INSERT, (1, "a"))
+    assert writer.flush()
+
+    locker = sqlite3.connect(path)
+    locker.execute("BEGIN IMMEDIATE")
+    writer.submit(INSERT, (2, "b"))
+    assert not writer.flush()
+    assert writer.pending == 1
+    assert [entry["params"] for entry in _journal(writer.journal_path)] == [[2, "b"]]
+
+    locker.rollback()
+    locker.close()
+    writer.submit(INSERT, (3, "c"))
+    assert writer.flush()
+    writer.close()
+
+    assert _rows(path) == [(1, "a"), (2, "b"), (3, "c")]
+    assert not os.path.exists(writer.journal_path)
+
+
+def test_journal_is_replayed_on_start(tmp_path):
+    path = _db(tmp_path)
+    journal_path = f"{path}.journal.4242-dead"
+    with open(journal_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"seq": 1, "sql": INSERT, "params": [1, "a"]}) + "\n")
+        f.write("not json\n")
+        f.write(json.dumps({"seq": 2, "sql": INSERT, "params": [2, "b"]}) + "\n")
+
+    writer = WriteBehindWriter(path)
+    assert _rows(path) == [(1, "a"), (2, "b")]
+    assert not os.path.exists(journal_path)
+
+    writer.submit(INSERT, (3, "c"))
+    writer.flush()
+    writer.close()
+    # Markers of journals that were written out are dropped with them
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM write_behind_state").fetchone()[0] == 0
+    conn.close()
+
+
+def test_replay_skips_events_committed_before_the_journal_was_truncated(tmp_path, monkeypatch):
+    path = _db(tmp_path)
+    # Simulate dying between the commit and the journal truncation
+    monkeypatch.setattr(_Journal, "rewrite", lambda self, entries: None)
+    writer = WriteBehindWriter(path, batch_size=100, flush_interval=60)
+    writer.submit(INSERT, (1, "a"))
+    writer.submit(INSERT, (2, "b"))
+    writer.flush()
+    _crash(writer)
+    monkeypatch.undo()
+
+    with open(writer.journal_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"seq": 3, "sql": INSERT, "params": [3, "c"]}) + "\n")
+    assert len(_journal(writer.journal_path)) == 3
+
+    restarted = WriteBehindWriter(path)
+    restarted.close()
+    assert _rows(path) == [(1, "a"), (2, "b"), (3, "c")]
+    assert not os.path.exists(writer.journal_path)
+    assert not os.path.exists(restarted.failed_path)
+
+
+def test_writers_of_one_database_keep_separate_journals(tmp_path):
+    path = _db(tmp_path)
+    first = WriteBehindWriter(path, batch_size=100, flush_interval=60)
+    second = WriteBehindWriter(path, batch_size=100, flush_interval=60)
+    assert first.journal_path != second.journal_path
+
+    # The second process journals an event and dies before writing it
+    second._journal.append([(second._next_seq(), INSERT, (100, "from second"))])
+    _crash(second)
+    for i in range(1, 11):
+        first.submit(INSERT, (i, f"e{i}"))
+    assert first.flush()
+    assert [entry["params"] for entry in _journal(second.journal_path)] == [[100, "from second"]]
+
+    # The next writer to start replays it (seq 1 is below the first writer's marker, not its own)
+    restarted = WriteBehindWriter(path)
+    restarted.close()
+    assert (100, "from second") in _rows(path)
+    assert not os.path.exists(second.journal_path)
+    # A live writer's journal is never replayed by another
+    assert os.path.exists(first.journal_path)
+    first.close()
+    assert len(_rows(path)) == 11
+
+
+def test_legacy_journal_without_sequence_numbers_is_replayed(tmp_path):
+    path = _db(tmp_path)
+    with open(f"{path}.journal", "w", encoding="utf-8") as f:
+        f.write(json.dumps({"sql": INSERT, "params": [1, "a"]}) + "\n")
+
+    WriteBehindWriter(path).close()
+    assert _rows(path) == [(1, "a")]
@@ -0,0 +1,281 @@
+"""
+One-thread scheduler for periodic monitoring jobs.
+
+Instead of a sleeping thread (or asyncio task) per monitored profile, every
+periodic job lives in a single heap ordered by due time, served by one
+scheduler thread. Due jobs run on a small shared worker pool, or on their
+own event loop when the job is a coroutine function (Playwright pages must
+be driven from the loop they belong to).
+
+Jobs are coalesced and back-pressured rather than queued:
+
+- a job is re-armed only when its previous run ends, so ticks falling
+  inside a slow run are dropped and a slow browser never accumulates a
+  backlog of screenshots for itself;
+- when every worker is busy, or the ``pressure`` callback reports that the
+  downstream (e.g. the database writer) is behind, due jobs are pushed back
+  instead of being started;
+- a job whose runs take longer than half its interval, or that keeps
+  failing, is stretched (up to ``max_stretch`` times its interval) and
+  recovers its normal pace once it is fast again.
+"""
+
+import time
+import heapq
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_STRETCH = 8.0
+# Delay before re-checking a due job that was held back by back-pressure
+PRESSURE_RETRY = 1.0
+
+
+class _Job:
+    def __init__(self, key: Tuple[Hashable, str], func: Callable, interval: float,
+                 loop: Optional[asyncio.AbstractEventLoop]):
+        self.key = key
+        self.func = func
+        self.interval = interval
+        self.loop = loop
+        self.current_interval = interval
+        self.generation = 0  # seq of its live heap entry; older entries are skipped
+        self.running = False
+        self.cancelled = False
+        self.runs = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.coalesced = 0
+        self.deferred = 0
+        self.last_duration = 0.0
+        self.last_error: Optional[str] = None
+
+
+class TickScheduler:
+    """
+    Heap-based scheduler multiplexing periodic jobs onto one thread.
+
+    Jobs are identified by ``(owner, kind)``, e.g. ``(profile_id, 'screenshot')``,
+    and an owner's jobs can be cancelled together.
+
+    Args:
+        max_workers: Threads running synchronous jobs (also the in-flight limit)
+        max_stretch: Largest factor a slow or failing job's interval is stretched by
+        pressure: Optional callable; while it returns True no new job is started
+        name: Thread name prefix
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_stretch: float = DEFAULT_MAX_STRETCH,
+                 pressure: Optional[Callable[[], bool]] = None, name: str = 'tick-scheduler'):
+        self.max_workers = max_workers
+        self.max_stretch = max_stretch
+        self.pressure = pressure
+        self.name = name
+
+        self._jobs: Dict[Tuple[Hashable, str], _Job] = {}
+        self._heap: List[Tuple[float, int, int, Tuple[Hashable, str]]] = []
+        self._seq = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    # ========================================
+    # JOBS
+    # ========================================
+
+    def schedule(self, owner: Hashable, kind: str, func: Callable[[], Any], interval: float,
+                 first_delay: float = 0.0, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Run ``func`` every ``interval`` seconds until cancelled (replaces an existing job).
+
+        Args:
+            owner: Whatever the job belongs to (profile or connection ID)
+            kind: Job kind, unique per owner ('screenshot', 'metrics', ...)
+            func: Callable, or coroutine function run on ``loop``
+            interval: Seconds between runs
+            first_delay: Seconds until the first run
+            loop: Event loop for coroutine functions (default: the running loop)
+        """
+        if asyncio.iscoroutinefunction(func) and loop is None:
+            loop = asyncio.get_running_loop()
+        key = (owner, kind)
+        with self._cond:
+            old = self._jobs.get(key)
+            if old:
+                old.cancelled = True
+            job = self._jobs[key] = _Job(key, func, interval, loop)
+            self._push(job, time.monotonic() + first_delay)
+            self._ensure_thread()
+            self._cond.notify()
+
+    def cancel(self, owner: Hashable, kind: Optional[str] = None) -> int:
+        """
+        Cancel an owner's jobs (or only one kind). A run already in flight finishes.
+
+        Returns:
+            Number of jobs cancelled
+        """
+        with self._cond:
+            keys = [key for key in self._jobs if key[0] == owner and (kind is None or key[1] == kind)]
+            for key in keys:
+                self._jobs.pop(key).cancelled = True
+            return len(keys)
+
+    def jobs(self, owner: Optional[Hashable] = None) -> List[Dict[str, Any]]:
+        """Per-job counters (runs, coalesced/deferred ticks, current interval, ...)"""
+        with self._cond:
+            return [
+                {
+                    'owner': job.key[0],
+                    'kind': job.key[1],
+                    'interval': job.interval,
+                    'current_interval': round(job.current_interval, 2),
+                    'running': job.running,
+                    'runs': job.runs,
+                    'errors': job.errors,
+                    'coalesced': job.coalesced,
+                    'deferred': job.deferred,
+                    'last_duration': round(job.last_duration, 3),
+                    'last_error': job.last_error,
+                }
+                for job in self._jobs.values() if owner is None or job.key[0] == owner
+            ]
+
+    def stop(self):
+        """Stop scheduling; runs in flight are allowed to finish."""
+        with self._cond:
+            self._stopped = True
+            for job in self._jobs.values():
+                job.cancelled = True
+            self._jobs.clear()
+            self._cond.notify()
+        self._executor.shutdown(wait=False)
+
+    # ========================================
+    # SCHEDULER THREAD
+    # ========================================
+
+    def _push(self, job: _Job, due: float):
+        self._seq += 1
+        job.generation = self._seq
+        heapq.heappush(self._heap, (due, self._seq, job.generation, job.key))
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, generation, key = self._heap[0]
+                now = time.monotonic()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                heapq.heappop(self._heap)
+                job = self._jobs.get(key)
+                if job is None or job.cancelled or job.generation != generation:
+                    continue
+                self._tick(job, now)
+
+    def _tick(self, job: _Job, now: float):
+        """Start a due job, or push it back (called with the lock held)"""
+        if self._in_flight >= self.max_workers or self._under_pressure():
+            job.deferred += 1
+            self._push(job, now + min(PRESSURE_RETRY, job.current_interval))
+            return
+
+        job.running = True
+        self._in_flight += 1
+        started = time.monotonic()
+        try:
+            if job.loop is not None:
+                future = asyncio.run_coroutine_threadsafe(job.func(), job.loop)
+            else:
+                future = self._executor.submit(job.func)
+        except RuntimeError as e:
+            # Executor shut down or event loop closed: the job can never run again
+            job.running = False
+            self._in_flight -= 1
+            job.cancelled = True
+            self._jobs.pop(job.key, None)
+            logger.warning(f"Dropping job {job.key}: {e}")
+            return
+        future.add_done_callback(lambda f: self._finished(job, f, started))
+
+    def _under_pressure(self) -> bool:
+        if self.pressure is None:
+            return False
+        try:
+            return bool(self.pressure())
+        except Exception as e:
+            logger.debug(f"Pressure check failed: {e}")
+            return False
+
+    def _finished(self, job: _Job, future: Future, started: float):
+        duration = time.monotonic() - started
+        error = None
+        if future.cancelled():
+            error = 'cancelled'
+        elif future.exception() is not None:
+            error = str(future.exception())
+            logger.error(f"Monitoring job {job.key} failed: {error}")
+
+        with self._cond:
+            self._in_flight -= 1
+            job.running = False
+            job.runs += 1
+            job.last_duration = duration
+            if error:
+                job.errors += 1
+                job.consecutive_errors += 1
+                job.last_error = error
+            else:
+                job.consecutive_errors = 0
+
+            # Slow or failing: stretch the interval; otherwise recover its normal pace
+            stretch = max(2 * duration / job.interval if job.interval else 1.0,
+                          2.0 ** job.consecutive_errors if job.consecutive_errors else 1.0)
+            job.current_interval = job.interval * min(max(stretch, 1.0), self.max_stretch)
+
+            # A job is re-armed only when its run ends, so ticks that fall
+            # inside a long run are dropped (coalesced) rather than queued
+            now = time.monotonic()
+            due = started + job.current_interval
+            if due <= now:
+                job.coalesced += int(duration // job.current_interval)
+                due = now + job.current_interval
+            if not job.cancelled and not self._stopped:
+                self._push(job, due)
+            self._cond.notify()
+
+
+_scheduler: Optional[TickScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler(pressure: Optional[Callable[[], bool]] = None) -> TickScheduler:
+    """
+    Get the process-wide monitoring scheduler.
+
+    Args:
+        pressure: Back-pressure check installed if the scheduler has none yet
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TickScheduler(name='monitor-scheduler')
+        if pressure is not None and _scheduler.pressure is None:
+            _scheduler.pressure = pressure
+        return _scheduler
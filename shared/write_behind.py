@@ -0,0 +1,540 @@
+"""
+Write-behind SQLite writer shared by all workers.
+
+Producers call ``submit(sql, params)`` and return immediately; a single
+background thread per database file drains the queue and writes events in
+batched ``executemany`` transactions once ``batch_size`` events are queued
+or ``flush_interval`` seconds have passed since the first queued event.
+
+Before each batch is written it is appended to the writer's own journal
+file next to the database (``<db>.journal.<pid>-<id>``, exclusively locked
+while the writer is alive), each event with a sequence number. Several
+processes write the same database (the threads server and its scheduler),
+so journals and their markers are never shared. The transaction that
+writes a batch also records the last sequence number it covers in
+``write_behind_state`` under the journal's name, and only then are the
+committed events dropped from the journal. A writer that starts replays
+the journals it can lock - those left by processes that died - skipping
+events their marker shows as committed, so a crash between commit and
+truncation does not write them twice.
+
+A batch that fails is written again one statement at a time. Statements the
+database rejects (constraint violations, bad SQL) go to
+``<db>.journal.failed``; when the database is locked or busy, the remaining
+events stay in the journal and are retried with the next write.
+"""
+
+import os
+import json
+import time
+import uuid
+import atexit
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from queue import Queue, Empty
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from shared.sqlite_pool import open_connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 0.5
+MAX_WRITE_ATTEMPTS = 3
+# Seconds between retries of events kept back by a locked/busy database
+RETRY_INTERVAL = 1.0
+# OperationalError messages that mean "try again later", not "bad statement"
+TRANSIENT_ERRORS = ('locked', 'busy', 'disk is full', 'disk i/o')
+
+# Journal entry: (seq, sql, params)
+Entry = Tuple[int, str, tuple]
+
+# An empty journal of a dead writer is removed once it is this old (seconds);
+# a younger one may belong to a writer that has not locked it yet
+ORPHAN_GRACE = 60.0
+
+_STOP = object()
+
+
+class _FlushRequest:
+    """Queue marker: write everything queued before it, then signal."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+def utc_timestamp() -> str:
+    """Current time in SQLite CURRENT_TIMESTAMP format (UTC)."""
+    return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class _Journal:
+    """
+    One crash journal file and the entries in it still to be written.
+
+    The process writing through a journal holds an exclusive lock on it, so
+    a journal that can be locked belongs to a writer that is gone.
+    """
+
+    def __init__(self, path: str, create: bool = True):
+        self.path = path
+        self.key = os.path.basename(path)  # its row in write_behind_state
+        self.retained: List[Entry] = []
+        self._file = open(path, 'a+' if create else 'r+', encoding='utf-8')
+
+    def lock(self, blocking: bool = True) -> bool:
+        """Take the journal's exclusive lock; False if another writer holds it"""
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except OSError:
+            return False
+
+    def read(self) -> List[Entry]:
+        entries = []
+        self._file.seek(0)
+        for line in self._file:
+            try:
+                entry = json.loads(line)
+                entries.append((int(entry.get('seq', 0)), entry['sql'], tuple(entry['params'])))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                logger.warning(f"Skipping corrupt write-behind journal line in {self.key}")
+        return entries
+
+    def age(self) -> float:
+        try:
+            return time.time() - os.path.getmtime(self.path)
+        except OSError:
+            return 0.0
+
+    @staticmethod
+    def _lines(entries: List[Entry]) -> str:
+        lines = []
+        for seq, sql, params in entries:
+            try:
+                lines.append(json.dumps({'seq': seq, 'sql': sql, 'params': list(params)}) + '\n')
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Could not journal write-behind event: {e}")
+        return ''.join(lines)
+
+    def append(self, entries: List[Entry]):
+        if not entries:
+            return
+        try:
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(self._lines(entries))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.warning(f"Could not journal write-behind batch: {e}")
+
+    def rewrite(self, entries: List[Entry]):
+        """Replace the journal with the entries still to be written."""
+        try:
+            self._file.seek(0)
+            self._file.truncate()
+            if entries:
+                self._file.write(self._lines(entries))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.warning(f"Could not rewrite write-behind journal {self.key}: {e}")
+
+    def close(self):
+        """Close the file, releasing the lock"""
+        try:
+            self._file.close()
+        except OSError:
+            pass
+
+    def remove(self, conn: sqlite3.Connection):
+        """Delete the (empty) journal, then its committed marker"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass  # already removed, or still open elsewhere (Windows)
+        try:
+            conn.execute("DELETE FROM write_behind_state WHERE journal = ?", (self.key,))
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Could not drop write-behind marker {self.key}: {e}")
+
+
+class WriteBehindWriter:
+    """
+    Background batched writer for one SQLite database file.
+
+    Events are ``(sql, params)`` pairs. Within a batch, consecutive events
+    with the same SQL are written with one ``executemany`` call, and the
+    whole batch commits as a single transaction.
+    """
+
+    def __init__(self, db_path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 journal_path: Optional[str] = None):
+        """
+        Initialize writer and start its background thread.
+
+        Args:
+            db_path: Path to the SQLite database file
+            batch_size: Write as soon as this many events are queued
+            flush_interval: Max seconds an event waits before being written
+            journal_path: Prefix of the crash journals (defaults to ``<db_path>.journal``);
+                this writer journals to ``<journal_path>.<pid>-<id>``, and events
+                the database rejects go to ``<journal_path>.failed``
+        """
+        self.db_path = str(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.journal_prefix = journal_path or f"{self.db_path}.journal"
+        self.journal_path = f"{self.journal_prefix}.{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.failed_path = f"{self.journal_prefix}.failed"
+
+        self.events_written = 0
+        self.batches_written = 0
+
+        self._queue: Queue = Queue()
+        self._closed = False
+        self._seq = 0
+        self._journal = _Journal(self.journal_path)
+        self._journal.lock()
+        self._adopted: List[_Journal] = []  # journals of dead writers being replayed
+        self._replay_journals()
+        self._thread = threading.Thread(target=self._run, name=f"write-behind:{os.path.basename(self.db_path)}",
+                                        daemon=True)
+        self._thread.start()
+
+    # ========================================
+    # PRODUCER API
+    # ========================================
+
+    def submit(self, sql: str, params: Sequence):
+        """Queue one statement for writing. Never blocks on the database."""
+        if self._closed:
+            raise RuntimeError(f"Writer for {self.db_path} is closed")
+        self._queue.put((sql, tuple(params)))
+
+    def flush(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Block until every event submitted before this call is written.
+
+        Returns:
+            True if the flush completed within ``timeout`` and no events are
+            kept back for a retry (rejected events count as written)
+        """
+        if self._closed or not self._thread.is_alive():
+            return not self._retained_count()
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout) and not self._retained_count()
+
+    def close(self, timeout: Optional[float] = 30.0):
+        """Flush pending events and stop the background thread."""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    @property
+    def pending(self) -> int:
+        """Approximate number of events waiting to be written."""
+        return self._queue.qsize() + self._retained_count()
+
+    def _retained_count(self) -> int:
+        return sum(len(journal.retained) for journal in [*self._adopted, self._journal])
+
+    # ========================================
+    # BACKGROUND THREAD
+    # ========================================
+
+    def _run(self):
+        conn = open_connection(self.db_path)
+        batch: List[Tuple[str, tuple]] = []
+        deadline = 0.0
+
+        while True:
+            waiting = batch or self._retained_count()
+            timeout = max(0.0, deadline - time.monotonic()) if waiting else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except Empty:
+                item = None
+
+            if item is _STOP:
+                self._write_batch(conn, batch)
+                self._close_journals(conn)
+                conn.close()
+                return
+
+            if isinstance(item, _FlushRequest):
+                self._write_batch(conn, batch)
+                batch = []
+                item.done.set()
+                continue
+
+            if item is not None:
+                if not waiting:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+
+            if (batch or self._retained_count()) and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write_batch(conn, batch)
+                batch = []
+                if self._retained_count():
+                    deadline = time.monotonic() + max(self.flush_interval, RETRY_INTERVAL)
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[str, tuple]]):
+        """
+        Journal and write one batch, after any events retained by an earlier
+        write or left in the journal of a dead writer.
+
+        Each journal's events commit as one transaction. If it fails, the events
+        are written one statement at a time: statements that fail on their own
+        are moved to the ``.failed`` journal, and a locked/busy database
+        stops the pass, retaining the rest in the journal for the next write.
+        """
+        entries = [(self._next_seq(), sql, params) for sql, params in batch]
+        self._journal.append(entries)
+        self._journal.retained.extend(entries)
+
+        for journal in [*self._adopted, self._journal]:
+            if journal.retained:
+                self._write_journal(conn, journal)
+        for journal in [j for j in self._adopted if not j.retained]:
+            self._adopted.remove(journal)
+            journal.remove(conn)
+
+    def _write_journal(self, conn: sqlite3.Connection, journal: _Journal):
+        entries = journal.retained
+        committed = self._execute_batch(conn, entries, journal.key)
+        if committed is None:
+            committed = self._execute_each(conn, entries, journal.key)
+
+        journal.retained = entries[committed:]
+        self.events_written += committed
+        if committed:
+            self.batches_written += 1
+        # Only committed events leave the journal
+        journal.rewrite(journal.retained)
+
+    def _execute_batch(self, conn: sqlite3.Connection, entries: List[Entry], key: str) -> Optional[int]:
+        """Write all entries in one transaction. Returns their count, or None if the batch failed."""
+        for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+            try:
+                conn.execute("BEGIN")
+                run_sql = entries[0][1]
+                run_params: List[tuple] = []
+                for _, sql, params in entries:
+                    if sql != run_sql:
+                        conn.executemany(run_sql, run_params)
+                        run_sql, run_params = sql, []
+                    run_params.append(params)
+                conn.executemany(run_sql, run_params)
+                self._mark_committed(conn, key, entries[-1][0])
+                conn.commit()
+                return len(entries)
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                if not _is_transient(e):
+                    logger.warning(f"Write-behind batch of {len(entries)} failed, writing one by one: {e}")
+                    return None
+                if attempt == MAX_WRITE_ATTEMPTS:
+                    logger.error(f"Write-behind batch of {len(entries)} failed, writing one by one: {e}")
+                    return None
+                logger.warning(f"Write-behind batch failed (attempt {attempt}/{MAX_WRITE_ATTEMPTS}): {e}")
+                time.sleep(0.2 * attempt)
+
+    def _execute_each(self, conn: sqlite3.Connection, entries: List[Entry], key: str) -> int:
+        """
+        Write entries one statement at a time in one transaction.
+
+        Returns:
+            Number of leading entries that are done (committed or moved to
+            the ``.failed`` journal); the rest are to be retried
+        """
+        done = 0
+        failed: List[Tuple[Entry, str]] = []
+        try:
+            conn.execute("BEGIN")
+            for entry in entries:
+                conn.execute("SAVEPOINT write_behind_event")
+                try:
+                    conn.execute(entry[1], entry[2])
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO write_behind_event")
+                    conn.execute("RELEASE write_behind_event")
+                    if _is_transient(e):
+                        break
+                    failed.append((entry, str(e)))
+                else:
+                    conn.execute("RELEASE write_behind_event")
+                done += 1
+            if done:
+                self._mark_committed(conn, key, entries[done - 1][0])
+                # Journal the rejects before the commit drops them from the main journal
+                self._append_failed(failed)
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error(f"Write-behind could not write {len(entries)} events, kept in journal: {e}")
+            return 0
+
+        if failed:
+            logger.error(f"Write-behind moved {len(failed)} failing events to {self.failed_path}: {failed[0][1]}")
+        if done < len(entries):
+            logger.warning(f"Write-behind database busy, {len(entries) - done} events kept in journal")
+        return done
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    @staticmethod
+    def _mark_committed(conn: sqlite3.Connection, key: str, seq: int):
+        """Record, inside the write transaction, the last entry of journal ``key`` it covers."""
+        conn.execute(
+            "INSERT INTO write_behind_state (journal, seq) VALUES (?, ?) "
+            "ON CONFLICT(journal) DO UPDATE SET seq = MAX(seq, excluded.seq)",
+            (key, seq)
+        )
+
+    # ========================================
+    # CRASH JOURNAL
+    # ========================================
+
+    def _append_failed(self, failed: List[Tuple[Entry, str]]):
+        """Keep events the database rejected in ``<journal>.failed`` for inspection."""
+        if not failed:
+            return
+        try:
+            with open(self.failed_path, 'a', encoding='utf-8') as f:
+                for (seq, sql, params), error in failed:
+                    try:
+                        f.write(json.dumps({'seq': seq, 'sql': sql, 'params': list(params), 'error': error}) + '\n')
+                    except (TypeError, ValueError):
+                        f.write(json.dumps({'seq': seq, 'sql': sql, 'params': repr(params), 'error': error}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            logger.warning(f"Could not write {self.failed_path}: {e}")
+
+    def _orphan_journals(self) -> List[str]:
+        """Journal files next to the database other than this writer's own"""
+        directory = os.path.dirname(self.journal_prefix) or '.'
+        prefix = os.path.basename(self.journal_prefix)
+        paths = []
+        for name in sorted(os.listdir(directory)):
+            # <prefix> itself is a journal from before per-writer journals
+            if name != prefix and not (name.startswith(f"{prefix}.") and not name.endswith('.failed')):
+                continue
+            path = os.path.join(directory, name)
+            if path != self.journal_path:
+                paths.append(path)
+        return paths
+
+    def _replay_journals(self):
+        """
+        Write events left in the journals of writers that stopped mid-batch.
+
+        Entries at or below a journal's committed marker were written by a
+        batch whose commit landed before the journal was truncated, and are
+        skipped. Journals from before the marker existed have no ``seq`` (0)
+        and are replayed as a whole. A journal stays locked until it is
+        written out, so two starting writers never replay the same one.
+        """
+        conn = open_connection(self.db_path)
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS write_behind_state ("
+                         "journal TEXT PRIMARY KEY, seq INTEGER NOT NULL)")
+            conn.commit()
+            for path in self._orphan_journals():
+                try:
+                    journal = _Journal(path, create=False)
+                except OSError:
+                    continue  # removed by another writer meanwhile
+                if not journal.lock(blocking=False):
+                    journal.close()  # its writer is alive
+                    continue
+                row = conn.execute("SELECT seq FROM write_behind_state WHERE journal = ?",
+                                   (journal.key,)).fetchone()
+                committed = row[0] if row else 0
+                entries = journal.read()
+                journal.retained = [entry for entry in entries if entry[0] == 0 or entry[0] > committed]
+                if len(journal.retained) < len(entries):
+                    logger.info(f"Skipped {len(entries) - len(journal.retained)} already committed "
+                                f"events of {journal.key}")
+                if journal.retained:
+                    self._adopted.append(journal)
+                elif journal.age() > ORPHAN_GRACE:
+                    journal.remove(conn)
+                else:
+                    journal.close()
+
+            replayed = self._retained_count()
+            if replayed:
+                self._write_batch(conn, [])
+                logger.info(f"Replayed {replayed - self._retained_count()} of {replayed} journaled events "
+                            f"for {self.db_path}")
+        finally:
+            conn.close()
+
+    def _close_journals(self, conn: sqlite3.Connection):
+        """On close: remove the own journal if everything is written, unlock the rest for the next writer"""
+        for journal in self._adopted:
+            journal.close()
+        if self._journal.retained:
+            self._journal.close()
+        else:
+            self._journal.remove(conn)
+
+
+def _is_transient(error: sqlite3.Error) -> bool:
+    """Errors that say nothing about the statement itself (locked/busy/full database)"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return any(reason in message for reason in TRANSIENT_ERRORS)
+
+
+_writers: Dict[str, WriteBehindWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path: str) -> WriteBehindWriter:
+    """Get the process-wide write-behind writer for a database file."""
+    key = os.path.abspath(str(db_path))
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer._closed:
+            writer = WriteBehindWriter(key)
+            _writers[key] = writer
+        return writer
+
+
+def flush_all(timeout: Optional[float] = 30.0):
+    """Flush every writer in this process."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.flush(timeout)
+
+
+@atexit.register
+def _close_all_writers():
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close(timeout=10.0)